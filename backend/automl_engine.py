@@ -1,7 +1,7 @@
 """
 PMMS AutoML 예측 엔진
 - pmdarima (Auto-ARIMA) 기반 시계열 예측
-- Optuna 자동 하이퍼파라미터 튜닝
+- Optuna 자동 하이퍼파라미터 튜닝 (시계열별 이전 탐색 결과로 warm start, 신규 시계열은 유사 시계열 최적값부터)
 - 최근 1년 데이터만 사용
 - 재현성을 위한 랜덤 시드 고정
 """
@@ -10,11 +10,13 @@ import numpy as np
 import warnings
 from datetime import datetime, timedelta
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from pmdarima import auto_arima
 import optuna
 
+from meta_tuning import series_features
+
 # 경고 메시지 억제
 warnings.filterwarnings('ignore')
 
@@ -27,6 +29,49 @@ optuna.logging.set_verbosity(optuna.logging.WARNING)
 RANDOM_SEED = 42
 np.random.seed(RANDOM_SEED)
 
+# Optuna 탐색 횟수
+TUNING_TRIALS = 10
+
+# warm start: 첫 시도(이전 최적, 신규 시계열은 유사 시계열 최적값들) 평가 후 최적값이 이 횟수 동안 개선되지 않으면 조기 종료
+WARM_CONFIRM_TRIALS = 3
+
+# 시계열별 보관 시도 수 (최근 순, TPE 사전 분포로 사용)
+MAX_TUNING_HISTORY = 50
+
+# 탐색 공간 (objective 의 suggest 와 동일, 이전 시도를 study 에 추가할 때 사용)
+TUNING_SPACE = {
+    'seasonal': optuna.distributions.CategoricalDistribution([True, False]),
+    'max_p': optuna.distributions.IntDistribution(2, 5),
+    'max_q': optuna.distributions.IntDistribution(2, 5),
+    'max_d': optuna.distributions.IntDistribution(1, 2),
+}
+
+
+def _tuning_key(params: Dict) -> tuple:
+    return tuple(params.get(name) for name in TUNING_SPACE)
+
+
+def _in_space(params: Dict) -> bool:
+    """탐색 공간 안의 파라미터인지 (탐색 공간이 바뀌면 이전 시도는 무시)"""
+    if not isinstance(params, dict) or set(params) != set(TUNING_SPACE):
+        return False
+    for name, distribution in TUNING_SPACE.items():
+        value = params[name]
+        if isinstance(distribution, optuna.distributions.CategoricalDistribution):
+            if value not in distribution.choices:
+                return False
+        elif isinstance(value, bool) or not isinstance(value, int) or not distribution.low <= value <= distribution.high:
+            return False
+    return True
+
+
+def _valid_trials(trials: Optional[List[Dict]]) -> List[Dict]:
+    """탐색 공간 안의 유한한 이전 시도만"""
+    return [
+        trial for trial in trials or []
+        if _in_space(trial.get('params')) and trial.get('value') is not None and np.isfinite(trial['value'])
+    ]
+
 
 class PmmsAutoMLPredictor:
     """
@@ -45,11 +90,13 @@ class PmmsAutoMLPredictor:
         self.best_params = None
         self.exog_cols = []
         self.historical_avg = None
+        self.tuning = None
     
     async def predict(
         self,
         data: List[Any],
-        periods: int = 30
+        periods: int = 30,
+        tuning_history: Optional[Dict] = None
     ) -> Dict:
         """
         AutoML 예측 수행
@@ -57,9 +104,11 @@ class PmmsAutoMLPredictor:
         Args:
             data: 학습 데이터 (DB rows)
             periods: 예측 기간 (일)
+            tuning_history: 같은 시계열의 이전 탐색 결과 (best_params, trials), 있으면 warm start
+                            신규 시계열은 유사 시계열 최적값 (seed_params, seeded_from)
         
         Returns:
-            예측 결과 및 모델 정보
+            예측 결과 및 모델 정보 (tuning: 저장용 탐색 결과)
         """
         try:
             # 1. 데이터 전처리
@@ -68,7 +117,7 @@ class PmmsAutoMLPredictor:
             logger.info(f"Prepared {len(df)} data points for training")
             
             # 2. AutoML 하이퍼파라미터 튜닝
-            best_params = self._auto_tune_hyperparameters(df)
+            best_params = self._auto_tune_hyperparameters(df, tuning_history)
             logger.info(f"Best params found: {best_params}")
             
             # 3. 최적 모델 학습
@@ -82,23 +131,44 @@ class PmmsAutoMLPredictor:
             # 5. 정확도 평가
             metrics = self._evaluate_model(model, df)
             
+            # 6. 경로 분포 추출 (Monte Carlo 기준 초과 확률용, 실패 시 생략)
+            path_model = None
+            try:
+                from exceedance_simulation import fit_path_model
+                path_model = fit_path_model(model.arima_res_, periods).to_dict()
+            except Exception as path_error:
+                logger.warning(f"Path model extraction failed: {path_error}")
+            
             return {
                 'predictions': predictions,
+                'path_model': path_model,
                 'historical_avg': round(float(self.historical_avg), 2),
                 'model_info': {
                     'model_type': 'Auto-ARIMA',
                     'best_params': best_params,
                     'features': ['계절성', '트렌드'],
                     'auto_tuned': True,
+                    'tuning': {
+                        key: self.tuning[key]
+                        for key in ('warm_start', 'meta_seeded', 'seeded_from', 'trials_run', 'stopped_early')
+                    },
                     'data_period': '최근 2년'
                 },
-                'metrics': metrics
+                'metrics': metrics,
+                'tuning': self.tuning
             }
             
         except Exception as e:
             logger.error(f"Prediction failed: {e}")
             raise
     
+    def prepare_training_data(self, data: List[Any]) -> pd.DataFrame:
+        """
+        학습 없이 전처리된 학습 데이터만 생성
+        - 저장된 예측 결과를 재사용할 때 인사이트 분석용 데이터 복원
+        """
+        return self._prepare_data(data)
+    
     def _prepare_data(self, data: List[Any]) -> pd.DataFrame:
         """데이터 전처리 (최근 1년만 사용)"""
         # DB rows를 DataFrame으로 변환
@@ -151,10 +221,20 @@ class PmmsAutoMLPredictor:
         self.training_data = df
         return df
     
-    def _auto_tune_hyperparameters(self, df: pd.DataFrame) -> Dict:
+    def _auto_tune_hyperparameters(self, df: pd.DataFrame, tuning_history: Optional[Dict] = None) -> Dict:
         """
         Optuna를 사용한 자동 하이퍼파라미터 튜닝 (재현성 보장)
+        
+        warm start (tuning_history 있음):
+        - 이전 시도들을 완료된 trial 로 추가 -> TPE 사전 분포
+        - 이전 최적 파라미터를 첫 시도로 재평가, 이후 최적값이 WARM_CONFIRM_TRIALS 회 동안 개선되지 않으면 조기 종료
+        - 최적값은 이번 데이터로 평가한 시도 중에서만 선택 (이전 시도는 다른 데이터 기준)
+        
+        메타 시드 (이력 없음, seed_params 있음):
+        - 유사 시계열 최적 파라미터들을 첫 시도들로 평가, 이후 같은 조건으로 조기 종료
         """
+        evaluated = {}  # 이번 탐색에서 평가한 파라미터 -> RMSE (중복 제안은 재학습 생략)
+        
         def objective(trial):
             # 하이퍼파라미터 탐색 공간
             params = {
@@ -164,6 +244,9 @@ class PmmsAutoMLPredictor:
                 'max_q': trial.suggest_int('max_q', 2, 5),
                 'max_d': trial.suggest_int('max_d', 1, 2),
             }
+            key = _tuning_key(trial.params)
+            if key in evaluated:
+                return evaluated[key]
             
             try:
                 # 학습/검증 분할
@@ -193,22 +276,77 @@ class PmmsAutoMLPredictor:
                 # 검증
                 if len(test_y) > 0:
                     pred = model.predict(n_periods=len(test_y), X=test_X)
-                    rmse = np.sqrt(np.mean((test_y.values - pred) ** 2))
-                    return rmse
+                    rmse = float(np.sqrt(np.mean((test_y.values - pred) ** 2)))
                 else:
-                    return float('inf')
+                    rmse = float('inf')
                     
             except Exception as e:
                 logger.warning(f"Trial failed: {e}")
-                return float('inf')
+                rmse = float('inf')
+            evaluated[key] = rmse
+            return rmse
         
         # Optuna 최적화 (10회 시도로 빠르게, 재현성 보장)
         sampler = optuna.samplers.TPESampler(seed=RANDOM_SEED)
         study = optuna.create_study(direction='minimize', sampler=sampler)
-        study.optimize(objective, n_trials=10, show_progress_bar=False)
         
-        self.best_params = study.best_params
-        return study.best_params
+        history = tuning_history or {}
+        prior_trials = _valid_trials(history.get('trials'))
+        incumbent = history.get('best_params')
+        warm_start = bool(prior_trials) and _in_space(incumbent)
+        if warm_start:
+            study.add_trials([
+                optuna.trial.create_trial(params=t['params'], distributions=TUNING_SPACE, value=t['value'])
+                for t in prior_trials
+            ])
+            seeds = [incumbent]
+        else:
+            seeds = list({_tuning_key(p): p for p in history.get('seed_params') or [] if _in_space(p)}.values())
+        n_prior = len(study.trials)
+        for params in seeds:
+            study.enqueue_trial(params)
+        
+        def stop_when_confirmed(study, trial):
+            """첫 시도들(이전 최적/유사 시계열 최적) 평가 후 현재 최적이 WARM_CONFIRM_TRIALS 회 동안 유지되면 종료"""
+            current = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))[n_prior:]
+            best_index = int(np.argmin([t.value for t in current]))
+            if (len(current) >= len(seeds) + WARM_CONFIRM_TRIALS
+                    and len(current) - 1 - best_index >= WARM_CONFIRM_TRIALS):
+                study.stop()
+        
+        study.optimize(
+            objective,
+            n_trials=TUNING_TRIALS,
+            callbacks=[stop_when_confirmed] if seeds else None,
+            show_progress_bar=False
+        )
+        
+        current = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))[n_prior:]
+        best = min(current, key=lambda t: t.value)
+        trained_at = datetime.now().isoformat()
+        
+        # 저장용 탐색 결과: 이번 시도 + 이전 시도 (같은 파라미터는 최신만, 최근 순)
+        trials, seen = [], set()
+        for trial in [{'params': t.params, 'value': t.value, 'trained_at': trained_at} for t in current] + prior_trials:
+            key = _tuning_key(trial['params'])
+            if key in seen or not np.isfinite(trial['value']):
+                continue
+            seen.add(key)
+            trials.append(trial)
+        self.tuning = {
+            'best_params': best.params,
+            'best_value': best.value if np.isfinite(best.value) else None,
+            'trials': trials[:MAX_TUNING_HISTORY],
+            'warm_start': warm_start,
+            'meta_seeded': bool(seeds) and not warm_start,
+            'seeded_from': (history.get('seeded_from') or []) if seeds and not warm_start else [],
+            'features': series_features(df['y'].to_numpy()),
+            'trials_run': len(current),
+            'stopped_early': len(current) < TUNING_TRIALS
+        }
+        
+        self.best_params = best.params
+        return best.params
     
     def _train_model(self, df: pd.DataFrame, params: Dict):
         """최적 파라미터로 모델 학습"""
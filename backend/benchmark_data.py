@@ -0,0 +1,76 @@
+"""
+벤치마크용 합성 측정 데이터 생성
+- DB 없이 InsightGenerator / AutoML 경로를 재현 가능한 데이터로 측정
+"""
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+RANDOM_SEED = 42
+
+
+def make_raw_rows(n_rows: int = 1000, n_stacks: int = 5, seed: int = RANDOM_SEED) -> List[Dict]:
+    """Measurement 조회 결과와 같은 형태의 행 목록 생성"""
+    rng = np.random.default_rng(seed)
+    start = datetime(2023, 1, 1)
+
+    stack_levels = rng.uniform(5, 40, n_stacks)
+    stack_idx = rng.integers(0, n_stacks, n_rows)
+    minutes = np.sort(rng.choice(n_rows * 30, n_rows, replace=False))
+    temp = rng.normal(15, 8, n_rows)
+    values = np.abs(stack_levels[stack_idx] + 0.3 * temp + rng.gamma(2.0, 3.0, n_rows))
+
+    # 추가 수치 컬럼 (기존 컬럼 난수열이 바뀌지 않도록 별도 생성기 사용)
+    extra = np.random.default_rng(seed + 1)
+    pressure = extra.normal(760, 5, n_rows)
+    gas_velocity = extra.uniform(5, 20, n_rows) + 0.05 * values
+    moisture = extra.uniform(2, 15, n_rows)
+    flow = extra.normal(300, 40, n_rows)
+    flow_missing = extra.random(n_rows) < 0.2
+
+    rows = []
+    for i in range(n_rows):
+        rows.append({
+            'measured_at': start + timedelta(minutes=int(minutes[i]) * 60),
+            'value': float(values[i]),
+            'stack_id': f"stack-{stack_idx[i]:03d}",
+            'stack_name': f"#A{stack_idx[i]:07d}",
+            'temp': float(temp[i]),
+            'humidity': float(rng.uniform(20, 90)),
+            'wind_speed': float(rng.uniform(0, 8)),
+            'gas_temp': float(rng.normal(120, 15)),
+            'o2_measured': float(rng.normal(12, 1.5)) if rng.random() > 0.1 else None,
+            'pressure': float(pressure[i]),
+            'gas_velocity': float(gas_velocity[i]),
+            'moisture': float(moisture[i]),
+            'flow': None if flow_missing[i] else float(flow[i])
+        })
+    return rows
+
+
+def make_training_frame(rows: List[Dict]) -> pd.DataFrame:
+    """PmmsAutoMLPredictor._prepare_data 결과와 같은 형태의 학습 데이터"""
+    df = pd.DataFrame(rows)
+    df['ds'] = pd.to_datetime(df['measured_at'])
+    df['y'] = df['value'].astype(float)
+    df = df.drop_duplicates(subset=['ds'], keep='last').sort_values('ds').set_index('ds')
+    return df
+
+
+def make_predictions(periods: int = 30, level: float = 20.0, seed: int = RANDOM_SEED) -> List[Dict]:
+    """예측 결과 목록 생성"""
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1)
+    values = level + np.cumsum(rng.normal(0, 0.5, periods))
+
+    predictions = []
+    for i, value in enumerate(values):
+        predictions.append({
+            'date': (start + timedelta(days=i + 1)).strftime('%Y-%m-%d'),
+            'predicted_value': round(max(0.0, float(value)), 2),
+            'lower_bound': round(max(0.0, float(value - 8)), 2),
+            'upper_bound': round(max(0.0, float(value + 8)), 2),
+            'trend': round(float(value), 2)
+        })
+    return predictions
@@ -0,0 +1,80 @@
+"""
+Monte Carlo 기준 초과 확률 벤치마크
+- 기존 대안: statsmodels SARIMAXResults.simulate(repetitions=N) (경로별 칼만 시뮬레이션)
+- 현재: 경로 모델(충격 응답) 행렬곱 1회로 10,000 경로 × 365일 생성
+- 정확도: 경로 표준편차와 statsmodels 예측 분산(var_pred_mean) 비교
+"""
+import sys
+import time
+import timeit
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pmdarima import auto_arima
+
+from exceedance_simulation import exceedance_probabilities, fit_path_model, simulate_paths
+
+warnings.filterwarnings('ignore')
+
+N_PATHS = 10_000
+HORIZON = 365
+# statsmodels simulate 는 느려서 일부 경로만 측정 후 환산
+BASELINE_PATHS = 200
+REPEATS = 3
+
+
+def make_series(n: int = 730, seed: int = 42) -> pd.Series:
+    """주간 계절성 + 완만한 추세의 일별 농도"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    return pd.Series(20 + 4 * np.sin(2 * np.pi * t / 7) + np.cumsum(rng.normal(0, 0.2, n)) + rng.normal(0, 2, n))
+
+
+def main():
+    print("=== Monte Carlo 기준 초과 확률 벤치마크 ===")
+    y = make_series()
+    started = time.perf_counter()
+    model = auto_arima(y, seasonal=True, m=7, max_p=3, max_q=3, max_d=2,
+                       suppress_warnings=True, error_action='ignore', stepwise=True)
+    print(f"모델: ARIMA{model.order}x{model.seasonal_order} (학습 {time.perf_counter() - started:.1f}s)")
+    results = model.arima_res_
+
+    build_best = min(timeit.repeat(lambda: fit_path_model(results, HORIZON), number=1, repeat=REPEATS))
+    path_model = fit_path_model(results, HORIZON)
+
+    expected_std = np.sqrt(np.asarray(results.get_forecast(HORIZON).var_pred_mean))
+    assert np.allclose(path_model.std(), expected_std, rtol=1e-6), "경로 모델 분산이 statsmodels 예측 분산과 다름"
+
+    limit_value = float(np.percentile(y, 95))
+    simulate_best = min(timeit.repeat(
+        lambda: exceedance_probabilities(simulate_paths(path_model, N_PATHS), limit_value),
+        number=1, repeat=REPEATS
+    ))
+
+    # 평균을 크게 옮겨 0 절단 없이 분산 검증
+    shifted = simulate_paths(path_model._replace(mean=path_model.mean + 1e4), N_PATHS) - 1e4
+    std_error = np.abs(shifted.std(axis=0) / expected_std - 1).max()
+    assert std_error < 0.05, f"시뮬레이션 표준편차 오차 과다: {std_error:.3f}"
+
+    baseline_best = min(timeit.repeat(
+        lambda: results.simulate(HORIZON, repetitions=BASELINE_PATHS, anchor='end'),
+        number=1, repeat=REPEATS
+    ))
+    baseline_full = baseline_best * N_PATHS / BASELINE_PATHS
+
+    summary = exceedance_probabilities(simulate_paths(path_model, N_PATHS), limit_value)
+    print(f"경로 모델 생성 ({HORIZON}일): {build_best * 1000:8.2f} ms")
+    print(f"{N_PATHS:,} 경로 × {HORIZON}일 | statsmodels simulate {baseline_full:8.2f} s (환산) | "
+          f"행렬곱 {simulate_best * 1000:8.2f} ms | {baseline_full / simulate_best:6.1f}x")
+    print(f"시점별 표준편차 최대 상대 오차: {std_error * 100:.2f}%")
+    print(f"기준 {limit_value:.2f}: 기간 내 1회 이상 초과 {summary['any_probability'] * 100:.1f}%, "
+          f"기대 초과 일수 {summary['expected_exceed_days']:.1f}일")
+
+
+if __name__ == "__main__":
+    main()
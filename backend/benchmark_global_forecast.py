@@ -0,0 +1,109 @@
+"""
+전역(cross-series) 예측 모델 벤치마크
+- 학습: 전체 시계열(굴뚝별 + 고객사 전체) 1회 학습 시간
+- 예측: 시계열 1개 30일 예측 지연 (요청 시 재학습 없음)
+- 정확도: 같은 holdout 에서 Auto-ARIMA(PmmsAutoMLPredictor) 와 RMSE 비교 (ARIMA 는 느려서 일부 시계열만)
+"""
+import asyncio
+import logging
+import sys
+import time
+import timeit
+import warnings
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import optuna
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from automl_engine import PmmsAutoMLPredictor
+from global_forecast import TOP_NODE, _accuracy, fit_global, prepare_frame
+
+warnings.filterwarnings('ignore')
+logging.disable(logging.WARNING)
+optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+N_CUSTOMERS = 4
+N_STACKS = 3
+N_ITEMS = 5
+N_DAYS = 365
+MISSING_RATE = 0.15
+PERIODS = 30
+REPEATS = 20
+BASELINE_SERIES = 2
+
+
+def make_rows(seed: int = 42) -> pd.DataFrame:
+    """항목별 규모가 다른 주간 계절성 + 확률보행 굴뚝 시계열 (+ 고객사 전체 = 같은 시각 평균)"""
+    rng = np.random.default_rng(seed)
+    start = datetime.now() - timedelta(days=N_DAYS)
+    t = np.arange(N_DAYS)
+    rows = []
+    for c in range(N_CUSTOMERS):
+        for s in range(N_STACKS):
+            for i in range(N_ITEMS):
+                base = 5 + 10 * i + c
+                values = (base * (1 + 0.2 * np.sin(2 * np.pi * t / 7))
+                          + np.cumsum(rng.normal(0, 0.05 * np.sqrt(base), N_DAYS))
+                          + rng.normal(0, 0.1 * base, N_DAYS))
+                for day in np.flatnonzero(rng.random(N_DAYS) >= MISSING_RATE):
+                    rows.append({
+                        'customer_id': f'customer-{c}', 'stack_id': f'stack-{c}-{s}', 'item_key': f'EA-I-{i:04d}',
+                        'measured_at': start + timedelta(days=int(day)), 'value': max(float(values[day]), 0.0)
+                    })
+    stacks = pd.DataFrame(rows)
+    pooled = stacks.groupby(['customer_id', 'item_key', 'measured_at'], as_index=False)['value'].mean()
+    pooled['stack_id'] = TOP_NODE
+    return pd.concat([stacks, pooled], ignore_index=True)
+
+
+def main():
+    print("=== 전역 예측 모델 벤치마크 ===")
+    data = make_rows()
+    frame = prepare_frame(data.to_dict('records'))
+
+    started = time.perf_counter()
+    model, evaluations = fit_global(frame)
+    train_seconds = time.perf_counter() - started
+    print(f"시계열 {model.info['series_count']}개, 측정 {model.info['row_count']:,}건 | "
+          f"학습 (holdout 평가 + 전체 재학습) {train_seconds:.1f}s")
+
+    target = evaluations[0]
+    series = data[(data['customer_id'] == target['customer_id'])
+                  & (data['stack_id'] == target['stack_id'])
+                  & (data['item_key'] == target['item_key'])].sort_values('measured_at')
+    measured_at = series['measured_at'].to_numpy(dtype='datetime64[ns]')
+    values = series['value'].to_numpy()
+    latency = min(timeit.repeat(
+        lambda: model.forecast(measured_at, values, target['item_key'], False, PERIODS),
+        number=1, repeat=REPEATS
+    ))
+    print(f"시계열 1개 {PERIODS}일 예측: {latency * 1000:.2f} ms")
+
+    mapes = [e['mape'] for e in evaluations]
+    print(f"holdout MAPE (전역, {len(evaluations)}개 시계열): 중앙값 {np.median(mapes):.2f}%")
+
+    arima_seconds = 0.0
+    for evaluation in evaluations[:BASELINE_SERIES]:
+        series = data[(data['customer_id'] == evaluation['customer_id'])
+                      & (data['stack_id'] == evaluation['stack_id'])
+                      & (data['item_key'] == evaluation['item_key'])].sort_values('measured_at')
+        train = series[series['measured_at'] < evaluation['holdout_start']]
+        actual = series[series['measured_at'] >= evaluation['holdout_start']]['value'].to_numpy()
+        started = time.perf_counter()
+        result = asyncio.run(PmmsAutoMLPredictor().predict(train.to_dict('records'), len(actual)))
+        arima_seconds += time.perf_counter() - started
+        predicted = np.array([p['predicted_value'] for p in result['predictions']])
+        arima = _accuracy(actual, predicted)
+        print(f"{evaluation['customer_id']}/{evaluation['stack_id'] or '전체'}/{evaluation['item_key']}: "
+              f"RMSE 전역 {evaluation['rmse']:.3f} | Auto-ARIMA {arima['rmse']:.3f}")
+    per_series = arima_seconds / BASELINE_SERIES
+    print(f"Auto-ARIMA 시계열당 학습+예측 {per_series:.1f}s -> 전체 {model.info['series_count']}개 환산 "
+          f"{per_series * model.info['series_count']:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
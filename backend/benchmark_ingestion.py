@@ -0,0 +1,106 @@
+"""
+CSV 일괄 적재 벤치마크 (DB 제외 구간)
+- CSV 청크 파싱, 굴뚝/항목 조회, COPY 레코드 생성 처리량 측정
+- COPY/INSERT 는 기록만 하는 가짜 커넥션으로 대체 (DB 구간은 응답의 upsert_seconds 로 확인)
+"""
+import asyncio
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from measurement_ingest import LookupMaps, ingest_csv
+
+ROW_COUNTS = [100_000, 500_000]
+N_STACKS = 200
+N_ITEMS = 40
+
+
+class RecordingConnection:
+    """COPY 레코드 수만 기록하는 asyncpg 커넥션 대체"""
+
+    def __init__(self):
+        self.copied = 0
+
+    def transaction(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, *args):
+        return None
+
+    async def fetch(self, query, *args):
+        if 'FROM "Stack"' in query:
+            return [{
+                'id': f'stack{i}', 'customer_id': f'customer{i % 20}', 'is_active': True,
+                'name': f'#A{i}', 'site_code': f'#A{i}', 'code': f'S{i:07d}',
+                'full_name': f'{i}번 굴뚝', 'site_name': f'{i}번 굴뚝'
+            } for i in range(N_STACKS)]
+        if 'StackAlias' in query or 'ingest' in query:
+            return []
+        return [{'key': f'EA-I-{i:04d}', 'name': f'항목{i}'} for i in range(N_ITEMS)]
+
+    async def fetchrow(self, query, *args):
+        return {'upserted': self.copied, 'inserted': self.copied, 'source_rows': self.copied, 'aux_rows': 0}
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copied += len(records)
+
+
+def make_csv(n_rows: int, seed: int = 42) -> bytes:
+    """가져오기 형식 합성 CSV (굴뚝 코드/이름 혼용, 보조항목 열 포함)"""
+    rng = np.random.default_rng(seed)
+    stacks = rng.integers(0, N_STACKS, n_rows)
+    minutes = rng.integers(0, 365 * 24 * 60, n_rows)
+    when = pd.Timestamp('2025-01-01') + pd.to_timedelta(minutes, unit='m')
+    names = np.array([f'#A{i}' for i in range(N_STACKS)])
+    codes = np.array([f'S{i:07d}' for i in range(N_STACKS)])
+    items = np.array([f'항목{i}' for i in range(N_ITEMS)])
+    df = pd.DataFrame({
+        '배출구명': np.where(rng.random(n_rows) < 0.5, names[stacks], codes[stacks]),
+        '오염물질': items[rng.integers(0, N_ITEMS, n_rows)],
+        '측정일자': when.strftime('%Y%m%d%H%M'),
+        '농도': np.round(rng.gamma(2.0, 5.0, n_rows), 3),
+        '기온(℃)': np.round(rng.normal(15, 8, n_rows), 1),
+        '습도(%)': np.round(rng.uniform(20, 90, n_rows), 1),
+        '가스온도': np.round(rng.normal(120, 20, n_rows), 1),
+        '기상': rng.choice(['맑음', '흐림', '비'], n_rows)
+    })
+    return df.to_csv(index=False).encode('utf-8')
+
+
+async def run(data: bytes, lookups: LookupMaps):
+    conn = RecordingConnection()
+    report = await ingest_csv(conn, io.BytesIO(data), lookups, 'org1')
+    return conn, report
+
+
+def main():
+    print("=== CSV 일괄 적재 벤치마크 (파싱/조회/COPY 레코드 생성) ===")
+    lookups = LookupMaps()
+    asyncio.run(lookups.load(RecordingConnection()))
+
+    for n in ROW_COUNTS:
+        data = make_csv(n)
+        started = time.perf_counter()
+        conn, report = asyncio.run(run(data, lookups))
+        elapsed = time.perf_counter() - started
+        assert conn.copied == n, f"적재 레코드 수 불일치: {conn.copied} != {n}"
+        print(
+            f"{n:>9,} rows ({len(data) / 1e6:.1f} MB): {elapsed:.2f}s "
+            f"-> {n / elapsed:,.0f} rows/s (parse {report['parse_seconds']:.2f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
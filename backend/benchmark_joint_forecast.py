@@ -0,0 +1,80 @@
+"""
+굴뚝 다항목 동시 예측 벤치마크 (총 CPU 시간)
+- 기존: 항목마다 PmmsAutoMLPredictor (Optuna 10회 + auto_arima) -> 항목 수만큼 반복
+- 현재: joint_forecast VAR 1회 학습으로 전체 항목 예측
+- 항목별 경로는 느려서 일부 항목만 측정 후 항목 수로 환산
+"""
+import asyncio
+import logging
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import optuna
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from automl_engine import PmmsAutoMLPredictor
+from joint_forecast import build_panel, fit_joint
+
+warnings.filterwarnings('ignore')
+logging.disable(logging.WARNING)
+optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+N_ITEMS = 15
+N_TIMESTAMPS = 300
+PERIODS = 30
+# 항목별 AutoML 은 일부 항목만 측정 후 환산
+BASELINE_ITEMS = 3
+# 측정 누락 비율 (항목별 측정 시각 불일치)
+MISSING_RATE = 0.1
+
+
+def make_rows(seed: int = 42):
+    """공통 요인(가동률) + 주간 계절성을 공유하는 굴뚝 다항목 측정 행"""
+    rng = np.random.default_rng(seed)
+    start = datetime.now() - timedelta(days=N_TIMESTAMPS)
+    t = np.arange(N_TIMESTAMPS)
+    factor = np.cumsum(rng.normal(0, 0.3, N_TIMESTAMPS)) + 2 * np.sin(2 * np.pi * t / 7)
+    rows = []
+    for j in range(N_ITEMS):
+        values = 10 + j + (1 + j / 10) * factor + rng.normal(0, 1, N_TIMESTAMPS)
+        for i in range(N_TIMESTAMPS):
+            if rng.random() < MISSING_RATE:
+                continue
+            rows.append({'measured_at': start + timedelta(days=i), 'item_key': f'EA-I-{j:04d}', 'value': float(values[i])})
+    return rows
+
+
+def main():
+    print("=== 굴뚝 다항목 동시 예측 벤치마크 (CPU 시간) ===")
+    rows = make_rows()
+    item_keys = sorted({row['item_key'] for row in rows})
+
+    started = time.process_time()
+    panel, _, _ = build_panel(rows)
+    result = fit_joint(panel, PERIODS)
+    joint_cpu = time.process_time() - started
+    info = result['model_info']
+    assert len(result['items']) == N_ITEMS, "전체 항목 예측 누락"
+
+    baseline_cpu = 0.0
+    for item_key in item_keys[:BASELINE_ITEMS]:
+        item_rows = [row for row in rows if row['item_key'] == item_key]
+        started = time.process_time()
+        asyncio.run(PmmsAutoMLPredictor().predict(item_rows, PERIODS))
+        baseline_cpu += time.process_time() - started
+    baseline_full = baseline_cpu * N_ITEMS / BASELINE_ITEMS
+
+    print(f"{N_ITEMS}개 항목 × {N_TIMESTAMPS}일 (누락 {MISSING_RATE * 100:.0f}%), 예측 {PERIODS}일")
+    print(f"항목별 AutoML {baseline_full:8.2f} s (환산, {BASELINE_ITEMS}개 측정) | "
+          f"VAR({info['lag_order']}) 동시 예측 {joint_cpu:8.3f} s | {baseline_full / joint_cpu:6.1f}x")
+    rmse = np.mean([forecast['metrics']['rmse'] for forecast in result['items'].values()])
+    print(f"VAR 학습 구간 평균 RMSE: {rmse:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+신규 시계열 메타 시드 벤치마크
+- 기존 시계열 2개(주간 계절성형 / 추세형) 탐색 -> 메타 특성 + 최적 파라미터
+- 신규 시계열(계절성형, 다른 고객사)을 새 탐색 vs 유사 시계열 최적값 첫 시도로 비교
+"""
+import asyncio
+import logging
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from automl_engine import PmmsAutoMLPredictor
+from meta_tuning import nearest_seeds, series_features
+
+warnings.filterwarnings('ignore')
+logging.disable(logging.WARNING)
+
+N_DAYS = 300
+PERIODS = 30
+
+
+def make_rows(kind: str, seed: int):
+    rng = np.random.default_rng(seed)
+    start = datetime.now() - timedelta(days=N_DAYS)
+    t = np.arange(N_DAYS)
+    if kind == 'seasonal':
+        values = 20 + 5 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 1.5, N_DAYS)
+    else:
+        values = 20 + np.cumsum(rng.normal(0, 0.8, N_DAYS)) + rng.normal(0, 0.5, N_DAYS)
+    return [{'measured_at': start + timedelta(days=i), 'value': float(values[i])} for i in range(N_DAYS)]
+
+
+def run(rows, tuning_history=None):
+    started = time.perf_counter()
+    result = asyncio.run(PmmsAutoMLPredictor().predict(rows, PERIODS, tuning_history))
+    return result['tuning'], time.perf_counter() - started
+
+
+def main():
+    print("=== 신규 시계열 메타 시드 벤치마크 ===")
+    candidates = []
+    for series_id, kind, seed in (('customer-a::EA-I-0001', 'seasonal', 1), ('customer-a::EA-I-0002', 'trend', 2)):
+        tuning, seconds = run(make_rows(kind, seed))
+        candidates.append({
+            'id': series_id, 'item_key': series_id.split(':')[-1], 'classification': '무기물질',
+            'features': tuning['features'], 'best_params': tuning['best_params']
+        })
+        print(f"기존 {series_id} ({kind}) 탐색 {seconds:.1f}s -> {tuning['best_params']}")
+
+    rows = make_rows('seasonal', 7)
+    y = PmmsAutoMLPredictor().prepare_training_data(rows)['y'].to_numpy()
+    seeds = nearest_seeds(series_features(y), 'EA-I-0001', '무기물질', candidates)
+    print(f"신규 시계열 유사도 순: {[(s['id'], s['distance']) for s in seeds]}")
+
+    cold, cold_seconds = run(rows)
+    seeded, seeded_seconds = run(rows, {
+        'seed_params': [s['best_params'] for s in seeds],
+        'seeded_from': [{'id': s['id'], 'distance': s['distance']} for s in seeds]
+    })
+    for label, tuning, seconds in (('새 탐색', cold, cold_seconds), ('메타 시드', seeded, seeded_seconds)):
+        print(f"{label:8s} {seconds:7.1f}s | 시도 {tuning['trials_run']:2d}회 | "
+              f"검증 RMSE {tuning['best_value']:.3f} | {tuning['best_params']}")
+    print(f"첫 예측까지 시간 {cold_seconds / seeded_seconds:.1f}x 단축")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+보고서 PDF 최적화 벤치마크 (실제 Chromium 렌더링 결과 기준)
+- 벤치마크 보고서 HTML -> Playwright Chromium page.pdf -> PdfOptimizer 단계별 적용
+- 단계별 용량/처리 시간, 서브셋 태그(XXXXXX+)가 이미 있는 폰트 수 출력
+- Chromium 이 필요함 (playwright install chromium)
+"""
+import asyncio
+import io
+import sys
+import time
+from pathlib import Path
+
+import pikepdf
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_data import make_predictions, make_raw_rows, make_training_frame
+from insight_generator import InsightGenerator
+from pdf_optimizer import PdfOptimizer
+from report_pdf import PAGE_MARGIN, wrap_html
+
+REPEATS = 3
+
+STEPS = {
+    '중복 제거만': {'subset_fonts': False, 'recompress_images': False, 'dedupe_resources': True},
+    '폰트 서브셋만': {'subset_fonts': True, 'recompress_images': False, 'dedupe_resources': False},
+    '이미지 재압축만': {'subset_fonts': False, 'recompress_images': True, 'dedupe_resources': False},
+    '전체': {},
+}
+
+
+def make_narrative() -> str:
+    rows = make_raw_rows(n_rows=2000, n_stacks=12)
+    report = InsightGenerator().generate_report(
+        predictions=make_predictions(periods=30),
+        historical_data=make_training_frame(rows),
+        raw_data=rows,
+        model_info={'features': ['계절성', '트렌드'], 'auto_tuned': True},
+        accuracy_metrics={'rmse': 3.2, 'mae': 2.1, 'r2': 0.54},
+        customer_name="벤치마크 고객사",
+        item_name="먼지",
+        limit_value=30.0
+    )
+    return report['narrative']
+
+
+async def render(narrative: str) -> bytes:
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        try:
+            page = await browser.new_page()
+            await page.set_content(wrap_html(narrative))
+            return await page.pdf(format='A4', margin=PAGE_MARGIN, print_background=True)
+        finally:
+            await browser.close()
+
+
+def font_summary(pdf_bytes: bytes):
+    """(Type0 폰트 수, 서브셋 태그가 이미 있는 폰트 수)"""
+    total = tagged = 0
+    with pikepdf.Pdf.open(io.BytesIO(pdf_bytes)) as pdf:
+        for obj in pdf.objects:
+            if isinstance(obj, pikepdf.Dictionary) and obj.get('/Type') == pikepdf.Name.Font \
+                    and obj.get('/Subtype') == pikepdf.Name.Type0:
+                total += 1
+                tagged += '+' in str(obj.get('/BaseFont', ''))[:8]
+    return total, tagged
+
+
+def main():
+    pdf_bytes = asyncio.run(render(make_narrative()))
+    total, tagged = font_summary(pdf_bytes)
+
+    print("=== 보고서 PDF 최적화 벤치마크 (Chromium page.pdf) ===")
+    print(f"원본: {len(pdf_bytes):,} bytes | Type0 폰트 {total}개 중 서브셋 태그 보유 {tagged}개")
+    for label, options in STEPS.items():
+        optimizer = PdfOptimizer(**options)
+        timings = []
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            optimized, stats = optimizer.optimize(pdf_bytes)
+            timings.append(time.perf_counter() - started)
+        print(
+            f"{label}: {len(optimized):,} bytes (-{stats['reduction_pct']}%) | "
+            f"폰트 서브셋 {stats['fonts_subset']}, 이미지 재압축 {stats['images_recompressed']}, "
+            f"중복 제거 {stats['duplicates_removed']} | {min(timings) * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
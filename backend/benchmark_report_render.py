@@ -0,0 +1,58 @@
+"""
+보고서 HTML 렌더링 벤치마크
+- InsightGenerator._generate_narrative 렌더링 시간
+- 생성 HTML 크기 및 인라인 style 속성 수 (Chromium 레이아웃 부담)
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from insight_generator import InsightGenerator
+from benchmark_data import make_raw_rows, make_training_frame, make_predictions
+
+ITERATIONS = 1000
+REPEATS = 7
+
+
+def main():
+    rows = make_raw_rows(n_rows=2000, n_stacks=12)
+    historical = make_training_frame(rows)
+    predictions = make_predictions(periods=30)
+
+    gen = InsightGenerator()
+    report = gen.generate_report(
+        predictions=predictions,
+        historical_data=historical,
+        raw_data=rows,
+        model_info={'features': ['계절성', '트렌드'], 'auto_tuned': True},
+        accuracy_metrics={'rmse': 3.2, 'mae': 2.1, 'r2': 0.54},
+        customer_name="벤치마크 고객사",
+        item_name="먼지",
+        limit_value=30.0
+    )
+    summary = report['summary']
+
+    args = (
+        "벤치마크 고객사", "먼지",
+        summary['historical'], summary['prediction'], summary['trend'], summary['risk'],
+        summary['influence_factors'], summary['correlation'], summary['stack_contribution'],
+        report['accuracy_metrics']
+    )
+
+    html = gen._generate_narrative(*args)
+
+    # 측정 잡음 제거를 위해 REPEATS회 중 최소값 사용
+    timings = timeit.repeat(lambda: gen._generate_narrative(*args), number=ITERATIONS, repeat=REPEATS)
+    best = min(timings)
+
+    print("=== 보고서 렌더링 벤치마크 ===")
+    print(f"반복 횟수: {ITERATIONS} x {REPEATS}")
+    print(f"평균 렌더링 시간: {best / ITERATIONS * 1000:.3f} ms")
+    print(f"HTML 크기: {len(html.encode('utf-8')):,} bytes")
+    print(f"인라인 style 속성 수: {html.count('style=')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+잔차 기반 재학습 정책 벤치마크
+- 시계열 N개에 매일 새 측정 유입 (일부 시계열은 중간에 수준 변화)
+- 기존: 새 측정이 있으면 매번 재학습 / 정책: rolling error 임계값 초과·최대 수명·예측 기간 소진 시만 재학습
+- 비교: 재학습 횟수, 수준 변화 후 첫 재학습까지 지연(사유), 사용 중인 예측의 오차 (MAE)
+- 학습기는 빠른 SARIMAX 고정 차수 (재학습 1회 비용은 Auto-ARIMA 탐색 기준으로 환산)
+"""
+import logging
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from exceedance_simulation import fit_path_model
+from retrain_policy import DRIFT_THRESHOLD, MAX_MODEL_AGE_DAYS, evaluate
+
+warnings.filterwarnings('ignore')
+logging.disable(logging.WARNING)
+
+N_SERIES = 20
+N_SHIFTED = 4
+HISTORY_DAYS = 240
+STREAM_DAYS = 28
+SHIFT_DAY = 7
+SHIFT_SIZE = 3.0  # 잡음 표준편차 배수
+PERIODS = 30
+AUTOML_SECONDS = 75  # Auto-ARIMA 시계열당 학습+예측 (README 성능 참고)
+
+
+def make_series(rng, shifted: bool) -> np.ndarray:
+    """주간 계절성 + AR(1) 잡음, shifted 면 스트림 SHIFT_DAY 부터 수준 상승"""
+    n = HISTORY_DAYS + STREAM_DAYS
+    t = np.arange(n)
+    noise = np.zeros(n)
+    for i in range(1, n):
+        noise[i] = 0.5 * noise[i - 1] + rng.normal()
+    values = 20 + 3 * np.sin(2 * np.pi * t / 7) + noise
+    if shifted:
+        values[HISTORY_DAYS + SHIFT_DAY:] += SHIFT_SIZE
+    return values
+
+
+def fit(values: np.ndarray, trained_at: datetime) -> dict:
+    """예측 결과 (automl_engine 형식: predictions, path_model, metrics)"""
+    results = SARIMAX(values, order=(1, 0, 0), seasonal_order=(1, 0, 0, 7), trend='c').fit(disp=False)
+    path_model = fit_path_model(results, PERIODS)
+    return {
+        'predictions': [
+            {'date': (trained_at + timedelta(days=h + 1)).strftime('%Y-%m-%d'), 'predicted_value': float(value)}
+            for h, value in enumerate(path_model.mean)
+        ],
+        'path_model': path_model.to_dict(),
+        'metrics': {'rmse': float(np.sqrt(np.mean(results.resid[7:] ** 2)))}
+    }
+
+
+def main():
+    print("=== 잔차 기반 재학습 정책 벤치마크 ===")
+    print(f"시계열 {N_SERIES}개 (수준 변화 {N_SHIFTED}개, +{SHIFT_SIZE}σ @ {SHIFT_DAY}일차), 스트림 {STREAM_DAYS}일 | "
+          f"임계값 {DRIFT_THRESHOLD}, 최대 수명 {MAX_MODEL_AGE_DAYS:.0f}일")
+    rng = np.random.default_rng(42)
+    start = datetime(2025, 1, 1)
+    series = [make_series(rng, shifted=i < N_SHIFTED) for i in range(N_SERIES)]
+
+    started = time.perf_counter()
+    reasons = {}
+    detection = {}
+    errors = {'always': [], 'policy': []}
+    policy_fits = 0
+    for i, values in enumerate(series):
+        trained_at = start + timedelta(days=HISTORY_DAYS - 1, hours=23)
+        model = fit(values[:HISTORY_DAYS], trained_at)
+        created_at, trained_until = trained_at, HISTORY_DAYS
+        always = model
+        for day in range(HISTORY_DAYS, HISTORY_DAYS + STREAM_DAYS):
+            now = start + timedelta(days=day, hours=23)
+            date = (start + timedelta(days=day)).strftime('%Y-%m-%d')
+            for name, active in (('always', always), ('policy', model)):
+                predicted = next(p['predicted_value'] for p in active['predictions'] if p['date'] == date)
+                errors[name].append(abs(values[day] - predicted))
+
+            always = fit(values[:day + 1], now)
+            new_rows = [
+                {'measured_at': start + timedelta(days=d, hours=10), 'value': values[d]}
+                for d in range(trained_until, day + 1)
+            ]
+            decision = evaluate(model, created_at, new_rows, now=now)
+            reasons[decision['reason']] = reasons.get(decision['reason'], 0) + 1
+            if decision['retrain']:
+                policy_fits += 1
+                model = fit(values[:day + 1], now)
+                created_at, trained_until = now, day + 1
+                if i < N_SHIFTED and day >= HISTORY_DAYS + SHIFT_DAY and i not in detection:
+                    detection[i] = (day - (HISTORY_DAYS + SHIFT_DAY), decision['reason'])
+    elapsed = time.perf_counter() - started
+
+    always_fits = N_SERIES * STREAM_DAYS
+    false_drift = reasons.get('drift', 0) - sum(reason == 'drift' for _, reason in detection.values())
+    print(f"재학습: 매번 {always_fits}회 -> 정책 {policy_fits}회 ({always_fits / max(policy_fits, 1):.1f}x 감소)")
+    print(f"판단 사유: {dict(sorted(reasons.items()))}")
+    print(f"수준 변화 후 첫 재학습 (지연 일, 사유): {sorted(detection.values())} | "
+          f"변화 없는 시계열 drift 재학습 {false_drift}회")
+    print(f"사용 중 예측 MAE: 매번 재학습 {np.mean(errors['always']):.3f} | 정책 {np.mean(errors['policy']):.3f}")
+    print(f"Auto-ARIMA 환산 계산량: {always_fits * AUTOML_SECONDS / 3600:.1f}h -> "
+          f"{policy_fits * AUTOML_SECONDS / 3600:.1f}h (벤치마크 실행 {elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+시계열 통계 커널 벤치마크
+- 기존: 과거 분석/트렌드/위험도/상관관계 섹션이 y 배열을 각각 순회하며 통계 재계산
+- 현재: summarize_series 1회 계산 후 SeriesStats 공유
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from series_stats import summarize_series
+
+SERIES_LENGTHS = [10_000, 100_000, 1_000_000]
+LIMIT_VALUE = 30.0
+REPEATS = 5
+
+
+def legacy_section_stats(df: pd.DataFrame, limit_value: float):
+    """기존 섹션별 통계 계산 (각 섹션이 독립적으로 y 배열 순회)"""
+    # _analyze_historical_data
+    values = df['y'].values
+    historical = (
+        np.mean(values), np.std(values), np.min(values), np.max(values), np.median(values),
+        np.std(values) > np.mean(values) * 0.5, np.std(values) > np.mean(values) * 0.2
+    )
+    # _analyze_trend
+    hist_mean = np.mean(df['y'].values)
+    # _assess_risk
+    hist_exceed = sum(1 for v in df['y'].values if v > limit_value)
+    # _analyze_correlation
+    high_values = df[df['y'] > df['y'].quantile(0.9)]
+    return historical, hist_mean, hist_exceed, len(high_values)
+
+
+def kernel_section_stats(df: pd.DataFrame, limit_value: float):
+    """SeriesStats 공유"""
+    stats = summarize_series(df['y'].values)
+    historical = (
+        stats.mean, stats.std, stats.min, stats.max, stats.median,
+        stats.std > stats.mean * 0.5, stats.std > stats.mean * 0.2
+    )
+    hist_exceed = stats.count_above(limit_value)
+    high_values = df[df['y'].values > stats.q90]
+    return historical, stats.mean, hist_exceed, len(high_values)
+
+
+def main():
+    rng = np.random.default_rng(42)
+
+    print("=== 시계열 통계 커널 벤치마크 ===")
+    for n in SERIES_LENGTHS:
+        df = pd.DataFrame({'y': np.abs(rng.normal(20, 8, n))})
+
+        legacy = legacy_section_stats(df, LIMIT_VALUE)
+        current = kernel_section_stats(df, LIMIT_VALUE)
+        assert legacy[2:] == current[2:], "초과 건수/상위 10% 건수 불일치"
+        assert np.allclose(legacy[0][:5], current[0][:5]) and abs(legacy[1] - current[1]) < 1e-9, "통계 불일치"
+
+        legacy_best = min(timeit.repeat(lambda: legacy_section_stats(df, LIMIT_VALUE), number=1, repeat=REPEATS))
+        current_best = min(timeit.repeat(lambda: kernel_section_stats(df, LIMIT_VALUE), number=1, repeat=REPEATS))
+
+        print(f"{n:>10,}건 | 기존 {legacy_best * 1000:8.2f} ms | 커널 {current_best * 1000:8.2f} ms | "
+              f"{legacy_best / current_best:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
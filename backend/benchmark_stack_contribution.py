@@ -0,0 +1,99 @@
+"""
+굴뚝별 기여도 분석 벤치마크
+- 기존 행 단위 루프 구현과 그룹 배열 연산 구현 비교
+- 수십 개 굴뚝, 10만 건 이상 측정 데이터 기준
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from insight_generator import InsightGenerator
+from benchmark_data import make_raw_rows
+
+N_ROWS = 120_000
+N_STACKS = 48
+REPEATS = 5
+
+
+def legacy_stack_contribution(raw_data):
+    """기존 구현 (굴뚝별 리스트 누적 + 굴뚝마다 상위 10% 기준값 재계산)"""
+    stack_data = {}
+    for row in raw_data:
+        row_dict = dict(row) if hasattr(row, 'keys') else row
+        stack_id = row_dict.get('stackId') or row_dict.get('stack_id') or 'Unknown'
+        stack_name = row_dict.get('stack_name') or row_dict.get('stackName') or stack_id
+        value = row_dict.get('value')
+        if value is not None:
+            try:
+                stack_data.setdefault(stack_name, []).append(float(value))
+            except (ValueError, TypeError):
+                continue
+
+    all_values = []
+    for values in stack_data.values():
+        all_values.extend(values)
+
+    overall_mean = np.mean(all_values)
+    overall_std = np.std(all_values)
+    overall_median = np.median(all_values)
+
+    stack_analysis = {}
+    outlier_stacks = []
+    for stack_name, values in stack_data.items():
+        stack_mean = np.mean(values)
+        stack_count = len(values)
+        deviation_pct = ((stack_mean - overall_mean) / overall_mean * 100) if overall_mean != 0 else 0
+        is_outlier = stack_mean > (overall_mean + 1.5 * overall_std)
+        high_threshold = np.percentile(all_values, 90)
+        high_count = sum(1 for v in values if v > high_threshold)
+        stack_analysis[stack_name] = {
+            'count': stack_count,
+            'mean': round(float(stack_mean), 2),
+            'std': round(float(np.std(values)), 2),
+            'max': round(float(np.max(values)), 2),
+            'deviation_pct': round(float(deviation_pct), 1),
+            'is_outlier': bool(is_outlier),
+            'high_ratio': round(float(high_count / stack_count * 100), 1),
+            'contribution_pct': round(float(stack_count / len(all_values) * 100), 1)
+        }
+        if is_outlier:
+            outlier_stacks.append(stack_name)
+
+    return {
+        'overall': {
+            'mean': round(float(overall_mean), 2),
+            'std': round(float(overall_std), 2),
+            'median': round(float(overall_median), 2),
+            'total_count': len(all_values)
+        },
+        'stacks': stack_analysis,
+        'outlier_stacks': outlier_stacks,
+        'stack_count': len(stack_data)
+    }
+
+
+def main():
+    rows = make_raw_rows(n_rows=N_ROWS, n_stacks=N_STACKS)
+    gen = InsightGenerator()
+
+    legacy = legacy_stack_contribution(rows)
+    current = gen._analyze_stack_contribution(rows)
+    assert legacy == current, "결과 불일치"
+
+    legacy_best = min(timeit.repeat(lambda: legacy_stack_contribution(rows), number=1, repeat=REPEATS))
+    current_best = min(timeit.repeat(lambda: gen._analyze_stack_contribution(rows), number=1, repeat=REPEATS))
+
+    print("=== 굴뚝별 기여도 분석 벤치마크 ===")
+    print(f"데이터: {N_ROWS:,}건 / 굴뚝 {N_STACKS}개")
+    print(f"기존 구현: {legacy_best * 1000:.1f} ms")
+    print(f"그룹 연산: {current_best * 1000:.1f} ms")
+    print(f"속도 향상: {legacy_best / current_best:.1f}x")
+    print("결과 일치: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Optuna warm start 벤치마크
+- 초기 학습: 새 study (TPE 10회)
+- 재학습 (1주 데이터 추가): 이전 탐색 이력 사전 분포 + 이전 최적 첫 시도, 확인되면 조기 종료
+"""
+import asyncio
+import json
+import logging
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from automl_engine import PmmsAutoMLPredictor
+
+warnings.filterwarnings('ignore')
+logging.disable(logging.WARNING)
+
+N_DAYS = 400
+NEW_DAYS = 7
+PERIODS = 30
+
+
+def make_rows(seed: int = 3):
+    """주간 계절성 + 완만한 추세의 일별 농도"""
+    rng = np.random.default_rng(seed)
+    start = datetime.now() - timedelta(days=N_DAYS)
+    t = np.arange(N_DAYS)
+    values = 20 + 4 * np.sin(2 * np.pi * t / 7) + np.cumsum(rng.normal(0, 0.2, N_DAYS)) + rng.normal(0, 2, N_DAYS)
+    return [{'measured_at': start + timedelta(days=i), 'value': float(values[i])} for i in range(N_DAYS)]
+
+
+def run(rows, tuning_history=None):
+    started = time.perf_counter()
+    result = asyncio.run(PmmsAutoMLPredictor().predict(rows, PERIODS, tuning_history))
+    return result, time.perf_counter() - started
+
+
+def main():
+    print("=== Optuna warm start 벤치마크 ===")
+    rows = make_rows()
+
+    cold, cold_seconds = run(rows[:-NEW_DAYS])
+    # DB 저장/조회와 같은 JSON 왕복
+    history = json.loads(json.dumps(cold['tuning']))
+    warm, warm_seconds = run(rows, history)
+    fresh, fresh_seconds = run(rows)
+
+    for label, result, seconds in (
+        ('초기 학습 (새 study)', cold, cold_seconds),
+        (f'재학습 +{NEW_DAYS}일 (warm start)', warm, warm_seconds),
+        (f'재학습 +{NEW_DAYS}일 (새 study)', fresh, fresh_seconds),
+    ):
+        tuning = result['tuning']
+        print(f"{label:24s} {seconds:7.1f}s | 시도 {tuning['trials_run']:2d}회 | "
+              f"검증 RMSE {tuning['best_value']:.3f} | {tuning['best_params']}")
+    print(f"재학습 시간 {fresh_seconds / warm_seconds:.1f}x 단축")
+
+
+if __name__ == "__main__":
+    main()
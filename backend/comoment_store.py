@@ -0,0 +1,235 @@
+"""
+환경변수 상관관계 누적 통계(공모멘트) 저장소
+- 굴뚝/항목별로 (배출농도, 환경변수) 쌍의 건수/평균/제곱편차합/공모멘트를 누적
+- 신규 측정 행만 반영(증분, stack_state_store 공용 저장소)하고, 굴뚝 간 병합(Chan 병합 공식)으로 고객사 전체 통계 산출
+- 고농도 구간 대비는 배출농도 로그 구간(bin)별 환경변수 합계로 근사
+- DB("series_comoments" 테이블)에 저장하여 재시작 후에도 전체 재조회 없이 재사용
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from series_stats import ENV_VARIABLES
+from stack_state_store import StackStateStore
+
+# 분석 컬럼명 -> Measurement 컬럼명
+MEASUREMENT_COLUMNS = {
+    'temp': 'temperatureC',
+    'humidity': 'humidityPct',
+    'wind_speed': 'windSpeedMs',
+    'gas_temp': 'gasTempC',
+    'o2_measured': 'oxygenMeasuredPct',
+    'pressure': 'pressureMmHg',
+    'gas_velocity': 'gasVelocityMs',
+    'moisture': 'moisturePct',
+    'flow': 'flowSm3Min'
+}
+
+# 배출농도 구간 경계 (0.01 ~ 10,000, 10배당 32구간 로그 간격) + 하한/상한 구간
+Y_BIN_EDGES = 10.0 ** (np.arange(-64, 129) / 32.0)
+N_Y_BINS = len(Y_BIN_EDGES) + 1
+
+# 고농도 구간 기준 (상위 10%)
+HIGH_FRACTION = 0.1
+
+STATE_VERSION = 1
+
+class ComomentAccumulator:
+    """
+    (배출농도 y, 환경변수 v) 쌍별 누적 통계
+
+    - pair_n / mean_y / mean_v / m2_y / m2_v / comoment: 쌍별 결측 제외 통계 (Welford/Chan)
+    - y_bin_count: 배출농도 구간별 건수
+    - v_bin_n / v_bin_sum: 배출농도 구간별 환경변수 유효 건수/합계 (고농도 구간 평균용)
+    """
+
+    def __init__(self, variables: Sequence[str] = None):
+        self.variables = list(variables or ENV_VARIABLES)
+        k = len(self.variables)
+        self.row_count = 0
+        self.pair_n = np.zeros(k)
+        self.mean_y = np.zeros(k)
+        self.mean_v = np.zeros(k)
+        self.m2_y = np.zeros(k)
+        self.m2_v = np.zeros(k)
+        self.comoment = np.zeros(k)
+        self.y_bin_count = np.zeros(N_Y_BINS)
+        self.v_bin_n = np.zeros((k, N_Y_BINS))
+        self.v_bin_sum = np.zeros((k, N_Y_BINS))
+
+    def update(self, matrix: np.ndarray) -> "ComomentAccumulator":
+        """
+        측정 행 일괄 반영
+
+        Args:
+            matrix: (n, 1 + k) float 행렬 [y, 환경변수...], 결측은 NaN
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        if len(matrix) == 0:
+            return self
+        batch = ComomentAccumulator(self.variables)
+        batch._fill(matrix)
+        return self.merge(batch)
+
+    def _fill(self, matrix: np.ndarray) -> None:
+        """빈 누적기에 행렬 통계 계산 (벡터 연산)"""
+        y = matrix[:, 0]
+        values = matrix[:, 1:]
+        y_valid = ~np.isnan(y)
+        pair_valid = y_valid[:, None] & ~np.isnan(values)
+        k = len(self.variables)
+
+        self.row_count = int(y_valid.sum())
+        self.pair_n = pair_valid.sum(axis=0).astype(float)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            y_pairs = np.where(pair_valid, y[:, None], 0.0)
+            v_pairs = np.where(pair_valid, values, 0.0)
+            self.mean_y = np.nan_to_num(y_pairs.sum(axis=0) / self.pair_n)
+            self.mean_v = np.nan_to_num(v_pairs.sum(axis=0) / self.pair_n)
+        dy = np.where(pair_valid, y[:, None] - self.mean_y, 0.0)
+        dv = np.where(pair_valid, values - self.mean_v, 0.0)
+        self.m2_y = (dy * dy).sum(axis=0)
+        self.m2_v = (dv * dv).sum(axis=0)
+        self.comoment = (dy * dv).sum(axis=0)
+
+        # 배출농도 구간별 집계 (변수 x 구간 인덱스를 한 번의 bincount로)
+        bins = np.digitize(np.where(y_valid, y, 0.0), Y_BIN_EDGES)
+        self.y_bin_count = np.bincount(bins[y_valid], minlength=N_Y_BINS).astype(float)
+        flat_index = (np.arange(k) * N_Y_BINS)[None, :] + bins[:, None]
+        self.v_bin_n = np.bincount(
+            flat_index[pair_valid], minlength=k * N_Y_BINS
+        ).astype(float).reshape(k, N_Y_BINS)
+        self.v_bin_sum = np.bincount(
+            flat_index[pair_valid], weights=values[pair_valid], minlength=k * N_Y_BINS
+        ).reshape(k, N_Y_BINS)
+
+    def merge(self, other: "ComomentAccumulator") -> "ComomentAccumulator":
+        """다른 누적기 병합 (굴뚝 간 / 증분 반영 공용)"""
+        if other.variables != self.variables:
+            raise ValueError("변수 구성이 다른 누적기는 병합할 수 없습니다.")
+
+        n_a, n_b = self.pair_n, other.pair_n
+        n = n_a + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight_b = np.where(n > 0, n_b / n, 0.0)
+            cross_weight = np.where(n > 0, n_a * n_b / n, 0.0)
+        delta_y = other.mean_y - self.mean_y
+        delta_v = other.mean_v - self.mean_v
+
+        self.mean_y = self.mean_y + delta_y * weight_b
+        self.mean_v = self.mean_v + delta_v * weight_b
+        self.m2_y = self.m2_y + other.m2_y + delta_y * delta_y * cross_weight
+        self.m2_v = self.m2_v + other.m2_v + delta_v * delta_v * cross_weight
+        self.comoment = self.comoment + other.comoment + delta_y * delta_v * cross_weight
+        self.pair_n = n
+
+        self.row_count += other.row_count
+        self.y_bin_count = self.y_bin_count + other.y_bin_count
+        self.v_bin_n = self.v_bin_n + other.v_bin_n
+        self.v_bin_sum = self.v_bin_sum + other.v_bin_sum
+        return self
+
+    def correlations(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(변수별 상관계수, 쌍별 유효 건수)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            denominator = np.sqrt(self.m2_y * self.m2_v)
+            corr = np.where(denominator > 0, self.comoment / denominator, np.nan)
+        return np.clip(corr, -1.0, 1.0), self.pair_n.astype(int)
+
+    def high_contrast(self) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        (변수별 전체 평균, 고농도 구간 평균, 고농도 건수)
+        - 상위 10% 경계가 걸친 구간은 필요한 건수 비율만큼만 반영
+        """
+        total = self.y_bin_count.sum()
+        target = total * HIGH_FRACTION
+
+        # 상위 구간부터 누적하여 상위 10% 건수만큼 구간 가중치 결정
+        above = np.concatenate(([0.0], np.cumsum(self.y_bin_count[::-1])[:-1]))[::-1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weights = np.clip((target - above) / self.y_bin_count, 0.0, 1.0)
+        weights = np.nan_to_num(weights)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            normal_means = self.v_bin_sum.sum(axis=1) / self.v_bin_n.sum(axis=1)
+            high_means = (self.v_bin_sum @ weights) / (self.v_bin_n @ weights)
+        return normal_means, high_means, int(round(target))
+
+    def fingerprint(self) -> str:
+        """섹션 캐시 키용 식별값"""
+        return f"{self.row_count}:{self.pair_n.sum():.0f}:{self.comoment.sum():.6f}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': STATE_VERSION,
+            'variables': self.variables,
+            'row_count': self.row_count,
+            'pair_n': self.pair_n.tolist(),
+            'mean_y': self.mean_y.tolist(),
+            'mean_v': self.mean_v.tolist(),
+            'm2_y': self.m2_y.tolist(),
+            'm2_v': self.m2_v.tolist(),
+            'comoment': self.comoment.tolist(),
+            'y_bin_count': self.y_bin_count.tolist(),
+            'v_bin_n': self.v_bin_n.tolist(),
+            'v_bin_sum': self.v_bin_sum.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional["ComomentAccumulator"]:
+        """저장된 상태 복원 (버전/변수 구성이 다르면 None → 재계산)"""
+        if data.get('version') != STATE_VERSION or data.get('variables') != list(ENV_VARIABLES):
+            return None
+        if len(data.get('y_bin_count', [])) != N_Y_BINS:
+            return None
+        acc = cls(data['variables'])
+        acc.row_count = int(data['row_count'])
+        for name in ('pair_n', 'mean_y', 'mean_v', 'm2_y', 'm2_v', 'comoment',
+                     'y_bin_count', 'v_bin_n', 'v_bin_sum'):
+            setattr(acc, name, np.asarray(data[name], dtype=float))
+        return acc
+
+
+def rows_to_matrix(rows: List[Any]) -> np.ndarray:
+    """측정 행 목록 -> [y, 환경변수...] float 행렬 (None → NaN)"""
+    columns = ['value'] + list(ENV_VARIABLES)
+    return np.array(
+        [[row[col] for col in columns] for row in rows],
+        dtype=float
+    ).reshape(len(rows), len(columns))
+
+
+class ComomentStore(StackStateStore):
+    """
+    굴뚝/항목별 누적기 저장소 (메모리 + DB, 갱신 기준은 stack_state_store 참고)
+    - 환경변수만 수정돼도 행 체크섬이 바뀌므로 해당 굴뚝 재계산
+    """
+
+    def __init__(self):
+        super().__init__(
+            table='series_comoments',
+            label='comoments',
+            columns={'value': 'value', **MEASUREMENT_COLUMNS},
+            state_type=ComomentAccumulator,
+            apply_rows=lambda accumulator, rows: accumulator.update(rows_to_matrix(rows))
+        )
+
+    async def get(
+        self,
+        conn,
+        customer_id: str,
+        item_key: str,
+        stack_ids: Optional[List[str]] = None
+    ) -> ComomentAccumulator:
+        """고객사/항목(선택적으로 굴뚝 한정)의 병합된 누적 통계"""
+        stacks = await self.get_stacks(conn, customer_id, item_key, stack_ids)
+
+        merged = ComomentAccumulator()
+        for accumulator in stacks.values():
+            merged.merge(accumulator)
+        return merged
+
+
+# 프로세스 공용 저장소
+comoment_store = ComomentStore()
@@ -0,0 +1,208 @@
+"""
+배출허용기준(EmissionLimit) 조회
+- 우선순위: 굴뚝별 > 고객사별 > 전체 기준 > 항목 기준 (0 이하는 기준 없음)
+- 항목 기준: 현재 유효한 ItemLimitHistory 최신 항목, 없으면 Item.limit
+- 측정 행 배열에 대해 고유 (항목, 고객사, 굴뚝) 조합만 조회한 뒤 배열로 펼침
+- 프로세스 공용 인덱스(limit_index): 시작 시 활성 기준 전체 적재, 조회는 dict O(1)
+- 기준 변경 시 DB 트리거의 NOTIFY(emission_limits_changed)로 재적재 (TTL 재적재는 보조 수단)
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY 채널 (EmissionLimit / Item.limit / ItemLimitHistory 변경 트리거)
+NOTIFY_CHANNEL = 'emission_limits_changed'
+
+# 알림 연결이 끊겼을 때를 대비한 최대 유지 시간 (초)
+INDEX_TTL_SECONDS = 600
+
+# 연속 변경 알림을 묶어 1회만 재적재하기 위한 대기 시간 (초)
+RELOAD_DEBOUNCE_SECONDS = 0.5
+
+# 적용 기준 출처
+SOURCE_STACK = 'stack'
+SOURCE_CUSTOMER = 'customer'
+SOURCE_GLOBAL = 'global'
+SOURCE_ITEM = 'item'
+
+
+class LimitTable:
+    """
+    배출허용기준 조회표
+
+    - stack_limits: {(itemKey, customerId, stackId): limit}
+    - customer_limits: {(itemKey, customerId): limit}
+    - global_limits: {itemKey: limit}
+    - item_limits: {itemKey: 항목 기준} (양수만)
+    """
+
+    def __init__(self, limit_rows: Sequence = (), item_rows: Sequence = ()):
+        self.stack_limits: Dict[Tuple[str, str, str], float] = {}
+        self.customer_limits: Dict[Tuple[str, str], float] = {}
+        self.global_limits: Dict[str, float] = {}
+        self.item_limits: Dict[str, float] = {}
+
+        for row in limit_rows:
+            limit = float(row['limit'])
+            if row['stack_id']:
+                self.stack_limits[(row['item_key'], row['customer_id'], row['stack_id'])] = limit
+            elif row['customer_id']:
+                self.customer_limits[(row['item_key'], row['customer_id'])] = limit
+            else:
+                self.global_limits[row['item_key']] = limit
+        for row in item_rows:
+            if row['limit'] is not None and row['limit'] > 0:
+                self.item_limits[row['key']] = float(row['limit'])
+
+    def resolve(self, item_key: str, customer_id: str, stack_id: str) -> Tuple[Optional[float], Optional[str]]:
+        """적용 기준값과 출처 (기준 없으면 (None, None))"""
+        limit = self.stack_limits.get((item_key, customer_id, stack_id))
+        if limit is not None:
+            return limit, SOURCE_STACK
+        limit = self.customer_limits.get((item_key, customer_id))
+        if limit is not None:
+            return limit, SOURCE_CUSTOMER
+        limit = self.global_limits.get(item_key)
+        if limit is not None:
+            return limit, SOURCE_GLOBAL
+        limit = self.item_limits.get(item_key)
+        if limit is not None:
+            return limit, SOURCE_ITEM
+        return None, None
+
+    def resolve_many(
+        self,
+        item_keys: Sequence[str],
+        customer_ids: Sequence[str],
+        stack_ids: Sequence[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        행 배열의 적용 기준값 (기준 없음은 NaN)과 출처 배열
+        - 고유 (항목, 고객사, 굴뚝) 조합만 resolve 후 그룹 번호로 펼침
+        """
+        frame = pd.DataFrame({'item': item_keys, 'customer': customer_ids, 'stack': stack_ids})
+        if len(frame) == 0:
+            return np.zeros(0), np.zeros(0, dtype=object)
+        codes = frame.groupby(['item', 'customer', 'stack'], sort=False, dropna=False).ngroup().to_numpy()
+        uniques = frame.drop_duplicates()
+
+        resolved = [self.resolve(i, c, s) for i, c, s in uniques.itertuples(index=False)]
+        limits = np.array([np.nan if limit is None else limit for limit, _ in resolved], dtype=float)
+        sources = np.array([source for _, source in resolved], dtype=object)
+        return limits[codes], sources[codes]
+
+
+class EmissionLimitIndex(LimitTable):
+    """
+    활성 배출허용기준 전체를 메모리에 유지하는 조회 인덱스
+
+    - load(): EmissionLimit / Item 각 1회 조회 후 조회표 교체
+    - listen(): 전용 연결에서 NOTIFY 수신 시 재적재 예약 (debounce)
+    - ensure_loaded(): 미적재 또는 TTL 경과 시 재적재
+    """
+
+    def __init__(self, ttl_seconds: float = INDEX_TTL_SECONDS):
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.loaded_at: Optional[float] = None
+        self.version = 0
+        self._pool = None
+        self._reload_task: Optional[asyncio.Task] = None
+
+    def is_loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def is_fresh(self) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < self.ttl_seconds
+
+    async def load(self, conn) -> "EmissionLimitIndex":
+        """활성 기준 전체 재적재 (조회표를 통째로 교체)"""
+        table = await load_limit_table(conn)
+        self.stack_limits = table.stack_limits
+        self.customer_limits = table.customer_limits
+        self.global_limits = table.global_limits
+        self.item_limits = table.item_limits
+        self.loaded_at = time.monotonic()
+        self.version += 1
+        logger.info(
+            f"Emission limit index loaded (v{self.version}): {len(self.stack_limits)} stack, "
+            f"{len(self.customer_limits)} customer, {len(self.global_limits)} global, {len(self.item_limits)} item limits"
+        )
+        return self
+
+    async def ensure_loaded(self, conn) -> "EmissionLimitIndex":
+        if not self.is_fresh():
+            await self.load(conn)
+        return self
+
+    async def listen(self, listen_conn, pool) -> None:
+        """
+        변경 알림 구독
+
+        Args:
+            listen_conn: LISTEN 전용 연결 (풀 밖에서 유지)
+            pool: 재적재에 사용할 연결 풀
+        """
+        self._pool = pool
+        await listen_conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+        logger.info(f"Listening for {NOTIFY_CHANNEL} notifications")
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.get_event_loop().create_task(self._reload_after_debounce())
+
+    async def _reload_after_debounce(self) -> None:
+        await asyncio.sleep(RELOAD_DEBOUNCE_SECONDS)
+        try:
+            async with self._pool.acquire() as conn:
+                await self.load(conn)
+        except Exception as e:
+            # 다음 조회 시 TTL 기준으로 재시도
+            self.loaded_at = None
+            logger.warning(f"Emission limit index reload failed: {e}")
+
+
+# 항목 기준: 현재 유효한 ItemLimitHistory (시작일 최신) 우선, 없으면 Item.limit
+ITEM_LIMIT_QUERY = """
+    SELECT i.key, COALESCE(h."limit", i."limit") as "limit"
+    FROM "Item" i
+    LEFT JOIN LATERAL (
+        SELECT ilh."limit"
+        FROM "ItemLimitHistory" ilh
+        WHERE ilh."itemKey" = i.key
+          AND (ilh."effectiveFrom" IS NULL OR ilh."effectiveFrom" <= NOW())
+          AND (ilh."effectiveTo" IS NULL OR ilh."effectiveTo" > NOW())
+        ORDER BY ilh."effectiveFrom" DESC NULLS LAST
+        LIMIT 1
+    ) h ON true
+"""
+
+
+async def load_limit_table(conn, item_keys: Optional[List[str]] = None) -> LimitTable:
+    """활성 EmissionLimit / 항목 기준 조회 (item_keys 지정 시 해당 항목만)"""
+    if item_keys is None:
+        limit_rows = await conn.fetch("""
+            SELECT "itemKey" as item_key, "customerId" as customer_id, "stackId" as stack_id, "limit"
+            FROM "EmissionLimit"
+            WHERE "isActive" = true
+        """)
+        item_rows = await conn.fetch(ITEM_LIMIT_QUERY)
+    else:
+        limit_rows = await conn.fetch("""
+            SELECT "itemKey" as item_key, "customerId" as customer_id, "stackId" as stack_id, "limit"
+            FROM "EmissionLimit"
+            WHERE "isActive" = true
+              AND "itemKey" = ANY($1::text[])
+        """, item_keys)
+        item_rows = await conn.fetch(ITEM_LIMIT_QUERY + ' WHERE i.key = ANY($1::text[])', item_keys)
+    return LimitTable(limit_rows, item_rows)
+
+
+# 프로세스 공용 인덱스
+limit_index = EmissionLimitIndex()
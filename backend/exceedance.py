@@ -0,0 +1,264 @@
+"""
+배출허용기준 초과 일괄 판정 / 알림
+- 신규 측정 행 묶음(batch)에 적용 기준값을 배열 단위로 결정 (emission_limits.limit_index)
+- "Measurement"."limitCheck" (초과/적합), "limitAtMeasure" 를 UPDATE 1회로 기록
+- 초과 건은 (굴뚝, 항목) 단위로 요약하여 수신자별 "Notification" 을 INSERT 1회로 생성
+- 수신자: 고객사 관리자(CUSTOMER_ADMIN) + 굴뚝 담당 환경측정기업 관리자(ORG_ADMIN)
+"""
+import json
+import logging
+import os
+from typing import Any, Collection, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from emission_limits import LimitTable, limit_index
+
+logger = logging.getLogger(__name__)
+
+LIMIT_CHECK_EXCEEDED = '초과'
+LIMIT_CHECK_PASSED = '적합'
+# 적용 기준이 없는 행 (미판정 행과 구분)
+LIMIT_CHECK_NO_LIMIT = ''
+
+NOTIFICATION_TYPE = 'EMISSION_LIMIT_EXCEEDED'
+
+# 측정 당시 기록된 기준("limitAtMeasure", CSV 배출허용기준농도 포함)으로 판정한 행의 기준 출처
+SOURCE_RECORDED = 'recorded'
+
+# 미판정 행 일괄 처리 단위
+BATCH_SIZE = 50_000
+
+# 미판정 행 알림 대상 최대 경과일 (측정시각 기준, 이전 행은 limitCheck 만 기록)
+# Prisma 경로 입력 행은 limitCheck 가 비어 있으므로 과거 이력 전체에 알림이 가지 않도록 제한
+NOTIFY_MAX_AGE_DAYS = int(os.getenv('EXCEEDANCE_NOTIFY_MAX_AGE_DAYS', '7'))
+
+# 알림 표시 시간대 (한국 표준시, DB는 UTC 저장)
+LOCAL_UTC_OFFSET_HOURS = 9
+
+# 알림 metadata 에 담을 최대 측정 ID 수
+MAX_NOTIFIED_IDS = 20
+
+# 판정 대상 행 조회 컬럼 (굴뚝/항목 표시명 포함)
+ROW_COLUMNS = """
+    m.id, m."customerId" as customer_id, m."stackId" as stack_id, m."itemKey" as item_key,
+    m.value, m."measuredAt" as measured_at, m."limitAtMeasure" as limit_at_measure,
+    COALESCE(NULLIF(s."siteName", ''), s.name) as stack_name, i.name as item_name
+"""
+
+
+def evaluate(values: np.ndarray, limits: np.ndarray) -> np.ndarray:
+    """값/기준 배열 -> limitCheck 배열 (기준 NaN 이면 빈 문자열)"""
+    checks = np.full(len(values), LIMIT_CHECK_NO_LIMIT, dtype=object)
+    has_limit = ~np.isnan(limits)
+    checks[has_limit] = LIMIT_CHECK_PASSED
+    checks[has_limit & (values > limits)] = LIMIT_CHECK_EXCEEDED
+    return checks
+
+
+def summarize_exceedances(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    초과 행 -> (고객사, 굴뚝, 항목) 단위 요약
+
+    Args:
+        frame: 초과 행 (id, customer_id, stack_id, item_key, value, measured_at, limit, source, 표시명)
+    """
+    if len(frame) == 0:
+        return []
+    frame = frame.assign(ratio=frame['value'] / frame['limit'])
+    frame = frame.sort_values('measured_at', kind='stable')
+    grouped = frame.groupby(['customer_id', 'stack_id', 'item_key'], sort=False)
+    summary = grouped.agg(
+        count=('value', 'size'),
+        max_value=('value', 'max'),
+        max_ratio=('ratio', 'max'),
+        limit=('limit', 'max'),
+        source=('source', 'first'),
+        first_at=('measured_at', 'min'),
+        last_at=('measured_at', 'max'),
+        stack_name=('stack_name', 'first'),
+        item_name=('item_name', 'first')
+    ).reset_index()
+    ids = grouped['id'].apply(lambda s: s.tolist()[:MAX_NOTIFIED_IDS]).reset_index(drop=True)
+    summary['measurement_ids'] = ids
+    return summary.to_dict('records')
+
+
+def build_notification(group: Dict[str, Any]) -> Dict[str, Any]:
+    """요약 1건 -> 알림 제목/내용/metadata"""
+    stack_name = group['stack_name'] or group['stack_id']
+    item_name = group['item_name'] or group['item_key']
+    first_at = group['first_at'] + pd.Timedelta(hours=LOCAL_UTC_OFFSET_HOURS)
+    last_at = group['last_at'] + pd.Timedelta(hours=LOCAL_UTC_OFFSET_HOURS)
+    period = first_at.strftime('%Y-%m-%d')
+    if last_at.date() != first_at.date():
+        period += f" ~ {last_at.strftime('%Y-%m-%d')}"
+    return {
+        'title': f"배출허용기준 초과: {stack_name} {item_name}",
+        'message': (
+            f"{stack_name} {item_name} 측정값이 배출허용기준({group['limit']:g})을 "
+            f"{group['count']}건 초과했습니다. 최고 {group['max_value']:g} "
+            f"(기준 대비 {group['max_ratio'] * 100:.0f}%), {period}"
+        ),
+        'metadata': json.dumps({
+            'itemKey': group['item_key'],
+            'itemName': item_name,
+            'stackName': stack_name,
+            'limit': group['limit'],
+            'limitSource': group['source'],
+            'exceedCount': int(group['count']),
+            'maxValue': float(group['max_value']),
+            'maxRatio': round(float(group['max_ratio']), 4),
+            'firstMeasuredAt': group['first_at'].isoformat(),
+            'lastMeasuredAt': group['last_at'].isoformat(),
+            'measurementIds': group['measurement_ids']
+        }, ensure_ascii=False)
+    }
+
+
+async def fetch_recipients(conn, stack_ids: List[str]) -> Dict[str, List[str]]:
+    """굴뚝별 알림 수신자 (고객사 관리자 + 담당 환경측정기업 관리자)"""
+    rows = await conn.fetch("""
+        SELECT s.id as stack_id, u.id as user_id
+        FROM "Stack" s
+        JOIN "User" u ON u."customerId" = s."customerId" AND u.role = 'CUSTOMER_ADMIN'
+        WHERE s.id = ANY($1::text[])
+          AND u.status = 'APPROVED'
+          AND u."isActive" = true
+        UNION
+        SELECT so."stackId" as stack_id, u.id as user_id
+        FROM "StackOrganization" so
+        JOIN "User" u ON u."organizationId" = so."organizationId" AND u.role = 'ORG_ADMIN'
+        WHERE so."stackId" = ANY($1::text[])
+          AND u.status = 'APPROVED'
+          AND u."isActive" = true
+    """, stack_ids)
+    recipients: Dict[str, List[str]] = {}
+    for row in rows:
+        recipients.setdefault(row['stack_id'], []).append(row['user_id'])
+    return recipients
+
+
+async def process_rows(
+    conn,
+    rows: Sequence[Any],
+    limits: Optional[LimitTable] = None,
+    notify_ids: Optional[Collection[str]] = None
+) -> Dict[str, Any]:
+    """
+    측정 행 묶음 초과 판정 + limitCheck 기록 + 알림 생성
+
+    Args:
+        rows: ROW_COLUMNS 형태의 측정 행 (limit_at_measure 가 있으면 해당 기준으로 판정)
+        limits: 기준 조회표 (미지정 시 공용 인덱스 limit_index)
+        notify_ids: 알림 대상 측정 ID (미지정 시 전체), 나머지 행은 limitCheck 만 기록
+
+    Returns:
+        evaluated, exceeded, no_limit, notifications
+    """
+    if not rows:
+        return {'evaluated': 0, 'exceeded': 0, 'no_limit': 0, 'exceedance_groups': 0, 'notifications': 0}
+
+    frame = pd.DataFrame([dict(row) for row in rows])
+    if limits is None:
+        limits = await limit_index.ensure_loaded(conn)
+
+    limit_values, sources = limits.resolve_many(
+        frame['item_key'].to_numpy(), frame['customer_id'].to_numpy(), frame['stack_id'].to_numpy()
+    )
+    # 측정 당시 기준이 기록된 행은 그 기준으로 판정 (현재 기준으로 덮어쓰지 않음)
+    recorded = frame['limit_at_measure'].to_numpy(dtype=float)
+    has_recorded = recorded > 0
+    limit_values = np.where(has_recorded, recorded, limit_values)
+    sources = np.where(has_recorded, SOURCE_RECORDED, sources)
+    values = frame['value'].to_numpy(dtype=float)
+    checks = evaluate(values, limit_values)
+    frame['limit'] = limit_values
+    frame['source'] = sources
+
+    await conn.execute("""
+        UPDATE "Measurement" m SET
+            "limitCheck" = CASE WHEN c.limit_check = '' THEN COALESCE(m."limitCheck", '') ELSE c.limit_check END,
+            "limitAtMeasure" = COALESCE(m."limitAtMeasure", c.limit_value)
+        FROM unnest($1::text[], $2::text[], $3::float8[]) AS c(id, limit_check, limit_value)
+        WHERE m.id = c.id
+    """,
+        frame['id'].tolist(),
+        checks.tolist(),
+        [None if np.isnan(v) else float(v) for v in limit_values]
+    )
+
+    exceeded = checks == LIMIT_CHECK_EXCEEDED
+    notify = exceeded if notify_ids is None else exceeded & frame['id'].isin(notify_ids).to_numpy()
+    groups = summarize_exceedances(frame[notify])
+    notifications = 0
+    if groups:
+        recipients = await fetch_recipients(conn, sorted({g['stack_id'] for g in groups}))
+        columns = {name: [] for name in ('user_id', 'title', 'message', 'stack_id', 'customer_id', 'metadata')}
+        for group in groups:
+            content = build_notification(group)
+            for user_id in recipients.get(group['stack_id'], []):
+                columns['user_id'].append(user_id)
+                columns['title'].append(content['title'])
+                columns['message'].append(content['message'])
+                columns['stack_id'].append(group['stack_id'])
+                columns['customer_id'].append(group['customer_id'])
+                columns['metadata'].append(content['metadata'])
+
+        if columns['user_id']:
+            await conn.execute(f"""
+                INSERT INTO "Notification"
+                (id, "userId", type, title, message, "stackId", "customerId", metadata, "isRead", "createdAt")
+                SELECT gen_random_uuid()::text, n.user_id, '{NOTIFICATION_TYPE}'::"NotificationType",
+                       n.title, n.message, n.stack_id, n.customer_id, n.metadata, false, NOW()
+                FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::text[], $6::text[])
+                    AS n(user_id, title, message, stack_id, customer_id, metadata)
+            """, *columns.values())
+            notifications = len(columns['user_id'])
+        else:
+            logger.warning(f"No recipients for {len(groups)} exceedance groups")
+
+    result = {
+        'evaluated': len(frame),
+        'exceeded': int(exceeded.sum()),
+        'no_limit': int(np.isnan(limit_values).sum()),
+        'exceedance_groups': len(groups),
+        'notifications': notifications
+    }
+    logger.info(
+        f"Exceedance check: {result['evaluated']} rows, {result['exceeded']} exceeded, "
+        f"{result['notifications']} notifications"
+    )
+    return result
+
+
+async def process_pending(conn, customer_id: Optional[str] = None, batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """
+    미판정("limitCheck" IS NULL) 측정 행을 묶음 단위로 처리
+    - 프론트엔드(Prisma) 경로로 입력된 측정값 판정용
+    - 측정시각이 NOTIFY_MAX_AGE_DAYS 이전인 행은 판정만 기록하고 알림 제외
+    """
+    totals = {'evaluated': 0, 'exceeded': 0, 'no_limit': 0, 'exceedance_groups': 0, 'notifications': 0, 'batches': 0}
+    while True:
+        async with conn.transaction():
+            rows = await conn.fetch(f"""
+                SELECT {ROW_COLUMNS},
+                       m."measuredAt" >= (NOW() AT TIME ZONE 'UTC') - make_interval(days => $3) as notify
+                FROM "Measurement" m
+                JOIN "Stack" s ON s.id = m."stackId"
+                JOIN "Item" i ON i.key = m."itemKey"
+                WHERE m."limitCheck" IS NULL
+                  AND ($1::text IS NULL OR m."customerId" = $1)
+                ORDER BY m."measuredAt"
+                LIMIT $2
+            """, customer_id, batch_size, NOTIFY_MAX_AGE_DAYS)
+            if not rows:
+                break
+            result = await process_rows(conn, rows, notify_ids={row['id'] for row in rows if row['notify']})
+        for key in ('evaluated', 'exceeded', 'no_limit', 'exceedance_groups', 'notifications'):
+            totals[key] += result[key]
+        totals['batches'] += 1
+        if len(rows) < batch_size:
+            break
+    return totals
@@ -0,0 +1,194 @@
+"""
+예측 경로 Monte Carlo 기준 초과 확률
+- 학습된 Auto-ARIMA(statsmodels SARIMAX 상태공간) 필터 종료 상태에서 미래 경로 분포를 추출
+- 경로 = 예측 평균 + 초기 상태 불확실성 + 누적 혁신(innovation) 충격 (선형 가우시안)
+- 충격 응답(Z T^j R)을 하삼각 행렬로 만들어 전체 경로를 행렬곱 1회로 생성 (시점별 루프 없음)
+- 경로 모델(PathModel)은 예측 결과와 함께 저장되어 기준값이 바뀌어도 재학습 없이 재계산
+"""
+import logging
+from typing import Any, Dict, NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 기본 시뮬레이션 경로 수
+N_PATHS = 10_000
+
+# 재현성을 위한 기본 시드 (automl_engine.RANDOM_SEED 와 동일)
+RANDOM_SEED = 42
+
+STATE_VERSION = 1
+
+
+def _sqrt_psd(matrix: np.ndarray) -> np.ndarray:
+    """양반정치 행렬 제곱근 (특이 행렬 허용, 음의 고유값은 0으로 절단)"""
+    values, vectors = np.linalg.eigh((matrix + matrix.T) / 2)
+    return vectors * np.sqrt(np.clip(values, 0.0, None))
+
+
+class PathModel(NamedTuple):
+    """
+    예측 기간 경로 분포 (y_h = mean_h + initial_h · u + Σ_{j<h} impulse_{h-1-j} · e_j + obs_std · ε_h)
+
+    - mean: (h,) 예측 평균
+    - initial: (h, k) 초기 상태 공분산 제곱근에 대한 관측 응답 (Z T^h P^½)
+    - impulse: (h, r) 상태 충격 응답 (Z T^j R Q^½)
+    - obs_std: 관측 잡음 표준편차
+    """
+    mean: np.ndarray
+    initial: np.ndarray
+    impulse: np.ndarray
+    obs_std: float
+
+    @property
+    def horizon(self) -> int:
+        return len(self.mean)
+
+    def std(self) -> np.ndarray:
+        """시점별 주변 표준편차 (해석해)"""
+        variance = (self.initial ** 2).sum(axis=1) + self.obs_std ** 2
+        cumulative = np.cumsum((self.impulse ** 2).sum(axis=1))
+        variance[1:] += cumulative[:-1]
+        return np.sqrt(variance)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': STATE_VERSION,
+            'mean': self.mean.tolist(),
+            'initial': self.initial.tolist(),
+            'impulse': self.impulse.tolist(),
+            'obs_std': self.obs_std
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["PathModel"]:
+        if not data or data.get('version') != STATE_VERSION:
+            return None
+        return cls(
+            mean=np.asarray(data['mean'], dtype=float),
+            initial=np.asarray(data['initial'], dtype=float).reshape(len(data['mean']), -1),
+            impulse=np.asarray(data['impulse'], dtype=float).reshape(len(data['mean']), -1),
+            obs_std=float(data['obs_std'])
+        )
+
+
+def fit_path_model(arima_results, horizon: int) -> PathModel:
+    """
+    학습된 SARIMAX 결과 -> 예측 기간 경로 모델
+
+    Args:
+        arima_results: statsmodels SARIMAXResults (pmdarima ARIMA.arima_res_)
+        horizon: 예측 기간 (일)
+
+    Raises:
+        ValueError: 시변(time-varying) 시스템 행렬 또는 외부 변수가 있는 모델
+    """
+    if arima_results.model.k_exog:
+        raise ValueError("외부 변수가 있는 모델은 경로 시뮬레이션을 지원하지 않습니다.")
+    filtered = arima_results.filter_results
+    matrices = {}
+    for name in ('design', 'transition', 'selection', 'state_cov', 'obs_cov'):
+        matrix = getattr(filtered, name)
+        if matrix.shape[-1] != 1:
+            raise ValueError(f"시변 {name} 행렬은 지원하지 않습니다.")
+        matrices[name] = matrix[..., 0]
+
+    design = matrices['design']  # (1, k)
+    transition = matrices['transition']  # (k, k)
+    shock = matrices['selection'] @ _sqrt_psd(matrices['state_cov'])  # (k, r)
+    initial_factor = _sqrt_psd(arima_results.predicted_state_cov[:, :, -1])  # (k, k)
+
+    # Z T^h 을 h 순서로 누적: initial_h = Z T^h P^½, impulse_h = Z T^h R Q^½
+    initial = np.empty((horizon, initial_factor.shape[1]))
+    impulse = np.empty((horizon, shock.shape[1]))
+    loading = design
+    for h in range(horizon):
+        initial[h] = loading @ initial_factor
+        impulse[h] = loading @ shock
+        loading = loading @ transition
+
+    mean = np.asarray(arima_results.get_forecast(horizon).predicted_mean, dtype=float)
+    obs_std = float(np.sqrt(max(matrices['obs_cov'][0, 0], 0.0)))
+    return PathModel(mean=mean, initial=initial, impulse=impulse, obs_std=obs_std)
+
+
+def forecast_variance(forecast: Dict[str, Any], horizon: int) -> np.ndarray:
+    """시점별 예측 분산 (경로 모델 해석해, 없으면 in-sample RMSE² 상수)"""
+    path_model = PathModel.from_dict(forecast.get('path_model'))
+    if path_model is not None and path_model.horizon >= horizon:
+        variance = path_model.std()[:horizon] ** 2
+    else:
+        rmse = (forecast.get('metrics') or {}).get('rmse') or 1.0
+        variance = np.full(horizon, float(rmse) ** 2)
+    return np.maximum(variance, 1e-9)
+
+
+def simulate_paths(
+    model: PathModel,
+    n_paths: int = N_PATHS,
+    seed: int = RANDOM_SEED,
+    horizon: Optional[int] = None
+) -> np.ndarray:
+    """
+    미래 경로 일괄 생성
+
+    Returns:
+        (n_paths, horizon) 경로 행렬 (음수는 0으로 절단, 예측값과 동일)
+    """
+    horizon = min(horizon or model.horizon, model.horizon)
+    rng = np.random.default_rng(seed)
+    initial = model.initial[:horizon]
+    impulse = model.impulse[:horizon]
+
+    paths = rng.standard_normal((n_paths, initial.shape[1])) @ initial.T
+    paths += model.mean[:horizon]
+
+    # 충격 j 가 시점 t(> j)에 주는 영향 impulse[t-1-j] -> 하삼각 Toeplitz 행렬곱
+    lag = np.arange(horizon)[:, None] - np.arange(horizon)[None, :] - 1
+    valid = lag >= 0
+    for r in range(impulse.shape[1]):
+        response = np.where(valid, impulse[np.clip(lag, 0, None), r], 0.0)
+        paths += rng.standard_normal((n_paths, horizon)) @ response.T
+
+    if model.obs_std > 0:
+        paths += model.obs_std * rng.standard_normal((n_paths, horizon))
+    np.maximum(paths, 0.0, out=paths)
+    return paths
+
+
+def exceedance_probabilities(paths: np.ndarray, limit_value: float) -> Dict[str, Any]:
+    """
+    경로 행렬 -> 기준 초과 확률
+
+    Returns:
+        daily: 시점별 초과 확률, cumulative: 해당 시점까지 1회 이상 초과 확률,
+        any_probability: 기간 내 1회 이상 초과 확률, expected_exceed_days: 기대 초과 일수
+    """
+    exceeded = paths > limit_value
+    cumulative = np.logical_or.accumulate(exceeded, axis=1).mean(axis=0)
+    return {
+        'paths': int(paths.shape[0]),
+        'daily': exceeded.mean(axis=0),
+        'cumulative': cumulative,
+        'any_probability': float(cumulative[-1]) if len(cumulative) else 0.0,
+        'expected_exceed_days': float(exceeded.sum(axis=1).mean())
+    }
+
+
+def simulate_exceedance(
+    model: PathModel,
+    limit_value: float,
+    n_paths: int = N_PATHS,
+    seed: int = RANDOM_SEED,
+    horizon: Optional[int] = None
+) -> Dict[str, Any]:
+    """경로 생성 + 초과 확률 요약 (보고서용, 확률은 % 단위 반올림)"""
+    result = exceedance_probabilities(simulate_paths(model, n_paths, seed, horizon), limit_value)
+    return {
+        'paths': result['paths'],
+        'any_exceed_probability': round(result['any_probability'] * 100, 1),
+        'expected_exceed_days': round(result['expected_exceed_days'], 1),
+        'max_daily_probability': round(float(result['daily'].max()) * 100, 1) if len(result['daily']) else 0.0,
+        'daily_probabilities': np.round(result['daily'] * 100, 1).tolist()
+    }
@@ -0,0 +1,243 @@
+"""
+예측 결과(Forecast Artifact) 공유 저장소
+- /api/predict 와 /api/predict/insight 가 같은 예측 결과를 읽고 씀
+- 메모리(LRU): 예측값, 모델 정보, 정확도, 전처리된 학습 데이터
+- DB("predictions" 테이블): 프로세스 재시작 후에도 재학습 없이 재사용
+- 유효성 기준: 최신 측정 데이터(watermark) 이후 생성된 예측만 사용
+- 그 외 최근 예측은 latest() 로 조회 -> 재학습 정책(retrain_policy)이 재사용하기로 하면 adopt()
+"""
+import base64
+import json
+import logging
+import math
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 메모리에 유지할 최대 예측 결과 수 (학습 데이터 DataFrame 포함)
+MAX_ARTIFACTS = 256
+
+
+def clean_float_values(obj):
+    """NaN/Infinity 값 정리"""
+    if isinstance(obj, dict):
+        return {k: clean_float_values(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [clean_float_values(item) for item in obj]
+    elif isinstance(obj, float):
+        if math.isnan(obj) or math.isinf(obj):
+            return None
+        return obj
+    return obj
+
+
+class ForecastStore:
+    """
+    예측 결과 공유 저장소
+
+    Artifact 구조:
+    - forecast_id: 예측 식별자 ("predictions".id)
+    - predictions, model_info, metrics, historical_avg, training_samples
+    - path_model: 예측 경로 분포 (exceedance_simulation.PathModel.to_dict, 없으면 None)
+    - training_data: 전처리된 학습 데이터 (PmmsAutoMLPredictor.training_data)
+    - watermark: 유효성 기준 최신 측정 시각 (재사용 시 갱신)
+    - trained_until: 학습 데이터의 최신 측정 시각 (이후 측정이 잔차 모니터링 대상)
+    """
+
+    def __init__(self, max_artifacts: int = MAX_ARTIFACTS):
+        self.max_artifacts = max_artifacts
+        self._artifacts: "OrderedDict[tuple, Dict]" = OrderedDict()
+
+    def _key(self, customer_id: str, item_key: str, periods: int) -> tuple:
+        return (customer_id, item_key, periods)
+
+    async def get(
+        self,
+        conn,
+        customer_id: str,
+        item_key: str,
+        periods: int,
+        watermark: Optional[datetime]
+    ) -> Optional[Dict]:
+        """
+        유효한 예측 결과 조회 (메모리 -> DB 순)
+
+        Returns:
+            artifact 또는 None. DB에서 복원된 경우 training_data는 None
+        """
+        if watermark is None:
+            return None
+
+        key = self._key(customer_id, item_key, periods)
+        artifact = self._artifacts.get(key)
+        if artifact and artifact['watermark'] == watermark:
+            self._artifacts.move_to_end(key)
+            logger.info(f"Using in-memory forecast artifact {artifact['forecast_id']} for {customer_id}/{item_key}")
+            return artifact
+
+        try:
+            row = await conn.fetchrow("""
+                SELECT id, "predictionData", "createdAt"
+                FROM "predictions"
+                WHERE "customerId" = $1
+                  AND "itemKey" = $2
+                  AND periods = $3
+                  AND "createdAt" > $4
+                ORDER BY "createdAt" DESC
+                LIMIT 1
+            """, customer_id, item_key, periods, watermark)
+        except Exception as e:
+            logger.warning(f"Prediction cache lookup failed (table may not exist): {e}")
+            return None
+
+        if not row:
+            return None
+
+        data = clean_float_values(json.loads(row['predictionData']))
+        artifact = {
+            'forecast_id': row['id'],
+            'predictions': data['predictions'],
+            'model_info': data['model_info'],
+            'metrics': data.get('accuracy_metrics'),
+            'historical_avg': data.get('historical_avg'),
+            'training_samples': data.get('training_samples'),
+            'path_model': data.get('path_model'),
+            'training_data': None,
+            'watermark': watermark,
+            'trained_until': self._trained_until(data, row['createdAt']),
+            'created_at': row['createdAt']
+        }
+        self._remember(key, artifact)
+        logger.info(f"Using stored forecast artifact {artifact['forecast_id']} for {customer_id}/{item_key}")
+        return artifact
+
+    async def latest(self, conn, customer_id: str, item_key: str, periods: int) -> Optional[Dict]:
+        """
+        가장 최근 예측 결과 (측정 데이터 이후 생성 여부와 무관, 재학습 판단용)
+
+        Returns:
+            artifact 또는 None. 메모리에 같은 예측이 있으면 학습 데이터 포함
+        """
+        try:
+            row = await conn.fetchrow("""
+                SELECT id, "predictionData", "createdAt"
+                FROM "predictions"
+                WHERE "customerId" = $1
+                  AND "itemKey" = $2
+                  AND periods = $3
+                ORDER BY "createdAt" DESC
+                LIMIT 1
+            """, customer_id, item_key, periods)
+        except Exception as e:
+            logger.warning(f"Latest prediction lookup failed (table may not exist): {e}")
+            return None
+
+        if not row:
+            return None
+
+        artifact = self._artifacts.get(self._key(customer_id, item_key, periods))
+        if artifact and artifact['forecast_id'] == row['id']:
+            return artifact
+
+        data = clean_float_values(json.loads(row['predictionData']))
+        return {
+            'forecast_id': row['id'],
+            'predictions': data['predictions'],
+            'model_info': data['model_info'],
+            'metrics': data.get('accuracy_metrics'),
+            'historical_avg': data.get('historical_avg'),
+            'training_samples': data.get('training_samples'),
+            'path_model': data.get('path_model'),
+            'training_data': None,
+            'watermark': None,
+            'trained_until': self._trained_until(data, row['createdAt']),
+            'created_at': row['createdAt']
+        }
+
+    def adopt(self, customer_id: str, item_key: str, periods: int, artifact: Dict, watermark: datetime) -> Dict:
+        """재학습하지 않기로 한 예측을 현재 측정 데이터 기준 유효 예측으로 등록 (메모리)"""
+        artifact = {**artifact, 'watermark': watermark}
+        self._remember(self._key(customer_id, item_key, periods), artifact)
+        return artifact
+
+    async def put(
+        self,
+        conn,
+        customer_id: str,
+        item_key: str,
+        periods: int,
+        watermark: Optional[datetime],
+        result: Dict,
+        training_data: Any,
+        training_samples: int
+    ) -> Dict:
+        """학습 결과를 artifact로 저장 (메모리 + DB)"""
+        # 생성 시각은 앱 시계 하나로 기록 (DB NOW() 와 섞이면 retrain_policy 모델 수명이 서버 시간대만큼 어긋남)
+        created_at = datetime.now()
+        artifact = {
+            'forecast_id': base64.b64encode(os.urandom(12)).decode('utf-8'),
+            'predictions': result['predictions'],
+            'model_info': result['model_info'],
+            'metrics': result.get('metrics'),
+            'historical_avg': result.get('historical_avg'),
+            'training_samples': training_samples,
+            'path_model': result.get('path_model'),
+            'training_data': training_data,
+            'watermark': watermark,
+            'trained_until': watermark,
+            'created_at': created_at
+        }
+
+        try:
+            await conn.execute("""
+                INSERT INTO "predictions"
+                (id, "customerId", "itemKey", periods, "predictionData", "createdAt")
+                VALUES ($1, $2, $3, $4, $5, $6)
+            """,
+                artifact['forecast_id'],
+                customer_id,
+                item_key,
+                periods,
+                json.dumps(clean_float_values({
+                    **self.to_response(artifact),
+                    'path_model': artifact['path_model'],
+                    'trained_until': watermark.isoformat() if watermark else None
+                })),
+                created_at
+            )
+            logger.info("Prediction saved to database for caching")
+        except Exception as save_error:
+            logger.warning(f"Failed to save prediction: {save_error}")
+
+        if watermark is not None:
+            self._remember(self._key(customer_id, item_key, periods), artifact)
+        return artifact
+
+    def to_response(self, artifact: Dict) -> Dict:
+        """/api/predict 응답 형식으로 변환"""
+        return {
+            'predictions': artifact['predictions'],
+            'model_info': artifact['model_info'],
+            'training_samples': artifact['training_samples'],
+            'accuracy_metrics': artifact['metrics'],
+            'historical_avg': artifact['historical_avg']
+        }
+
+    def _trained_until(self, data: Dict, created_at: datetime) -> datetime:
+        """저장된 예측의 학습 데이터 최신 측정 시각 (기록 이전 예측은 생성 시각)"""
+        if data.get('trained_until'):
+            return datetime.fromisoformat(data['trained_until'])
+        return created_at
+
+    def _remember(self, key: tuple, artifact: Dict) -> None:
+        self._artifacts[key] = artifact
+        self._artifacts.move_to_end(key)
+        if len(self._artifacts) > self.max_artifacts:
+            self._artifacts.popitem(last=False)
+
+
+# 프로세스 공용 저장소
+forecast_store = ForecastStore()
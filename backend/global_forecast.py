@@ -0,0 +1,613 @@
+"""
+전역(cross-series) 예측 모델
+- 전체 고객사/굴뚝/항목 시계열을 하나의 특성 행렬로 묶어 Gradient Boosting(HistGradientBoostingRegressor) 1회 학습
+- 직접(direct) 다중 시점 예측: 기준 시점 특성 + 예측 대상까지의 일수(lead_days)로 대상 값을 바로 예측
+  -> 요청 시 시계열별 탐색/재귀 없이 예측 1회 (수 ms)
+- 특성: 시계열 평균으로 정규화한 최근 측정값(lag), 최근 7회 평균/표준편차, 대상 일자 달력(요일/월/연중 일),
+  항목(범주형), 굴뚝 단위 여부, 시계열 규모
+- 학습 시 시계열별 마지막 구간(holdout)으로 정확도 평가 -> "global_forecast_evaluations"
+  (Auto-ARIMA 경로와 같은 holdout 비교는 compare 에서 일부 시계열씩 누적), 예측 구간은 holdout 단계별 정규화 오차 기반
+- 학습된 모델은 "global_forecast_models" 에 저장, 서버 재시작 시 재적재
+"""
+import asyncio
+import json
+import logging
+import pickle
+import time
+import warnings
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+from hierarchical_forecast import TOP_NODE, fit_series, get_executor
+
+logger = logging.getLogger(__name__)
+
+MODEL_ID = 'global'
+MODEL_VERSION = 1
+
+# 학습 기간 (automl_engine 과 동일: 최근 2년)
+TRAINING_DAYS = 730
+
+# 최근 측정값 특성 (측정 순서 기준, 1 = 기준 시점 측정값)
+LAGS = (1, 2, 3, 7, 14)
+MAX_LAG = max(LAGS)
+ROLLING_WINDOW = 7
+
+# 학습 대상: 기준 시점마다 이후 HORIZON_STEPS 건 중 TARGETS_PER_ORIGIN 건 추출
+HORIZON_STEPS = 30
+TARGETS_PER_ORIGIN = 4
+
+# 학습 포함 최소 측정 건수 (automl_engine 최소 학습 데이터와 동일) / 정확도 평가 최소 건수
+MIN_TRAIN_ROWS = 10
+MIN_EVAL_ROWS = 30
+
+# 시계열별 holdout: 마지막 min(30, 20%) 건
+HOLDOUT_ROWS = 30
+HOLDOUT_FRACTION = 0.2
+
+# 예측 구간 (95%)
+INTERVAL_Z = 1.96
+
+# 정기 재학습 시 Auto-ARIMA 비교 시계열 수 (비교가 오래된 순)
+COMPARE_SERIES = 5
+
+RANDOM_SEED = 42
+
+FEATURES = [
+    'lag_1', 'lag_2', 'lag_3', 'lag_7', 'lag_14',
+    'roll_mean_7', 'roll_std_7', 'lead_days',
+    'day_of_week', 'month', 'doy_sin', 'doy_cos',
+    'item_code', 'is_stack', 'log_scale'
+]
+
+# HistGradientBoosting 범주형 특성 최대 범주 수
+MAX_CATEGORIES = 255
+
+
+def _estimator(categorical: bool) -> HistGradientBoostingRegressor:
+    return HistGradientBoostingRegressor(
+        max_iter=300,
+        learning_rate=0.05,
+        max_leaf_nodes=31,
+        min_samples_leaf=40,
+        l2_regularization=1.0,
+        categorical_features=[name == 'item_code' for name in FEATURES] if categorical else None,
+        early_stopping=False,
+        random_state=RANDOM_SEED
+    )
+
+
+def prepare_frame(rows: List[Any]) -> pd.DataFrame:
+    """측정 행 -> 시계열 순 정렬 프레임 (series: 시계열 번호)"""
+    frame = pd.DataFrame(
+        [dict(row) for row in rows],
+        columns=['customer_id', 'stack_id', 'item_key', 'measured_at', 'value']
+    )
+    frame['measured_at'] = pd.to_datetime(frame['measured_at'])
+    frame['value'] = frame['value'].astype(float)
+    frame = frame.sort_values(['customer_id', 'stack_id', 'item_key', 'measured_at'], kind='mergesort')
+    frame = frame.reset_index(drop=True)
+    frame['series'] = frame.groupby(['customer_id', 'stack_id', 'item_key'], sort=False).ngroup()
+    return frame
+
+
+def _series_scale(values: np.ndarray, series: np.ndarray, n_series: int) -> np.ndarray:
+    """시계열별 평균 (0 이하이면 1, 정규화 기준)"""
+    sums = np.bincount(series, weights=values, minlength=n_series)
+    counts = np.bincount(series, minlength=n_series)
+    scale = np.divide(sums, counts, out=np.zeros(n_series), where=counts > 0)
+    return np.where(scale > 0, scale, 1.0)
+
+
+def _feature_rows(
+    known: np.ndarray,
+    origin_times: np.ndarray,
+    target_times: np.ndarray,
+    item_code: np.ndarray,
+    is_stack: np.ndarray,
+    log_scale: np.ndarray
+) -> np.ndarray:
+    """
+    특성 행렬 (학습/예측 공용, 행 = (기준 시점, 예측 대상) 쌍)
+
+    Args:
+        known: (n, MAX_LAG) 기준 시점까지의 정규화 측정값, 열 0 = 기준 시점 (이전 측정이 없으면 NaN)
+    """
+    target_times = pd.DatetimeIndex(target_times)
+    day_of_year = target_times.dayofyear.to_numpy()
+    recent = known[:, :ROLLING_WINDOW]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        roll_mean = np.nanmean(recent, axis=1)
+        roll_std = np.nanstd(recent, axis=1)
+    lead_days = (target_times.to_numpy() - np.asarray(origin_times, dtype='datetime64[ns]')) / np.timedelta64(1, 'D')
+    return np.column_stack([
+        *(known[:, lag - 1] for lag in LAGS),
+        roll_mean,
+        roll_std,
+        lead_days,
+        target_times.dayofweek.to_numpy(),
+        target_times.month.to_numpy(),
+        np.sin(2 * np.pi * day_of_year / 365.25),
+        np.cos(2 * np.pi * day_of_year / 365.25),
+        item_code,
+        is_stack,
+        log_scale
+    ])
+
+
+def _series_attributes(frame: pd.DataFrame, item_codes: Dict[str, int]) -> pd.DataFrame:
+    """시계열별 정적 속성 (series 순)"""
+    first = frame.groupby('series', sort=True)[['customer_id', 'stack_id', 'item_key']].first()
+    first['item_code'] = first['item_key'].map(item_codes).astype(float)
+    first['is_stack'] = (first['stack_id'] != TOP_NODE).astype(float)
+    return first
+
+
+def _known_matrix(z: np.ndarray, series: np.ndarray) -> np.ndarray:
+    """행별 기준 시점까지의 정규화 측정값 (열 j = j 건 전, 같은 시계열만)"""
+    grouped = pd.Series(z).groupby(series, sort=False)
+    return np.column_stack([z] + [grouped.shift(k).to_numpy() for k in range(1, MAX_LAG)])
+
+
+def _training_matrix(
+    frame: pd.DataFrame,
+    scale: np.ndarray,
+    attributes: pd.DataFrame,
+    seed: int = RANDOM_SEED
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    학습 행렬: 기준 시점마다 이후 1~HORIZON_STEPS 건 중 TARGETS_PER_ORIGIN 건을 예측 대상으로 추출
+    (전체 쌍 대비 행 수를 줄이면서 모든 예측 거리를 학습)
+    """
+    series = frame['series'].to_numpy()
+    times = frame['measured_at'].to_numpy()
+    z = frame['value'].to_numpy() / scale[series]
+    known = _known_matrix(z, series)
+
+    rng = np.random.default_rng(seed)
+    n = len(frame)
+    origin = np.repeat(np.arange(n), TARGETS_PER_ORIGIN)
+    target = origin + rng.integers(1, HORIZON_STEPS + 1, size=len(origin))
+    valid = target < n
+    valid[valid] = series[target[valid]] == series[origin[valid]]
+    origin, target = origin[valid], target[valid]
+
+    origin_series = series[origin]
+    features = _feature_rows(
+        known[origin], times[origin], times[target],
+        attributes['item_code'].to_numpy()[origin_series],
+        attributes['is_stack'].to_numpy()[origin_series],
+        np.log1p(scale)[origin_series]
+    )
+    return features, z[target]
+
+
+def _accuracy(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, float]:
+    """holdout 정확도 (automl_engine 지표와 같은 정의)"""
+    residual = actual - predicted
+    return {
+        'rmse': round(float(np.sqrt(np.mean(residual ** 2))), 4),
+        'mae': round(float(np.mean(np.abs(residual))), 4),
+        'mape': round(float(np.mean(np.abs(residual / (actual + 1e-10))) * 100), 2)
+    }
+
+
+class GlobalForecaster:
+    """학습된 전역 모델 (추정기 + 항목 코드 + 단계별 예측 오차)"""
+
+    def __init__(self, estimator, item_codes: Dict[str, int], horizon_sigma: np.ndarray, info: Dict[str, Any]):
+        self.estimator = estimator
+        self.item_codes = item_codes
+        self.horizon_sigma = horizon_sigma
+        self.info = info
+
+    def sigma(self, horizon: int) -> np.ndarray:
+        """단계별 정규화 예측 표준편차 (검증 구간 이후는 √h 비례 외삽)"""
+        known = self.horizon_sigma
+        if horizon <= len(known):
+            return known[:horizon]
+        steps = np.arange(len(known) + 1, horizon + 1)
+        return np.concatenate([known, known[-1] * np.sqrt(steps / len(known))])
+
+    def forecast(
+        self,
+        measured_at: np.ndarray,
+        values: np.ndarray,
+        item_key: str,
+        is_stack: bool,
+        periods: int = 30
+    ) -> Dict[str, Any]:
+        """시계열 1개 예측 (내일부터 일별 periods 일, automl_engine 예측 형식)"""
+        scale = float(values.mean()) if len(values) and values.mean() > 0 else 1.0
+        known = np.full(MAX_LAG, np.nan)
+        recent = values[::-1][:MAX_LAG] / scale
+        known[:len(recent)] = recent
+        future_dates = pd.date_range(start=datetime.now() + timedelta(days=1), periods=periods, freq='D')
+
+        features = _feature_rows(
+            np.tile(known, (periods, 1)),
+            np.repeat(np.asarray(measured_at[-1:], dtype='datetime64[ns]'), periods),
+            future_dates.to_numpy(),
+            np.full(periods, self.item_codes.get(item_key, np.nan), dtype=float),
+            np.full(periods, float(is_stack)),
+            np.full(periods, np.log1p(scale))
+        )
+        predicted = self.estimator.predict(features) * scale
+        margin = INTERVAL_Z * self.sigma(periods) * scale
+
+        return {
+            'predictions': [
+                {
+                    'date': date.strftime('%Y-%m-%d'),
+                    'predicted_value': round(max(0.0, float(value)), 2),
+                    'lower_bound': round(max(0.0, float(value - width)), 2),
+                    'upper_bound': round(max(0.0, float(value + width)), 2),
+                    'trend': round(float(value), 2)
+                }
+                for date, value, width in zip(future_dates, predicted, margin)
+            ],
+            'historical_avg': round(float(values.mean()), 2),
+            'model_info': {
+                'model_type': 'Global-GBM',
+                'trained_at': self.info['trained_at'],
+                'series_count': self.info['series_count'],
+                'features': FEATURES,
+                'known_item': item_key in self.item_codes,
+                'data_period': '최근 2년'
+            }
+        }
+
+
+def fit_global(frame: pd.DataFrame) -> Tuple[GlobalForecaster, List[Dict[str, Any]]]:
+    """
+    전역 모델 학습 (CPU 작업, 스레드에서 실행)
+    1. 시계열별 holdout 제외 학습 -> holdout 일괄 예측으로 시계열별 정확도/단계별 오차
+    2. 전체 데이터로 재학습
+
+    Returns:
+        (모델, 시계열별 평가)
+    """
+    started = time.perf_counter()
+    counts = frame.groupby('series', sort=True).size()
+    frame = frame[frame['series'].map(counts).to_numpy() >= MIN_TRAIN_ROWS]
+    if frame.empty:
+        raise ValueError(f"학습 가능한 시계열이 없습니다. (시계열당 최소 {MIN_TRAIN_ROWS}개 필요)")
+    frame = frame.assign(series=frame.groupby(['customer_id', 'stack_id', 'item_key'], sort=False).ngroup())
+    n_series = int(frame['series'].max()) + 1
+
+    items = sorted(frame['item_key'].unique())
+    item_codes = {key: code for code, key in enumerate(items)}
+    categorical = len(items) <= MAX_CATEGORIES
+    attributes = _series_attributes(frame, item_codes)
+
+    # 1. holdout 평가
+    series = frame['series'].to_numpy()
+    counts = np.bincount(series, minlength=n_series)
+    holdout_size = np.where(
+        counts >= MIN_EVAL_ROWS, np.minimum(HOLDOUT_ROWS, (counts * HOLDOUT_FRACTION).astype(int)), 0
+    )
+    position = frame.groupby('series', sort=False).cumcount().to_numpy()
+    holdout = position >= counts[series] - holdout_size[series]
+
+    fit_frame = frame[~holdout]
+    fit_series_ids = fit_frame['series'].to_numpy()
+    fit_scale = _series_scale(fit_frame['value'].to_numpy(), fit_series_ids, n_series)
+    features, target = _training_matrix(fit_frame, fit_scale, attributes)
+    estimator = _estimator(categorical).fit(features, target)
+
+    evaluations = []
+    horizon_sigma = np.array([1.0])
+    held = frame[holdout]
+    if len(held):
+        # 기준 시점 = 시계열별 holdout 직전 측정
+        fit_known = _known_matrix(fit_frame['value'].to_numpy() / fit_scale[fit_series_ids], fit_series_ids)
+        last_row = pd.Series(np.arange(len(fit_frame))).groupby(fit_series_ids).last()
+        held_series = held['series'].to_numpy()
+        origin = last_row.loc[held_series].to_numpy()
+        z_pred = estimator.predict(_feature_rows(
+            fit_known[origin], fit_frame['measured_at'].to_numpy()[origin], held['measured_at'].to_numpy(),
+            attributes['item_code'].to_numpy()[held_series],
+            attributes['is_stack'].to_numpy()[held_series],
+            np.log1p(fit_scale)[held_series]
+        ))
+        actual = held['value'].to_numpy()
+        step = held.groupby('series', sort=False).cumcount().to_numpy()
+        errors = actual / fit_scale[held_series] - z_pred
+
+        for s, idx in pd.Series(np.arange(len(held))).groupby(held_series).groups.items():
+            idx = np.asarray(idx)
+            key = attributes.loc[s]
+            evaluations.append({
+                'customer_id': key['customer_id'],
+                'stack_id': key['stack_id'],
+                'item_key': key['item_key'],
+                'holdout_start': held['measured_at'].iloc[idx[0]].to_pydatetime(),
+                'holdout_count': len(idx),
+                **_accuracy(actual[idx], np.maximum(z_pred[idx] * fit_scale[s], 0.0))
+            })
+        squared = np.bincount(step, weights=errors ** 2)
+        horizon_sigma = np.maximum.accumulate(np.sqrt(squared / np.bincount(step)))
+
+    # 2. 전체 데이터 재학습
+    scale = _series_scale(frame['value'].to_numpy(), series, n_series)
+    features, target = _training_matrix(frame, scale, attributes)
+    estimator = _estimator(categorical).fit(features, target)
+
+    info = {
+        'version': MODEL_VERSION,
+        'trained_at': datetime.now().isoformat(),
+        'series_count': n_series,
+        'item_count': len(items),
+        'row_count': int(len(frame)),
+        'training_rows': int(len(target)),
+        'evaluated_series': len(evaluations),
+        'median_mape': round(float(np.median([e['mape'] for e in evaluations])), 2) if evaluations else None,
+        'fit_seconds': round(time.perf_counter() - started, 2)
+    }
+    return GlobalForecaster(estimator, item_codes, horizon_sigma, info), evaluations
+
+
+class GlobalForecastStore:
+    """전역 모델 학습/저장/예측 + Auto-ARIMA 비교"""
+
+    def __init__(self):
+        self.model: Optional[GlobalForecaster] = None
+        self._loaded = False
+        self._train_lock = asyncio.Lock()
+
+    async def ensure_loaded(self, conn) -> Optional[GlobalForecaster]:
+        if not self._loaded:
+            row = await conn.fetchrow("""
+                SELECT version, model, info FROM "global_forecast_models" WHERE id = $1
+            """, MODEL_ID)
+            self._loaded = True
+            if row and row['version'] == MODEL_VERSION:
+                estimator, item_codes, horizon_sigma = pickle.loads(row['model'])
+                self.model = GlobalForecaster(estimator, item_codes, horizon_sigma, json.loads(row['info']))
+                logger.info(f"Global forecast model loaded (trained {self.model.info['trained_at']})")
+        return self.model
+
+    async def train(self, conn) -> Dict[str, Any]:
+        """전체 시계열(굴뚝별 + 고객사 전체) 재학습 + holdout 평가 저장"""
+        async with self._train_lock:
+            rows = await conn.fetch("""
+                SELECT m."customerId" as customer_id,
+                       CASE WHEN GROUPING(m."stackId") = 1 THEN $2 ELSE m."stackId" END as stack_id,
+                       m."itemKey" as item_key, m."measuredAt" as measured_at,
+                       AVG(m.value)::float8 as value
+                FROM "Measurement" m
+                WHERE m.value IS NOT NULL AND m."measuredAt" >= $1
+                GROUP BY GROUPING SETS (
+                    (m."customerId", m."itemKey", m."measuredAt", m."stackId"),
+                    (m."customerId", m."itemKey", m."measuredAt")
+                )
+            """, datetime.now() - timedelta(days=TRAINING_DAYS), TOP_NODE)
+            frame = prepare_frame(rows)
+
+            loop = asyncio.get_running_loop()
+            model, evaluations = await loop.run_in_executor(None, fit_global, frame)
+
+            payload = pickle.dumps((model.estimator, model.item_codes, model.horizon_sigma))
+            async with conn.transaction():
+                await conn.execute("""
+                    INSERT INTO "global_forecast_models" (id, version, model, info, "trainedAt")
+                    VALUES ($1, $2, $3, $4, NOW())
+                    ON CONFLICT (id) DO UPDATE SET
+                        version = EXCLUDED.version, model = EXCLUDED.model,
+                        info = EXCLUDED.info, "trainedAt" = EXCLUDED."trainedAt"
+                """, MODEL_ID, MODEL_VERSION, payload, json.dumps(model.info))
+                await self._save_evaluations(conn, evaluations)
+
+            self.model = model
+            self._loaded = True
+            logger.info(
+                f"Global forecast model trained: {model.info['series_count']} series, "
+                f"{model.info['training_rows']} rows, {model.info['fit_seconds']}s"
+            )
+            return model.info
+
+    async def _save_evaluations(self, conn, evaluations: List[Dict[str, Any]]) -> None:
+        """시계열별 holdout 정확도 교체 (holdout 이 바뀐 시계열은 Auto-ARIMA 비교 초기화)"""
+        await conn.execute('DELETE FROM "global_forecast_evaluations" WHERE NOT (id = ANY($1::text[]))', [
+            f"{e['customer_id']}:{e['stack_id']}:{e['item_key']}" for e in evaluations
+        ])
+        if not evaluations:
+            return
+        await conn.execute("""
+            INSERT INTO "global_forecast_evaluations" AS g (
+                id, "customerId", "stackId", "itemKey", "holdoutStart", "holdoutCount",
+                "globalRmse", "globalMae", "globalMape", "evaluatedAt"
+            )
+            SELECT c || ':' || s || ':' || i, c, s, i, hs, hc, r, a, p, NOW()
+            FROM unnest($1::text[], $2::text[], $3::text[], $4::timestamp[], $5::int[],
+                        $6::float8[], $7::float8[], $8::float8[]) AS t(c, s, i, hs, hc, r, a, p)
+            ON CONFLICT (id) DO UPDATE SET
+                "arimaRmse" = CASE WHEN g."holdoutStart" = EXCLUDED."holdoutStart"
+                    AND g."holdoutCount" = EXCLUDED."holdoutCount" THEN g."arimaRmse" END,
+                "arimaMae" = CASE WHEN g."holdoutStart" = EXCLUDED."holdoutStart"
+                    AND g."holdoutCount" = EXCLUDED."holdoutCount" THEN g."arimaMae" END,
+                "arimaMape" = CASE WHEN g."holdoutStart" = EXCLUDED."holdoutStart"
+                    AND g."holdoutCount" = EXCLUDED."holdoutCount" THEN g."arimaMape" END,
+                "arimaComparedAt" = CASE WHEN g."holdoutStart" = EXCLUDED."holdoutStart"
+                    AND g."holdoutCount" = EXCLUDED."holdoutCount" THEN g."arimaComparedAt" END,
+                "holdoutStart" = EXCLUDED."holdoutStart",
+                "holdoutCount" = EXCLUDED."holdoutCount",
+                "globalRmse" = EXCLUDED."globalRmse",
+                "globalMae" = EXCLUDED."globalMae",
+                "globalMape" = EXCLUDED."globalMape",
+                "evaluatedAt" = EXCLUDED."evaluatedAt"
+        """,
+            [e['customer_id'] for e in evaluations],
+            [e['stack_id'] for e in evaluations],
+            [e['item_key'] for e in evaluations],
+            [e['holdout_start'] for e in evaluations],
+            [e['holdout_count'] for e in evaluations],
+            [e['rmse'] for e in evaluations],
+            [e['mae'] for e in evaluations],
+            [e['mape'] for e in evaluations]
+        )
+
+    async def _series_rows(self, conn, customer_id: str, item_key: str, stack_id: Optional[str]):
+        """시계열 측정값 (고객사 전체는 같은 측정 시각 평균, 학습과 동일)"""
+        return await conn.fetch("""
+            SELECT m."measuredAt" as measured_at, AVG(m.value)::float8 as value
+            FROM "Measurement" m
+            WHERE m."customerId" = $1
+              AND m."itemKey" = $2
+              AND ($3::text IS NULL OR m."stackId" = $3)
+              AND m.value IS NOT NULL
+              AND m."measuredAt" >= $4
+            GROUP BY m."measuredAt"
+            ORDER BY m."measuredAt"
+        """, customer_id, item_key, stack_id, datetime.now() - timedelta(days=TRAINING_DAYS))
+
+    async def forecast(
+        self,
+        conn,
+        customer_id: str,
+        item_key: str,
+        periods: int = 30,
+        stack_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        시계열 1개 예측 (재학습 없음)
+
+        Raises:
+            ValueError: 모델 미학습 / 측정 데이터 없음
+        """
+        model = await self.ensure_loaded(conn)
+        if model is None:
+            raise ValueError("전역 예측 모델이 아직 학습되지 않았습니다. (/api/forecast/global/train)")
+        rows = await self._series_rows(conn, customer_id, item_key, stack_id)
+        if not rows:
+            raise ValueError("최근 2년 측정 데이터가 없습니다.")
+
+        measured_at = np.array([row['measured_at'] for row in rows], dtype='datetime64[ns]')
+        values = np.array([row['value'] for row in rows], dtype=float)
+        result = model.forecast(measured_at, values, item_key, stack_id is not None, periods)
+
+        evaluation = await conn.fetchrow("""
+            SELECT "holdoutCount" as holdout_count, "globalRmse" as rmse, "globalMae" as mae,
+                   "globalMape" as mape, "arimaRmse" as arima_rmse, "arimaMape" as arima_mape
+            FROM "global_forecast_evaluations"
+            WHERE id = $1
+        """, f"{customer_id}:{stack_id or TOP_NODE}:{item_key}")
+        result['metrics'] = dict(evaluation) if evaluation else None
+        result['training_samples'] = len(rows)
+        return result
+
+    async def compare(
+        self,
+        conn,
+        customer_id: Optional[str] = None,
+        item_key: Optional[str] = None,
+        limit: int = COMPARE_SERIES
+    ) -> List[Dict[str, Any]]:
+        """
+        Auto-ARIMA 경로와 정확도 비교 (전역 모델 평가와 같은 holdout, 비교가 오래된 시계열부터 limit 개)
+        - ARIMA 는 holdout 이전 측정값으로 학습 후 holdout 건수만큼 예측 (프로세스 풀 병렬)
+        """
+        targets = await conn.fetch("""
+            SELECT id, "customerId" as customer_id, "stackId" as stack_id, "itemKey" as item_key,
+                   "holdoutStart" as holdout_start, "holdoutCount" as holdout_count,
+                   "globalRmse" as global_rmse, "globalMape" as global_mape
+            FROM "global_forecast_evaluations"
+            WHERE ($1::text IS NULL OR "customerId" = $1)
+              AND ($2::text IS NULL OR "itemKey" = $2)
+            ORDER BY "arimaComparedAt" NULLS FIRST, "evaluatedAt"
+            LIMIT $3
+        """, customer_id, item_key, limit)
+
+        jobs = []
+        for target in targets:
+            rows = await self._series_rows(
+                conn, target['customer_id'], target['item_key'],
+                None if target['stack_id'] == TOP_NODE else target['stack_id']
+            )
+            train = [dict(row) for row in rows if row['measured_at'] < target['holdout_start']]
+            actual = [row['value'] for row in rows if row['measured_at'] >= target['holdout_start']]
+            actual = actual[:target['holdout_count']]
+            if len(train) < MIN_TRAIN_ROWS or len(actual) < target['holdout_count']:
+                logger.warning(f"Series {target['id']} changed since evaluation, skipping ARIMA comparison")
+                continue
+            jobs.append((target, train, np.array(actual)))
+        if not jobs:
+            return []
+
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+        fitted = await asyncio.gather(*(
+            loop.run_in_executor(executor, fit_series, train, len(actual)) for _, train, actual in jobs
+        ))
+
+        results = []
+        for (target, _, actual), forecast in zip(jobs, fitted):
+            predicted = np.array([p['predicted_value'] for p in forecast['predictions']][:len(actual)])
+            arima = _accuracy(actual, predicted)
+            results.append({
+                'customer_id': target['customer_id'],
+                'stack_id': target['stack_id'],
+                'item_key': target['item_key'],
+                'holdout_count': target['holdout_count'],
+                'global': {'rmse': target['global_rmse'], 'mape': target['global_mape']},
+                'arima': arima,
+                'winner': 'global' if target['global_rmse'] <= arima['rmse'] else 'arima'
+            })
+        await conn.execute("""
+            UPDATE "global_forecast_evaluations" g
+            SET "arimaRmse" = t.r, "arimaMae" = t.a, "arimaMape" = t.p, "arimaComparedAt" = NOW()
+            FROM unnest($1::text[], $2::float8[], $3::float8[], $4::float8[]) AS t(id, r, a, p)
+            WHERE g.id = t.id
+        """,
+            [target['id'] for target, _, _ in jobs],
+            [r['arima']['rmse'] for r in results],
+            [r['arima']['mae'] for r in results],
+            [r['arima']['mape'] for r in results]
+        )
+        logger.info(
+            f"Global vs ARIMA comparison: {sum(r['winner'] == 'global' for r in results)} of {len(results)} series favour global"
+        )
+        return results
+
+    async def evaluations(
+        self,
+        conn,
+        customer_id: Optional[str] = None,
+        item_key: Optional[str] = None,
+        compared_only: bool = False
+    ) -> Dict[str, Any]:
+        """시계열별 holdout 정확도 (전역 / Auto-ARIMA) + 요약"""
+        rows = await conn.fetch("""
+            SELECT "customerId" as customer_id, "stackId" as stack_id, "itemKey" as item_key,
+                   "holdoutStart" as holdout_start, "holdoutCount" as holdout_count,
+                   "globalRmse" as global_rmse, "globalMae" as global_mae, "globalMape" as global_mape,
+                   "arimaRmse" as arima_rmse, "arimaMae" as arima_mae, "arimaMape" as arima_mape,
+                   "arimaComparedAt" as arima_compared_at, "evaluatedAt" as evaluated_at
+            FROM "global_forecast_evaluations"
+            WHERE ($1::text IS NULL OR "customerId" = $1)
+              AND ($2::text IS NULL OR "itemKey" = $2)
+              AND (NOT $3 OR "arimaRmse" IS NOT NULL)
+            ORDER BY "customerId", "itemKey", "stackId"
+        """, customer_id, item_key, compared_only)
+        series = [dict(row) for row in rows]
+        compared = [s for s in series if s['arima_rmse'] is not None]
+        ratios = [s['global_rmse'] / s['arima_rmse'] for s in compared if s['arima_rmse'] > 0]
+        return {
+            'model': self.model.info if self.model else None,
+            'summary': {
+                'series': len(series),
+                'compared': len(compared),
+                'global_better': sum(s['global_rmse'] <= s['arima_rmse'] for s in compared),
+                'median_rmse_ratio': round(float(np.median(ratios)), 3) if ratios else None
+            },
+            'series': series
+        }
+
+
+# 전역 모델 싱글톤
+global_forecast_store = GlobalForecastStore()
@@ -0,0 +1,383 @@
+"""
+굴뚝별 예측 + 고객사 단위 계층 조정(reconciliation)
+- 굴뚝마다 자체 측정 시계열로 Auto-ARIMA 학습 (프로세스 풀 병렬), 고객사 전체 시계열(동일 시각은 평균)도 기준 예측으로 학습
+- 고객사 값 = 굴뚝 값의 측정 건수 가중 평균 (풀링 시계열의 기대값) 제약으로 WLS 조정 -> 굴뚝/고객사 예측 일관
+- 조정 가중치: 시점별 예측 분산 (경로 모델, 없으면 RMSE²)
+- 굴뚝별 기준 예측은 "stack_forecasts" 에 저장, 새 측정 잔차가 커졌거나 오래된 노드(또는 요청 굴뚝)만 재학습 (retrain_policy)
+"""
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from exceedance_simulation import PathModel, forecast_variance
+from forecast_store import clean_float_values
+from retrain_policy import REASON_HORIZON_EXHAUSTED, evaluate, retrain_decision_store
+from tuning_store import tuning_store
+
+logger = logging.getLogger(__name__)
+
+# 고객사 전체 기준 예측 노드 ("stack_forecasts"."stackId")
+TOP_NODE = ''
+
+# 굴뚝별 모델 최소 측정 건수 (미만 굴뚝은 조정에서 제외)
+MIN_STACK_ROWS = 30
+
+# 병렬 학습 프로세스 수
+MAX_WORKERS = int(os.getenv('STACK_FORECAST_WORKERS', str(os.cpu_count() or 1)))
+
+METHOD_WLS = 'wls'
+METHOD_BOTTOM_UP = 'bottom_up'
+
+TRAINING_COLUMNS = """
+    m."measuredAt" as measured_at,
+    m.value,
+    m."temperatureC" as temp,
+    m."humidityPct" as humidity,
+    m."windSpeedMs" as wind_speed,
+    m."gasTempC" as gas_temp,
+    m."oxygenMeasuredPct" as o2_measured,
+    m."pressureMmHg" as pressure,
+    m."gasVelocityMs" as gas_velocity,
+    m."moisturePct" as moisture,
+    m."flowSm3Min" as flow,
+    m."stackId" as stack_id,
+    COALESCE(NULLIF(s."siteName", ''), s.name) as stack_name
+"""
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def fit_series(
+    rows: List[Dict[str, Any]],
+    periods: int,
+    tuning_history: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    시계열 1개 학습 + 예측 (프로세스 풀 작업 함수)
+
+    Returns:
+        predictions, path_model, model_info, metrics, historical_avg, tuning (저장용 탐색 결과)
+    """
+    from automl_engine import PmmsAutoMLPredictor
+
+    predictor = PmmsAutoMLPredictor()
+    result = asyncio.run(predictor.predict(data=rows, periods=periods, tuning_history=tuning_history))
+    return {
+        key: result.get(key)
+        for key in ('predictions', 'path_model', 'model_info', 'metrics', 'historical_avg', 'tuning')
+    }
+
+
+def pool_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """고객사 전체 시계열: 같은 측정 시각의 굴뚝 값은 평균 (기존 drop_duplicates 의 행 유실 방지)"""
+    frame = pd.DataFrame(rows)
+    numeric = [c for c in frame.columns if c not in ('measured_at', 'stack_id', 'stack_name')]
+    frame[numeric] = frame[numeric].apply(pd.to_numeric, errors='coerce')
+    pooled = frame.groupby('measured_at', sort=True)[numeric].mean().reset_index()
+    return pooled.to_dict('records')
+
+
+def reconcile(
+    bottom: np.ndarray,
+    bottom_variance: np.ndarray,
+    weights: np.ndarray,
+    top: Optional[np.ndarray] = None,
+    top_variance: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    가중 평균 제약 WLS 조정 (시점별 독립, 닫힌 해)
+
+    제약 top = weights · bottom 하에서 Σ (ŷ - y)² / v 최소화:
+        b̃ = b̂ + v_b w (ŷ_top - w·b̂) / (v_top + Σ w² v_b)
+
+    Args:
+        bottom: (굴뚝 수, 기간) 굴뚝별 기준 예측
+        bottom_variance: (굴뚝 수, 기간) 예측 분산
+        weights: (굴뚝 수,) 합 1 가중치
+        top, top_variance: (기간,) 고객사 기준 예측/분산 (없으면 bottom-up)
+
+    Returns:
+        조정된 굴뚝별 예측 (고객사 값은 weights @ 결과)
+    """
+    if top is None:
+        return bottom.copy()
+    w = weights[:, None]
+    gap = top - (w * bottom).sum(axis=0)
+    denominator = top_variance + (w * w * bottom_variance).sum(axis=0)
+    return bottom + bottom_variance * w * (gap / denominator)
+
+
+def shared_dates(forecasts: List[Dict[str, Any]]) -> List[str]:
+    """모든 예측에 공통으로 있는 날짜 (재사용 노드는 생성일만큼 시작일이 앞서므로 단계가 아닌 날짜로 정렬)"""
+    dates = set.intersection(*({p['date'] for p in forecast['predictions']} for forecast in forecasts))
+    return sorted(dates)
+
+
+def aligned_steps(forecast: Dict[str, Any], dates: List[str]) -> np.ndarray:
+    """날짜 목록에 해당하는 예측 단계 인덱스"""
+    steps = {p['date']: i for i, p in enumerate(forecast['predictions'])}
+    return np.array([steps[date] for date in dates], dtype=int)
+
+
+def reconciled_predictions(base: Dict[str, Any], values: np.ndarray, dates: List[str]) -> List[Dict[str, Any]]:
+    """기준 예측 형식 유지: 조정량만큼 예측값/신뢰구간 이동 (구간 폭 유지, 날짜로 정렬)"""
+    points = [base['predictions'][i] for i in aligned_steps(base, dates)]
+    predictions = []
+    for point, value, date in zip(points, values, dates):
+        shift = float(value) - point['predicted_value']
+        predictions.append({
+            'date': date,
+            'predicted_value': round(max(0.0, float(value)), 2),
+            'lower_bound': round(max(0.0, point['lower_bound'] + shift), 2),
+            'upper_bound': round(max(0.0, point['upper_bound'] + shift), 2),
+            'trend': round(float(value), 2)
+        })
+    return predictions
+
+
+class StackForecastStore:
+    """
+    굴뚝별 기준 예측 저장소 ("stack_forecasts", 고객사 전체 기준 예측은 stackId '')
+
+    재사용 기준: 저장 이후 새 측정의 rolling error 가 임계값 이하이고 최대 수명 이내 (retrain_policy)
+    """
+
+    async def _load(self, conn, customer_id: str, item_key: str, periods: int) -> Dict[str, Dict[str, Any]]:
+        try:
+            rows = await conn.fetch("""
+                SELECT "stackId" as stack_id, "rowCount" as row_count, "lastMeasuredAt" as last_measured_at,
+                       forecast, "createdAt" as created_at
+                FROM stack_forecasts
+                WHERE "customerId" = $1 AND "itemKey" = $2 AND periods = $3
+            """, customer_id, item_key, periods)
+        except Exception as e:
+            logger.warning(f"Stack forecast lookup failed (table may not exist): {e}")
+            return {}
+        return {
+            row['stack_id']: {
+                'row_count': row['row_count'],
+                'last_measured_at': row['last_measured_at'],
+                'forecast': clean_float_values(json.loads(row['forecast'])),
+                'created_at': row['created_at']
+            }
+            for row in rows
+        }
+
+    async def _save(self, conn, customer_id: str, item_key: str, periods: int, nodes: Dict[str, Dict[str, Any]]) -> None:
+        if not nodes:
+            return
+        stack_ids = list(nodes)
+        try:
+            await conn.execute("""
+                INSERT INTO stack_forecasts
+                (id, "customerId", "stackId", "itemKey", periods, "rowCount", "lastMeasuredAt", forecast, "createdAt")
+                SELECT $1 || ':' || s.stack_id || ':' || $2 || ':' || $3::int, $1, s.stack_id, $2, $3,
+                       s.row_count, s.last_measured_at, s.forecast, $8::timestamp
+                FROM unnest($4::text[], $5::int[], $6::timestamp[], $7::text[])
+                    AS s(stack_id, row_count, last_measured_at, forecast)
+                ON CONFLICT ("customerId", "stackId", "itemKey", periods) DO UPDATE SET
+                    "rowCount" = EXCLUDED."rowCount",
+                    "lastMeasuredAt" = EXCLUDED."lastMeasuredAt",
+                    forecast = EXCLUDED.forecast,
+                    "createdAt" = EXCLUDED."createdAt"
+            """,
+                customer_id, item_key, periods,
+                stack_ids,
+                [nodes[s]['row_count'] for s in stack_ids],
+                [nodes[s]['last_measured_at'] for s in stack_ids],
+                [json.dumps(clean_float_values(nodes[s]['forecast'])) for s in stack_ids],
+                datetime.now()  # retrain_policy 가 비교하는 앱 시계 (DB NOW() 시간대와 무관)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to save stack forecasts: {e}")
+
+    async def forecast(
+        self,
+        conn,
+        customer_id: str,
+        item_key: str,
+        periods: int = 30,
+        stack_id: Optional[str] = None,
+        use_top: bool = True
+    ) -> Dict[str, Any]:
+        """
+        굴뚝별 예측 + 고객사 조정 예측
+
+        Args:
+            stack_id: 지정 시 해당 굴뚝은 잔차와 무관하게 재학습 (나머지는 재학습 정책대로)
+            use_top: 고객사 전체 기준 예측을 조정에 사용 (False 면 bottom-up)
+
+        Raises:
+            ValueError: 학습 가능한 굴뚝이 없거나 지정 굴뚝 데이터 부족
+        """
+        rows = await conn.fetch(f"""
+            SELECT {TRAINING_COLUMNS}
+            FROM "Measurement" m
+            LEFT JOIN "Stack" s ON m."stackId" = s.id
+            WHERE m."customerId" = $1
+              AND m."itemKey" = $2
+              AND m.value IS NOT NULL
+            ORDER BY m."measuredAt"
+        """, customer_id, item_key)
+        rows = [dict(row) for row in rows]
+
+        by_stack: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_stack.setdefault(row['stack_id'], []).append(row)
+        names = {s: stack_rows[0]['stack_name'] or s for s, stack_rows in by_stack.items()}
+
+        modeled = sorted(s for s, stack_rows in by_stack.items() if len(stack_rows) >= MIN_STACK_ROWS)
+        skipped = sorted(s for s in by_stack if s not in modeled)
+        if stack_id is not None and stack_id not in modeled:
+            raise ValueError(f"굴뚝 {stack_id} 의 학습 데이터가 부족합니다. (최소 {MIN_STACK_ROWS}개 필요)")
+        if not modeled:
+            raise ValueError(f"굴뚝별 학습 데이터가 부족합니다. (굴뚝당 최소 {MIN_STACK_ROWS}개 필요)")
+
+        node_rows = {s: by_stack[s] for s in modeled}
+        if use_top:
+            node_rows[TOP_NODE] = pool_rows([row for s in modeled for row in by_stack[s]])
+        current = {
+            s: {'row_count': len(by_stack[s]), 'last_measured_at': by_stack[s][-1]['measured_at']} for s in modeled
+        }
+        if use_top:
+            current[TOP_NODE] = {
+                'row_count': sum(current[s]['row_count'] for s in modeled),
+                'last_measured_at': max(current[s]['last_measured_at'] for s in modeled)
+            }
+
+        # 재학습 판단: 저장된 기준 예측 이후 새 측정의 잔차/모델 수명
+        stored = await self._load(conn, customer_id, item_key, periods)
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        decisions = {}
+        for node in node_rows:
+            previous = stored.get(node)
+            if previous is None:
+                decisions[node] = evaluate(None, None, [])
+                continue
+            watermark = previous['last_measured_at']
+            new_rows = [row for row in node_rows[node] if watermark is None or row['measured_at'] > watermark]
+            decisions[node] = evaluate(
+                previous['forecast'], previous['created_at'], new_rows, requested=node == stack_id
+            )
+            # 예측 기간이 모두 지난 노드는 새 예측(내일부터)과 겹치는 날짜가 없으므로 재학습
+            if not decisions[node]['retrain'] and previous['forecast']['predictions'][-1]['date'] < tomorrow:
+                decisions[node] = {**decisions[node], 'retrain': True, 'reason': REASON_HORIZON_EXHAUSTED}
+        await retrain_decision_store.record(conn, periods, {
+            (customer_id, node, item_key): decision for node, decision in decisions.items()
+        })
+        stale = [node for node in node_rows if decisions[node]['retrain']]
+
+        # 병렬 학습 (프로세스 풀, 노드별 이전 탐색 결과 또는 유사 시계열 최적값으로 warm start)
+        tuning_keys = {node: (customer_id, node, item_key) for node in stale}
+        histories = await tuning_store.load_with_seeds(
+            conn, {tuning_keys[node]: node_rows[node] for node in stale}
+        )
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+        fitted = await asyncio.gather(*(
+            loop.run_in_executor(executor, fit_series, node_rows[node], periods, histories.get(tuning_keys[node]))
+            for node in stale
+        ))
+        await tuning_store.save(conn, {
+            tuning_keys[node]: forecast.pop('tuning', None) for node, forecast in zip(stale, fitted)
+        })
+        refreshed = {node: {**current[node], 'forecast': forecast} for node, forecast in zip(stale, fitted)}
+        await self._save(conn, customer_id, item_key, periods, refreshed)
+        nodes = {node: refreshed.get(node) or stored[node] for node in node_rows}
+
+        # 시점 정렬: 모든 노드에 공통인 날짜만 조정 (재사용 노드는 생성일만큼 앞선 날짜부터 시작)
+        dates = shared_dates([nodes[node]['forecast'] for node in nodes])
+        if not dates:
+            raise ValueError("굴뚝별 예측 기간이 서로 겹치지 않습니다.")
+        horizon = len(dates)
+
+        def aligned(node: str):
+            forecast = nodes[node]['forecast']
+            steps = aligned_steps(forecast, dates)
+            values = np.array([forecast['predictions'][i]['predicted_value'] for i in steps])
+            variance = forecast_variance(forecast, len(forecast['predictions']))[steps]
+            return values, variance
+
+        counts = np.array([current[s]['row_count'] for s in modeled], dtype=float)
+        weights = counts / counts.sum()
+        bottom, bottom_variance = (np.array(part) for part in zip(*(aligned(s) for s in modeled)))
+        top = top_variance = None
+        if use_top:
+            top, top_variance = aligned(TOP_NODE)
+
+        reconciled = reconcile(bottom, bottom_variance, weights, top, top_variance)
+        customer_values = weights @ reconciled
+
+        # 고객사 형식: 기준 예측(고객사 노드, 없으면 가중치 최대 굴뚝)의 구간 폭 유지
+        customer_base = nodes[TOP_NODE]['forecast'] if use_top else nodes[modeled[int(np.argmax(weights))]]['forecast']
+        customer_path = PathModel.from_dict(customer_base.get('path_model'))
+        # 경로 모델은 예측 첫 날부터의 분포이므로 공통 날짜가 첫 날부터 시작할 때만 유지
+        if customer_path is not None and customer_base['predictions'][0]['date'] != dates[0]:
+            customer_path = None
+        if customer_path is not None and customer_path.horizon >= horizon:
+            customer_path = customer_path._replace(
+                mean=customer_values, initial=customer_path.initial[:horizon], impulse=customer_path.impulse[:horizon]
+            )
+
+        result = {
+            'customer_id': customer_id,
+            'item_key': item_key,
+            'periods': periods,
+            'method': METHOD_WLS if use_top else METHOD_BOTTOM_UP,
+            'predictions': reconciled_predictions(customer_base, customer_values, dates),
+            'path_model': customer_path.to_dict() if customer_path is not None else None,
+            'stacks': [
+                {
+                    'stack_id': s,
+                    'stack_name': names[s],
+                    'weight': round(float(weights[i]), 4),
+                    'row_count': current[s]['row_count'],
+                    'refreshed': s in refreshed,
+                    'adjustment_avg': round(float(np.mean(reconciled[i] - bottom[i])), 3),
+                    'predictions': reconciled_predictions(nodes[s]['forecast'], reconciled[i], dates),
+                    'model_info': nodes[s]['forecast'].get('model_info'),
+                    'metrics': nodes[s]['forecast'].get('metrics')
+                }
+                for i, s in enumerate(modeled)
+            ],
+            'skipped_stacks': [
+                {'stack_id': s, 'stack_name': names[s], 'row_count': len(by_stack[s])} for s in skipped
+            ],
+            'refreshed': sorted(refreshed),
+            'reused': sorted(node for node in nodes if node not in refreshed),
+            'retrain_decisions': {
+                node: {key: decision[key] for key in ('retrain', 'reason', 'rolling_error', 'residual_count')}
+                for node, decision in decisions.items()
+            },
+            'training_samples': len(rows)
+        }
+        logger.info(
+            f"Stack forecasts for {customer_id}/{item_key}: {len(modeled)} stacks "
+            f"({len(refreshed)} retrained, {len(nodes) - len(refreshed)} reused), method={result['method']}"
+        )
+        return result
+
+
+# 프로세스 공용 저장소
+stack_forecast_store = StackForecastStore()
@@ -0,0 +1,209 @@
+"""
+굴뚝 단위 다항목 동시 예측 (VAR)
+- 굴뚝의 측정 항목(StackMeasurementItem)을 측정 시각 기준 패널로 묶어 VAR 모델 1회 학습
+- 항목별 Optuna + auto_arima 탐색(항목 수만큼 반복) 대신 단일 학습으로 전체 항목 예측
+- 측정 시각이 다른 항목 결측은 시간 순 선형 보간, 결측 비율은 항목별로 보고
+- 예측 구간은 VAR 예측 오차 공분산 기반 95% 구간
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.api import VAR
+
+logger = logging.getLogger(__name__)
+
+# 항목별 최소 측정 건수 (미만 항목은 동시 예측에서 제외)
+MIN_ITEM_ROWS = 20
+
+# 최대 시차 (automl_engine 주간 계절성 m=7 과 동일 범위)
+MAX_LAGS = 7
+
+# 관측치 대비 파라미터 수 제한 (추정 파라미터 k*p+1 이 관측치의 1/3 이하)
+OBS_PER_PARAMETER = 3
+
+# 학습 기간 (automl_engine 과 동일: 최근 2년, 365건 미만이면 전체)
+TRAINING_DAYS = 730
+MIN_WINDOW_ROWS = 365
+
+
+def build_panel(rows: List[Any], min_item_rows: int = MIN_ITEM_ROWS):
+    """
+    측정 행 -> (측정 시각 x 항목) 패널
+
+    Returns:
+        panel: 보간된 패널 (모델 대상 항목만), observed: 항목별 실측 비율, skipped: {항목: 측정 건수}
+    """
+    frame = pd.DataFrame([dict(row) for row in rows], columns=['measured_at', 'item_key', 'value'])
+    frame['measured_at'] = pd.to_datetime(frame['measured_at'])
+    frame['value'] = frame['value'].astype(float)
+
+    recent = frame[frame['measured_at'] >= datetime.now() - timedelta(days=TRAINING_DAYS)]
+    if recent['measured_at'].nunique() >= MIN_WINDOW_ROWS:
+        frame = recent
+
+    # 같은 시각 중복 측정은 평균
+    wide = frame.pivot_table(index='measured_at', columns='item_key', values='value', aggfunc='mean').sort_index()
+    counts = wide.notna().sum()
+    skipped = {key: int(count) for key, count in counts.items() if count < min_item_rows}
+    wide = wide.drop(columns=list(skipped))
+    wide = wide.dropna(how='all')
+
+    observed = wide.notna().mean()
+    panel = wide.interpolate(method='time', limit_direction='both')
+    return panel, observed, skipped
+
+
+def _metrics(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, float]:
+    """automl_engine._evaluate_model 과 같은 지표"""
+    residual = actual - predicted
+    total = np.sum((actual - np.mean(actual)) ** 2)
+    return {
+        'rmse': round(float(np.sqrt(np.mean(residual ** 2))), 2),
+        'mae': round(float(np.mean(np.abs(residual))), 2),
+        'mape': round(float(np.mean(np.abs(residual / (actual + 1e-10))) * 100), 2),
+        'r2': round(float(1 - np.sum(residual ** 2) / total), 3) if total > 0 else 0.0
+    }
+
+
+def _format_predictions(point: np.ndarray, lower: np.ndarray, upper: np.ndarray, dates) -> List[Dict]:
+    return [
+        {
+            'date': date.strftime('%Y-%m-%d'),
+            'predicted_value': round(max(0.0, float(p)), 2),
+            'lower_bound': round(max(0.0, float(lo)), 2),
+            'upper_bound': round(max(0.0, float(hi)), 2),
+            'trend': round(float(p), 2)
+        }
+        for date, p, lo, hi in zip(dates, point, lower, upper)
+    ]
+
+
+def fit_joint(panel: pd.DataFrame, periods: int = 30, max_lags: int = MAX_LAGS) -> Dict[str, Any]:
+    """
+    패널 전체 항목 VAR 1회 학습 + 예측
+
+    Returns:
+        model_info, items: {항목: {predictions, metrics, historical_avg}}
+
+    Raises:
+        ValueError: 관측치 대비 항목 수가 너무 많음
+    """
+    future_dates = pd.date_range(start=datetime.now() + timedelta(days=1), periods=periods, freq='D')
+    items: Dict[str, Dict[str, Any]] = {}
+
+    # 변동 없는 항목은 상수 예측 (VAR 공분산 특이 방지)
+    constant = [key for key in panel.columns if panel[key].std() == 0]
+    for key in constant:
+        value = np.full(periods, panel[key].iloc[-1])
+        items[key] = {
+            'predictions': _format_predictions(value, value, value, future_dates),
+            'metrics': _metrics(panel[key].to_numpy(), panel[key].to_numpy()),
+            'historical_avg': round(float(panel[key].mean()), 2)
+        }
+    variable = panel.drop(columns=constant)
+    k = variable.shape[1]
+    n_obs = len(variable)
+    if k == 0:
+        return {'model_info': {'model_type': 'Constant', 'lag_order': 0, 'items': list(panel.columns), 'n_obs': n_obs}, 'items': items}
+
+    # 추정 파라미터 수 (k * p + 1) 가 관측치의 1/OBS_PER_PARAMETER 를 넘지 않는 최대 시차
+    lag_limit = min(max_lags, (n_obs // OBS_PER_PARAMETER - 1) // k)
+    if lag_limit < 1:
+        raise ValueError(
+            f"동시 예측에 필요한 측정 시점이 부족합니다. (항목 {k}개, 측정 시점 {n_obs}개, "
+            f"최소 {OBS_PER_PARAMETER * (k + 1)}개 필요)"
+        )
+
+    model = VAR(variable.to_numpy())
+    try:
+        lag_order = model.select_order(lag_limit, trend='c').aic or 1
+    except Exception as e:
+        logger.warning(f"VAR lag selection failed, using lag 1: {e}")
+        lag_order = 1
+    lag_order = int(max(1, min(lag_order, lag_limit)))
+    results = model.fit(lag_order, trend='c')
+
+    point, lower, upper = results.forecast_interval(variable.to_numpy()[-lag_order:], steps=periods, alpha=0.05)
+    fitted = results.fittedvalues
+    actual = variable.to_numpy()[lag_order:]
+
+    for j, key in enumerate(variable.columns):
+        items[key] = {
+            'predictions': _format_predictions(point[:, j], lower[:, j], upper[:, j], future_dates),
+            'metrics': _metrics(actual[:, j], fitted[:, j]),
+            'historical_avg': round(float(variable[key].mean()), 2)
+        }
+
+    return {
+        'model_info': {
+            'model_type': 'VAR',
+            'lag_order': lag_order,
+            'items': list(panel.columns),
+            'constant_items': constant,
+            'n_obs': n_obs,
+            'aic': round(float(results.aic), 3) if np.isfinite(results.aic) else None
+        },
+        'items': items
+    }
+
+
+async def forecast_stack_items(
+    conn,
+    stack_id: str,
+    periods: int = 30,
+    item_keys: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    굴뚝 측정 항목 동시 예측
+
+    Args:
+        item_keys: 미지정 시 활성 StackMeasurementItem 전체
+
+    Raises:
+        ValueError: 대상 항목 없음 / 학습 데이터 부족
+    """
+    if item_keys is None:
+        item_rows = await conn.fetch("""
+            SELECT "itemKey" as item_key
+            FROM "StackMeasurementItem"
+            WHERE "stackId" = $1 AND "isActive" = true
+            ORDER BY "order", "itemKey"
+        """, stack_id)
+        item_keys = [row['item_key'] for row in item_rows]
+    if not item_keys:
+        raise ValueError("굴뚝에 설정된 측정 항목이 없습니다.")
+
+    rows = await conn.fetch("""
+        SELECT m."measuredAt" as measured_at, m."itemKey" as item_key, m.value
+        FROM "Measurement" m
+        WHERE m."stackId" = $1
+          AND m."itemKey" = ANY($2::text[])
+          AND m.value IS NOT NULL
+        ORDER BY m."measuredAt"
+    """, stack_id, item_keys)
+
+    panel, observed, skipped = build_panel(rows)
+    skipped.update({key: 0 for key in item_keys if key not in panel.columns and key not in skipped})
+    if panel.shape[1] == 0:
+        raise ValueError(f"동시 예측 가능한 항목이 없습니다. (항목당 최소 {MIN_ITEM_ROWS}개 필요)")
+
+    result = fit_joint(panel, periods)
+    for key, forecast in result['items'].items():
+        forecast['observed_ratio'] = round(float(observed[key]), 3)
+
+    logger.info(
+        f"Joint forecast for stack {stack_id}: {len(result['items'])} items, "
+        f"{result['model_info']['model_type']}({result['model_info']['lag_order']}), "
+        f"{result['model_info']['n_obs']} timestamps, {len(skipped)} skipped"
+    )
+    return {
+        'stack_id': stack_id,
+        'periods': periods,
+        'model_info': result['model_info'],
+        'items': result['items'],
+        'skipped_items': [{'item_key': key, 'row_count': count} for key, count in sorted(skipped.items())],
+        'training_samples': len(rows)
+    }
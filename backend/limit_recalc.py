@@ -0,0 +1,270 @@
+"""
+배출허용기준 변경/가정(what-if) 시 인사이트 보고서 기준 관련 섹션 재계산
+- 저장된 보고서의 예측값/신뢰구간으로 예측 분석(_analyze_predictions)과 위험도(_assess_risk)만 재계산
+- 모델 재학습 없음, 기준과 무관한 섹션(과거/트렌드/상관관계/굴뚝 기여도/영향 요인)은 저장된 결과 재사용
+- 과거 초과 이력은 보고서 학습 기간의 측정값을 DB에서 1회 집계 (여러 보고서 일괄)
+"""
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from emission_limits import limit_index
+from exceedance_simulation import PathModel
+from forecast_store import clean_float_values
+from insight_generator import InsightGenerator
+
+logger = logging.getLogger(__name__)
+
+MODE_WHAT_IF = 'what_if'
+MODE_LIMIT_CHANGE = 'limit_change'
+
+
+class HistoricalExceedance(NamedTuple):
+    """
+    보고서 학습 기간의 기준 초과 건수 (SeriesStats 대신 _assess_risk 에 전달)
+    - count_above 는 집계에 사용한 기준값(limit)에 대해서만 유효, 다른 기준값이면 ValueError
+    """
+    count: int
+    exceeded: int
+    limit: Optional[float]
+
+    def count_above(self, threshold: float) -> int:
+        if self.limit is None or float(threshold) != self.limit:
+            raise ValueError(f"초과 건수는 기준값 {self.limit} 로 집계되었습니다. (요청 기준값 {threshold})")
+        return self.exceeded
+
+
+def parse_period(period: str) -> Tuple[datetime, datetime]:
+    """'YYYY-MM-DD ~ YYYY-MM-DD' -> (시작일 0시, 종료일 다음날 0시)"""
+    start, end = [part.strip() for part in period.split('~')]
+    return datetime.strptime(start, '%Y-%m-%d'), datetime.strptime(end, '%Y-%m-%d') + timedelta(days=1)
+
+
+def limits_differ(a: Optional[float], b: Optional[float]) -> bool:
+    if not a and not b:
+        return False
+    if not a or not b:
+        return True
+    return abs(a - b) > 1e-9
+
+
+async def fetch_report_heads(
+    conn,
+    customer_id: Optional[str] = None,
+    item_key: Optional[str] = None,
+    report_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    고객사/항목별 최신 보고서 (report_id 지정 시 해당 보고서)
+    - 저장 기준값만 JSON 에서 추출 (reportData/PDF 전송 없음)
+    """
+    rows = await conn.fetch("""
+        SELECT DISTINCT ON ("customerId", "itemKey")
+            id, "customerId" as customer_id, "itemKey" as item_key,
+            ("reportData"::jsonb #>> '{insight_report,summary,prediction,limit_value}')::float8 as stored_limit
+        FROM "insight_reports"
+        WHERE ($1::text IS NULL OR "customerId" = $1)
+          AND ($2::text IS NULL OR "itemKey" = $2)
+          AND ($3::text IS NULL OR id = $3)
+        ORDER BY "customerId", "itemKey", "createdAt" DESC
+    """, customer_id, item_key, report_id)
+    return [dict(row) for row in rows]
+
+
+async def resolve_current_limits(conn, heads: List[Dict[str, Any]]) -> None:
+    """
+    보고서별 현재 적용 기준 (인사이트 보고서와 동일: 굴뚝 1개면 굴뚝별 기준부터, 여러 굴뚝이면 고객사 기준부터)
+    - heads 에 limit, limit_source 추가
+    """
+    await limit_index.ensure_loaded(conn)
+    rows = await conn.fetch("""
+        SELECT ms."customerId" as customer_id, ms."itemKey" as item_key,
+               COUNT(*) as stack_count, MIN(ms."stackId") as stack_id
+        FROM measurement_stats ms
+        JOIN unnest($1::text[], $2::text[]) AS h(customer_id, item_key)
+          ON ms."customerId" = h.customer_id AND ms."itemKey" = h.item_key
+        GROUP BY ms."customerId", ms."itemKey"
+    """, [h['customer_id'] for h in heads], [h['item_key'] for h in heads])
+    single_stack = {
+        (row['customer_id'], row['item_key']): row['stack_id'] for row in rows if row['stack_count'] == 1
+    }
+    for head in heads:
+        stack_id = single_stack.get((head['customer_id'], head['item_key']), '')
+        head['limit'], head['limit_source'] = limit_index.resolve(head['item_key'], head['customer_id'], stack_id)
+
+
+async def fetch_historical_exceedances(conn, targets: List[Dict[str, Any]]) -> Dict[str, HistoricalExceedance]:
+    """
+    보고서별 학습 기간 기준 초과 건수 (1회 집계)
+
+    Args:
+        targets: report_id, customer_id, item_key, period_start, period_end, data_count, limit
+    """
+    with_limit = [t for t in targets if t['limit']]
+    exceeded = {}
+    if with_limit:
+        rows = await conn.fetch("""
+            SELECT t.report_id, COUNT(DISTINCT m."measuredAt") as exceeded
+            FROM unnest($1::text[], $2::text[], $3::text[], $4::timestamp[], $5::timestamp[], $6::float8[])
+                AS t(report_id, customer_id, item_key, period_start, period_end, limit_value)
+            JOIN "Measurement" m
+              ON m."customerId" = t.customer_id
+             AND m."itemKey" = t.item_key
+             AND m."measuredAt" >= t.period_start
+             AND m."measuredAt" < t.period_end
+             AND m.value > t.limit_value
+            GROUP BY t.report_id
+        """,
+            [t['report_id'] for t in with_limit],
+            [t['customer_id'] for t in with_limit],
+            [t['item_key'] for t in with_limit],
+            [t['period_start'] for t in with_limit],
+            [t['period_end'] for t in with_limit],
+            [float(t['limit']) for t in with_limit]
+        )
+        exceeded = {row['report_id']: row['exceeded'] for row in rows}
+    return {
+        t['report_id']: HistoricalExceedance(
+            count=max(int(t['data_count']), 1),
+            exceeded=min(int(exceeded.get(t['report_id'], 0)), int(t['data_count'])),
+            limit=float(t['limit']) if t['limit'] else None
+        )
+        for t in targets
+    }
+
+
+def recalculate_report(
+    insight_report: Dict[str, Any],
+    predictions: List[Dict],
+    limit_value: Optional[float],
+    historical_exceedance: HistoricalExceedance,
+    chart_image: Optional[str] = None,
+    render: bool = False,
+    path_model: Optional[PathModel] = None
+) -> Dict[str, Any]:
+    """
+    저장된 보고서의 기준 관련 섹션 재계산 (새 보고서 dict 반환, 원본 변경 없음)
+    - prediction / risk / recommendations 재계산 (path_model 있으면 경로 시뮬레이션 초과 확률 포함)
+    - render=True 이면 저장된 나머지 섹션과 함께 보고서 HTML 재렌더링
+    """
+    generator = InsightGenerator()
+    summary = dict(insight_report['summary'])
+    summary['prediction'] = generator._analyze_predictions(predictions, limit_value)
+    summary['risk'] = generator._assess_risk(predictions, limit_value, None, historical_exceedance, path_model)
+
+    report = dict(insight_report)
+    report['summary'] = summary
+    report['recommendations'] = generator._generate_recommendations(summary['risk'], summary['trend'])
+    if render:
+        report['narrative'] = generator._generate_narrative(
+            insight_report['customer'],
+            insight_report['item'],
+            summary['historical'],
+            summary['prediction'],
+            summary['trend'],
+            summary['risk'],
+            summary.get('influence_factors') or [],
+            summary.get('correlation') or {},
+            summary.get('stack_contribution') or {},
+            insight_report.get('accuracy_metrics') or {},
+            chart_image
+        )
+    return report
+
+
+async def recalculate(
+    conn,
+    customer_id: Optional[str] = None,
+    item_key: Optional[str] = None,
+    report_id: Optional[str] = None,
+    limit_value: Optional[float] = None,
+    render: bool = False,
+    include_unchanged: bool = False
+) -> Dict[str, Any]:
+    """
+    기준 변경 반영 / 가정 기준 재계산
+
+    - limit_value 지정: 가정(what-if) 기준으로 대상 보고서 재계산
+    - 미지정: 현재 적용 기준(limit_index)과 보고서 저장 기준이 다른 보고서만 재계산
+      (include_unchanged=True 이면 전체)
+
+    Returns:
+        mode, evaluated, affected, results (report_id, 이전/새 기준, prediction, risk, recommendations, report)
+    """
+    mode = MODE_WHAT_IF if limit_value is not None else MODE_LIMIT_CHANGE
+    heads = await fetch_report_heads(conn, customer_id, item_key, report_id)
+    if not heads:
+        return {'mode': mode, 'evaluated': 0, 'affected': 0, 'results': []}
+
+    if mode == MODE_WHAT_IF:
+        for head in heads:
+            head['limit'], head['limit_source'] = limit_value, MODE_WHAT_IF
+        targets = heads
+    else:
+        await resolve_current_limits(conn, heads)
+        targets = [h for h in heads if include_unchanged or limits_differ(h['stored_limit'], h['limit'])]
+    if not targets:
+        return {'mode': mode, 'evaluated': len(heads), 'affected': 0, 'results': []}
+
+    rows = await conn.fetch("""
+        SELECT id, "reportData", "chartImage"
+        FROM "insight_reports"
+        WHERE id = ANY($1::text[])
+    """, [t['id'] for t in targets])
+    stored = {row['id']: row for row in rows}
+
+    prepared = []
+    for target in targets:
+        row = stored.get(target['id'])
+        if row is None:
+            continue
+        data = clean_float_values(json.loads(row['reportData']))
+        insight_report = data.get('insight_report') or {}
+        historical = (insight_report.get('summary') or {}).get('historical') or {}
+        if not data.get('predictions') or 'period' not in historical:
+            logger.warning(f"Report {target['id']} lacks stored predictions or history, skipping")
+            continue
+        period_start, period_end = parse_period(historical['period'])
+        prepared.append({
+            'report_id': target['id'],
+            'customer_id': target['customer_id'],
+            'item_key': target['item_key'],
+            'period_start': period_start,
+            'period_end': period_end,
+            'data_count': historical.get('data_count') or 0,
+            'limit': target['limit'],
+            'limit_source': target['limit_source'],
+            'previous_limit': target['stored_limit'],
+            'data': data,
+            'chart_image': row['chartImage']
+        })
+
+    exceedances = await fetch_historical_exceedances(conn, prepared)
+
+    results = []
+    for item in prepared:
+        data = item['data']
+        previous_risk = data['insight_report']['summary'].get('risk') or {}
+        report = recalculate_report(
+            data['insight_report'], data['predictions'], item['limit'],
+            exceedances[item['report_id']], item['chart_image'], render,
+            PathModel.from_dict(data.get('path_model'))
+        )
+        results.append({
+            'report_id': item['report_id'],
+            'customer_id': item['customer_id'],
+            'item_key': item['item_key'],
+            'previous_limit': item['previous_limit'],
+            'limit': item['limit'],
+            'limit_source': item['limit_source'],
+            'previous_risk': {'level': previous_risk.get('level'), 'score': previous_risk.get('score')},
+            'prediction': report['summary']['prediction'],
+            'risk': report['summary']['risk'],
+            'recommendations': report['recommendations'],
+            'report': report,
+            'report_data': data
+        })
+
+    logger.info(f"Limit recalculation ({mode}): {len(results)} of {len(heads)} reports recalculated")
+    return {'mode': mode, 'evaluated': len(heads), 'affected': len(results), 'results': results}
@@ -3,14 +3,17 @@ PMMS 환경 AutoML 예측 API 서버
 - Auto-ARIMA 기반 시계열 예측
 - PostgreSQL 연동
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
 from pydantic import BaseModel
 import asyncpg
+import asyncio
 from typing import Optional, List, Dict
+from datetime import datetime
 import logging
 import base64
+import json
 import os
 from dotenv import load_dotenv
 
@@ -50,9 +53,61 @@ logger.info(f"Database URL: {DATABASE_URL}")
 # Connection pool
 db_pool: Optional[asyncpg.Pool] = None
 
+# 이상치 검증 기준선 증분 갱신 주기 (초, 0이면 비활성)
+BASELINE_REFRESH_SECONDS = int(os.getenv('BASELINE_REFRESH_SECONDS', '600'))
+baseline_refresh_task: Optional[asyncio.Task] = None
+
+# 전체 위험도 스캔 재산정 주기 (초, 0이면 비활성)
+RISK_SCAN_REFRESH_SECONDS = int(os.getenv('RISK_SCAN_REFRESH_SECONDS', '3600'))
+risk_scan_task: Optional[asyncio.Task] = None
+
+# 전역 예측 모델 재학습 주기 (초, 0이면 비활성)
+GLOBAL_FORECAST_RETRAIN_SECONDS = int(os.getenv('GLOBAL_FORECAST_RETRAIN_SECONDS', '86400'))
+global_forecast_task: Optional[asyncio.Task] = None
+
+# 배출허용기준 변경 알림(LISTEN) 전용 연결 (풀 밖에서 유지)
+limit_listen_conn: Optional[asyncpg.Connection] = None
+
+async def refresh_baselines_periodically():
+    """측정 데이터가 바뀐 (굴뚝, 항목) 기준선을 주기적으로 재계산"""
+    from robust_baselines import baseline_store
+    
+    while True:
+        await asyncio.sleep(BASELINE_REFRESH_SECONDS)
+        try:
+            async with db_pool.acquire() as conn:
+                await baseline_store.refresh(conn)
+        except Exception as e:
+            logger.warning(f"Periodic baseline refresh failed: {e}")
+
+async def refresh_risk_scan_periodically():
+    """최신 예측/기준으로 전체 위험도 스캔 주기적 재산정"""
+    from risk_scan import run_scan
+    
+    while True:
+        await asyncio.sleep(RISK_SCAN_REFRESH_SECONDS)
+        try:
+            async with db_pool.acquire() as conn:
+                await run_scan(conn)
+        except Exception as e:
+            logger.warning(f"Periodic risk scan failed: {e}")
+
+async def retrain_global_forecast_periodically():
+    """전역 예측 모델 재학습 + 일부 시계열 Auto-ARIMA 정확도 비교 누적"""
+    from global_forecast import global_forecast_store
+    
+    while True:
+        await asyncio.sleep(GLOBAL_FORECAST_RETRAIN_SECONDS)
+        try:
+            async with db_pool.acquire() as conn:
+                await global_forecast_store.train(conn)
+                await global_forecast_store.compare(conn)
+        except Exception as e:
+            logger.warning(f"Periodic global forecast retrain failed: {e}")
+
 @app.on_event("startup")
 async def startup():
-    global db_pool
+    global db_pool, baseline_refresh_task, risk_scan_task, global_forecast_task, limit_listen_conn
     try:
         db_pool = await asyncpg.create_pool(
             DATABASE_URL,
@@ -64,10 +119,37 @@ async def startup():
     except Exception as e:
         logger.error(f"Failed to create database pool: {e}")
         raise
+    
+    if BASELINE_REFRESH_SECONDS > 0:
+        baseline_refresh_task = asyncio.create_task(refresh_baselines_periodically())
+    if RISK_SCAN_REFRESH_SECONDS > 0:
+        risk_scan_task = asyncio.create_task(refresh_risk_scan_periodically())
+    if GLOBAL_FORECAST_RETRAIN_SECONDS > 0:
+        global_forecast_task = asyncio.create_task(retrain_global_forecast_periodically())
+    
+    # 배출허용기준 인덱스 적재 + 변경 알림 구독 (실패 시 조회 시점 TTL 재적재로 대체)
+    from emission_limits import limit_index
+    try:
+        async with db_pool.acquire() as conn:
+            await limit_index.load(conn)
+        limit_listen_conn = await asyncpg.connect(DATABASE_URL)
+        await limit_index.listen(limit_listen_conn, db_pool)
+    except Exception as e:
+        logger.warning(f"Emission limit index unavailable at startup: {e}")
 
 @app.on_event("shutdown")
 async def shutdown():
     global db_pool
+    if baseline_refresh_task:
+        baseline_refresh_task.cancel()
+    if risk_scan_task:
+        risk_scan_task.cancel()
+    if global_forecast_task:
+        global_forecast_task.cancel()
+    if limit_listen_conn:
+        await limit_listen_conn.close()
+    from hierarchical_forecast import shutdown_executor
+    shutdown_executor()
     if db_pool:
         await db_pool.close()
         logger.info("Database connection pool closed")
@@ -83,6 +165,50 @@ class PredictionRequest(BaseModel):
     chart_image: str = None
     user_id: str = None
     value: float = None
+    measured_at: datetime = None
+
+class ValidationEntry(BaseModel):
+    stack: str = None
+    item_key: str
+    value: float = None
+    customer_id: str = None
+    measured_at: datetime = None
+
+class BatchValidationRequest(BaseModel):
+    customer_id: str = None
+    entries: List[ValidationEntry] = []
+    temp_ids: List[str] = []  # MeasurementTemp.tempId 또는 id
+
+class StackForecastRequest(BaseModel):
+    customer_id: str
+    item_key: str
+    periods: int = 30
+    stack_id: str = None  # 지정 시 해당 굴뚝만 재학습
+    stack: str = None  # 굴뚝 이름/현장명/코드 (stack_id 대신 사용 가능)
+    use_top: bool = True  # 고객사 전체 기준 예측으로 WLS 조정 (False 면 bottom-up)
+
+class StackItemsForecastRequest(BaseModel):
+    customer_id: str
+    stack_id: str = None
+    stack: str = None  # 굴뚝 이름/현장명/코드 (stack_id 대신 사용 가능)
+    item_keys: List[str] = None  # 미지정 시 굴뚝의 활성 측정 항목 전체
+    periods: int = 30
+
+class GlobalForecastRequest(BaseModel):
+    customer_id: str
+    item_key: str
+    periods: int = 30
+    stack_id: str = None  # 지정 시 굴뚝 시계열, 미지정 시 고객사 전체 시계열
+    stack: str = None  # 굴뚝 이름/현장명/코드 (stack_id 대신 사용 가능)
+
+class LimitRecalcRequest(BaseModel):
+    customer_id: str = None
+    item_key: str = None
+    report_id: str = None
+    limit_value: float = None  # 가정(what-if) 기준, 미지정 시 현재 적용 기준
+    render: bool = False  # 보고서 HTML 재렌더링
+    persist: bool = False  # 보고서 갱신 저장 (HTML/PDF 재렌더링 포함, 현재 기준만 가능)
+    include_unchanged: bool = False
 
 class PredictionResponse(BaseModel):
     predictions: List[Dict]
@@ -90,6 +216,39 @@ class PredictionResponse(BaseModel):
     training_samples: int
     accuracy_metrics: Optional[Dict] = None
 
+def build_report_summary(report: Dict) -> Dict:
+    """
+    인사이트 보고서 목록용 경량 요약 생성
+    - insight_reports.summary 컬럼에 저장되어 목록 조회 시 reportData/PDF 로딩을 피함
+    """
+    summary = report.get('summary', {})
+    risk = summary.get('risk', {})
+    trend = summary.get('trend', {})
+    
+    return {
+        'risk_level': risk.get('level'),
+        'risk_score': risk.get('score'),
+        'trend': trend.get('trend'),
+        'change_rate': trend.get('change_rate'),
+        'historical_period': summary.get('historical', {}).get('period'),
+        'prediction_period': summary.get('prediction', {}).get('period'),
+        'exceed_probability': summary.get('prediction', {}).get('exceed_probability')
+    }
+
+def encode_report_cursor(created_at: datetime, report_id: str) -> str:
+    """키셋 페이지네이션 커서 인코딩 (createdAt, id)"""
+    raw = f"{created_at.isoformat()}|{report_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('utf-8')
+
+def decode_report_cursor(cursor: str):
+    """키셋 페이지네이션 커서 디코딩"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('utf-8')).decode('utf-8')
+        created_at, report_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), report_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="잘못된 커서 값입니다.")
+
 @app.get("/")
 async def root():
     return {
@@ -133,6 +292,7 @@ async def predict(request: PredictionRequest):
     - Auto-ARIMA 자동 학습
     - Optuna 하이퍼파라미터 최적화
     - 30일 예측
+    - 새 측정이 있어도 이전 예측 잔차가 작고 모델이 최대 수명 이내면 재학습 없이 재사용 (retrain_policy)
     """
     global db_pool
     
@@ -141,8 +301,12 @@ async def predict(request: PredictionRequest):
     
     try:
         from automl_engine import PmmsAutoMLPredictor
-        import json
-        import math
+        from forecast_store import forecast_store
+        from hierarchical_forecast import TOP_NODE
+        from retrain_policy import evaluate, retrain_decision_store
+        from tuning_store import tuning_store
+        
+        tuning_key = (request.customer_id, TOP_NODE, request.item_key)
         
         # PostgreSQL에서 학습 데이터 가져오기
         async with db_pool.acquire() as conn:
@@ -157,39 +321,12 @@ async def predict(request: PredictionRequest):
             
             latest_measurement_time = latest_measurement['latest_time'] if latest_measurement else None
             
-            # 캐시 확인: 최신 측정 데이터 이후 생성된 예측이 있으면 재사용
-            if latest_measurement_time:
-                try:
-                    cached_prediction = await conn.fetchrow("""
-                        SELECT "predictionData", "createdAt"
-                        FROM "predictions"
-                        WHERE "customerId" = $1
-                          AND "itemKey" = $2
-                          AND periods = $3
-                          AND "createdAt" > $4
-                        ORDER BY "createdAt" DESC
-                        LIMIT 1
-                    """, request.customer_id, request.item_key, request.periods, latest_measurement_time)
-                    
-                    if cached_prediction:
-                        logger.info(f"Using cached prediction for {request.customer_id}/{request.item_key}")
-                        prediction_data = json.loads(cached_prediction['predictionData'])
-                        
-                        # NaN/Infinity 값 정리
-                        def clean_float_values(obj):
-                            if isinstance(obj, dict):
-                                return {k: clean_float_values(v) for k, v in obj.items()}
-                            elif isinstance(obj, list):
-                                return [clean_float_values(item) for item in obj]
-                            elif isinstance(obj, float):
-                                if math.isnan(obj) or math.isinf(obj):
-                                    return None
-                                return obj
-                            return obj
-                        
-                        return clean_float_values(prediction_data)
-                except Exception as cache_error:
-                    logger.warning(f"Prediction cache lookup failed (table may not exist): {cache_error}")
+            # 캐시 확인: 최신 측정 데이터 이후 생성된 예측이 있으면 재사용 (인사이트 보고서와 공유)
+            artifact = await forecast_store.get(
+                conn, request.customer_id, request.item_key, request.periods, latest_measurement_time
+            )
+            if artifact:
+                return forecast_store.to_response(artifact)
             
             # 고객사 전체 굴뚝 데이터를 사용하여 충분한 학습 데이터 확보
             query = """
@@ -201,6 +338,10 @@ async def predict(request: PredictionRequest):
                     m."windSpeedMs" as wind_speed,
                     m."gasTempC" as gas_temp,
                     m."oxygenMeasuredPct" as o2_measured,
+                    m."pressureMmHg" as pressure,
+                    m."gasVelocityMs" as gas_velocity,
+                    m."moisturePct" as moisture,
+                    m."flowSm3Min" as flow,
                     m."stackId" as stack_id,
                     s.name as stack_name
                 FROM "Measurement" m
@@ -214,6 +355,24 @@ async def predict(request: PredictionRequest):
             rows = await conn.fetch(query, request.customer_id, request.item_key)
             
             logger.info(f"Found {len(rows)} measurements for customer {request.customer_id}, item {request.item_key}")
+            
+            # 재학습 판단: 이전 예측 이후 새 측정의 잔차/모델 수명
+            previous = await forecast_store.latest(conn, request.customer_id, request.item_key, request.periods)
+            trained_until = previous['trained_until'] if previous else None
+            decision = evaluate(
+                previous,
+                previous['created_at'] if previous else None,
+                [row for row in rows if trained_until is None or row['measured_at'] > trained_until]
+            )
+            await retrain_decision_store.record(conn, request.periods, {tuning_key: decision})
+            retrain_decision = {
+                key: decision[key] for key in ('retrain', 'reason', 'rolling_error', 'residual_count')
+            }
+            if not decision['retrain']:
+                artifact = forecast_store.adopt(
+                    request.customer_id, request.item_key, request.periods, previous, latest_measurement_time
+                )
+                return {**forecast_store.to_response(artifact), 'retrain_decision': retrain_decision}
         
         if len(rows) < 10:
             raise HTTPException(
@@ -221,38 +380,28 @@ async def predict(request: PredictionRequest):
                 detail=f"학습 데이터가 부족합니다. (최소 10개 필요, 현재 {len(rows)}개)"
             )
         
+        # 이전 하이퍼파라미터 탐색 결과 (warm start), 신규 시계열은 유사 시계열 최적값
+        async with db_pool.acquire() as conn:
+            tuning_history = await tuning_store.get_or_seed(conn, tuning_key, rows)
+        
         # AutoML 예측 수행
         predictor = PmmsAutoMLPredictor()
         result = await predictor.predict(
             data=rows,
-            periods=request.periods
+            periods=request.periods,
+            tuning_history=tuning_history
         )
         
-        response_data = {
-            'predictions': result['predictions'],
-            'model_info': result['model_info'],
-            'training_samples': len(rows),
-            'accuracy_metrics': result.get('metrics'),
-            'historical_avg': result.get('historical_avg')
-        }
+        # 예측 결과 저장 (메모리 + DB, 인사이트 보고서에서 재사용)
+        async with db_pool.acquire() as conn:
+            artifact = await forecast_store.put(
+                conn, request.customer_id, request.item_key, request.periods,
+                latest_measurement_time, result, predictor.training_data, len(rows)
+            )
+            await tuning_store.save(conn, {tuning_key: result['tuning']})
         
-        # DB에 예측 결과 저장 (캐싱용)
-        try:
-            async with db_pool.acquire() as conn:
-                await conn.execute("""
-                    INSERT INTO "predictions" 
-                    (id, "customerId", "itemKey", periods, "predictionData", "createdAt")
-                    VALUES ($1, $2, $3, $4, $5, NOW())
-                """, 
-                    base64.b64encode(os.urandom(12)).decode('utf-8'),
-                    request.customer_id,
-                    request.item_key,
-                    request.periods,
-                    json.dumps(response_data)
-                )
-                logger.info("Prediction saved to database for caching")
-        except Exception as save_error:
-            logger.warning(f"Failed to save prediction: {save_error}")
+        response_data = forecast_store.to_response(artifact)
+        response_data['retrain_decision'] = retrain_decision
         
         return response_data
         
@@ -262,6 +411,209 @@ async def predict(request: PredictionRequest):
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/predict/stacks")
+async def predict_stacks(request: StackForecastRequest):
+    """
+    굴뚝별 예측 + 고객사 단위 계층 조정
+    - 굴뚝마다 자체 시계열로 병렬 학습, 고객사 값 = 굴뚝 측정 건수 가중 평균이 되도록 조정
+    - 새 측정 잔차가 커졌거나 오래된 굴뚝만 재학습 (stack_id/stack 지정 시 해당 굴뚝은 항상)
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    try:
+        from hierarchical_forecast import stack_forecast_store
+        
+        async with db_pool.acquire() as conn:
+            stack_id = request.stack_id
+            if stack_id is None and request.stack:
+                stack_row = await conn.fetchrow("""
+                    SELECT id FROM "Stack"
+                    WHERE "customerId" = $1
+                      AND (name = $2 OR "siteName" = $2 OR code = $2)
+                    LIMIT 1
+                """, request.customer_id, request.stack)
+                if not stack_row:
+                    raise HTTPException(status_code=404, detail=f"굴뚝을 찾을 수 없습니다: {request.stack}")
+                stack_id = stack_row['id']
+            
+            return await stack_forecast_store.forecast(
+                conn, request.customer_id, request.item_key, request.periods,
+                stack_id=stack_id, use_top=request.use_top
+            )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Stack forecast error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/predict/stack-items")
+async def predict_stack_items(request: StackItemsForecastRequest):
+    """
+    굴뚝 측정 항목 동시 예측 (VAR 1회 학습으로 전체 항목 예측)
+    - 항목 간 상관관계를 함께 학습, 항목별 AutoML 반복 학습 없음
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    if not request.stack_id and not request.stack:
+        raise HTTPException(status_code=400, detail="stack_id 또는 stack 이 필요합니다.")
+    
+    try:
+        from joint_forecast import forecast_stack_items
+        
+        async with db_pool.acquire() as conn:
+            stack_row = await conn.fetchrow("""
+                SELECT id FROM "Stack"
+                WHERE "customerId" = $1
+                  AND (id = $2 OR name = $3 OR "siteName" = $3 OR code = $3)
+                LIMIT 1
+            """, request.customer_id, request.stack_id, request.stack)
+            if not stack_row:
+                raise HTTPException(status_code=404, detail=f"굴뚝을 찾을 수 없습니다: {request.stack_id or request.stack}")
+            
+            return await forecast_stack_items(conn, stack_row['id'], request.periods, request.item_keys)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Stack items forecast error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/predict/global")
+async def predict_global(request: GlobalForecastRequest):
+    """
+    전역 모델 예측 (전체 시계열 공동 학습 모델, 시계열별 학습 없음)
+    - /api/predict (Auto-ARIMA) 의 빠른 대안, 모델은 주기적으로 재학습
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    if not 1 <= request.periods <= 365:
+        raise HTTPException(status_code=400, detail="periods 는 1~365 범위여야 합니다.")
+    
+    try:
+        from global_forecast import global_forecast_store
+        
+        async with db_pool.acquire() as conn:
+            stack_id = request.stack_id
+            if stack_id is None and request.stack:
+                stack_row = await conn.fetchrow("""
+                    SELECT id FROM "Stack"
+                    WHERE "customerId" = $1
+                      AND (name = $2 OR "siteName" = $2 OR code = $2)
+                    LIMIT 1
+                """, request.customer_id, request.stack)
+                if not stack_row:
+                    raise HTTPException(status_code=404, detail=f"굴뚝을 찾을 수 없습니다: {request.stack}")
+                stack_id = stack_row['id']
+            
+            return await global_forecast_store.forecast(
+                conn, request.customer_id, request.item_key, request.periods, stack_id
+            )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Global forecast error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/forecast/global/train")
+async def train_global_forecast():
+    """전역 예측 모델 즉시 재학습 (전체 굴뚝/고객사 시계열, holdout 정확도 갱신)"""
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    try:
+        from global_forecast import global_forecast_store
+        
+        async with db_pool.acquire() as conn:
+            return await global_forecast_store.train(conn)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Global forecast training error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/forecast/global/compare")
+async def compare_global_forecast(
+    customer_id: Optional[str] = None,
+    item_key: Optional[str] = None,
+    limit: int = 5
+):
+    """
+    전역 모델 vs Auto-ARIMA 정확도 비교 (같은 holdout)
+    - 비교가 오래된 시계열부터 limit 개, ARIMA 는 holdout 이전 데이터로 학습
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    if not 1 <= limit <= 50:
+        raise HTTPException(status_code=400, detail="limit 은 1~50 범위여야 합니다.")
+    
+    try:
+        from global_forecast import global_forecast_store
+        
+        async with db_pool.acquire() as conn:
+            return {'results': await global_forecast_store.compare(conn, customer_id, item_key, limit)}
+    except Exception as e:
+        logger.error(f"Global forecast comparison error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/forecast/global/evaluations")
+async def get_global_forecast_evaluations(
+    customer_id: Optional[str] = None,
+    item_key: Optional[str] = None,
+    compared_only: bool = False
+):
+    """시계열별 holdout 정확도 (전역 모델 / Auto-ARIMA) + 요약"""
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    try:
+        from global_forecast import global_forecast_store
+        
+        async with db_pool.acquire() as conn:
+            await global_forecast_store.ensure_loaded(conn)
+            return await global_forecast_store.evaluations(conn, customer_id, item_key, compared_only)
+    except Exception as e:
+        logger.error(f"Global forecast evaluation query error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/forecast/retrain-decisions")
+async def get_retrain_decisions(
+    customer_id: Optional[str] = None,
+    item_key: Optional[str] = None,
+    limit: int = 100
+):
+    """재학습 판단 이력 (사유, rolling error) + 요약"""
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    try:
+        from retrain_policy import retrain_decision_store
+        
+        async with db_pool.acquire() as conn:
+            return await retrain_decision_store.history(conn, customer_id, item_key, limit)
+    except Exception as e:
+        logger.error(f"Retrain decision query error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/predict/insight")
 async def generate_insight_report(request: PredictionRequest):
     """
@@ -275,7 +627,7 @@ async def generate_insight_report(request: PredictionRequest):
     try:
         from automl_engine import PmmsAutoMLPredictor
         from insight_generator import InsightGenerator
-        from datetime import datetime, timedelta
+        from forecast_store import forecast_store
         
         async with db_pool.acquire() as conn:
             # 최신 측정 데이터 시간 조회
@@ -329,6 +681,7 @@ async def generate_insight_report(request: PredictionRequest):
                                 return obj
                             
                             logger.info(f"Using cached insight report (ID: {cached_report['id']})")
+                            full_response.pop('path_model', None)
                             return clean_float_values(full_response)
                     except Exception as cache_error:
                         logger.warning(f"Failed to load cached report: {cache_error}, regenerating...")
@@ -348,7 +701,11 @@ async def generate_insight_report(request: PredictionRequest):
                     m."humidityPct" as humidity,
                     m."windSpeedMs" as wind_speed,
                     m."gasTempC" as gas_temp,
-                    m."oxygenMeasuredPct" as o2_measured
+                    m."oxygenMeasuredPct" as o2_measured,
+                    m."pressureMmHg" as pressure,
+                    m."gasVelocityMs" as gas_velocity,
+                    m."moisturePct" as moisture,
+                    m."flowSm3Min" as flow
                 FROM "Measurement" m
                 LEFT JOIN "Stack" s ON m."stackId" = s.id
                 WHERE m."customerId" = $1
@@ -366,13 +723,20 @@ async def generate_insight_report(request: PredictionRequest):
             )
             customer_name = customer_row['name'] if customer_row else "Unknown"
             
-            # 항목 이름 및 허용기준 조회
+            # 항목 이름 조회
             item_row = await conn.fetchrow(
-                'SELECT name, "limit" FROM "Item" WHERE key = $1',
+                'SELECT name FROM "Item" WHERE key = $1',
                 request.item_key
             )
             item_name = item_row['name'] if item_row else "Unknown"
-            limit_value = item_row['limit'] if item_row else None
+            
+            # 허용기준: 굴뚝 1개면 굴뚝별 기준까지, 여러 굴뚝이면 고객사 기준부터 적용
+            from emission_limits import limit_index
+            await limit_index.ensure_loaded(conn)
+            report_stacks = {row['stack_id'] for row in rows}
+            report_stack_id = report_stacks.pop() if len(report_stacks) == 1 else ''
+            limit_value, limit_source = limit_index.resolve(request.item_key, request.customer_id, report_stack_id)
+            logger.info(f"Insight limit for {request.item_key}: {limit_value} ({limit_source})")
         
         if len(rows) < 10:
             raise HTTPException(
@@ -380,72 +744,88 @@ async def generate_insight_report(request: PredictionRequest):
                 detail=f"학습 데이터가 부족합니다. (최소 10개 필요, 현재 {len(rows)}개)"
             )
         
-        # AutoML 예측 수행
-        predictor = PmmsAutoMLPredictor()
-        result = await predictor.predict(data=rows, periods=request.periods)
+        # 예측 결과 재사용: /api/predict 로 이미 학습된 결과가 있으면 재학습 생략
+        async with db_pool.acquire() as conn:
+            artifact = await forecast_store.get(
+                conn, request.customer_id, request.item_key, request.periods, latest_measurement_time
+            )
+        
+        if artifact:
+            if artifact['training_data'] is None:
+                # DB에서 복원된 예측: 학습 데이터 전처리만 수행 (모델 학습 없음)
+                artifact['training_data'] = PmmsAutoMLPredictor().prepare_training_data(rows)
+        else:
+            # AutoML 예측 수행 (이전 탐색 결과로 warm start, 신규 시계열은 유사 시계열 최적값)
+            from hierarchical_forecast import TOP_NODE
+            from tuning_store import tuning_store
+            
+            tuning_key = (request.customer_id, TOP_NODE, request.item_key)
+            async with db_pool.acquire() as conn:
+                tuning_history = await tuning_store.get_or_seed(conn, tuning_key, rows)
+            
+            predictor = PmmsAutoMLPredictor()
+            result = await predictor.predict(data=rows, periods=request.periods, tuning_history=tuning_history)
+            
+            async with db_pool.acquire() as conn:
+                artifact = await forecast_store.put(
+                    conn, request.customer_id, request.item_key, request.periods,
+                    latest_measurement_time, result, predictor.training_data, len(rows)
+                )
+                await tuning_store.save(conn, {tuning_key: result['tuning']})
+        
+        result = {
+            'predictions': artifact['predictions'],
+            'model_info': artifact['model_info'],
+            'metrics': artifact['metrics']
+        }
+        
+        # 환경변수 상관관계 누적 통계 (변경된 굴뚝만 증분 반영)
+        correlation_stats = None
+        try:
+            from comoment_store import comoment_store
+            async with db_pool.acquire() as conn:
+                correlation_stats = await comoment_store.get(conn, request.customer_id, request.item_key)
+        except Exception as comoment_error:
+            logger.warning(f"Comoment store unavailable, computing correlations from training data: {comoment_error}")
+        
+        # 전체 측정 이력 분위수 스케치 (굴뚝별 스케치 병합)
+        quantile_sketch = None
+        try:
+            from quantile_sketch import quantile_sketch_store
+            async with db_pool.acquire() as conn:
+                quantile_sketch = await quantile_sketch_store.get(conn, request.customer_id, request.item_key)
+        except Exception as sketch_error:
+            logger.warning(f"Quantile sketch store unavailable, skipping long-term percentiles: {sketch_error}")
+        
+        # 예측 경로 분포 (Monte Carlo 기준 초과 확률, 이전 형식 예측은 없음)
+        from exceedance_simulation import PathModel
+        path_model = PathModel.from_dict(artifact.get('path_model'))
         
         # 인사이트 보고서 생성
         insight_gen = InsightGenerator()
         report = insight_gen.generate_report(
             predictions=result['predictions'],
-            historical_data=predictor.training_data,
+            historical_data=artifact['training_data'],
             raw_data=rows,
             model_info=result['model_info'],
-            accuracy_metrics=result.get('metrics', {}),
+            accuracy_metrics=result.get('metrics') or {},
             customer_name=customer_name,
             item_name=item_name,
             limit_value=limit_value,
-            chart_image=request.chart_image
+            chart_image=request.chart_image,
+            forecast_id=artifact['forecast_id'],
+            correlation_stats=correlation_stats,
+            quantile_sketch=quantile_sketch,
+            path_model=path_model,
+            customer_id=request.customer_id,
+            item_key=request.item_key
         )
         
         # PDF 생성 (Playwright)
         try:
             logger.info("Starting PDF generation...")
-            from playwright.async_api import async_playwright
-            
-            async with async_playwright() as p:
-                logger.info("Launching browser...")
-                browser = await p.chromium.launch()
-                page = await browser.new_page()
-                
-                html_with_style = f"""
-                <!DOCTYPE html>
-                <html>
-                <head>
-                    <meta charset="utf-8">
-                    <style>
-                        @page {{
-                            margin: 25mm 20mm;
-                            size: A4;
-                        }}
-                        body {{
-                            font-family: 'Malgun Gothic', 'Noto Sans KR', sans-serif;
-                            margin: 0;
-                            padding: 0;
-                        }}
-                    </style>
-                </head>
-                <body>
-                    {report['narrative']}
-                </body>
-                </html>
-                """
-                
-                await page.set_content(html_with_style)
-                pdf_bytes = await page.pdf(
-                    format='A4',
-                    margin={'top': '25mm', 'right': '20mm', 'bottom': '25mm', 'left': '20mm'},
-                    print_background=True
-                )
-                
-                await browser.close()
-                logger.info(f"PDF generated: {len(pdf_bytes)} bytes")
-                
-                pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-                
-                if not pdf_base64 or len(pdf_base64) < 100:
-                    raise ValueError("PDF generation failed: Empty or invalid PDF data")
-                    
+            from report_pdf import render_pdf
+            pdf_base64, pdf_optimization = await render_pdf(report['narrative'])
         except Exception as pdf_error:
             logger.error(f"PDF generation error: {pdf_error}", exc_info=True)
             raise HTTPException(
@@ -473,19 +853,21 @@ async def generate_insight_report(request: PredictionRequest):
             "training_samples": len(rows),
             "accuracy_metrics": result.get('metrics'),
             "insight_report": report,
-            "pdf_base64": pdf_base64
+            "pdf_base64": pdf_base64,
+            "pdf_optimization": pdf_optimization
         }
         
         # DB에 인사이트 보고서 저장 (전체 응답 구조 저장)
         try:
             import json
-            cleaned_response = sanitize_for_json(response_data)
+            # 경로 분포는 기준 변경 재계산용으로 저장만 함 (응답 제외)
+            cleaned_response = sanitize_for_json({**response_data, "path_model": artifact.get('path_model')})
             
             async with db_pool.acquire() as conn:
                 await conn.execute("""
                     INSERT INTO "insight_reports" 
-                    (id, "customerId", "itemKey", "itemName", periods, "reportData", "chartImage", "pdfBase64", "createdBy", "createdAt")
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, NOW())
+                    (id, "customerId", "itemKey", "itemName", periods, "reportData", summary, "chartImage", "pdfBase64", "createdBy", "createdAt")
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, NOW())
                 """, 
                     base64.b64encode(os.urandom(12)).decode('utf-8'),
                     request.customer_id,
@@ -493,6 +875,7 @@ async def generate_insight_report(request: PredictionRequest):
                     request.item_name or item_name,
                     request.periods,
                     json.dumps(cleaned_response),  # 전체 응답 저장
+                    json.dumps(sanitize_for_json(build_report_summary(report))),  # 목록용 요약
                     request.chart_image,
                     pdf_base64,
                     request.user_id or 'system'
@@ -510,25 +893,327 @@ async def generate_insight_report(request: PredictionRequest):
         logger.error(f"Insight generation error: {e}\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/insight/limit-recalc")
+async def recalculate_insight_limits(request: LimitRecalcRequest):
+    """
+    배출허용기준 변경/가정 시 인사이트 보고서 기준 섹션 재계산 (재학습 없음)
+    - limit_value 지정: 가정 기준으로 예측 분석/위험도 재계산 (저장 안 함)
+    - 미지정: 현재 적용 기준과 저장 기준이 다른 최신 보고서 일괄 재계산
+    - persist=true: 재계산된 섹션으로 보고서 HTML/PDF 재렌더링 후 저장
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    if request.limit_value is not None:
+        if request.persist:
+            raise HTTPException(status_code=400, detail="가정 기준(limit_value)은 저장할 수 없습니다.")
+        if not request.report_id and not (request.customer_id and request.item_key):
+            raise HTTPException(status_code=400, detail="가정 기준은 report_id 또는 customer_id + item_key 가 필요합니다.")
+    
+    try:
+        from limit_recalc import recalculate
+        from forecast_store import clean_float_values
+        
+        async with db_pool.acquire() as conn:
+            outcome = await recalculate(
+                conn,
+                customer_id=request.customer_id,
+                item_key=request.item_key,
+                report_id=request.report_id,
+                limit_value=request.limit_value,
+                render=request.render or request.persist,
+                include_unchanged=request.include_unchanged
+            )
+        
+        results = outcome['results']
+        if request.persist and results:
+            from report_pdf import render_pdfs
+            
+            pdfs = await render_pdfs([r['report']['narrative'] for r in results])
+            async with db_pool.acquire() as conn:
+                async with conn.transaction():
+                    for r, (pdf_base64, pdf_optimization) in zip(results, pdfs):
+                        report_data = dict(r['report_data'], insight_report=r['report'])
+                        report_data['pdf_base64'] = pdf_base64
+                        report_data['pdf_optimization'] = pdf_optimization
+                        await conn.execute("""
+                            UPDATE "insight_reports"
+                            SET "reportData" = $2, summary = $3, "pdfBase64" = $4
+                            WHERE id = $1
+                        """,
+                            r['report_id'],
+                            json.dumps(clean_float_values(report_data)),
+                            json.dumps(clean_float_values(build_report_summary(r['report']))),
+                            pdf_base64
+                        )
+            logger.info(f"Updated {len(results)} insight reports for new limits")
+        
+        for r in results:
+            r.pop('report_data')
+            report = r.pop('report')
+            if request.render:
+                r['narrative'] = report['narrative']
+        
+        return clean_float_values({**outcome, 'persisted': bool(request.persist and results)})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Limit recalculation error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/insight/cache-stats")
+async def insight_cache_stats():
+    """인사이트 분석 섹션 캐시 적중률 조회"""
+    from section_cache import section_cache
+    return section_cache.stats()
+
+@app.get("/api/insight/correlations")
+async def get_correlations(customer_id: str, item_key: str, stack_id: Optional[str] = None):
+    """
+    환경변수 상관관계 / 고농도 구간 대비 조회
+    - 굴뚝별 누적 공모멘트를 병합하여 응답 (신규 측정분만 증분 반영, 전체 이력 재조회 없음)
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    try:
+        from comoment_store import comoment_store
+        from insight_generator import InsightGenerator
+        from forecast_store import clean_float_values
+        
+        async with db_pool.acquire() as conn:
+            accumulator = await comoment_store.get(
+                conn, customer_id, item_key, [stack_id] if stack_id else None
+            )
+        
+        if accumulator.row_count == 0:
+            raise HTTPException(status_code=404, detail="측정 데이터가 없습니다.")
+        
+        return {
+            "customer_id": customer_id,
+            "item_key": item_key,
+            "stack_id": stack_id,
+            "row_count": accumulator.row_count,
+            "correlation": clean_float_values(InsightGenerator()._correlation_from_accumulator(accumulator))
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Correlation lookup error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/quantiles")
+async def get_quantiles(
+    customer_id: str,
+    item_key: str,
+    stack_id: Optional[str] = None,
+    q: str = "0.1,0.5,0.9,0.99"
+):
+    """
+    측정값 분위수 근사 조회 (굴뚝별 t-digest 스케치)
+    - 신규 측정분만 증분 반영, 전체 이력 재조회/정렬 없음
+    - 굴뚝별 분위수와 병합된 고객사 전체 분위수 응답
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    try:
+        levels = [float(level) for level in q.split(',') if level.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="q는 0~1 사이 숫자 목록이어야 합니다.")
+    if not levels or any(level < 0 or level > 1 for level in levels):
+        raise HTTPException(status_code=400, detail="q는 0~1 사이 숫자 목록이어야 합니다.")
+    
+    try:
+        from quantile_sketch import quantile_sketch_store, merge_sketches
+        
+        async with db_pool.acquire() as conn:
+            stacks = await quantile_sketch_store.get_stacks(
+                conn, customer_id, item_key, [stack_id] if stack_id else None
+            )
+        
+        merged = merge_sketches(list(stacks.values()))
+        if merged.count == 0:
+            raise HTTPException(status_code=404, detail="측정 데이터가 없습니다.")
+        
+        def describe(sketch):
+            return {
+                "count": sketch.count,
+                "min": sketch.min,
+                "max": sketch.max,
+                "quantiles": {str(level): round(float(value), 4) for level, value in zip(levels, sketch.quantile(levels))}
+            }
+        
+        return {
+            "customer_id": customer_id,
+            "item_key": item_key,
+            "stack_id": stack_id,
+            "total": describe(merged),
+            "stacks": {sid: describe(sketch) for sid, sketch in stacks.items() if sketch.count > 0}
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Quantile lookup error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/insight-reports")
+async def list_insight_reports(
+    customer_id: str,
+    item_key: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None
+):
+    """
+    인사이트 보고서 목록 조회 (키셋 페이지네이션)
+    - (customerId, itemKey, createdAt) 인덱스 사용
+    - summary 컬럼의 경량 요약만 반환 (reportData, chartImage, pdfBase64 미로딩)
+    - PDF/상세 데이터는 /api/insight-reports/{id}/pdf, /api/insight-reports/{id} 로 별도 조회
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    limit = max(1, min(limit, 100))
+    
+    conditions = ['"customerId" = $1']
+    params = [customer_id]
+    
+    if item_key:
+        params.append(item_key)
+        conditions.append(f'"itemKey" = ${len(params)}')
+    
+    if cursor:
+        cursor_created_at, cursor_id = decode_report_cursor(cursor)
+        params.extend([cursor_created_at, cursor_id])
+        created_idx, id_idx = len(params) - 1, len(params)
+        # ("createdAt", id) < (cursor) - createdAt 범위 조건을 분리해 인덱스 범위 스캔 유도
+        conditions.append(
+            f'"createdAt" <= ${created_idx} AND ("createdAt" < ${created_idx} OR id < ${id_idx})'
+        )
+    
+    params.append(limit + 1)
+    query = f"""
+        SELECT id, "customerId", "itemKey", "itemName", periods, summary,
+               "createdAt", "createdBy", "sharedAt", "viewedAt"
+        FROM "insight_reports"
+        WHERE {' AND '.join(conditions)}
+        ORDER BY "createdAt" DESC, id DESC
+        LIMIT ${len(params)}
+    """
+    
+    try:
+        async with db_pool.acquire() as conn:
+            rows = await conn.fetch(query, *params)
+    except Exception as e:
+        logger.error(f"Insight report listing error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    reports = []
+    for row in rows:
+        reports.append({
+            'id': row['id'],
+            'customer_id': row['customerId'],
+            'item_key': row['itemKey'],
+            'item_name': row['itemName'],
+            'periods': row['periods'],
+            'summary': json.loads(row['summary']) if row['summary'] else None,
+            'created_at': row['createdAt'].isoformat() if row['createdAt'] else None,
+            'created_by': row['createdBy'],
+            'shared_at': row['sharedAt'].isoformat() if row['sharedAt'] else None,
+            'viewed_at': row['viewedAt'].isoformat() if row['viewedAt'] else None
+        })
+    
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = encode_report_cursor(rows[-1]['createdAt'], rows[-1]['id'])
+    
+    return {
+        'data': reports,
+        'next_cursor': next_cursor,
+        'has_more': has_more
+    }
+
+@app.get("/api/insight-reports/{report_id}")
+async def get_insight_report(report_id: str):
+    """인사이트 보고서 상세 데이터 조회 (PDF 제외)"""
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    async with db_pool.acquire() as conn:
+        row = await conn.fetchrow(
+            'SELECT "reportData" FROM "insight_reports" WHERE id = $1',
+            report_id
+        )
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="보고서를 찾을 수 없습니다.")
+    
+    report_data = json.loads(row['reportData'])
+    report_data.pop('pdf_base64', None)
+    report_data.pop('path_model', None)
+    return report_data
+
+@app.get("/api/insight-reports/{report_id}/pdf")
+async def get_insight_report_pdf(report_id: str):
+    """인사이트 보고서 PDF 다운로드"""
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    async with db_pool.acquire() as conn:
+        row = await conn.fetchrow(
+            'SELECT "pdfBase64" FROM "insight_reports" WHERE id = $1',
+            report_id
+        )
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="보고서를 찾을 수 없습니다.")
+    
+    return Response(
+        content=base64.b64decode(row['pdfBase64']),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'inline; filename="insight_report_{report_id}.pdf"'}
+    )
+
 @app.post("/api/validate-measurement")
 async def validate_measurement(request: PredictionRequest):
-    """측정 데이터 이상치 검증 (통계 기반)"""
+    """
+    측정 데이터 이상치 검증 (통계 기반)
+    - 굴뚝/항목/월별 강건 기준선(중앙값 ± MAD) 우선, 없으면 고객사 전체 평균 ± 2σ
+    - 누적 통계/기준선은 메모리 캐시: 이력 길이와 무관하게 상수 시간 판정
+    """
     global db_pool
     
     try:
-        import numpy as np
+        from measurement_stats import measurement_stats_cache
+        from robust_baselines import baseline_store, resolve_bounds, month_of
         
-        async with db_pool.acquire() as conn:
-            rows = await conn.fetch("""
-                SELECT m.value
-                FROM "Measurement" m
-                JOIN "Stack" s ON m."stackId" = s.id
-                WHERE s."customerId" = $1 AND m."itemKey" = $2
-                  AND m.value IS NOT NULL
-                ORDER BY m."measuredAt" ASC
-            """, request.customer_id, request.item_key)
+        stats = measurement_stats_cache.lookup(request.customer_id, request.item_key)
+        if stats is None or not baseline_store.is_loaded(request.customer_id, request.item_key):
+            async with db_pool.acquire() as conn:
+                stats = await measurement_stats_cache.load(conn, request.customer_id, request.item_key)
+                await baseline_store.load(conn, request.customer_id, [request.item_key])
         
-        if len(rows) < 10:
+        stack_id = stats['stack_ids'].get(request.stack)
+        bounds = resolve_bounds(
+            baseline_store.lookup(stack_id, request.item_key) if stack_id else None,
+            month_of(request.measured_at),
+            stats['customer']
+        )
+        if bounds is None:
             return {
                 "anomaly_detected": False,
                 "skip_reason": "insufficient_data",
@@ -544,27 +1229,19 @@ async def validate_measurement(request: PredictionRequest):
                 "message": "검증할 값이 없습니다."
             }
         
-        # 통계 기반 이상치 탐지
-        values = [float(row['value']) for row in rows]
-        mean = np.mean(values)
-        std = np.std(values)
-        
-        # 평균 ± 2 표준편차 (95% 신뢰구간)
-        lower_bound = max(0, mean - 2 * std)  # 음수 방지
-        upper_bound = mean + 2 * std
-        
         # 이상치 판정
-        if input_value < lower_bound or input_value > upper_bound:
+        if input_value < bounds.lower or input_value > bounds.upper:
             return {
                 "anomaly_detected": True,
                 "severity": "warning",
-                "message": f"입력값({input_value:.2f})이 과거 데이터 범위({lower_bound:.2f}~{upper_bound:.2f})를 벗어났습니다.",
+                "message": f"입력값({input_value:.2f})이 과거 데이터 범위({bounds.lower:.2f}~{bounds.upper:.2f})를 벗어났습니다.",
                 "details": {
                     "input_value": input_value,
-                    "historical_mean": round(mean, 2),
-                    "lower_bound": round(lower_bound, 2),
-                    "upper_bound": round(upper_bound, 2),
-                    "data_count": len(values)
+                    "historical_mean": round(bounds.center, 2),
+                    "lower_bound": round(bounds.lower, 2),
+                    "upper_bound": round(bounds.upper, 2),
+                    "data_count": bounds.count,
+                    "method": bounds.method
                 }
             }
         
@@ -581,6 +1258,278 @@ async def validate_measurement(request: PredictionRequest):
             "message": f"검증 중 오류 발생: {str(e)}"
         }
 
+@app.post("/api/validate-measurement/batch")
+async def validate_measurements_batch(request: BatchValidationRequest):
+    """
+    측정 데이터 일괄 이상치 검증
+    - entries: (굴뚝, 항목, 값) 목록 / temp_ids: MeasurementTemp 레코드의 측정값 전체
+    - 필요한 항목 통계/기준선은 캐시 또는 고객사당 1회 쿼리로 조회, 판정은 벡터 연산
+    - 판정 기준은 /api/validate-measurement 와 동일
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    try:
+        import numpy as np
+        from measurement_stats import measurement_stats_cache
+        from robust_baselines import baseline_store, resolve_bounds, judge_values, month_of
+        
+        entries = [
+            {
+                'customer_id': entry.customer_id or request.customer_id,
+                'stack': entry.stack,
+                'item_key': entry.item_key,
+                'value': entry.value,
+                'measured_at': entry.measured_at,
+                'temp_id': None
+            }
+            for entry in request.entries
+        ]
+        
+        # 임시저장 레코드의 측정값 펼치기
+        if request.temp_ids:
+            async with db_pool.acquire() as conn:
+                temp_rows = await conn.fetch("""
+                    SELECT "tempId", "customerId", "stackId", "measurementDate", measurements
+                    FROM "MeasurementTemp"
+                    WHERE "tempId" = ANY($1::text[]) OR id = ANY($1::text[])
+                """, request.temp_ids)
+            for row in temp_rows:
+                try:
+                    measurements = json.loads(row['measurements'] or '[]')
+                except (ValueError, TypeError):
+                    measurements = []
+                for measurement in measurements:
+                    value = measurement.get('value')
+                    try:
+                        value = float(value) if value is not None and value != '' else None
+                    except (ValueError, TypeError):
+                        value = None
+                    entries.append({
+                        'customer_id': row['customerId'],
+                        'stack': row['stackId'],
+                        'item_key': measurement.get('itemKey'),
+                        'value': value,
+                        'measured_at': row['measurementDate'],
+                        'temp_id': row['tempId']
+                    })
+        
+        if not entries:
+            raise HTTPException(status_code=400, detail="검증할 측정값이 없습니다.")
+        if any(not entry['customer_id'] or not entry['item_key'] for entry in entries):
+            raise HTTPException(status_code=400, detail="customer_id와 item_key는 필수입니다.")
+        
+        # 고객사별로 필요한 항목 통계/기준선 조회 (캐시 미스 항목만 고객사당 1회 쿼리)
+        items_by_customer: Dict[str, List[str]] = {}
+        for entry in entries:
+            items_by_customer.setdefault(entry['customer_id'], []).append(entry['item_key'])
+        stats = {}
+        for customer_id, item_keys in items_by_customer.items():
+            loaded = await measurement_stats_cache.get_many(db_pool.acquire, customer_id, item_keys)
+            for item_key, entry_stats in loaded.items():
+                stats[(customer_id, item_key)] = entry_stats
+            unloaded = [k for k in dict.fromkeys(item_keys) if not baseline_store.is_loaded(customer_id, k)]
+            if unloaded:
+                async with db_pool.acquire() as conn:
+                    await baseline_store.load(conn, customer_id, unloaded)
+        
+        bounds = []
+        for entry in entries:
+            entry_stats = stats[(entry['customer_id'], entry['item_key'])]
+            stack_id = entry_stats['stack_ids'].get(entry['stack'])
+            bounds.append(resolve_bounds(
+                baseline_store.lookup(stack_id, entry['item_key']) if stack_id else None,
+                month_of(entry['measured_at']),
+                entry_stats['customer']
+            ))
+        verdicts = judge_values(bounds, [entry['value'] for entry in entries])
+        
+        results = []
+        for i, entry in enumerate(entries):
+            result = {
+                "index": i,
+                "customer_id": entry['customer_id'],
+                "stack": entry['stack'],
+                "item_key": entry['item_key'],
+                "value": entry['value'],
+                "anomaly_detected": bool(verdicts['anomaly_detected'][i])
+            }
+            if entry['temp_id']:
+                result["temp_id"] = entry['temp_id']
+            if verdicts['skip_reason'][i]:
+                result["skip_reason"] = str(verdicts['skip_reason'][i])
+            else:
+                result["details"] = {
+                    "historical_mean": round(bounds[i].center, 2),
+                    "lower_bound": round(bounds[i].lower, 2),
+                    "upper_bound": round(bounds[i].upper, 2),
+                    "data_count": bounds[i].count,
+                    "method": bounds[i].method
+                }
+            results.append(result)
+        
+        return {
+            "total": len(results),
+            "anomaly_count": int(np.count_nonzero(verdicts['anomaly_detected'])),
+            "skipped_count": int(np.count_nonzero(verdicts['skip_reason'] != '')),
+            "results": results
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch validation error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/baselines/refresh")
+async def refresh_baselines(customer_id: Optional[str] = None, full: bool = False):
+    """
+    이상치 검증 기준선 갱신
+    - 기본: 측정 데이터가 바뀐 (굴뚝, 항목)만 재계산
+    - full=true: 전체 측정 데이터로 모든 기준선 재계산 (backfill)
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    try:
+        from robust_baselines import baseline_store
+        
+        async with db_pool.acquire() as conn:
+            if full:
+                result = await baseline_store.backfill(conn)
+            else:
+                result = await baseline_store.refresh(conn, customer_id)
+        return {"mode": "backfill" if full else "incremental", **result}
+    except Exception as e:
+        logger.error(f"Baseline refresh error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/measurements/ingest")
+async def ingest_measurements(
+    file: UploadFile = File(...),
+    organization_id: str = Form(...),
+    customer_id: Optional[str] = Form(None),
+    encoding: str = Form("utf-8-sig")
+):
+    """
+    측정 데이터 CSV 일괄 적재
+    - 청크 단위 파싱 -> 임시 테이블 binary COPY -> "Measurement" upsert 1회
+      (stackId_itemKey_measuredAt 중복 시 값/부가 컬럼 갱신)
+    - 굴뚝은 이름/현장코드/코드/정식명칭/별칭, 항목은 코드/명칭으로 매칭
+    - 응답: 신규/갱신/제외 건수와 처리 속도(rows_per_second)
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    try:
+        from measurement_ingest import ingestion_lookups, ingest_csv
+        from measurement_stats import measurement_stats_cache
+        
+        async with db_pool.acquire() as conn:
+            if not ingestion_lookups.is_fresh():
+                await ingestion_lookups.load(conn)
+            report = await ingest_csv(
+                conn, file.file, ingestion_lookups, organization_id,
+                customer_id=customer_id, encoding=encoding
+            )
+        
+        for affected_customer in report['customer_ids']:
+            measurement_stats_cache.invalidate(affected_customer)
+        
+        return {"file_name": file.filename, **report}
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"CSV 형식 오류: {e}")
+    except Exception as e:
+        logger.error(f"Measurement ingestion error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/exceedances/process")
+async def process_exceedances(customer_id: Optional[str] = None):
+    """
+    미판정 측정값 배출허용기준 초과 일괄 판정
+    - "limitCheck" 가 비어있는(NULL) 측정 행을 묶음 단위로 판정하여 초과/적합 기록
+    - 초과 건은 굴뚝/항목별로 요약해 고객사/환경측정기업 관리자에게 알림
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    try:
+        from exceedance import process_pending
+        
+        async with db_pool.acquire() as conn:
+            return await process_pending(conn, customer_id)
+    except Exception as e:
+        logger.error(f"Exceedance processing error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/risk/scan/refresh")
+async def refresh_risk_scan(horizon_days: int = 30):
+    """
+    전체 굴뚝/항목 위험도 재산정
+    - 고객사/항목별 최신 예측과 굴뚝별 적용 기준으로 일괄 채점 후 결과 테이블 교체
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    if not 1 <= horizon_days <= 365:
+        raise HTTPException(status_code=400, detail="horizon_days 는 1~365 범위여야 합니다.")
+    
+    try:
+        from risk_scan import run_scan
+        
+        async with db_pool.acquire() as conn:
+            return await run_scan(conn, horizon_days)
+    except Exception as e:
+        logger.error(f"Risk scan error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/risk/scan")
+async def get_risk_scan(
+    page: int = 1,
+    page_size: int = 50,
+    sort_by: str = 'score',
+    order: str = 'desc',
+    customer_id: Optional[str] = None,
+    item_key: Optional[str] = None,
+    level: Optional[str] = None,
+    min_score: Optional[float] = None,
+    include_no_limit: bool = False
+):
+    """
+    배출허용기준 초과 위험도 순위 (사전 산정 결과 조회)
+    - 정렬: score, exceed_probability, max_ratio, historical_exceed_rate, first_exceed_date
+    """
+    global db_pool
+    
+    if not db_pool:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    if page < 1 or not 1 <= page_size <= 500:
+        raise HTTPException(status_code=400, detail="page 는 1 이상, page_size 는 1~500 범위여야 합니다.")
+    
+    try:
+        from risk_scan import query_results
+        
+        async with db_pool.acquire() as conn:
+            return await query_results(
+                conn, page, page_size, sort_by, order,
+                customer_id=customer_id, item_key=item_key, level=level,
+                min_score=min_score, include_no_limit=include_no_limit
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Risk scan query error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/models")
 async def list_models():
     """사용 가능한 AutoML 모델 목록"""
@@ -0,0 +1,629 @@
+"""
+측정 데이터 CSV 일괄 적재
+- 업로드 CSV를 청크 단위로 읽어 열 단위 배열로 변환 (행 단위 Python 처리 없음)
+- 굴뚝명/별칭/코드, 항목 코드/명칭은 메모리 조회표로 고유값만 변환
+- 청크마다 임시 테이블에 binary COPY, 마지막에 INSERT ... ON CONFLICT 1회로 "Measurement" upsert
+- 보조항목(기온, 습도 등)은 열(wide) 또는 항목 행(long) 모두 지원, 같은 굴뚝/측정시각 오염물질 행에 병합
+- 적재 중에는 measurement_stats 행 단위 트리거를 끄고, 영향받은 고객사/항목 통계만 1회 재집계
+- 적재된 행은 같은 트랜잭션에서 배출허용기준 초과 판정/알림 (exceedance)
+"""
+import asyncio
+import logging
+import re
+import time
+from collections import Counter
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from exceedance import ROW_COLUMNS, process_rows
+
+logger = logging.getLogger(__name__)
+
+# 청크당 행 수
+CHUNK_ROWS = 100_000
+
+# 굴뚝/항목 조회표 유지 시간 (초)
+LOOKUP_TTL_SECONDS = 300
+
+# CSV 측정시각 기준 시간대 (한국 표준시, DB는 UTC 저장)
+SOURCE_UTC_OFFSET_HOURS = 9
+
+# 필수 컬럼 -> 허용 헤더명
+REQUIRED_COLUMNS = {
+    'stack': ['stack', '굴뚝', '굴뚝명', '굴뚝번호', '배출구명'],
+    'item': ['itemkey', 'item_key', 'item', '항목', '항목코드', '오염물질'],
+    'measured_at': ['measuredat', 'measured_at', '측정일자', '측정일시'],
+    'value': ['value', '농도', '측정값']
+}
+
+# "Measurement" 부가 컬럼 -> (숫자 여부, 허용 헤더명)
+# 헤더명 첫 항목은 /api/measurements/bulk 의 보조항목 itemKey 와 동일 (항목 행 형식 지원)
+FIELD_COLUMNS = {
+    'weather': (False, ['weather', '기상']),
+    'temperatureC': (True, ['temperature', '기온']),
+    'humidityPct': (True, ['humidity', '습도']),
+    'pressureMmHg': (True, ['pressure', '기압']),
+    'windDirection': (False, ['wind_direction', '풍향']),
+    'windSpeedMs': (True, ['wind_speed', '풍속']),
+    'gasVelocityMs': (True, ['gas_velocity', '가스속도']),
+    'gasTempC': (True, ['gas_temp', '가스온도']),
+    'moisturePct': (True, ['moisture', '수분함량']),
+    'oxygenMeasuredPct': (True, ['oxygen_measured', '실측산소농도']),
+    'oxygenStdPct': (True, ['oxygen_std', '표준산소농도']),
+    'flowSm3Min': (True, ['flow_rate', '배출가스유량']),
+    'limitAtMeasure': (True, ['배출허용기준농도']),
+    'limitCheck': (False, ['배출허용기준체크']),
+    'measuringCompany': (False, ['측정업체'])
+}
+
+# 항목 행 형식의 보조항목 itemKey -> "Measurement" 컬럼
+AUX_ITEM_FIELDS = {
+    aliases[0]: column for column, (_, aliases) in list(FIELD_COLUMNS.items())[:12]
+}
+
+# 항목명 표기 차이 (가져오기 스크립트와 동일)
+ITEM_NAME_SYNONYMS = {
+    '포름알데히드': '폼알데하이드',
+    '불소화합물': '플루오린화합물'
+}
+
+STAGE_COLUMNS = ['seq', 'customer_id', 'stack_id', 'item_key', 'is_aux', 'value', 'measured_at_ms'] + list(FIELD_COLUMNS)
+
+
+def normalize_header(name: str) -> str:
+    """헤더 비교용 정규화 (괄호 단위 표기, 공백 제거, 소문자)"""
+    return re.sub(r'\(.*?\)|\s+', '', str(name)).lower()
+
+
+def normalize_key(value: str) -> str:
+    """굴뚝 식별자 비교용 정규화 (가져오기 스크립트 normKey 와 동일)"""
+    return re.sub(r'[^A-Z0-9#-]', '', re.sub(r'\s+', '', str(value).strip().upper()))
+
+
+def normalize_item_name(name: str) -> str:
+    """항목명 비교용 정규화 (괄호 표기 제거, 동의어 치환)"""
+    base = re.sub(r'\(.+?\)', '', str(name)).strip()
+    return ITEM_NAME_SYNONYMS.get(base, base)
+
+
+def match_columns(headers: Iterable[str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    CSV 헤더 -> (필수 컬럼 매핑, 부가 컬럼 매핑)
+
+    Raises:
+        ValueError: 필수 컬럼 누락
+    """
+    normalized = {}
+    for header in headers:
+        normalized.setdefault(normalize_header(header), header)
+
+    def find(aliases):
+        for alias in aliases:
+            header = normalized.get(normalize_header(alias))
+            if header is not None:
+                return header
+        return None
+
+    required = {}
+    for key, aliases in REQUIRED_COLUMNS.items():
+        header = find(aliases)
+        if header is None:
+            raise ValueError(f"필수 컬럼이 없습니다: {key} ({', '.join(aliases)})")
+        required[key] = header
+
+    fields = {}
+    for column, (_, aliases) in FIELD_COLUMNS.items():
+        header = find([column] + aliases)
+        if header is not None:
+            fields[column] = header
+    return required, fields
+
+
+def parse_measured_at(values: pd.Series) -> pd.Series:
+    """
+    측정시각 문자열 -> UTC 기준 datetime64 (변환 실패 시 NaT)
+    - YYYYMMDD / YYYYMMDDHHmm / YYYYMMDDHHmmss 숫자형과 ISO 형식 지원
+    - 시간대 표기가 없으면 한국 표준시로 간주
+    - 숫자형은 정수 연산으로 연/월/일/시/분/초 분해 (문자열 파싱 없음)
+    """
+    result = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+    digits = ~np.isnan(numbers) & (numbers >= 1e7) & (numbers < 1e14) & (numbers == np.floor(numbers))
+
+    if digits.any():
+        stamps = numbers[digits].astype(np.int64)
+        # 8자리(일) / 12자리(분) / 14자리(초) 를 14자리로 맞춤
+        stamps = np.select(
+            [stamps < 10 ** 8, stamps < 10 ** 12, stamps >= 10 ** 13],
+            [stamps * 10 ** 6, stamps * 100, stamps],
+            -1
+        )
+        parts = pd.DataFrame({
+            'year': stamps // 10 ** 10,
+            'month': stamps // 10 ** 8 % 100,
+            'day': stamps // 10 ** 6 % 100,
+            'hour': stamps // 10 ** 4 % 100,
+            'minute': stamps // 100 % 100,
+            'second': stamps % 100
+        })
+        parts[stamps < 0] = 0
+        parsed = pd.to_datetime(parts, errors='coerce').to_numpy()
+        result[digits] = parsed - np.timedelta64(SOURCE_UTC_OFFSET_HOURS, 'h')
+
+    rest = ~digits & (values.to_numpy() != '')
+    if rest.any():
+        values = values[rest].str.strip()
+        parsed = pd.to_datetime(values, errors='coerce', utc=True, format='mixed')
+        # 시간대 표기가 없는 값은 utc=True 에서 UTC로 해석되므로 한국 시간 보정
+        naive = ~values.str.contains(r'(?:Z|[+-]\d{2}:?\d{2})$', regex=True)
+        offset = np.where(naive.to_numpy(), SOURCE_UTC_OFFSET_HOURS, 0)
+        result[rest] = parsed.dt.tz_convert(None) - pd.to_timedelta(offset, unit='h')
+    return result
+
+
+def parse_numbers(values: pd.Series) -> np.ndarray:
+    """숫자 문자열 -> float 배열 (천 단위 쉼표 허용, 변환 실패 시 NaN)"""
+    numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+    # 변환 실패한 비어있지 않은 값만 쉼표 제거 후 재시도
+    retry = np.isnan(numbers) & (values.to_numpy() != '')
+    if retry.any():
+        numbers[retry] = pd.to_numeric(
+            values[retry].str.replace(',', '', regex=False).str.strip(), errors='coerce'
+        ).to_numpy(dtype=float)
+    return numbers
+
+
+def to_nullable(array: np.ndarray) -> List[Any]:
+    """NaN -> None 변환된 COPY 입력 목록"""
+    result = array.astype(object)
+    result[np.isnan(array)] = None
+    return result.tolist()
+
+
+class LookupMaps:
+    """
+    굴뚝/항목 메모리 조회표
+
+    - stacks: {식별자: [(stackId, customerId, isActive)]} (이름, 현장코드, 코드, 정식명칭, 별칭 + 정규화 키)
+    - items: {항목 코드/명칭/정규화 명칭: itemKey}
+    """
+
+    def __init__(self, ttl_seconds: float = LOOKUP_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.loaded_at: Optional[float] = None
+        self.stacks: Dict[str, List[Tuple[str, str, bool]]] = {}
+        self.items: Dict[str, str] = {}
+
+    def is_fresh(self) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < self.ttl_seconds
+
+    async def load(self, conn) -> "LookupMaps":
+        """DB에서 조회표 재구성 (굴뚝, 별칭, 항목 각 1회 조회)"""
+        stack_rows = await conn.fetch("""
+            SELECT id, "customerId" as customer_id, "isActive" as is_active,
+                   name, "siteCode" as site_code, code, "fullName" as full_name, "siteName" as site_name
+            FROM "Stack"
+        """)
+        alias_rows = await conn.fetch('SELECT "stackId" as stack_id, alias FROM "StackAlias"')
+        item_rows = await conn.fetch('SELECT key, name FROM "Item"')
+
+        stacks: Dict[str, List[Tuple[str, str, bool]]] = {}
+        entries = {}
+
+        def register(identifier, entry):
+            if not identifier:
+                return
+            for key in {str(identifier).strip(), normalize_key(identifier)}:
+                if key and entry not in stacks.setdefault(key, []):
+                    stacks[key].append(entry)
+
+        for row in stack_rows:
+            entry = (row['id'], row['customer_id'], bool(row['is_active']))
+            entries[row['id']] = entry
+            for identifier in (row['name'], row['site_code'], row['code'], row['full_name'], row['site_name']):
+                register(identifier, entry)
+        for row in alias_rows:
+            if row['stack_id'] in entries:
+                register(row['alias'], entries[row['stack_id']])
+
+        items = {}
+        for row in item_rows:
+            items[row['key']] = row['key']
+        for row in item_rows:
+            for name in (row['name'], normalize_item_name(row['name'])):
+                if name:
+                    items.setdefault(name, row['key'])
+
+        self.stacks = stacks
+        self.items = items
+        self.loaded_at = time.monotonic()
+        logger.info(f"Ingestion lookups loaded: {len(stack_rows)} stacks, {len(alias_rows)} aliases, {len(item_rows)} items")
+        return self
+
+    def resolve_stacks(self, names: pd.Series, customer_id: Optional[str] = None) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """
+        굴뚝 식별자 -> (stackId, customerId, 사유) 열 (고유값만 조회)
+        - customer_id 지정 시 해당 고객사 굴뚝만 매칭
+        - 사유: None(정상) / stack_not_found / stack_ambiguous / inactive_stack
+        """
+        resolved = {}
+        for name in names.unique():
+            candidates = self.stacks.get(str(name).strip()) or self.stacks.get(normalize_key(name)) or []
+            if customer_id:
+                candidates = [c for c in candidates if c[1] == customer_id]
+            if not candidates:
+                resolved[name] = (None, None, 'stack_not_found')
+            elif len(candidates) > 1:
+                resolved[name] = (None, None, 'stack_ambiguous')
+            elif not candidates[0][2]:
+                resolved[name] = (None, None, 'inactive_stack')
+            else:
+                resolved[name] = (candidates[0][0], candidates[0][1], None)
+
+        return (
+            names.map({k: v[0] for k, v in resolved.items()}),
+            names.map({k: v[1] for k, v in resolved.items()}),
+            names.map({k: v[2] for k, v in resolved.items()})
+        )
+
+    def resolve_items(self, names: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """항목 코드/명칭 -> (itemKey, 보조항목 컬럼) 열 (고유값만 조회)"""
+        keys, aux = {}, {}
+        for name in names.unique():
+            text = str(name).strip()
+            if text in AUX_ITEM_FIELDS:
+                aux[name] = AUX_ITEM_FIELDS[text]
+                continue
+            keys[name] = self.items.get(text) or self.items.get(normalize_item_name(text))
+        return names.map(keys), names.map(aux)
+
+
+def prepare_chunk(
+    chunk: pd.DataFrame,
+    required: Dict[str, str],
+    fields: Dict[str, str],
+    lookups: LookupMaps,
+    customer_id: Optional[str],
+    seq_start: int,
+    skipped: Counter,
+    unmatched: Dict[str, set]
+) -> List[tuple]:
+    """
+    CSV 청크 -> 임시 테이블 COPY 레코드 (STAGE_COLUMNS 순서)
+
+    오염물질 행은 value, 보조항목 행(is_aux)은 해당 컬럼에 값을 담음
+    """
+    stack_names = chunk[required['stack']]
+    item_names = chunk[required['item']]
+    value_text = chunk[required['value']]
+    measured_at = parse_measured_at(chunk[required['measured_at']])
+
+    missing = (stack_names == '') | (item_names == '') | (chunk[required['measured_at']] == '')
+    skipped['missing_required_field'] += int(missing.sum())
+    valid = ~missing
+
+    stack_ids, customer_ids, stack_reasons = lookups.resolve_stacks(stack_names[valid], customer_id)
+    item_keys, aux_fields = lookups.resolve_items(item_names[valid])
+    stack_ok = stack_reasons.isna()
+    for reason, count in stack_reasons[~stack_ok].value_counts().items():
+        skipped[reason] += int(count)
+    unmatched['stacks'].update(stack_names[valid][stack_reasons == 'stack_not_found'].unique().tolist())
+
+    is_aux = aux_fields.notna()
+    item_ok = item_keys.notna() | is_aux
+    skipped['item_not_found'] += int((stack_ok & ~item_ok).sum())
+    unmatched['items'].update(item_names[valid][stack_ok & ~item_ok].unique().tolist())
+
+    date_ok = measured_at[valid].notna()
+    skipped['invalid_date'] += int((stack_ok & item_ok & ~date_ok).sum())
+
+    values = parse_numbers(value_text[valid])
+    numeric_aux = aux_fields.map({column: numeric for column, (numeric, _) in FIELD_COLUMNS.items()}).eq(True)
+    value_ok = ~np.isnan(values) | (is_aux & ~numeric_aux)
+    keep = stack_ok & item_ok & date_ok & value_ok
+    skipped['value_not_numeric'] += int((stack_ok & item_ok & date_ok & ~value_ok).sum())
+
+    keep_index = keep[keep].index
+    n = len(keep_index)
+    if n == 0:
+        return []
+
+    positions = np.flatnonzero(keep.to_numpy())
+    chunk = chunk.loc[keep_index]
+    is_aux = is_aux.to_numpy()[positions]
+    aux_fields = aux_fields.to_numpy()[positions]
+    values = values[positions]
+
+    columns = {
+        'seq': np.arange(seq_start, seq_start + n).tolist(),
+        'customer_id': customer_ids.to_numpy()[positions].tolist(),
+        'stack_id': stack_ids.to_numpy()[positions].tolist(),
+        'item_key': np.where(is_aux, None, item_keys.to_numpy()[positions]).tolist(),
+        'is_aux': is_aux.tolist(),
+        'value': to_nullable(np.where(is_aux, np.nan, values)),
+        'measured_at_ms': (measured_at[keep_index].to_numpy().astype('datetime64[ms]').astype(np.int64)).tolist()
+    }
+
+    for column, (numeric, _) in FIELD_COLUMNS.items():
+        from_row = is_aux & (aux_fields == column)
+        if numeric:
+            data = parse_numbers(chunk[fields[column]]) if column in fields else np.full(n, np.nan)
+            data = np.where(from_row, values, data)
+            columns[column] = to_nullable(data)
+        else:
+            if column in fields:
+                data = chunk[fields[column]].to_numpy(dtype=object)
+            else:
+                data = np.full(n, None, dtype=object)
+            if from_row.any():
+                data = np.where(from_row, value_text.loc[keep_index].to_numpy(dtype=object), data)
+            data[data == ''] = None
+            columns[column] = data.tolist()
+
+    return list(zip(*(columns[c] for c in STAGE_COLUMNS)))
+
+
+def _next_records(
+    reader,
+    required: Optional[Dict[str, str]],
+    fields: Optional[Dict[str, str]],
+    lookups: LookupMaps,
+    customer_id: Optional[str],
+    offset: int,
+    skipped: Counter,
+    unmatched: Dict[str, set]
+):
+    """
+    다음 청크 읽기 + 적재 레코드 변환 (스레드 풀 실행용)
+
+    Returns:
+        (필수 컬럼, 부가 컬럼, 청크 행 수, 레코드), 마지막 청크 이후면 None
+    """
+    chunk = next(reader, None)
+    if chunk is None:
+        return None
+    if required is None:
+        required, fields = match_columns(chunk.columns)
+    records = prepare_chunk(chunk, required, fields, lookups, customer_id, offset, skipped, unmatched)
+    return required, fields, len(chunk), records
+
+
+async def ingest_csv(
+    conn,
+    stream,
+    lookups: LookupMaps,
+    organization_id: str,
+    customer_id: Optional[str] = None,
+    encoding: str = 'utf-8-sig',
+    chunk_rows: int = CHUNK_ROWS
+) -> Dict[str, Any]:
+    """
+    CSV 스트림을 "Measurement"에 upsert
+
+    Args:
+        stream: 바이너리 파일 객체 (UploadFile.file)
+        organization_id: 측정 수행 환경측정기업 ID
+        customer_id: 지정 시 해당 고객사 굴뚝만 매칭
+
+    Returns:
+        적재 결과 (행 수, 신규/갱신 건수, 제외 사유, 처리 속도)
+
+    Raises:
+        ValueError: 필수 컬럼 누락
+
+    CSV 읽기/변환은 스레드 풀에서 실행하고 이벤트 루프에서는 COPY/upsert 만 대기
+    """
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    skipped: Counter = Counter()
+    unmatched = {'stacks': set(), 'items': set()}
+    total_rows = 0
+    staged = 0
+    parse_seconds = 0.0
+
+    reader = await loop.run_in_executor(None, partial(
+        pd.read_csv, stream, dtype=str, keep_default_na=False, chunksize=chunk_rows,
+        encoding=encoding, skipinitialspace=True
+    ))
+
+    async with conn.transaction():
+        # 행 단위 통계 트리거 비활성화 (적재 후 일괄 재집계)
+        await conn.execute("SET LOCAL pmms.bulk_ingest = 'on'")
+        field_columns = ",\n                ".join(
+            f'"{column}" {"DOUBLE PRECISION" if numeric else "TEXT"}'
+            for column, (numeric, _) in FIELD_COLUMNS.items()
+        )
+        await conn.execute(f"""
+            CREATE TEMP TABLE ingest_rows (
+                seq BIGINT,
+                customer_id TEXT,
+                stack_id TEXT,
+                item_key TEXT,
+                is_aux BOOLEAN,
+                value DOUBLE PRECISION,
+                measured_at_ms BIGINT,
+                {field_columns}
+            ) ON COMMIT DROP
+        """)
+        await conn.execute("CREATE TEMP TABLE ingested_ids (id TEXT, notify BOOLEAN) ON COMMIT DROP")
+
+        required = fields = None
+        chunk_started = time.perf_counter()
+        while True:
+            parsed = await loop.run_in_executor(
+                None, _next_records, reader, required, fields, lookups, customer_id, total_rows, skipped, unmatched
+            )
+            if parsed is None:
+                break
+            required, fields, chunk_size, records = parsed
+            total_rows += chunk_size
+            parse_seconds += time.perf_counter() - chunk_started
+            if records:
+                await conn.copy_records_to_table('ingest_rows', records=records, columns=STAGE_COLUMNS)
+                staged += len(records)
+            chunk_started = time.perf_counter()
+
+        if required is None:
+            raise ValueError("CSV 헤더가 없습니다.")
+
+        copy_finished = time.perf_counter()
+        result = await conn.fetchrow(_upsert_sql(), organization_id)
+        customer_ids = [r['customer_id'] for r in await conn.fetch(
+            "SELECT DISTINCT customer_id FROM ingest_rows WHERE NOT is_aux ORDER BY customer_id"
+        )]
+        await conn.execute(_refresh_stats_sql())
+        upsert_seconds = time.perf_counter() - copy_finished
+
+        ingested = await conn.fetch(f"""
+            SELECT {ROW_COLUMNS}, t.notify
+            FROM ingested_ids t
+            JOIN "Measurement" m ON m.id = t.id
+            JOIN "Stack" s ON s.id = m."stackId"
+            JOIN "Item" i ON i.key = m."itemKey"
+        """)
+        # 재업로드로 값이 그대로인 행은 판정만 다시 기록하고 알림 제외
+        exceedance = await process_rows(
+            conn, ingested, notify_ids={row['id'] for row in ingested if row['notify']}
+        )
+
+    elapsed = time.perf_counter() - started
+    upserted = result['upserted'] if result else 0
+    inserted = result['inserted'] if result else 0
+    report = {
+        'total_rows': total_rows,
+        'staged_rows': staged,
+        'aux_rows': result['aux_rows'] if result else 0,
+        'inserted': inserted,
+        'updated': upserted - inserted,
+        'duplicates_in_file': (result['source_rows'] - upserted) if result else 0,
+        'skipped': {reason: count for reason, count in skipped.items() if count},
+        'skipped_count': sum(skipped.values()),
+        'unmatched_stacks': sorted(unmatched['stacks'])[:20],
+        'unmatched_items': sorted(unmatched['items'])[:20],
+        'customer_ids': customer_ids,
+        'elapsed_seconds': round(elapsed, 3),
+        'parse_seconds': round(parse_seconds, 3),
+        'upsert_seconds': round(upsert_seconds, 3),
+        'exceedance': exceedance,
+        'rows_per_second': round(total_rows / elapsed) if elapsed > 0 else None
+    }
+    logger.info(
+        f"CSV ingestion: {total_rows} rows, {inserted} inserted, {report['updated']} updated, "
+        f"{report['skipped_count']} skipped in {elapsed:.2f}s ({report['rows_per_second']} rows/s)"
+    )
+    return report
+
+
+def _upsert_sql() -> str:
+    """
+    임시 테이블 -> "Measurement" upsert (1회)
+    - 파일 내 중복 키는 마지막 행 기준
+    - 보조항목은 열 값 우선, 없으면 같은 굴뚝/측정시각의 보조항목 행 값
+    - 기존 행 갱신 시 값이 없는 부가 컬럼은 기존 값 유지
+    - 신규 행과 값이 바뀐 행만 알림 대상(ingested_ids.notify)으로 표시
+    """
+    columns = list(FIELD_COLUMNS)
+    aux_select = ",\n                    ".join(f'MAX("{c}") as "{c}"' for c in columns)
+    merged = ",\n                ".join(f'COALESCE(s."{c}", a."{c}")' for c in columns)
+    insert_columns = ", ".join(f'"{c}"' for c in columns)
+    updates = ",\n                ".join(
+        f'"{c}" = COALESCE(EXCLUDED."{c}", "Measurement"."{c}")' for c in columns
+    )
+    return f"""
+        WITH aux AS (
+            SELECT stack_id, measured_at_ms,
+                    {aux_select}
+            FROM ingest_rows
+            WHERE is_aux
+            GROUP BY stack_id, measured_at_ms
+        ),
+        latest AS (
+            SELECT DISTINCT ON (stack_id, item_key, measured_at_ms) *
+            FROM ingest_rows
+            WHERE NOT is_aux
+            ORDER BY stack_id, item_key, measured_at_ms, seq DESC
+        ),
+        previous AS (
+            SELECT m.id, m.value
+            FROM latest s
+            JOIN "Measurement" m
+              ON m."stackId" = s.stack_id
+             AND m."itemKey" = s.item_key
+             AND m."measuredAt" = to_timestamp(s.measured_at_ms / 1000.0) AT TIME ZONE 'UTC'
+        ),
+        upserted AS (
+            INSERT INTO "Measurement"
+            (id, "customerId", "stackId", "itemKey", value, "measuredAt", "organizationId", {insert_columns})
+            SELECT
+                gen_random_uuid()::text,
+                s.customer_id,
+                s.stack_id,
+                s.item_key,
+                s.value,
+                to_timestamp(s.measured_at_ms / 1000.0) AT TIME ZONE 'UTC',
+                $1,
+                {merged}
+            FROM latest s
+            LEFT JOIN aux a ON a.stack_id = s.stack_id AND a.measured_at_ms = s.measured_at_ms
+            ON CONFLICT ("stackId", "itemKey", "measuredAt") DO UPDATE SET
+                value = EXCLUDED.value,
+                "organizationId" = EXCLUDED."organizationId",
+                {updates}
+            RETURNING id, value, (xmax = 0) AS inserted
+        ),
+        saved AS (
+            INSERT INTO ingested_ids
+            SELECT u.id, u.inserted OR u.value IS DISTINCT FROM p.value
+            FROM upserted u
+            LEFT JOIN previous p ON p.id = u.id
+        )
+        SELECT
+            (SELECT COUNT(*) FROM upserted) as upserted,
+            (SELECT COUNT(*) FROM upserted WHERE inserted) as inserted,
+            (SELECT COUNT(*) FROM ingest_rows WHERE NOT is_aux) as source_rows,
+            (SELECT COUNT(*) FROM ingest_rows WHERE is_aux) as aux_rows
+    """
+
+
+def _refresh_stats_sql() -> str:
+    """적재된 고객사/항목의 measurement_stats 굴뚝별 재집계 (행 체크섬/최신 측정시각 포함)"""
+    return """
+        INSERT INTO "measurement_stats"
+            ("id", "customerId", "stackId", "itemKey", "count", "mean", "m2", "minValue", "maxValue",
+             "checksum", "lastMeasuredAt", "updatedAt")
+        SELECT
+            m."customerId" || ':' || m."stackId" || ':' || m."itemKey",
+            m."customerId",
+            m."stackId",
+            m."itemKey",
+            COUNT(*),
+            AVG(m.value),
+            COALESCE(VAR_POP(m.value) * COUNT(*), 0),
+            MIN(m.value),
+            MAX(m.value),
+            SUM(measurement_checksum(m)),
+            MAX(m."measuredAt"),
+            CURRENT_TIMESTAMP
+        FROM "Measurement" m
+        WHERE (m."customerId", m."itemKey") IN (
+            SELECT DISTINCT customer_id, item_key FROM ingest_rows WHERE NOT is_aux
+        )
+          AND m.value IS NOT NULL
+        GROUP BY m."customerId", m."stackId", m."itemKey"
+        ON CONFLICT ("customerId", "itemKey", "stackId") DO UPDATE SET
+            "count" = EXCLUDED."count",
+            "mean" = EXCLUDED."mean",
+            "m2" = EXCLUDED."m2",
+            "minValue" = EXCLUDED."minValue",
+            "maxValue" = EXCLUDED."maxValue",
+            "checksum" = EXCLUDED."checksum",
+            "lastMeasuredAt" = EXCLUDED."lastMeasuredAt",
+            "updatedAt" = CURRENT_TIMESTAMP
+    """
+
+
+# 프로세스 공용 조회표 (TTL 경과 시 재조회)
+ingestion_lookups = LookupMaps()
@@ -0,0 +1,179 @@
+"""
+측정값 누적 통계 조회 (이상치 검증용)
+- "measurement_stats" 테이블: Measurement 트리거가 Welford(count/mean/M2, min/max)로 증분 갱신
+- 굴뚝별 통계만 저장, 고객사 전체 통계는 조회 시 굴뚝 통계 병합 (Chan 병합 공식)
+- 고객사/항목 단위 메모리 캐시 (TTL), 캐시 적중 시 DB 조회 없이 검증
+"""
+import logging
+import math
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 캐시 유지 시간 (초) - 트리거로 갱신된 DB 통계를 다시 읽는 주기
+CACHE_TTL_SECONDS = 30
+MAX_ENTRIES = 4096
+
+# 검증에 필요한 최소 데이터 수
+MIN_SAMPLES = 10
+
+
+class RunningStats(NamedTuple):
+    """Welford 누적 통계"""
+    count: int
+    mean: float
+    m2: float
+    min: float
+    max: float
+
+    @property
+    def std(self) -> float:
+        """모표준편차 (np.std 와 동일)"""
+        return math.sqrt(self.m2 / self.count) if self.count > 0 else 0.0
+
+
+def combine(parts: Sequence[RunningStats]) -> Optional[RunningStats]:
+    """여러 누적 통계 병합 (굴뚝별 -> 고객사 전체, 건수 0 이면 None)"""
+    parts = [p for p in parts if p.count > 0]
+    count = sum(p.count for p in parts)
+    if count == 0:
+        return None
+    mean = sum(p.count * p.mean for p in parts) / count
+    return RunningStats(
+        count=count,
+        mean=mean,
+        m2=sum(p.m2 + p.count * (p.mean - mean) ** 2 for p in parts),
+        min=min(p.min for p in parts),
+        max=max(p.max for p in parts)
+    )
+
+
+def bounds(stats: RunningStats) -> Tuple[float, float]:
+    """평균 ± 2 표준편차 (95% 신뢰구간) 하한/상한 (하한 음수 방지)"""
+    return max(0, stats.mean - 2 * stats.std), stats.mean + 2 * stats.std
+
+
+def check_value(stats: RunningStats, value: float) -> Dict[str, Any]:
+    """
+    평균 ± 2 표준편차 (95% 신뢰구간) 기준 이상치 판정
+
+    Returns:
+        anomaly_detected, lower_bound, upper_bound
+    """
+    lower_bound, upper_bound = bounds(stats)
+    return {
+        'anomaly_detected': value < lower_bound or value > upper_bound,
+        'lower_bound': lower_bound,
+        'upper_bound': upper_bound
+    }
+
+
+class MeasurementStatsCache:
+    """
+    고객사/항목별 누적 통계 캐시
+
+    항목 구조:
+    - customer: 고객사 전체 RunningStats (굴뚝 통계 병합)
+    - stacks: {stackId: RunningStats}
+    - stack_ids: {굴뚝명 또는 ID: stackId}
+    """
+
+    def __init__(self, ttl_seconds: float = CACHE_TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[tuple, tuple] = {}
+
+    def lookup(self, customer_id: str, item_key: str) -> Optional[Dict[str, Any]]:
+        """캐시 조회 (만료 시 None)"""
+        entry = self._entries.get((customer_id, item_key))
+        if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+            return entry[1]
+        return None
+
+    async def load(self, conn, customer_id: str, item_key: str) -> Dict[str, Any]:
+        """DB에서 통계 조회 후 캐시"""
+        entries = await self.load_many(conn, customer_id, [item_key])
+        return entries[item_key]
+
+    async def get_many(self, conn_factory, customer_id: str, item_keys: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        여러 항목 통계 조회 (캐시 미스 항목만 1회 쿼리)
+
+        Args:
+            conn_factory: 캐시 미스 시 사용할 커넥션 컨텍스트 생성 함수 (예: db_pool.acquire)
+        """
+        result = {}
+        missing = []
+        for item_key in dict.fromkeys(item_keys):
+            entry = self.lookup(customer_id, item_key)
+            if entry is None:
+                missing.append(item_key)
+            else:
+                result[item_key] = entry
+        if missing:
+            async with conn_factory() as conn:
+                result.update(await self.load_many(conn, customer_id, missing))
+        return result
+
+    async def load_many(self, conn, customer_id: str, item_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """DB에서 여러 항목 통계를 1회 조회 후 캐시 (통계 테이블이 없으면 집계 쿼리로 대체)"""
+        try:
+            rows = await conn.fetch("""
+                SELECT ms."itemKey" as item_key, ms."stackId" as stack_id, s.name as stack_name,
+                       ms.count, ms.mean, ms.m2, ms."minValue" as min_value, ms."maxValue" as max_value
+                FROM "measurement_stats" ms
+                LEFT JOIN "Stack" s ON s.id = ms."stackId"
+                WHERE ms."customerId" = $1
+                  AND ms."itemKey" = ANY($2::text[])
+            """, customer_id, item_keys)
+        except Exception as e:
+            logger.warning(f"measurement_stats lookup failed, aggregating Measurement: {e}")
+            rows = await conn.fetch("""
+                SELECT m."itemKey" as item_key, m."stackId" as stack_id, MAX(s.name) as stack_name,
+                       COUNT(*) as count, AVG(m.value) as mean,
+                       COALESCE(VAR_POP(m.value) * COUNT(*), 0) as m2,
+                       MIN(m.value) as min_value, MAX(m.value) as max_value
+                FROM "Measurement" m
+                LEFT JOIN "Stack" s ON s.id = m."stackId"
+                WHERE m."customerId" = $1
+                  AND m."itemKey" = ANY($2::text[])
+                  AND m.value IS NOT NULL
+                GROUP BY m."itemKey", m."stackId"
+            """, customer_id, item_keys)
+
+        entries = {item_key: {'customer': None, 'stacks': {}, 'stack_ids': {}} for item_key in item_keys}
+        for row in rows:
+            entry = entries[row['item_key']]
+            stats = RunningStats(
+                count=int(row['count']),
+                mean=float(row['mean']),
+                m2=float(row['m2']),
+                min=float(row['min_value']),
+                max=float(row['max_value'])
+            )
+            entry['stacks'][row['stack_id']] = stats
+            entry['stack_ids'][row['stack_id']] = row['stack_id']
+            if row['stack_name']:
+                entry['stack_ids'][row['stack_name']] = row['stack_id']
+        for entry in entries.values():
+            entry['customer'] = combine(list(entry['stacks'].values()))
+
+        if len(self._entries) + len(entries) > self.max_entries:
+            self._entries.clear()
+        now = time.monotonic()
+        for item_key, entry in entries.items():
+            self._entries[(customer_id, item_key)] = (now, entry)
+        return entries
+
+    def invalidate(self, customer_id: str = None, item_key: str = None) -> None:
+        """캐시 무효화 (인자 미지정 시 전체)"""
+        if customer_id is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == customer_id and (item_key is None or k[1] == item_key)]:
+            del self._entries[key]
+
+
+# 프로세스 공용 캐시
+measurement_stats_cache = MeasurementStatsCache()
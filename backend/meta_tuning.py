@@ -0,0 +1,110 @@
+"""
+신규 시계열 하이퍼파라미터 메타 학습 (유사 시계열 기반 초기 시도)
+- 시계열 메타 특성: 길이, 주간 계절성 강도, 추세 강도, 변동성, 1차 자기상관 (분해 1회, 모델 학습 없음)
+- 탐색 이력이 없는 시계열은 이미 탐색된 시계열 중 특성이 가까운 순(항목분류/항목이 같으면 우선)으로
+  최적 파라미터를 첫 시도로 사용 -> automl_engine 이 확인되면 조기 종료
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 계절 주기 (automl_engine m=7 과 동일, 측정 순서 기준)
+SEASON_PERIOD = 7
+
+FEATURE_NAMES = ['length', 'seasonal_strength', 'trend_strength', 'volatility', 'autocorr']
+
+# 첫 시도로 사용할 유사 시계열 수
+META_SEEDS = 3
+
+# 거리 가산점 (표준화 특성 거리 단위): 항목분류가 다르거나 모름 / 항목이 다름
+CLASSIFICATION_PENALTY = 1.0
+ITEM_PENALTY = 0.5
+
+
+def series_features(values) -> Dict[str, float]:
+    """
+    시계열 메타 특성
+
+    - seasonal_strength / trend_strength: 고전적 분해(중심 이동평균 + 주기별 평균) 잔차 분산 비율 (0~1)
+    - volatility: log(1 + 1차 차분 표준편차 / 평균 절대값)
+    """
+    y = np.asarray(values, dtype=float)
+    y = y[np.isfinite(y)]
+    n = len(y)
+    features = dict.fromkeys(FEATURE_NAMES, 0.0)
+    features['length'] = round(float(np.log1p(n)), 4)
+    if n < 2:
+        return features
+
+    scale = float(np.mean(np.abs(y))) + 1e-10
+    features['volatility'] = round(float(np.log1p(np.std(np.diff(y)) / scale)), 4)
+    if np.std(y[:-1]) > 0 and np.std(y[1:]) > 0:
+        features['autocorr'] = round(float(np.corrcoef(y[:-1], y[1:])[0, 1]), 4)
+
+    half = SEASON_PERIOD // 2
+    if n < 2 * SEASON_PERIOD + 1:
+        return features
+    trend = np.convolve(y, np.ones(SEASON_PERIOD) / SEASON_PERIOD, mode='valid')
+    core = y[half:n - half]
+    detrended = core - trend
+    position = np.arange(half, n - half) % SEASON_PERIOD
+    seasonal = np.bincount(position, weights=detrended, minlength=SEASON_PERIOD) / np.bincount(
+        position, minlength=SEASON_PERIOD
+    )
+    seasonal -= seasonal.mean()
+    remainder = detrended - seasonal[position]
+    remainder_var = np.var(remainder)
+    if np.var(detrended) > 0:
+        features['seasonal_strength'] = round(float(max(0.0, 1 - remainder_var / np.var(detrended))), 4)
+    deseasonalized = core - seasonal[position]
+    if np.var(deseasonalized) > 0:
+        features['trend_strength'] = round(float(max(0.0, 1 - remainder_var / np.var(deseasonalized))), 4)
+    return features
+
+
+def nearest_seeds(
+    features: Dict[str, float],
+    item_key: str,
+    classification: Optional[str],
+    candidates: List[Dict[str, Any]],
+    k: int = META_SEEDS
+) -> List[Dict[str, Any]]:
+    """
+    유사 시계열 최적 파라미터 (거리 순, 같은 파라미터는 가장 가까운 것만)
+
+    Args:
+        candidates: id, item_key, classification, features, best_params
+    Returns:
+        [{id, distance, best_params}]
+    """
+    if not candidates:
+        return []
+    matrix = np.array([[c['features'].get(name, 0.0) for name in FEATURE_NAMES] for c in candidates])
+    spread = matrix.std(axis=0)
+    spread[spread == 0] = 1.0
+    target = np.array([features.get(name, 0.0) for name in FEATURE_NAMES])
+    distance = np.sqrt((((matrix - target) / spread) ** 2).sum(axis=1))
+    distance += np.array([
+        (0.0 if classification and c['classification'] == classification else CLASSIFICATION_PENALTY)
+        + (0.0 if c['item_key'] == item_key else ITEM_PENALTY)
+        for c in candidates
+    ])
+
+    seeds, seen = [], set()
+    for index in np.argsort(distance, kind='stable'):
+        candidate = candidates[index]
+        params_key = tuple(sorted(candidate['best_params'].items()))
+        if params_key in seen:
+            continue
+        seen.add(params_key)
+        seeds.append({
+            'id': candidate['id'],
+            'distance': round(float(distance[index]), 4),
+            'best_params': candidate['best_params']
+        })
+        if len(seeds) == k:
+            break
+    return seeds
@@ -0,0 +1,331 @@
+"""
+PDF 용량 최적화 후처리
+- 임베디드 한글 폰트(Noto Sans KR 등) 서브셋: 실제 사용된 글리프만 유지
+  (서브셋 태그 XXXXXX+ 가 없는 전체 폰트만 대상, Chromium(Skia) 출력 폰트는 이미 서브셋되어 건너뜀)
+- 차트 이미지 재압축 (Flate RGB -> JPEG)
+- 중복 리소스(폰트 파일, 이미지) 제거
+"""
+import io
+import hashlib
+import logging
+from typing import Dict, Set, Tuple
+
+import pikepdf
+from pikepdf import Name, Pdf, PdfImage
+from fontTools.ttLib import TTFont
+from fontTools import subset as ft_subset
+
+logger = logging.getLogger(__name__)
+
+# 차트 이미지 JPEG 품질 (보고서 인쇄 품질 유지 범위)
+JPEG_QUALITY = 85
+
+# 이보다 작은 이미지는 재압축하지 않음 (아이콘 등)
+MIN_IMAGE_BYTES = 16 * 1024
+
+# 텍스트 표시 연산자 (Tj, ', ", TJ)
+TEXT_SHOW_OPERATORS = {'Tj', "'", '"', 'TJ'}
+
+
+class PdfOptimizer:
+    """
+    Chromium(page.pdf) 출력 PDF 후처리기
+
+    Features:
+    - Type0/Identity-H 폰트의 사용 글리프 서브셋 (GID 유지, 이미 서브셋된 폰트 제외)
+    - Flate 압축 이미지의 JPEG 재압축
+    - 동일 스트림 중복 제거
+    """
+
+    def __init__(
+        self,
+        subset_fonts: bool = True,
+        recompress_images: bool = True,
+        dedupe_resources: bool = True,
+        jpeg_quality: int = JPEG_QUALITY
+    ):
+        self.subset_fonts = subset_fonts
+        self.recompress_images = recompress_images
+        self.dedupe_resources = dedupe_resources
+        self.jpeg_quality = jpeg_quality
+
+    def optimize(self, pdf_bytes: bytes) -> Tuple[bytes, Dict]:
+        """
+        PDF 최적화 수행
+
+        Args:
+            pdf_bytes: 원본 PDF
+
+        Returns:
+            (최적화된 PDF, 처리 통계)
+        """
+        stats = {
+            'original_size': len(pdf_bytes),
+            'optimized_size': len(pdf_bytes),
+            'reduction_pct': 0.0,
+            'duplicates_removed': 0,
+            'fonts_subset': 0,
+            'images_recompressed': 0
+        }
+
+        with Pdf.open(io.BytesIO(pdf_bytes)) as pdf:
+            removed = {}
+            if self.dedupe_resources:
+                removed = self._dedupe_streams(pdf)
+                stats['duplicates_removed'] = len(removed)
+            if self.subset_fonts:
+                stats['fonts_subset'] = self._subset_fonts(pdf)
+            if self.recompress_images:
+                stats['images_recompressed'] = self._recompress_images(pdf, skip=set(removed))
+
+            pdf.remove_unreferenced_resources()
+
+            output = io.BytesIO()
+            pdf.save(
+                output,
+                compress_streams=True,
+                recompress_flate=True,
+                object_stream_mode=pikepdf.ObjectStreamMode.generate
+            )
+            optimized = output.getvalue()
+
+        # 최적화 결과가 더 크면 원본 유지
+        if len(optimized) >= len(pdf_bytes):
+            logger.info("PDF optimization did not reduce size, keeping original")
+            return pdf_bytes, stats
+
+        stats['optimized_size'] = len(optimized)
+        stats['reduction_pct'] = round((1 - len(optimized) / len(pdf_bytes)) * 100, 1)
+        return optimized, stats
+
+    def _dedupe_streams(self, pdf: Pdf) -> Dict:
+        """
+        내용이 동일한 스트림(폰트 파일, 이미지)을 하나로 통합
+
+        Returns:
+            제거된 스트림 objgen -> 대표 스트림 매핑
+        """
+        canonical = {}
+        duplicates = {}
+
+        for obj in pdf.objects:
+            if not isinstance(obj, pikepdf.Stream):
+                continue
+            header = {k: str(v) for k, v in obj.items() if k != '/Length'}
+            digest = hashlib.sha256(obj.read_raw_bytes())
+            digest.update(repr(sorted(header.items())).encode('utf-8'))
+            key = digest.hexdigest()
+
+            if key in canonical:
+                duplicates[obj.objgen] = canonical[key]
+            else:
+                canonical[key] = obj
+
+        if not duplicates:
+            return duplicates
+
+        # 모든 간접 객체의 참조를 대표 객체로 교체
+        for obj in pdf.objects:
+            if isinstance(obj, (pikepdf.Dictionary, pikepdf.Array, pikepdf.Stream)):
+                self._replace_refs(obj, duplicates)
+        self._replace_refs(pdf.trailer, duplicates)
+
+        return duplicates
+
+    def _replace_refs(self, container, mapping: Dict) -> None:
+        """컨테이너 내부(직접 객체 포함)의 간접 참조를 교체"""
+        if isinstance(container, pikepdf.Array):
+            items = enumerate(list(container))
+        else:
+            items = list(container.items())
+
+        for key, value in items:
+            if not isinstance(value, pikepdf.Object):
+                continue  # 정수/실수 등 스칼라 값
+            if value.is_indirect:
+                if value.objgen in mapping:
+                    container[key] = mapping[value.objgen]
+            elif isinstance(value, (pikepdf.Dictionary, pikepdf.Array)):
+                self._replace_refs(value, mapping)
+
+    def _subset_fonts(self, pdf: Pdf) -> int:
+        """Identity-H 인코딩 Type0 폰트를 사용 글리프만 남기도록 서브셋"""
+        used_gids: Dict[Tuple[int, int], Set[int]] = {}
+        font_files = {}
+        font_dicts = {}
+
+        for page in pdf.pages:
+            self._collect_glyphs(page.obj, page.obj.get('/Resources'), used_gids, font_files, font_dicts, set())
+
+        count = 0
+        for objgen, gids in used_gids.items():
+            font_file = font_files[objgen]
+            try:
+                font = TTFont(io.BytesIO(font_file.read_bytes()))
+                options = ft_subset.Options()
+                options.retain_gids = True  # 콘텐츠 스트림의 GID 유지
+                options.notdef_outline = True
+                options.name_IDs = ['*']
+                options.name_languages = ['*']
+                options.layout_features = []
+                options.hinting = False
+                subsetter = ft_subset.Subsetter(options)
+                subsetter.populate(gids=sorted(gids | {0}))
+                subsetter.subset(font)
+
+                buffer = io.BytesIO()
+                font.save(buffer)
+                data = buffer.getvalue()
+            except Exception as e:
+                logger.warning(f"Font subset failed: {e}")
+                continue
+
+            font_file.write(data)
+            if '/Length1' in font_file:
+                font_file.Length1 = len(data)
+
+            # 서브셋 폰트 명명 규칙 (ABCDEF+FontName)
+            tag = self._subset_tag(gids)
+            for font_dict in font_dicts[objgen].values():
+                self._tag_font_name(font_dict, tag)
+            count += 1
+
+        return count
+
+    def _collect_glyphs(self, owner, resources, used_gids, font_files, font_dicts, visited) -> None:
+        """콘텐츠 스트림을 파싱해 폰트별 사용 GID 수집 (Form XObject 재귀)"""
+        if resources is None or owner.objgen in visited:
+            return
+        visited.add(owner.objgen)
+
+        fonts = {}
+        for name, font in resources.get('/Font', {}).items():
+            font_file, cid_to_gid = self._subsettable_font_file(font)
+            if font_file is not None:
+                fonts[name] = (font, font_file, cid_to_gid)
+
+        current = None
+        for operands, operator in pikepdf.parse_content_stream(owner):
+            op = str(operator)
+            if op == 'Tf':
+                current = fonts.get(str(operands[0]))
+            elif op == 'Do':
+                xobject = resources.get('/XObject', {}).get(str(operands[0]))
+                if xobject is not None and xobject.get('/Subtype') == Name.Form:
+                    self._collect_glyphs(
+                        xobject, xobject.get('/Resources', resources),
+                        used_gids, font_files, font_dicts, visited
+                    )
+            elif op in TEXT_SHOW_OPERATORS and current is not None:
+                font, font_file, cid_to_gid = current
+                gids = used_gids.setdefault(font_file.objgen, set())
+                font_files[font_file.objgen] = font_file
+                font_dicts.setdefault(font_file.objgen, {})[font.objgen] = font
+
+                strings = operands[-1] if op == 'TJ' else [operands[-1]]
+                for item in strings:
+                    if isinstance(item, pikepdf.String):
+                        raw = bytes(item)
+                        for i in range(0, len(raw) - 1, 2):
+                            cid = (raw[i] << 8) | raw[i + 1]
+                            gids.add(cid_to_gid(cid))
+
+    def _subsettable_font_file(self, font):
+        """서브셋 가능한 폰트 파일 스트림과 CID->GID 변환 함수 반환"""
+        if font.get('/Subtype') != Name.Type0 or font.get('/Encoding') != Name('/Identity-H'):
+            return None, None
+        if '+' in str(font.get('/BaseFont', ''))[:8]:
+            return None, None  # 이미 서브셋된 폰트
+
+        descendant = font.DescendantFonts[0]
+        descriptor = descendant.get('/FontDescriptor')
+        if descriptor is None:
+            return None, None
+
+        font_file = descriptor.get('/FontFile2')
+        if font_file is None:
+            font_file = descriptor.get('/FontFile3')
+            if font_file is None or font_file.get('/Subtype') != Name.OpenType:
+                return None, None
+
+        cid_map = descendant.get('/CIDToGIDMap')
+        if isinstance(cid_map, pikepdf.Stream):
+            table = cid_map.read_bytes()
+
+            def cid_to_gid(cid):
+                idx = cid * 2
+                if idx + 1 < len(table):
+                    return (table[idx] << 8) | table[idx + 1]
+                return 0
+        else:
+            def cid_to_gid(cid):
+                return cid
+
+        return font_file, cid_to_gid
+
+    def _subset_tag(self, gids: Set[int]) -> str:
+        """글리프 집합 기반 6자 서브셋 태그 생성"""
+        digest = hashlib.md5(','.join(map(str, sorted(gids))).encode('utf-8')).digest()
+        return ''.join(chr(ord('A') + b % 26) for b in digest[:6])
+
+    def _tag_font_name(self, font, tag: str) -> None:
+        """Type0 폰트, 하위 CIDFont, FontDescriptor 이름에 서브셋 태그 부여"""
+        base = str(font.BaseFont).lstrip('/')
+        tagged = Name('/' + f"{tag}+{base}")
+        font.BaseFont = tagged
+
+        descendant = font.DescendantFonts[0]
+        descendant.BaseFont = tagged
+        if '/FontDescriptor' in descendant:
+            descendant.FontDescriptor.FontName = tagged
+
+    def _recompress_images(self, pdf: Pdf, skip: Set = None) -> int:
+        """Flate 압축된 8bit RGB/Gray 이미지를 JPEG으로 재압축"""
+        # 알파 채널(SMask)로 쓰이는 이미지와 중복 제거된 이미지는 제외
+        mask_ids = set(skip or ())
+        for obj in pdf.objects:
+            if isinstance(obj, pikepdf.Stream) and '/SMask' in obj:
+                mask_ids.add(obj.SMask.objgen)
+
+        count = 0
+        for obj in pdf.objects:
+            if not isinstance(obj, pikepdf.Stream) or obj.get('/Subtype') != Name.Image:
+                continue
+            if obj.objgen in mask_ids or obj.get('/Filter') != Name.FlateDecode:
+                continue
+            if obj.get('/BitsPerComponent') != 8 or '/Mask' in obj:
+                continue
+
+            raw_size = len(obj.read_raw_bytes())
+            if raw_size < MIN_IMAGE_BYTES:
+                continue
+
+            try:
+                image = PdfImage(obj).as_pil_image()
+                if image.mode not in ('RGB', 'L'):
+                    image = image.convert('RGB')
+
+                buffer = io.BytesIO()
+                image.save(buffer, format='JPEG', quality=self.jpeg_quality, optimize=True)
+                jpeg = buffer.getvalue()
+            except Exception as e:
+                logger.warning(f"Image recompression failed: {e}")
+                continue
+
+            if len(jpeg) >= raw_size:
+                continue
+
+            obj.write(jpeg, filter=Name.DCTDecode)
+            obj.ColorSpace = Name.DeviceRGB if image.mode == 'RGB' else Name.DeviceGray
+            obj.BitsPerComponent = 8
+            for key in ('/DecodeParms', '/Decode'):
+                if key in obj:
+                    del obj[key]
+            count += 1
+
+        return count
+
+
+def optimize_pdf(pdf_bytes: bytes, **options) -> Tuple[bytes, Dict]:
+    """PDF 최적화 편의 함수"""
+    return PdfOptimizer(**options).optimize(pdf_bytes)
@@ -0,0 +1,222 @@
+"""
+배출농도 분위수 스케치 (병합형 t-digest)
+- 굴뚝/항목별 측정값 분포를 중심점(centroid) 최대 약 COMPRESSION 개로 요약 (메모리 일정)
+- 굴뚝 간 / 고객사 간 스케치 병합 후 중앙값, 90/99 분위수 등 근사 조회
+- 중심점 크기를 k1 척도(arcsin)로 제한하여 꼬리 구간(상위/하위 분위수)일수록 정밀
+- 중심점이 모두 1건이면(소량 데이터) np.percentile 과 동일한 값
+- DB("series_quantile_sketches" 테이블)에 저장하여 재시작 후에도 신규 측정분만 반영
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from stack_state_store import StackStateStore
+
+# 압축 계수 (중심점 수 상한 ≈ COMPRESSION, 중앙값 부근 순위 오차 ≈ 0.8 / COMPRESSION)
+COMPRESSION = 200
+
+# 압축 전 버퍼에 쌓아두는 최대 값 수 (COMPRESSION 배수)
+BUFFER_FACTOR = 5
+
+STATE_VERSION = 1
+
+
+class QuantileSketch:
+    """
+    병합형 t-digest
+
+    - means / weights: 평균값 순 중심점
+    - count / min / max: 전체 건수, 정확한 최솟값/최댓값
+    - 추가된 값은 버퍼에 모았다가 일괄 정렬/압축 (벡터 연산)
+    """
+
+    def __init__(self, compression: int = COMPRESSION):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+
+    def add(self, values) -> "QuantileSketch":
+        """측정값 일괄 추가 (NaN/무한대 제외)"""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+        self._buffer.append(values)
+        self._buffered += len(values)
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self._buffered >= self.compression * BUFFER_FACTOR:
+            self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """다른 스케치 병합 (굴뚝 간 / 고객사 간 공용, other 는 변경하지 않음)"""
+        if other.count == 0:
+            return self
+        self._compress(*other.centroids())
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def centroids(self) -> Tuple[np.ndarray, np.ndarray]:
+        """중심점 + 압축 전 버퍼 값(가중치 1) 복사본 (스케치 상태는 그대로)"""
+        means = np.concatenate([self.means] + self._buffer)
+        weights = np.concatenate([self.weights] + [np.ones(len(b)) for b in self._buffer])
+        return means, weights
+
+    def _compress(self, extra_means: np.ndarray = None, extra_weights: np.ndarray = None) -> None:
+        """
+        버퍼(및 병합 대상 중심점)를 기존 중심점과 합쳐 재압축
+
+        중심점 왼쪽 경계의 누적 비율 q 를 k1 척도 k(q) = δ·(asin(2q-1)/π + 1/2) 로 변환해
+        정수 구간이 같은 값끼리 묶음 → 중심점 하나가 차지하는 k 폭 ≤ 1 (+ 마지막 값 가중치)
+        """
+        if not self._buffer and extra_means is None:
+            return
+
+        parts_m = [self.means] + self._buffer
+        parts_w = [self.weights] + [np.ones(len(b)) for b in self._buffer]
+        if extra_means is not None:
+            parts_m.append(extra_means)
+            parts_w.append(extra_weights)
+        means = np.concatenate(parts_m)
+        weights = np.concatenate(parts_w)
+        self._buffer = []
+        self._buffered = 0
+
+        order = np.argsort(means, kind='stable')
+        means = means[order]
+        weights = weights[order]
+
+        total = weights.sum()
+        left = (np.cumsum(weights) - weights) / total
+        k = self.compression * (np.arcsin(np.clip(2 * left - 1, -1.0, 1.0)) / np.pi + 0.5)
+        groups = np.floor(k).astype(np.int64)
+
+        starts = np.flatnonzero(np.concatenate(([True], groups[1:] != groups[:-1])))
+        new_weights = np.add.reduceat(weights, starts)
+        new_means = np.add.reduceat(means * weights, starts) / new_weights
+        # 부동소수 오차로 인한 역전 방지
+        self.means = np.maximum.accumulate(new_means)
+        self.weights = new_weights
+
+    def _positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        보간 기준점 (정렬 순위 위치 0..n-1, 값)
+        - 중심점은 자신이 차지하는 순위 구간의 가운데에 위치
+        - 양 끝은 정확한 최솟값/최댓값으로 고정
+        """
+        self._compress()
+        centers = np.cumsum(self.weights) - self.weights + (self.weights - 1) / 2
+        xs, ys = centers, self.means
+        if centers[0] > 0:
+            xs, ys = np.concatenate(([0.0], xs)), np.concatenate(([self.min], ys))
+        if centers[-1] < self.count - 1:
+            xs, ys = np.concatenate((xs, [self.count - 1.0])), np.concatenate((ys, [self.max]))
+        return xs, ys
+
+    def quantile(self, q):
+        """
+        분위수 근사 (np.percentile 의 선형 보간 정의, q: 0~1, 배열 가능)
+        """
+        if self.count == 0:
+            raise ValueError("빈 스케치는 분위수를 계산할 수 없습니다.")
+        xs, ys = self._positions()
+        result = np.interp(np.asarray(q, dtype=float) * (self.count - 1), xs, ys)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def count_above(self, threshold: float) -> int:
+        """기준값 초과 건수 근사 (SeriesStats.count_above 대응)"""
+        if self.count == 0 or threshold >= self.max:
+            return 0
+        if threshold < self.min:
+            return self.count
+        xs, ys = self._positions()
+        i = int(np.searchsorted(ys, threshold, side='right'))
+        # ys[i-1] <= threshold < ys[i] 구간 선형 보간 (양 끝 고정점이 있으므로 0 < i < len)
+        fraction = (threshold - ys[i - 1]) / (ys[i] - ys[i - 1])
+        position = xs[i - 1] + (xs[i] - xs[i - 1]) * fraction
+        return int(self.count - (np.floor(position) + 1))
+
+    def fingerprint(self) -> str:
+        """섹션 캐시 키용 식별값"""
+        self._compress()
+        return f"{self.count}:{len(self.means)}:{float(self.means @ self.weights) if self.count else 0.0:.6f}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._compress()
+        return {
+            'version': STATE_VERSION,
+            'compression': self.compression,
+            'count': self.count,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'means': self.means.tolist(),
+            'weights': self.weights.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional["QuantileSketch"]:
+        """저장된 상태 복원 (버전/압축 계수가 다르면 None → 재계산)"""
+        if data.get('version') != STATE_VERSION or data.get('compression') != COMPRESSION:
+            return None
+        sketch = cls(data['compression'])
+        sketch.count = int(data['count'])
+        if sketch.count:
+            sketch.min = float(data['min'])
+            sketch.max = float(data['max'])
+            sketch.means = np.asarray(data['means'], dtype=float)
+            sketch.weights = np.asarray(data['weights'], dtype=float)
+        return sketch
+
+
+def merge_sketches(sketches: Sequence[QuantileSketch]) -> QuantileSketch:
+    """여러 스케치 병합 (중심점을 한 번에 모아 1회 압축, 입력 스케치는 변경하지 않음)"""
+    merged = QuantileSketch()
+    parts = [s for s in sketches if s.count > 0]
+    if not parts:
+        return merged
+    means, weights = zip(*(s.centroids() for s in parts))
+    merged._compress(np.concatenate(means), np.concatenate(weights))
+    merged.count = sum(s.count for s in parts)
+    merged.min = min(s.min for s in parts)
+    merged.max = max(s.max for s in parts)
+    return merged
+
+
+class QuantileSketchStore(StackStateStore):
+    """
+    굴뚝/항목별 분위수 스케치 저장소 (메모리 + DB, 갱신 기준은 stack_state_store 참고)
+    - 기존 행이 수정되면(행 체크섬 불일치) 해당 굴뚝 재계산 (스케치는 값 제거 불가)
+    """
+
+    def __init__(self):
+        super().__init__(
+            table='series_quantile_sketches',
+            label='quantile sketches',
+            columns={'value': 'value'},
+            state_type=QuantileSketch,
+            apply_rows=lambda sketch, rows: sketch.add([row['value'] for row in rows])
+        )
+
+    async def get(
+        self,
+        conn,
+        customer_id: str,
+        item_key: str,
+        stack_ids: Optional[List[str]] = None
+    ) -> QuantileSketch:
+        """고객사/항목(선택적으로 굴뚝 한정)의 병합된 스케치"""
+        stacks = await self.get_stacks(conn, customer_id, item_key, stack_ids)
+        return merge_sketches(list(stacks.values()))
+
+
+# 프로세스 공용 저장소
+quantile_sketch_store = QuantileSketchStore()
@@ -0,0 +1,92 @@
+"""
+인사이트 보고서 PDF 렌더링 (Playwright Chromium)
+- 보고서 HTML(narrative) -> A4 PDF -> 용량 최적화(pdf_optimizer) -> Base64
+- 여러 보고서를 렌더링할 때는 브라우저 1개를 재사용
+- 최적화(폰트 서브셋, 이미지 재압축)는 CPU 작업이므로 스레드 풀에서 실행 (이벤트 루프 비차단)
+"""
+import asyncio
+import base64
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PAGE_MARGIN = {'top': '25mm', 'right': '20mm', 'bottom': '25mm', 'left': '20mm'}
+
+
+def wrap_html(narrative: str) -> str:
+    """보고서 본문을 인쇄용 HTML 문서로 감쌈"""
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <style>
+            @page {{
+                margin: 25mm 20mm;
+                size: A4;
+            }}
+            body {{
+                font-family: 'Malgun Gothic', 'Noto Sans KR', sans-serif;
+                margin: 0;
+                padding: 0;
+            }}
+        </style>
+    </head>
+    <body>
+        {narrative}
+    </body>
+    </html>
+    """
+
+
+def _optimize(pdf_bytes: bytes) -> Tuple[bytes, Optional[Dict]]:
+    """PDF 용량 최적화 (폰트 서브셋, 이미지 재압축, 중복 리소스 제거), 실패 시 원본 사용"""
+    try:
+        from pdf_optimizer import optimize_pdf
+        pdf_bytes, optimization = optimize_pdf(pdf_bytes)
+        logger.info(
+            f"PDF optimized: {optimization['original_size']} -> "
+            f"{optimization['optimized_size']} bytes "
+            f"(-{optimization['reduction_pct']}%)"
+        )
+        return pdf_bytes, optimization
+    except Exception as optimize_error:
+        logger.warning(f"PDF optimization failed, using original PDF: {optimize_error}")
+        return pdf_bytes, None
+
+
+async def render_pdfs(narratives: List[str]) -> List[Tuple[str, Optional[Dict]]]:
+    """
+    보고서 HTML 목록 -> (PDF Base64, 최적화 정보) 목록
+
+    Raises:
+        ValueError: 빈 PDF 생성
+    """
+    from playwright.async_api import async_playwright
+
+    results = []
+    loop = asyncio.get_running_loop()
+    async with async_playwright() as p:
+        logger.info("Launching browser...")
+        browser = await p.chromium.launch()
+        try:
+            page = await browser.new_page()
+            for narrative in narratives:
+                await page.set_content(wrap_html(narrative))
+                pdf_bytes = await page.pdf(format='A4', margin=PAGE_MARGIN, print_background=True)
+                logger.info(f"PDF generated: {len(pdf_bytes)} bytes")
+
+                pdf_bytes, optimization = await loop.run_in_executor(None, _optimize, pdf_bytes)
+                pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
+                if not pdf_base64 or len(pdf_base64) < 100:
+                    raise ValueError("PDF generation failed: Empty or invalid PDF data")
+                results.append((pdf_base64, optimization))
+        finally:
+            await browser.close()
+    return results
+
+
+async def render_pdf(narrative: str) -> Tuple[str, Optional[Dict]]:
+    """보고서 HTML 1건 -> (PDF Base64, 최적화 정보)"""
+    return (await render_pdfs([narrative]))[0]
@@ -0,0 +1,1015 @@
+"""
+인사이트 보고서 HTML 템플릿
+- 섹션별 템플릿을 모듈 로드 시 1회 컴파일 ($변수 자리표시자 -> 렌더 함수)
+- 공통 스타일시트(CSS 클래스)로 요소별 인라인 스타일 제거
+- 변수가 없는 정적 조각은 상수로 캐싱
+"""
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List
+
+# 템플릿 변경 시 증가 (캐시된 보고서 섹션 무효화용)
+TEMPLATE_VERSION = "3"
+
+_PLACEHOLDER = re.compile(r'\$(?:\{([A-Za-z_][A-Za-z0-9_]*)\}|([A-Za-z_][A-Za-z0-9_]*))')
+
+
+class SectionTemplate:
+    """
+    사전 컴파일된 섹션 템플릿
+    - $name / ${name} 자리표시자를 로드 시 분해해 렌더 함수로 컴파일
+    - 렌더링 시 정규식/포맷 파싱 없이 문자열 조각 결합만 수행
+    """
+
+    def __init__(self, text: str):
+        chunks = _PLACEHOLDER.split(text)
+        namespace = {}
+        items = []
+        # split 결과: [리터럴, ${name}, $name, 리터럴, ...]
+        for i in range(0, len(chunks), 3):
+            if chunks[i]:
+                namespace[f"_l{i}"] = chunks[i]
+                items.append(f"_l{i}")
+            if i + 1 < len(chunks):
+                name = chunks[i + 1] or chunks[i + 2]
+                items.append(f"str(c[{name!r}])")
+        source = f"lambda c: ''.join(({', '.join(items)},))"
+        self._render = eval(source, namespace)
+
+    def substitute(self, mapping: Dict = None, **kwargs) -> str:
+        if mapping is None:
+            return self._render(kwargs)
+        if kwargs:
+            return self._render({**mapping, **kwargs})
+        return self._render(mapping)
+
+
+def _compile(text: str) -> SectionTemplate:
+    """섹션 템플릿 컴파일"""
+    return SectionTemplate(text.strip('\n'))
+
+
+# ============================================
+# 공통 스타일시트
+# ============================================
+
+REPORT_STYLESHEET = """<style>
+.rpt-main { font-family: 'Segoe UI', Arial, sans-serif; max-width: 1200px; margin: 0 auto; padding: 20px; }
+.rpt-main h1.rpt-title { color: #1e40af; border-bottom: 3px solid #3b82f6; padding-bottom: 10px; margin-top: 0; }
+.rpt-chart { margin: 20px 0; text-align: center; }
+.rpt-chart h2 { color: #1e40af; margin-bottom: 15px; }
+.rpt-chart img { max-width: 100%; height: auto; border: 1px solid #ddd; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); }
+.rpt-banner { padding: 20px; border-radius: 10px; margin: 20px 0; }
+.rpt-banner h2 { margin: 0; }
+.rpt-banner-primary { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; }
+.rpt-banner-primary h2 { color: white; }
+.rpt-banner-light { background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%); }
+.rpt-center { text-align: center; }
+.rpt-box { border-radius: 10px; padding: 25px; margin: 20px 0; }
+.rpt-box-primary { border: 3px solid #667eea; background-color: #f8f9ff; }
+.rpt-box-success { border: 3px solid #4caf50; background-color: #f1f8f4; }
+.rpt-box-warning { border: 3px solid #ff9800; background-color: #fff8f0; }
+.rpt-box-detail { border: 2px solid #e0e0e0; background-color: #fafafa; }
+.rpt-table { width: 100%; border-collapse: collapse; margin: 15px 0; }
+.rpt-table th, .rpt-table td { padding: 12px; text-align: center; border: 1px solid #ddd; }
+.rpt-table th { background-color: #667eea; color: white; }
+.rpt-table tr { background-color: white; }
+.rpt-table tr.rpt-alt { background-color: #f5f5f5; }
+.rpt-table .rpt-left { text-align: left; }
+.rpt-risk { color: white; padding: 15px; border-radius: 8px; margin: 15px 0; text-align: center; }
+.rpt-risk h3 { margin: 0; font-size: 24px; color: white; }
+.rpt-risk p { margin: 10px 0 0 0; font-size: 18px; }
+.rpt-risk-very-high { background-color: #ff4444; }
+.rpt-risk-high { background-color: #ff9800; }
+.rpt-risk-medium { background-color: #ffc107; }
+.rpt-risk-low { background-color: #4caf50; }
+.rpt-callout { border-left: 4px solid; padding: 15px; margin: 15px 0; }
+.rpt-callout-lg { border-left-width: 5px; padding: 20px; }
+.rpt-callout-danger { background-color: #ffebee; border-left-color: #f44336; }
+.rpt-callout-warning { background-color: #fff3e0; border-left-color: #ff9800; }
+.rpt-callout-caution { background-color: #fffde7; border-left-color: #ffc107; }
+.rpt-callout-ok { background-color: #e8f5e9; border-left-color: #4caf50; }
+.rpt-callout-alert { background-color: #fef2f2; border-left-color: #ef4444; }
+.rpt-callout-good { background-color: #f0fdf4; border-left-color: #10b981; }
+.rpt-card { background-color: #f9fafb; border-left: 4px solid #3b82f6; padding: 15px; margin: 10px 0; }
+.rpt-card h4 { margin-top: 0; }
+.rpt-card-alert { border-left-color: #ef4444; }
+.rpt-steps { line-height: 1.8; }
+.rpt-divider { border: none; border-top: 2px solid #e5e7eb; margin: 30px 0; }
+.rpt-risk-level { font-size: 20px; }
+.rpt-footer { background-color: #f5f5f5; padding: 15px; border-radius: 5px; margin: 20px 0; text-align: center; color: #666; }
+.rpt-c-green { color: #4caf50; }
+.rpt-c-orange { color: #ff9800; }
+.rpt-c-gray { color: #666; }
+.rpt-c-red { color: #ff4444; }
+.rpt-c-alert { color: #ef4444; }
+.rpt-c-good { color: #10b981; }
+</style>"""
+
+
+# ============================================
+# 섹션 템플릿 (사전 컴파일)
+# ============================================
+
+CHART_TEMPLATE = _compile("""
+<div class="rpt-chart">
+<h2>📊 측정 데이터 추이 및 예측</h2>
+<img src="data:image/png;base64,$chart_image" />
+</div>
+""")
+
+EXECUTIVE_SUMMARY_TEMPLATE = _compile("""
+<div class="rpt-main report-main">
+
+<h1 class="rpt-title">📋 $customer - $item 예측 분석 보고서</h1>
+
+$chart_html
+
+<div class="rpt-banner rpt-banner-primary">
+<h2>🎯 종합 분석 결과 (Executive Summary)</h2>
+</div>
+
+<div class="rpt-box rpt-box-primary">
+
+<h3>📊 핵심 요약</h3>
+
+<p><strong>분석 기간</strong>: $historical_period (${data_count}회 측정)<br>
+<strong>예측 기간</strong>: $prediction_period (향후 30일)</p>
+
+<table class="rpt-table">
+<tr><th class="rpt-left">구분</th><th>과거 평균</th><th>예측 평균</th><th>추세</th></tr>
+<tr>
+<td class="rpt-left"><strong>배출 농도</strong></td>
+<td>$historical_mean mg/S㎥</td>
+<td>$prediction_mean mg/S㎥</td>
+<td><strong class="$trend_class">$trend</strong> ($change_rate%)</td>
+</tr>
+</table>
+
+<h3>⚠️ 위험도 평가</h3>
+
+<div class="rpt-risk $risk_class">
+<h3>위험 수준: $risk_level</h3>
+<p>점수: $risk_score/100</p>
+</div>
+
+<p><strong>평가 근거</strong>: $risk_description</p>
+
+</div>
+
+<div class="rpt-box rpt-box-success">
+
+<h3>🔮 AI 예측 결과 요약</h3>
+
+<ul>
+<li><strong>예측 평균 농도</strong>: $prediction_mean mg/S㎥</li>
+<li><strong>예측 범위</strong>: $prediction_min ~ $prediction_max mg/S㎥</li>
+<li><strong>과거 대비 변화</strong>: $change_rate% ($trend)</li>
+<li><strong>불확실성</strong>: ±$uncertainty_avg mg/S㎥</li>
+</ul>
+""")
+
+PREDICTION_TREND_TEMPLATES = {
+    "상승": _compile("""
+<p><strong>해석</strong>: AI 모델은 향후 30일간 배출 농도가 과거 평균($historical_mean mg/S㎥) 대비 <strong>$change_rate% 상승</strong>할 것으로 예측합니다.
+현재 추세가 지속될 경우 배출 농도가 점진적으로 증가할 수 있으므로, 사전 대응이 필요합니다.</p>
+"""),
+    "하락": _compile("""
+<p><strong>해석</strong>: AI 모델은 향후 30일간 배출 농도가 과거 평균($historical_mean mg/S㎥) 대비 <strong>$change_rate% 하락</strong>할 것으로 예측합니다.
+현재의 배출 저감 노력이 지속적인 효과를 나타낼 것으로 판단됩니다.</p>
+"""),
+    "안정": _compile("""
+<p><strong>해석</strong>: AI 모델은 향후 30일간 배출 농도가 과거 평균($historical_mean mg/S㎥) 대비 <strong>안정적으로 유지</strong>될 것으로 예측합니다 (변화율: $change_rate%).
+현재 수준의 배출 관리를 지속하시면 됩니다.</p>
+"""),
+}
+
+LIMIT_TABLE_TEMPLATE = _compile("""
+<h3>📋 배출허용기준 대비</h3>
+
+<table class="rpt-table">
+<tr><th class="rpt-left">항목</th><th>값</th></tr>
+<tr><td class="rpt-left">배출허용기준</td><td><strong>$limit_value mg/S㎥</strong></td></tr>
+<tr class="rpt-alt"><td class="rpt-left">기준 초과 예상 일수</td><td><strong>${exceed_days}일 / 30일</strong></td></tr>
+<tr><td class="rpt-left">기준 초과 확률</td><td><strong class="$exceed_class">$exceed_probability%</strong></td></tr>
+</table>
+""")
+
+LIMIT_SIMULATION_TEMPLATE = _compile("""
+<table class="rpt-table">
+<tr><th class="rpt-left">경로 시뮬레이션 (${paths}회)</th><th>값</th></tr>
+<tr><td class="rpt-left">기간 내 1회 이상 초과 확률</td><td><strong class="$any_class">$any_exceed_probability%</strong></td></tr>
+<tr class="rpt-alt"><td class="rpt-left">기대 초과 일수</td><td><strong>${expected_exceed_days}일</strong></td></tr>
+<tr><td class="rpt-left">일별 최대 초과 확률</td><td><strong>$max_daily_probability%</strong></td></tr>
+</table>
+""")
+
+LIMIT_INTERPRETATION_TEMPLATES = {
+    "danger": _compile("""
+<div class="rpt-callout rpt-callout-danger">
+<strong>⚠️ 주의</strong>: 예측 기간 중 ${exceed_days}일 동안 배출허용기준을 초과할 것으로 예상됩니다.
+이는 전체 기간의 $exceed_probability%에 해당하는 높은 비율입니다.
+배출 저감 조치를 즉시 시행하여 기준 초과를 방지해야 합니다.
+</div>
+"""),
+    "warning": _compile("""
+<div class="rpt-callout rpt-callout-warning">
+<strong>주의</strong>: 예측 기간 중 일부 기간(${exceed_days}일)에 배출허용기준 초과 가능성이 있습니다.
+기준 초과 확률이 $exceed_probability%로 나타나, 예방적 관리가 필요합니다.
+</div>
+"""),
+    "caution": _compile("""
+<div class="rpt-callout rpt-callout-caution">
+예측 기간 중 소수의 일자(${exceed_days}일)에서 기준 초과 가능성이 있으나, 전체적으로는 안정적입니다.
+정기적인 모니터링을 통해 관리하시면 됩니다.
+</div>
+"""),
+    "ok": _compile("""
+<div class="rpt-callout rpt-callout-ok">
+<strong>✅ 양호</strong>: 예측 기간 전체에서 배출허용기준 이내로 유지될 것으로 예상됩니다.
+현재의 배출 관리 수준이 우수한 것으로 평가됩니다.
+</div>
+"""),
+}
+
+HISTORICAL_TEMPLATE = _compile("""
+<hr class="rpt-divider">
+
+<div class="rpt-banner rpt-banner-light">
+<h2>📑 상세 분석 (Detailed Analysis)</h2>
+</div>
+
+<div class="rpt-box rpt-box-detail">
+
+<h2>📈 과거 데이터 분석</h2>
+
+<h3>분석 기간</h3>
+<p>$period (${data_count}회 측정)</p>
+
+<h3>측정 현황 상세</h3>
+<ul>
+<li><strong>평균 농도</strong>: $average mg/S㎥</li>
+<li><strong>표준편차</strong>: $std_dev mg/S㎥</li>
+<li><strong>최소값</strong>: $min mg/S㎥</li>
+<li><strong>최대값</strong>: $max mg/S㎥</li>
+<li><strong>중앙값</strong>: $median mg/S㎥</li>
+<li><strong>변동성</strong>: $volatility</li>
+</ul>
+
+<h3>해석</h3>
+<p>분석 기간 동안 총 ${data_count}회의 측정이 이루어졌습니다.
+평균 배출 농도는 $average mg/S㎥이며, 최소 $min mg/S㎥에서 최대 $max mg/S㎥까지 측정되었습니다.</p>
+""")
+
+VOLATILITY_TEMPLATES = {
+    "높음": _compile("""
+<p>데이터의 표준편차가 $std_dev mg/S㎥로, 평균 대비 변동폭이 큰 편입니다.
+이는 배출 농도가 시간에 따라 불규칙하게 변화하고 있음을 의미합니다.
+배출 공정의 안정성을 검토하고, 변동 원인을 파악하는 것이 필요합니다.</p>
+"""),
+    "보통": _compile("""
+<p>데이터의 표준편차가 $std_dev mg/S㎥로, 보통 수준의 변동성을 보이고 있습니다.
+일반적인 배출 패턴으로 판단되며, 현재 관리 수준을 유지하시면 됩니다.</p>
+"""),
+    "낮음": _compile("""
+<p>데이터의 표준편차가 $std_dev mg/S㎥로, 변동폭이 작아 안정적인 배출 상태를 유지하고 있습니다.
+우수한 배출 관리 상태로 평가됩니다.</p>
+"""),
+}
+
+STACK_OVERVIEW_TEMPLATE = _compile("""
+<div class="rpt-box rpt-box-detail">
+
+<h2>🏭 굴뚝별 데이터 기여도 분석</h2>
+
+<h3>개요</h3>
+<p>본 예측은 고객사 전체 굴뚝의 데이터를 통합하여 수행되었습니다.
+각 굴뚝별 데이터 특성과 전체 예측에 미치는 영향을 분석하였습니다.</p>
+
+<h3>전체 통계</h3>
+<ul>
+<li><strong>총 데이터</strong>: ${total_count}건</li>
+<li><strong>평균 농도</strong>: $mean mg/S㎥</li>
+<li><strong>표준편차</strong>: $std mg/S㎥</li>
+<li><strong>중앙값</strong>: $median mg/S㎥</li>
+<li><strong>분석 굴뚝 수</strong>: ${stack_count}개</li>
+</ul>
+
+<h3>굴뚝별 상세 분석 (상위 10개)</h3>
+
+<p>평균 배출 농도가 높은 상위 10개 굴뚝의 상세 정보입니다:</p>
+""")
+
+STACK_CARD_TEMPLATE = _compile("""
+<div class="rpt-card$card_class">
+<h4>$stack_name</h4>
+<ul>
+<li>데이터 건수: ${count}건 (전체의 $contribution_pct%)</li>
+<li>평균 농도: $mean mg/S㎥</li>
+<li>최대 농도: $max mg/S㎥</li>
+<li>전체 평균 대비: $deviation%</li>
+<li>고농도 데이터 비율: $high_ratio%</li>
+$interpretation</ul></div>
+""")
+
+STACK_OUTLIER_TEMPLATE = _compile("""
+<div class="rpt-callout rpt-callout-alert">
+<p><strong class="rpt-c-alert">⚠️ 주의</strong>: ${outlier_names}의 배출 농도가 다른 굴뚝들에 비해 현저히 높습니다.</p>
+
+<p><strong>예측에 미치는 영향</strong>:</p>
+<ul>
+<li>이러한 고농도 굴뚝의 데이터가 전체 예측값을 상승시키고 있습니다.</li>
+<li>만약 이들 굴뚝의 배출 농도가 개선된다면, 전체 예측값도 크게 낮아질 것으로 예상됩니다.</li>
+<li>반대로 이들 굴뚝의 배출이 더 악화된다면, 전체 예측값이 더욱 상승할 수 있습니다.</li>
+</ul>
+
+<p><strong>권장 조치</strong>:</p>
+<ol>
+<li><strong>우선 관리 대상</strong>: 고농도 굴뚝을 우선적으로 관리하시기 바랍니다.</li>
+<li><strong>원인 분석</strong>: 해당 굴뚝의 배출 저감 설비 상태, 공정 조건 등을 점검하세요.</li>
+<li><strong>집중 모니터링</strong>: 고농도 굴뚝의 측정 빈도를 증가시켜 변화를 면밀히 관찰하세요.</li>
+<li><strong>개선 효과</strong>: 이들 굴뚝의 배출을 개선하면 전체 배출 수준이 크게 향상될 것입니다.</li>
+</ol>
+</div>
+""")
+
+TREND_TEMPLATE = _compile("""
+<div class="rpt-box rpt-box-detail">
+
+<h2>📉 트렌드 변화 분석</h2>
+
+<h3>과거 vs 예측 비교</h3>
+<ul>
+<li><strong>과거 평균</strong>: $historical_mean mg/S㎥</li>
+<li><strong>예측 평균</strong>: $prediction_mean mg/S㎥</li>
+<li><strong>변화율</strong>: $change_rate%</li>
+<li><strong>추세</strong>: $trend</li>
+</ul>
+
+<h3>해석</h3>
+""")
+
+TREND_INTERPRETATION_TEMPLATES = {
+    "상승": _compile("""
+<p>과거 평균($historical_mean mg/S㎥) 대비 예측 평균($prediction_mean mg/S㎥)이 <strong>$change_rate% 상승</strong>할 것으로 예측됩니다.
+배출 농도가 증가하는 추세이므로, 원인 분석과 사전 대응이 필요합니다.
+배출원의 활동 증가, 저감 설비 효율 저하 등을 점검해야 합니다.</p>
+"""),
+    "하락": _compile("""
+<p>과거 평균($historical_mean mg/S㎥) 대비 예측 평균($prediction_mean mg/S㎥)이 <strong>$change_rate% 하락</strong>할 것으로 예측됩니다.
+배출 저감 노력이 효과를 발휘하고 있는 긍정적인 신호입니다.</p>
+"""),
+    "안정": _compile("""
+<p>과거 평균($historical_mean mg/S㎥) 대비 예측 평균($prediction_mean mg/S㎥)이 <strong>안정적으로 유지</strong>될 것으로 예측됩니다 (변화율: $change_rate%).
+현재의 배출 패턴이 지속될 것으로 예상되므로, 기존 관리 방식을 계속 적용하시면 됩니다.</p>
+"""),
+}
+
+RISK_HEADER_TEMPLATE = _compile("""
+<div class="rpt-box rpt-box-detail">
+
+<h2>⚠️ 종합 위험도 평가</h2>
+
+<h3>위험 수준</h3>
+<p class="rpt-risk-level"><strong>$risk_level</strong> (점수: $risk_score/100)</p>
+
+<h3>평가 근거</h3>
+""")
+
+RISK_BASIS_TEMPLATES = {
+    "매우 높음": _compile("""
+<p>AI 분석 결과, 향후 배출허용기준 초과 가능성이 <strong>매우 높은 것</strong>으로 평가되었습니다.<br>
+$description</p>
+
+<p>이는 다음과 같은 요인들이 복합적으로 작용한 결과입니다:</p>
+<ul>
+<li>예측값이 배출허용기준에 근접하거나 초과</li>
+<li>신뢰구간 상한이 기준을 초과</li>
+<li>상승 추세 지속</li>
+<li>과거 기준 초과 이력 존재</li>
+</ul>
+
+<p><strong>즉각적인 조치가 필요합니다.</strong></p>
+"""),
+    "높음": _compile("""
+<p>AI 분석 결과, 향후 배출허용기준 초과 가능성이 <strong>높은 것</strong>으로 평가되었습니다.<br>
+$description</p>
+
+<p>현재 추세가 지속될 경우 배출허용기준을 초과할 위험이 있으므로, 사전 예방 조치가 필요합니다.</p>
+"""),
+    "보통": _compile("""
+<p>AI 분석 결과, 배출허용기준 초과 가능성이 <strong>보통 수준</strong>으로 평가되었습니다.<br>
+$description</p>
+
+<p>일부 기간에 주의가 필요하나, 전체적으로는 관리 가능한 수준입니다.
+정기적인 모니터링을 통해 상황을 지켜보시기 바랍니다.</p>
+"""),
+    "낮음": _compile("""
+<p>AI 분석 결과, 배출허용기준 초과 가능성이 <strong>낮은 것</strong>으로 평가되었습니다.<br>
+$description</p>
+
+<p>현재의 배출 관리 수준이 우수하며, 향후에도 안정적인 배출 상태가 유지될 것으로 예상됩니다.</p>
+"""),
+}
+
+CORRELATION_CARD_TEMPLATE = _compile("""
+<div class="rpt-card">
+<h4>$var_name</h4>
+<ul>
+<li>상관계수: $coefficient</li>
+<li>상관 강도: $strength</li>
+<li>관계: $direction</li>
+$interpretation</ul></div>
+""")
+
+ANOMALY_CARD_TEMPLATE = _compile("""
+<div class="rpt-card">
+<h4>$var_name</h4>
+<ul>
+<li>평상시 평균: $normal_avg</li>
+<li>고농도 시 평균: $high_avg</li>
+<li>차이: $difference%</li>
+$interpretation</ul></div>
+""")
+
+MAJOR_FACTORS_TEMPLATE = _compile("""
+<p>고농도 배출 시 $factors 등의 환경 조건이 평상시와 크게 달랐습니다.
+이러한 환경 조건이 배출 농도 증가의 주요 원인으로 작용했을 가능성이 높습니다.
+해당 조건이 예상될 때는 사전에 배출 저감 조치를 강화하시기 바랍니다.</p>
+""")
+
+FACTOR_TEMPLATE = _compile("""
+<h3>$index. $factor (영향도: $impact)</h3>
+<p>$description</p>
+
+""")
+
+ACCURACY_TEMPLATE = _compile("""
+<div class="rpt-box rpt-box-detail">
+
+<h2>📐 모델 정확도 평가</h2>
+
+<h3>정확도 지표</h3>
+<ul>
+<li><strong>RMSE (평균 제곱근 오차)</strong>: $rmse mg/S㎥</li>
+<li><strong>MAE (평균 절대 오차)</strong>: $mae mg/S㎥</li>
+<li><strong>R² (결정계수)</strong>: $r2</li>
+</ul>
+
+<h3>해석</h3>
+""")
+
+ACCURACY_INTERPRETATION_TEMPLATES = {
+    "high": _compile("""
+<p>모델의 R² 값이 $r2로, 데이터 패턴을 <strong>매우 잘 학습</strong>한 것으로 평가됩니다.
+예측 결과를 높은 신뢰도로 활용하실 수 있습니다.
+평균적으로 실제값과 ±$rmse mg/S㎥ 정도의 오차 범위를 보입니다.</p>
+"""),
+    "medium": _compile("""
+<p>모델의 R² 값이 $r2로, 데이터 패턴을 <strong>적절히 학습</strong>한 것으로 평가됩니다.
+예측 결과를 참고 자료로 활용하시되, 실제 측정값과 함께 종합적으로 판단하시기 바랍니다.
+평균적으로 실제값과 ±$rmse mg/S㎥ 정도의 오차 범위를 보입니다.</p>
+"""),
+    "low": _compile("""
+<p>모델의 R² 값이 $r2로, 데이터 패턴 학습이 <strong>보통 수준</strong>입니다.
+배출 농도의 변동성이 크거나 외부 요인의 영향이 복잡한 경우 이러한 결과가 나타날 수 있습니다.
+예측 결과는 추세 파악용 참고 자료로 활용하시고, 실제 측정을 통한 검증을 병행하시기 바랍니다.</p>
+"""),
+    "poor": _compile("""
+<p>모델의 R² 값이 $r2로, 데이터 패턴이 <strong>복잡</strong>한 것으로 나타났습니다.
+이는 배출 농도가 매우 불규칙하거나, 측정 데이터가 부족한 경우 발생할 수 있습니다.
+예측 결과는 대략적인 경향성 파악용으로만 활용하시고, 실제 측정 데이터를 우선적으로 참고하시기 바랍니다.</p>
+"""),
+}
+
+CONCLUSION_TEMPLATES = {
+    "매우 높음": _compile("""
+<div class="rpt-callout rpt-callout-lg rpt-callout-danger">
+
+<p>${customer}의 $item 배출 농도는 향후 30일간 <strong>배출허용기준을 초과할 가능성이 매우 높은 것</strong>으로 분석되었습니다.</p>
+
+<p><strong>주요 발견사항</strong>:</p>
+<ul>
+<li>AI 모델 예측: 기준 초과 확률 $exceed_probability%</li>
+<li>예상 초과 일수: 30일 중 ${exceed_days}일</li>
+<li>위험도 점수: $risk_score/100</li>
+</ul>
+
+<p><strong>제언</strong>: 배출허용기준 초과는 법적 제재 및 환경 피해로 이어질 수 있으므로, <strong>즉각적인 대응이 필요</strong>합니다.
+배출 저감 설비의 긴급 점검, 공정 운영 조건 조정 등을 통해 배출 농도를 낮추는 조치를 시행하시기 바랍니다.</p>
+
+</div>
+"""),
+    "높음": _compile("""
+<div class="rpt-callout rpt-callout-lg rpt-callout-warning">
+
+<p>${customer}의 $item 배출 농도는 향후 30일간 <strong>배출허용기준 초과 가능성이 높은 것</strong>으로 분석되었습니다.</p>
+
+<p><strong>주요 발견사항</strong>:</p>
+<ul>
+<li>현재 추세가 지속될 경우 일부 기간에 기준 초과 위험</li>
+<li>위험도 점수: $risk_score/100</li>
+</ul>
+
+<p><strong>제언</strong>: 사전 예방 조치를 통해 배출허용기준 초과를 방지하시기 바랍니다.
+배출 저감 설비의 정기 점검 일정을 앞당기고, 공정 운영 조건을 재검토하시기를 권장합니다.</p>
+
+</div>
+"""),
+    "보통": _compile("""
+<div class="rpt-callout rpt-callout-lg rpt-callout-caution">
+
+<p>${customer}의 $item 배출 농도는 향후 30일간 <strong>대체로 안정적으로 유지</strong>될 것으로 예상됩니다.</p>
+
+<p><strong>주요 발견사항</strong>:</p>
+<ul>
+<li>일부 기간에는 주의 필요</li>
+<li>위험도 점수: $risk_score/100</li>
+</ul>
+
+<p><strong>제언</strong>: 현재의 배출 관리 수준을 유지하시되, 정기적인 모니터링을 통해 상황을 지속적으로 확인하시기 바랍니다.</p>
+
+</div>
+"""),
+    "낮음": _compile("""
+<div class="rpt-callout rpt-callout-lg rpt-callout-ok">
+
+<p>${customer}의 $item 배출 농도는 향후 30일간 <strong>배출허용기준 이내로 안정적으로 유지</strong>될 것으로 예상됩니다.</p>
+
+<p><strong>주요 발견사항</strong>:</p>
+<ul>
+<li>기준 초과 가능성 매우 낮음</li>
+<li>위험도 점수: $risk_score/100</li>
+<li>현재 배출 관리 수준 우수</li>
+</ul>
+
+<p><strong>제언</strong>: 현재의 배출 관리 수준을 지속적으로 유지하시기 바랍니다.
+정기적인 측정과 설비 점검을 통해 안정적인 배출 상태를 계속 이어가시기를 권장합니다.</p>
+
+</div>
+"""),
+}
+
+FOOTER_TEMPLATE = _compile("""
+</div>
+
+<div class="rpt-footer">
+<p><strong>보고서 생성 시각</strong>: $generated_at<br>
+<strong>분석 모델</strong>: Auto-ARIMA (pmdarima)<br>
+<strong>자동 생성</strong>: 보아스 환경 AI 예측 시스템</p>
+</div>
+
+</div>
+""")
+
+
+# ============================================
+# 정적 조각 (변수 없음, 캐싱)
+# ============================================
+
+BOX_END = "\n</div>\n"
+
+RECOMMENDATION_OPEN = """
+</div>
+
+<div class="rpt-box rpt-box-warning">
+
+<h3>💡 권장 조치사항</h3>
+"""
+
+URGENT_ACTIONS = """
+<li><strong>배출 저감 설비 긴급 점검</strong>: 집진기, 탈황설비 등의 작동 상태 확인</li>
+<li><strong>공정 운영 조건 재검토</strong>: 연료 사용량, 가동 시간 등 조정 검토</li>
+<li><strong>측정 빈도 증가</strong>: 일일 또는 주 2-3회 측정으로 변경</li>
+<li><strong>관련 부서 사전 협의</strong>: 환경안전팀, 생산팀 간 대응 방안 논의</li>
+<li><strong>비상 저감 계획 수립</strong>: 기준 초과 시 즉시 시행할 수 있는 조치 마련</li>
+"""
+
+PREVENTIVE_ACTIONS = """
+<li><strong>정기 점검 강화</strong>: 배출 저감 설비의 정기 점검 주기 준수</li>
+<li><strong>모니터링 지속</strong>: 현재 수준의 측정 빈도 유지</li>
+<li><strong>예방 정비 계획</strong>: 설비 노후화에 대비한 예방 정비 일정 수립</li>
+"""
+
+MAINTAIN_ACTIONS = """
+<li><strong>현재 관리 수준 유지</strong>: 우수한 배출 관리 상태를 지속적으로 유지</li>
+<li><strong>정기 모니터링</strong>: 정기적인 측정과 설비 점검 지속</li>
+<li><strong>예방적 관리</strong>: 안정적인 배출 상태 유지를 위한 예방적 관리</li>
+"""
+
+SUMMARY_ACTIONS = {
+    "urgent": f'<ol class="rpt-steps">{URGENT_ACTIONS}</ol>\n',
+    "preventive": f'<ol class="rpt-steps">{PREVENTIVE_ACTIONS}</ol>\n',
+    "maintain": f'<ol class="rpt-steps">{MAINTAIN_ACTIONS}</ol>\n',
+}
+
+RISK_ACTIONS = {
+    "urgent": f"\n<h3>권장 조치사항</h3>\n<ol>{URGENT_ACTIONS}</ol>\n",
+    "preventive": f"\n<h3>권장 조치사항</h3>\n<ol>{PREVENTIVE_ACTIONS}</ol>\n",
+}
+
+HISTORICAL_TREND_FRAGMENTS = {
+    "증가": """
+<p><strong>추세 분석</strong>: 분석 기간 동안 배출 농도가 <strong>증가하는 추세</strong>를 보이고 있습니다.
+이는 배출원의 활동이 증가하거나, 저감 설비의 효율이 저하되고 있을 가능성을 시사합니다.</p>
+""",
+    "감소": """
+<p><strong>추세 분석</strong>: 분석 기간 동안 배출 농도가 <strong>감소하는 추세</strong>를 보이고 있습니다.
+이는 배출 저감 노력이 효과를 보고 있거나, 배출원의 활동이 감소하고 있음을 의미합니다.</p>
+""",
+    "안정": """
+<p><strong>추세 분석</strong>: 분석 기간 동안 배출 농도가 <strong>안정적으로 유지</strong>되고 있습니다.
+현재의 배출 관리 수준이 적절하게 유지되고 있는 것으로 판단됩니다.</p>
+""",
+}
+
+STACK_SUMMARY_HEADER = "\n<h3>종합 해석 및 예측 영향도</h3>\n"
+
+STACK_BALANCED = """
+<div class="rpt-callout rpt-callout-good">
+<p><strong class="rpt-c-good">✅ 양호</strong>: 모든 굴뚝의 배출 농도가 비교적 균등한 수준을 보이고 있습니다.</p>
+
+<p><strong>예측에 미치는 영향</strong>:</p>
+<ul>
+<li>특정 굴뚝이 전체 예측을 크게 왜곡하는 현상은 없습니다.</li>
+<li>예측값은 전체 굴뚝의 평균적인 배출 패턴을 잘 반영하고 있습니다.</li>
+<li>안정적이고 신뢰할 수 있는 예측 결과로 판단됩니다.</li>
+</ul>
+
+<p><strong>권장 조치</strong>:</p>
+<ul>
+<li>현재의 균등한 배출 관리 수준을 유지하시기 바랍니다.</li>
+<li>정기적인 모니터링을 통해 특정 굴뚝의 배출이 급증하지 않도록 관리하세요.</li>
+</ul>
+</div>
+"""
+
+CORRELATION_OPEN = """
+<div class="rpt-box rpt-box-detail">
+
+<h2>🔬 환경변수 상관관계 분석</h2>
+
+<h3>개요</h3>
+<p>배출 농도와 환경변수(기상 조건, 공정 변수) 간의 상관관계를 분석하여,
+어떤 요인이 배출 농도 변화에 영향을 미치는지 파악하였습니다.</p>
+
+<h3>상관계수 분석</h3>
+"""
+
+CORRELATION_MISSING = "\n환경변수 데이터가 부족하여 상관관계 분석을 수행할 수 없습니다.\n"
+
+ANOMALY_OPEN = """
+<h3>고농도 배출 시 환경 조건 분석</h3>
+
+<p>배출 농도가 높았던 시점(상위 10%)의 환경 조건을 분석하였습니다:</p>
+"""
+
+ANOMALY_SUMMARY_HEADER = "\n<h3>종합 해석</h3>\n"
+
+NO_MAJOR_FACTORS = """
+<p>고농도 배출 시에도 환경 조건이 평상시와 크게 다르지 않았습니다.
+이는 배출 농도 변화가 환경 조건보다는 공정 운영 조건이나 설비 상태 등
+내부 요인에 의해 주로 영향을 받았을 가능성을 시사합니다.</p>
+"""
+
+FACTORS_OPEN = """
+<div class="rpt-box rpt-box-detail">
+
+<h2>🔍 예측 영향 요인 분석</h2>
+
+<p>본 AI 예측 모델은 다음과 같은 요인들을 종합적으로 분석하여 예측 결과를 도출하였습니다:</p>
+"""
+
+CONCLUSION_OPEN = """
+<hr class="rpt-divider">
+
+<div class="rpt-banner rpt-banner-primary rpt-center">
+<h2>📌 보고서 요약</h2>
+</div>
+
+<div class="rpt-box rpt-box-primary">
+
+<h2>💡 종합 결론</h2>
+"""
+
+RISK_CLASSES = {
+    "매우 높음": "rpt-risk-very-high",
+    "높음": "rpt-risk-high",
+    "보통": "rpt-risk-medium",
+}
+
+TREND_CLASSES = {
+    "하락": "rpt-c-green",
+    "상승": "rpt-c-orange",
+}
+
+
+@lru_cache(maxsize=256)
+def _stack_interpretation(is_outlier: bool, deviation: float) -> str:
+    """굴뚝 카드 해석 항목 (입력 조합별 캐싱)"""
+    if is_outlier:
+        lines = ["<li><strong class='rpt-c-alert'>⚠️ 이상치 굴뚝</strong>: 이 굴뚝의 평균 배출 농도가 전체 평균보다 현저히 높습니다.</li>"]
+        if abs(deviation) >= 50:
+            lines.append("<li><strong>영향도</strong>: 이 굴뚝의 데이터가 전체 예측값을 <strong>크게 상승</strong>시키고 있습니다.</li>")
+        else:
+            lines.append("<li><strong>영향도</strong>: 이 굴뚝의 데이터가 전체 예측값을 <strong>일부 상승</strong>시키고 있습니다.</li>")
+        return ''.join(lines)
+    if abs(deviation) >= 20:
+        if deviation > 0:
+            return "<li><strong>특성</strong>: 평균보다 높은 배출 수준을 보이는 굴뚝입니다.</li>"
+        return "<li><strong>특성</strong>: 평균보다 낮은 배출 수준을 보이는 굴뚝입니다.</li>"
+    return "<li><strong>특성</strong>: 전체 평균과 유사한 배출 수준을 보이는 굴뚝입니다.</li>"
+
+
+def _correlation_interpretation(var_name: str, coef: float) -> str:
+    """상관계수 해석 항목"""
+    if abs(coef) >= 0.5:
+        if coef > 0:
+            return f"<li>해석: {var_name}이(가) 높을수록 배출 농도가 증가하는 경향이 강합니다.</li>"
+        return f"<li>해석: {var_name}이(가) 높을수록 배출 농도가 감소하는 경향이 강합니다.</li>"
+    if abs(coef) >= 0.3:
+        if coef > 0:
+            return f"<li>해석: {var_name}이(가) 배출 농도 증가에 일정 부분 영향을 미칩니다.</li>"
+        return f"<li>해석: {var_name}이(가) 배출 농도 감소에 일정 부분 영향을 미칩니다.</li>"
+    return f"<li>해석: {var_name}과(와) 배출 농도 간 상관관계가 약합니다.</li>"
+
+
+def _anomaly_interpretation(var_name: str, diff: float) -> str:
+    """고농도 시 환경 조건 해석 항목"""
+    if abs(diff) >= 20:
+        if diff > 0:
+            return f"<li>해석: 고농도 배출 시 {var_name}이(가) 평상시보다 <strong>{abs(diff):.1f}% 높았습니다</strong>. 이는 주요 영향 요인으로 판단됩니다.</li>"
+        return f"<li>해석: 고농도 배출 시 {var_name}이(가) 평상시보다 <strong>{abs(diff):.1f}% 낮았습니다</strong>. 이는 주요 영향 요인으로 판단됩니다.</li>"
+    if abs(diff) >= 10:
+        return f"<li>해석: 고농도 배출 시 {var_name}에 일부 차이가 있었습니다.</li>"
+    return f"<li>해석: 고농도 배출 시에도 {var_name}은(는) 평상시와 유사한 수준이었습니다.</li>"
+
+
+def _exceed_class(exceed_probability: float) -> str:
+    if exceed_probability > 50:
+        return "rpt-c-red"
+    if exceed_probability > 20:
+        return "rpt-c-orange"
+    return "rpt-c-green"
+
+
+def _action_key(risk_level: str) -> str:
+    if risk_level in ("매우 높음", "높음"):
+        return "urgent"
+    if risk_level == "보통":
+        return "preventive"
+    return "maintain"
+
+
+def render_narrative(
+    customer: str,
+    item: str,
+    historical: Dict,
+    prediction: Dict,
+    trend: Dict,
+    risk: Dict,
+    factors: List[Dict],
+    correlation: Dict,
+    stack_contribution: Dict,
+    metrics: Dict,
+    chart_image: str = None
+) -> str:
+    """보고서 HTML 렌더링 - 두괄식 구조"""
+    parts = [REPORT_STYLESHEET]
+    change_rate = f"{trend['change_rate']:+.1f}"
+
+    # 1. 종합 분석 결과
+    parts.append(EXECUTIVE_SUMMARY_TEMPLATE.substitute(
+        customer=customer,
+        item=item,
+        chart_html=CHART_TEMPLATE.substitute(chart_image=chart_image) if chart_image else "",
+        historical_period=historical['period'],
+        data_count=historical['data_count'],
+        prediction_period=prediction['period'],
+        historical_mean=trend['historical_mean'],
+        prediction_mean=trend['prediction_mean'],
+        trend=trend['trend'],
+        trend_class=TREND_CLASSES.get(trend['trend'], "rpt-c-gray"),
+        change_rate=change_rate,
+        risk_level=risk['level'],
+        risk_class=RISK_CLASSES.get(risk['level'], "rpt-risk-low"),
+        risk_score=risk['score'],
+        risk_description=risk['description'],
+        prediction_min=prediction['min'],
+        prediction_max=prediction['max'],
+        uncertainty_avg=prediction['uncertainty_avg']
+    ))
+    parts.append(PREDICTION_TREND_TEMPLATES.get(trend['trend'], PREDICTION_TREND_TEMPLATES["안정"]).substitute(
+        historical_mean=trend['historical_mean'],
+        change_rate=change_rate
+    ))
+
+    # 배출허용기준 대비 분석
+    if 'limit_value' in prediction:
+        exceed_probability = prediction['exceed_probability']
+        limit_context = dict(
+            limit_value=prediction['limit_value'],
+            exceed_days=prediction['exceed_days'],
+            exceed_probability=exceed_probability,
+            exceed_class=_exceed_class(exceed_probability)
+        )
+        parts.append(LIMIT_TABLE_TEMPLATE.substitute(limit_context))
+        simulation = risk.get('simulation')
+        if simulation:
+            parts.append(LIMIT_SIMULATION_TEMPLATE.substitute(
+                simulation, any_class=_exceed_class(simulation['any_exceed_probability'])
+            ))
+
+        if exceed_probability > 50:
+            level = "danger"
+        elif exceed_probability > 20:
+            level = "warning"
+        elif exceed_probability > 0:
+            level = "caution"
+        else:
+            level = "ok"
+        parts.append(LIMIT_INTERPRETATION_TEMPLATES[level].substitute(limit_context))
+
+    # 2. 권장 조치사항
+    parts.append(RECOMMENDATION_OPEN)
+    parts.append(SUMMARY_ACTIONS[_action_key(risk['level'])])
+    parts.append(BOX_END)
+
+    # 3. 과거 데이터 분석
+    parts.append(HISTORICAL_TEMPLATE.substitute(historical))
+    parts.append(VOLATILITY_TEMPLATES.get(historical['volatility'], VOLATILITY_TEMPLATES["낮음"]).substitute(historical))
+    parts.append(HISTORICAL_TREND_FRAGMENTS.get(historical['trend'], HISTORICAL_TREND_FRAGMENTS["안정"]))
+    parts.append(BOX_END)
+
+    # 4. 굴뚝별 기여도 분석
+    if stack_contribution and stack_contribution.get('stack_count', 0) > 1:
+        parts.append(_render_stack_section(stack_contribution))
+
+    # 5. 트렌드 변화 분석
+    trend_context = dict(
+        historical_mean=trend['historical_mean'],
+        prediction_mean=trend['prediction_mean'],
+        change_rate=change_rate,
+        trend=trend['trend']
+    )
+    parts.append(TREND_TEMPLATE.substitute(trend_context))
+    parts.append(TREND_INTERPRETATION_TEMPLATES.get(trend['trend'], TREND_INTERPRETATION_TEMPLATES["안정"]).substitute(trend_context))
+    parts.append(BOX_END)
+
+    # 6. 종합 위험도 평가
+    parts.append(RISK_HEADER_TEMPLATE.substitute(risk_level=risk['level'], risk_score=risk['score']))
+    parts.append(RISK_BASIS_TEMPLATES.get(risk['level'], RISK_BASIS_TEMPLATES["낮음"]).substitute(description=risk['description']))
+    action_key = _action_key(risk['level'])
+    if action_key in RISK_ACTIONS:
+        parts.append(RISK_ACTIONS[action_key])
+    parts.append(BOX_END)
+
+    # 7. 환경변수 상관관계 분석
+    if correlation:
+        parts.append(_render_correlation_section(correlation))
+
+    # 8. 예측 영향 요인 분석
+    parts.append(FACTORS_OPEN)
+    for i, factor in enumerate(factors, 1):
+        parts.append(FACTOR_TEMPLATE.substitute(
+            index=i,
+            factor=factor['factor'],
+            impact=factor['impact'],
+            description=factor['description']
+        ))
+    parts.append(BOX_END)
+
+    # 9. 모델 정확도 평가
+    parts.append(_render_accuracy_section(metrics))
+
+    # 10. 종합 결론
+    parts.append(CONCLUSION_OPEN)
+    parts.append(CONCLUSION_TEMPLATES.get(risk['level'], CONCLUSION_TEMPLATES["낮음"]).substitute(
+        customer=customer,
+        item=item,
+        exceed_probability=prediction.get('exceed_probability', 0),
+        exceed_days=prediction.get('exceed_days', 0),
+        risk_score=risk['score']
+    ))
+    parts.append(FOOTER_TEMPLATE.substitute(
+        generated_at=datetime.now().strftime("%Y년 %m월 %d일 %H시 %M분")
+    ))
+
+    return ''.join(parts)
+
+
+def _render_stack_section(stack_contribution: Dict) -> str:
+    """굴뚝별 데이터 기여도 분석 섹션"""
+    overall = stack_contribution['overall']
+    stacks = stack_contribution['stacks']
+    outlier_stacks = stack_contribution.get('outlier_stacks', [])
+
+    parts = [STACK_OVERVIEW_TEMPLATE.substitute(
+        total_count=overall['total_count'],
+        mean=overall['mean'],
+        std=overall['std'],
+        median=overall['median'],
+        stack_count=stack_contribution['stack_count']
+    )]
+
+    # 굴뚝을 평균 농도 기준으로 정렬 (상위 10개만 표시)
+    top_stacks = sorted(stacks.items(), key=lambda x: x[1]['mean'], reverse=True)[:10]
+
+    for stack_name, data in top_stacks:
+        parts.append(STACK_CARD_TEMPLATE.substitute(
+            card_class=" rpt-card-alert" if data['is_outlier'] else "",
+            stack_name=stack_name,
+            count=data['count'],
+            contribution_pct=data['contribution_pct'],
+            mean=data['mean'],
+            max=data['max'],
+            deviation=f"{data['deviation_pct']:+.1f}",
+            high_ratio=data['high_ratio'],
+            interpretation=_stack_interpretation(data['is_outlier'], data['deviation_pct'])
+        ))
+
+    parts.append(STACK_SUMMARY_HEADER)
+
+    if outlier_stacks:
+        outlier_names = ', '.join(outlier_stacks[:5])  # 처음 5개만 표시
+        if len(outlier_stacks) > 5:
+            outlier_names += f" 외 {len(outlier_stacks) - 5}개"
+        parts.append(STACK_OUTLIER_TEMPLATE.substitute(outlier_names=outlier_names))
+    else:
+        parts.append(STACK_BALANCED)
+
+    parts.append(BOX_END)
+    return ''.join(parts)
+
+
+def _render_correlation_section(correlation: Dict) -> str:
+    """환경변수 상관관계 분석 섹션"""
+    parts = [CORRELATION_OPEN]
+
+    has_correlation = False
+    for var_name, corr_data in correlation.items():
+        if var_name != 'anomaly_analysis' and isinstance(corr_data, dict):
+            has_correlation = True
+            coef = corr_data['coefficient']
+            parts.append(CORRELATION_CARD_TEMPLATE.substitute(
+                var_name=var_name,
+                coefficient=coef,
+                strength=corr_data['strength'],
+                direction=corr_data['direction'],
+                interpretation=_correlation_interpretation(var_name, coef)
+            ))
+
+    if not has_correlation:
+        parts.append(CORRELATION_MISSING)
+
+    if 'anomaly_analysis' in correlation:
+        anomaly = correlation['anomaly_analysis']
+        parts.append(ANOMALY_OPEN)
+
+        major_factors = []
+        for var_name, data in anomaly.items():
+            diff = data['difference_pct']
+            parts.append(ANOMALY_CARD_TEMPLATE.substitute(
+                var_name=var_name,
+                normal_avg=data['normal_avg'],
+                high_avg=data['high_avg'],
+                difference=f"{diff:+.1f}",
+                interpretation=_anomaly_interpretation(var_name, diff)
+            ))
+            if abs(diff) >= 20:
+                major_factors.append(f"{var_name}({diff:+.1f}%)")
+
+        parts.append(ANOMALY_SUMMARY_HEADER)
+        if major_factors:
+            parts.append(MAJOR_FACTORS_TEMPLATE.substitute(factors=', '.join(major_factors)))
+        else:
+            parts.append(NO_MAJOR_FACTORS)
+
+    parts.append(BOX_END)
+    return ''.join(parts)
+
+
+def _render_accuracy_section(metrics: Dict) -> str:
+    """모델 정확도 평가 섹션"""
+    rmse = metrics.get('rmse', 0)
+    r2 = metrics.get('r2', 0)
+
+    parts = [ACCURACY_TEMPLATE.substitute(
+        rmse=metrics.get('rmse', 'N/A'),
+        mae=metrics.get('mae', 'N/A'),
+        r2=metrics.get('r2', 'N/A')
+    )]
+
+    if r2 > 0.7:
+        level = "high"
+    elif r2 > 0.3:
+        level = "medium"
+    elif r2 > 0:
+        level = "low"
+    else:
+        level = "poor"
+    parts.append(ACCURACY_INTERPRETATION_TEMPLATES[level].substitute(r2=f"{r2:.3f}", rmse=f"{rmse:.2f}"))
+
+    parts.append(BOX_END)
+    return ''.join(parts)
@@ -0,0 +1,203 @@
+"""
+예측 모델 재학습 정책 (잔차 모니터링)
+- 저장된 예측 이후 새 측정값을 같은 날짜의 예측값과 비교 -> 표준화 잔차 (예측 시점별 표준편차 기준)
+- 시계열별 최근 ROLLING_WINDOW 개 잔차의 RMS(rolling error) 가 임계값을 넘거나 모델이 최대 수명을 넘으면 재학습
+- 새 측정이 예측 기간을 벗어나도 재학습 (비교할 예측 없음), 그 외에는 저장된 예측 재사용
+- 판단 결과와 사유는 "retrain_decisions" 에 저장 (같은 예측·같은 데이터 상태의 판단은 1회만)
+"""
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from exceedance_simulation import forecast_variance
+
+logger = logging.getLogger(__name__)
+
+# 재학습 임계값: 표준화 잔차 RMS (모델이 맞으면 약 1)
+DRIFT_THRESHOLD = float(os.getenv('FORECAST_DRIFT_THRESHOLD', '2.0'))
+
+# 모델 최대 수명 (일), 넘으면 잔차와 무관하게 재학습
+MAX_MODEL_AGE_DAYS = float(os.getenv('FORECAST_MAX_AGE_DAYS', '14'))
+
+# rolling error 계산에 쓰는 최근 잔차 수 (주간 계절 1주기) / 판단에 필요한 최소 잔차 수
+ROLLING_WINDOW = 7
+MIN_RESIDUALS = 3
+
+REASON_NO_MODEL = 'no_model'
+REASON_REQUESTED = 'requested'
+REASON_MAX_AGE = 'max_age'
+REASON_HORIZON_EXHAUSTED = 'horizon_exhausted'
+REASON_DRIFT = 'drift'
+REASON_WITHIN_TOLERANCE = 'within_tolerance'
+REASON_TOO_FEW_RESIDUALS = 'too_few_residuals'
+REASON_NO_NEW_DATA = 'no_new_data'
+
+SeriesKey = Tuple[str, str, str]  # (customerId, stackId, itemKey), 굴뚝 '' = 고객사 전체
+
+
+def standardized_residuals(forecast: Dict[str, Any], new_rows: List[Dict[str, Any]]) -> Tuple[np.ndarray, bool]:
+    """
+    새 측정값의 표준화 잔차 (예측 날짜 순, 같은 날 측정은 평균)
+
+    Returns:
+        (잔차, 예측 기간 이후 측정 존재 여부)
+    """
+    predictions = forecast['predictions']
+    steps = {p['date']: i for i, p in enumerate(predictions)}
+    by_date: Dict[str, List[float]] = {}
+    for row in new_rows:
+        if row['value'] is None:
+            continue
+        by_date.setdefault(row['measured_at'].strftime('%Y-%m-%d'), []).append(float(row['value']))
+
+    exhausted = any(date > predictions[-1]['date'] for date in by_date)
+    matched = sorted((steps[date], np.mean(values)) for date, values in by_date.items() if date in steps)
+    if not matched:
+        return np.empty(0), exhausted
+    index = np.array([step for step, _ in matched])
+    actual = np.array([value for _, value in matched])
+    predicted = np.array([predictions[step]['predicted_value'] for step in index])
+    std = np.sqrt(forecast_variance(forecast, len(predictions)))[index]
+    return (actual - predicted) / std, exhausted
+
+
+def evaluate(
+    forecast: Optional[Dict[str, Any]],
+    created_at: Optional[datetime],
+    new_rows: List[Dict[str, Any]],
+    requested: bool = False,
+    now: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    저장된 예측의 재학습 여부 판단
+
+    Args:
+        forecast: 저장된 예측 (predictions, path_model, metrics), 없으면 재학습
+        created_at: 예측 생성 시각
+        new_rows: 예측 학습 이후 측정 (measured_at, value)
+        requested: 사용자가 재학습을 지정한 경우
+    Returns:
+        retrain, reason, rolling_error, residual_count, model_age_days, forecast_created_at, last_measured_at
+    """
+    now = now or datetime.now()
+    decision = {
+        'retrain': True,
+        'reason': REASON_NO_MODEL,
+        'rolling_error': None,
+        'residual_count': 0,
+        'model_age_days': None,
+        'forecast_created_at': created_at,
+        'last_measured_at': max((row['measured_at'] for row in new_rows), default=None)
+    }
+    if forecast is None or not forecast.get('predictions'):
+        return decision
+
+    exhausted = False
+    if new_rows:
+        residuals, exhausted = standardized_residuals(forecast, new_rows)
+        recent = residuals[-ROLLING_WINDOW:]
+        decision['residual_count'] = len(residuals)
+        if len(recent):
+            decision['rolling_error'] = round(float(np.sqrt(np.mean(recent ** 2))), 4)
+    if created_at is not None:
+        decision['model_age_days'] = round((now - created_at).total_seconds() / 86400, 2)
+
+    if requested:
+        decision['reason'] = REASON_REQUESTED
+    elif decision['model_age_days'] is not None and decision['model_age_days'] > MAX_MODEL_AGE_DAYS:
+        decision['reason'] = REASON_MAX_AGE
+    elif exhausted:
+        decision['reason'] = REASON_HORIZON_EXHAUSTED
+    elif decision['residual_count'] >= MIN_RESIDUALS and decision['rolling_error'] > DRIFT_THRESHOLD:
+        decision['reason'] = REASON_DRIFT
+    else:
+        decision['retrain'] = False
+        if not new_rows:
+            decision['reason'] = REASON_NO_NEW_DATA
+        elif decision['residual_count'] < MIN_RESIDUALS:
+            decision['reason'] = REASON_TOO_FEW_RESIDUALS
+        else:
+            decision['reason'] = REASON_WITHIN_TOLERANCE
+    return decision
+
+
+class RetrainDecisionStore:
+    """재학습 판단 이력 ("retrain_decisions")"""
+
+    async def record(self, conn, periods: int, decisions: Dict[SeriesKey, Dict[str, Any]]) -> None:
+        """판단 저장 (같은 예측·최신 측정·사유 조합은 중복 저장하지 않음)"""
+        entries = list(decisions.items())
+        if not entries:
+            return
+        try:
+            await conn.execute("""
+                INSERT INTO "retrain_decisions" (
+                    id, "customerId", "stackId", "itemKey", periods, retrain, reason, "rollingError",
+                    "residualCount", "modelAgeDays", "forecastCreatedAt", "lastMeasuredAt", "createdAt"
+                )
+                SELECT md5(concat_ws(':', c, s, i, $1::int, fc, lm, r)), c, s, i, $1::int, rt, r, e,
+                       n, a, fc, lm, NOW()
+                FROM unnest($2::text[], $3::text[], $4::text[], $5::bool[], $6::text[], $7::float8[],
+                            $8::int[], $9::float8[], $10::timestamp[], $11::timestamp[])
+                    AS d(c, s, i, rt, r, e, n, a, fc, lm)
+                ON CONFLICT (id) DO NOTHING
+            """,
+                periods,
+                [key[0] for key, _ in entries],
+                [key[1] for key, _ in entries],
+                [key[2] for key, _ in entries],
+                [d['retrain'] for _, d in entries],
+                [d['reason'] for _, d in entries],
+                [d['rolling_error'] for _, d in entries],
+                [d['residual_count'] for _, d in entries],
+                [d['model_age_days'] for _, d in entries],
+                [d['forecast_created_at'] for _, d in entries],
+                [d['last_measured_at'] for _, d in entries]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to save retrain decisions: {e}")
+            return
+        retrained = sum(d['retrain'] for _, d in entries)
+        logger.info(f"Retrain decisions: {retrained} retrain, {len(entries) - retrained} reuse")
+
+    async def history(
+        self,
+        conn,
+        customer_id: Optional[str] = None,
+        item_key: Optional[str] = None,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """최근 판단 (생성 역순) + 재학습/재사용 건수, 사유별 건수"""
+        rows = await conn.fetch("""
+            SELECT "customerId" as customer_id, "stackId" as stack_id, "itemKey" as item_key, periods,
+                   retrain, reason, "rollingError" as rolling_error, "residualCount" as residual_count,
+                   "modelAgeDays" as model_age_days, "forecastCreatedAt" as forecast_created_at,
+                   "lastMeasuredAt" as last_measured_at, "createdAt" as created_at
+            FROM "retrain_decisions"
+            WHERE ($1::text IS NULL OR "customerId" = $1)
+              AND ($2::text IS NULL OR "itemKey" = $2)
+            ORDER BY "createdAt" DESC
+            LIMIT $3
+        """, customer_id, item_key, limit)
+        decisions = [dict(row) for row in rows]
+        by_reason: Dict[str, int] = {}
+        for decision in decisions:
+            by_reason[decision['reason']] = by_reason.get(decision['reason'], 0) + 1
+        retrained = sum(decision['retrain'] for decision in decisions)
+        return {
+            'decisions': decisions,
+            'summary': {
+                'retrain': retrained,
+                'reuse': len(decisions) - retrained,
+                'by_reason': by_reason,
+                'drift_threshold': DRIFT_THRESHOLD,
+                'max_model_age_days': MAX_MODEL_AGE_DAYS
+            }
+        }
+
+
+# 재학습 판단 저장소 싱글톤
+retrain_decision_store = RetrainDecisionStore()
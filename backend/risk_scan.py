@@ -0,0 +1,388 @@
+"""
+전체 굴뚝/항목 배출허용기준 초과 위험도 일괄 산정
+- 굴뚝별 기준 예측("stack_forecasts")이 있으면 그 예측으로, 없으면 고객사/항목별 최신 예측("predictions", pooled)으로
+  굴뚝별 적용 기준(limit_index)과 행렬로 묶어 한 번에 채점 (이미 지난 날짜의 예측값은 제외)
+- 채점 기준은 InsightGenerator._assess_risk 와 동일 (예측 초과 40, 상한 초과 30, 상승 추세 20, 과거 초과 10)
+- 결과는 "risk_scan_results" 에 통째로 교체 저장, /api/risk/scan 은 저장된 결과만 조회
+"""
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from emission_limits import limit_index
+
+logger = logging.getLogger(__name__)
+
+# 위험도 산정 기간 (일)
+HORIZON_DAYS = 30
+
+# 위험도 레벨 (하한 점수 내림차순, InsightGenerator._assess_risk 와 동일)
+RISK_LEVELS = [
+    (70, '매우 높음'),
+    (50, '높음'),
+    (30, '보통'),
+    (0, '낮음'),
+]
+LEVEL_NO_LIMIT = '정보없음'
+
+# 채점에 사용한 예측 출처
+SOURCE_STACK = 'stack'
+SOURCE_POOLED = 'pooled'
+
+RESULT_COLUMNS = [
+    'id', 'customerId', 'stackId', 'itemKey', 'forecastId', 'forecastCreatedAt', 'forecastSource', 'horizonDays',
+    'limitValue', 'limitSource', 'score', 'level', 'exceedDays', 'upperExceedDays',
+    'exceedProbability', 'maxPredicted', 'maxRatio', 'historicalExceedRate', 'trendRising',
+    'firstExceedDate', 'scannedAt'
+]
+
+
+def forecast_matrices(forecasts: List[Dict[str, Any]], horizon: int):
+    """
+    예측 목록 -> (예측값, 신뢰상한) 행렬 + 날짜 행렬 + 유효 길이
+    - 기간이 짧은 예측은 NaN 으로 채움
+    """
+    n = len(forecasts)
+    predicted = np.full((n, horizon), np.nan)
+    upper = np.full((n, horizon), np.nan)
+    dates = np.full((n, horizon), None, dtype=object)
+    lengths = np.zeros(n, dtype=int)
+    for i, forecast in enumerate(forecasts):
+        points = forecast['predictions'][:horizon]
+        k = len(points)
+        lengths[i] = k
+        if k == 0:
+            continue
+        predicted[i, :k] = [p['predicted_value'] for p in points]
+        upper[i, :k] = [p['upper_bound'] for p in points]
+        dates[i, :k] = [p['date'] for p in points]
+    return predicted, upper, dates, lengths
+
+
+def score_risk(
+    predicted: np.ndarray,
+    upper: np.ndarray,
+    lengths: np.ndarray,
+    limits: np.ndarray,
+    historical_rates: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    행 단위 위험도 채점 (행마다 예측 1개, 기준 1개)
+
+    Args:
+        predicted, upper: (행 수, 기간) 예측값/신뢰상한 (기간 밖은 NaN)
+        lengths: 행별 유효 예측 길이
+        limits: 행별 적용 기준 (없으면 NaN)
+        historical_rates: 행별 과거 측정 초과 비율 (0~1)
+    """
+    has_limit = ~np.isnan(limits)
+    safe_lengths = np.maximum(lengths, 1)
+    # NaN 비교는 False 이므로 기간 밖/기준 없음은 초과로 세지 않음
+    exceeded = predicted > limits[:, None]
+    exceed_days = exceeded.sum(axis=1)
+    upper_exceed_days = (upper > limits[:, None]).sum(axis=1)
+
+    rows = np.arange(len(lengths))
+    first = predicted[:, 0]
+    last = predicted[rows, np.maximum(lengths - 1, 0)]
+    rising = (lengths > 0) & (last > first)
+
+    score = (
+        exceed_days / safe_lengths * 40
+        + upper_exceed_days / safe_lengths * 30
+        + np.where(rising, 20, 0)
+        + historical_rates * 10
+    )
+    score = np.where(has_limit & (lengths > 0), np.round(score, 1), 0.0)
+
+    level = np.full(len(score), LEVEL_NO_LIMIT, dtype=object)
+    for threshold, name in reversed(RISK_LEVELS):
+        level[has_limit & (score >= threshold)] = name
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        max_predicted = np.nanmax(np.where(lengths[:, None] > 0, predicted, 0.0), axis=1)
+        max_ratio = np.where(has_limit & (limits > 0), max_predicted / limits, np.nan)
+
+    return {
+        'score': score,
+        'level': level,
+        'exceed_days': exceed_days,
+        'upper_exceed_days': upper_exceed_days,
+        'exceed_probability': np.round(exceed_days / safe_lengths * 100, 1),
+        'max_predicted': max_predicted,
+        'max_ratio': max_ratio,
+        'trend_rising': rising,
+        'first_exceed_index': np.where(exceeded.any(axis=1), exceeded.argmax(axis=1), -1)
+    }
+
+
+def upcoming_predictions(data: str, today: str) -> Optional[List[Dict[str, Any]]]:
+    """예측 JSON -> 오늘 이후 예측값 (읽을 수 없으면 None)"""
+    try:
+        predictions = json.loads(data).get('predictions') or []
+    except (TypeError, ValueError, AttributeError):
+        return None
+    return [p for p in predictions if p.get('predicted_value') is not None and p.get('date', '') >= today]
+
+
+async def fetch_latest_forecasts(conn, today: str) -> List[Dict[str, Any]]:
+    """고객사/항목별 최신 예측 (굴뚝 공통, pooled)"""
+    rows = await conn.fetch("""
+        SELECT DISTINCT ON ("customerId", "itemKey")
+            id, "customerId" as customer_id, "itemKey" as item_key, "predictionData", "createdAt" as created_at
+        FROM "predictions"
+        ORDER BY "customerId", "itemKey", "createdAt" DESC
+    """)
+    forecasts = []
+    for row in rows:
+        predictions = upcoming_predictions(row['predictionData'], today)
+        if predictions is None:
+            logger.warning(f"Skipping unreadable forecast {row['id']}")
+            continue
+        forecasts.append({
+            'forecast_id': row['id'],
+            'source': SOURCE_POOLED,
+            'customer_id': row['customer_id'],
+            'stack_id': None,
+            'item_key': row['item_key'],
+            'created_at': row['created_at'],
+            'predictions': predictions
+        })
+    return forecasts
+
+
+async def fetch_stack_forecasts(conn, today: str) -> List[Dict[str, Any]]:
+    """굴뚝/항목별 최신 기준 예측 ("stack_forecasts", 고객사 전체 노드 제외)"""
+    try:
+        rows = await conn.fetch("""
+            SELECT DISTINCT ON ("customerId", "stackId", "itemKey")
+                id, "customerId" as customer_id, "stackId" as stack_id, "itemKey" as item_key,
+                forecast, "createdAt" as created_at
+            FROM stack_forecasts
+            WHERE "stackId" <> ''
+            ORDER BY "customerId", "stackId", "itemKey", "createdAt" DESC
+        """)
+    except Exception as e:
+        logger.warning(f"Stack forecast lookup failed (table may not exist): {e}")
+        return []
+    forecasts = []
+    for row in rows:
+        predictions = upcoming_predictions(row['forecast'], today)
+        if predictions is None:
+            logger.warning(f"Skipping unreadable stack forecast {row['id']}")
+            continue
+        forecasts.append({
+            'forecast_id': row['id'],
+            'source': SOURCE_STACK,
+            'customer_id': row['customer_id'],
+            'stack_id': row['stack_id'],
+            'item_key': row['item_key'],
+            'created_at': row['created_at'],
+            'predictions': predictions
+        })
+    return forecasts
+
+
+async def run_scan(conn, horizon: int = HORIZON_DAYS) -> Dict[str, Any]:
+    """
+    전체 위험도 산정 후 "risk_scan_results" 교체
+
+    Returns:
+        series, forecasts, with_limit, by_level, by_source, seconds
+    """
+    started = time.perf_counter()
+    scanned_at = datetime.now()
+    today = scanned_at.strftime('%Y-%m-%d')
+    forecasts = [
+        f for f in await fetch_stack_forecasts(conn, today) + await fetch_latest_forecasts(conn, today)
+        if f['predictions']
+    ]
+    empty = {'series': 0, 'forecasts': len(forecasts), 'with_limit': 0, 'by_level': {}, 'by_source': {}, 'seconds': 0.0}
+    if not forecasts:
+        return empty
+
+    # 예측이 있는 고객사/항목의 굴뚝 목록 (measurement_stats)
+    pairs = sorted({(f['customer_id'], f['item_key']) for f in forecasts})
+    series = await conn.fetch("""
+        SELECT ms."customerId" as customer_id, ms."stackId" as stack_id, ms."itemKey" as item_key, ms.count
+        FROM measurement_stats ms
+        JOIN unnest($1::text[], $2::text[]) AS f(customer_id, item_key)
+          ON ms."customerId" = f.customer_id AND ms."itemKey" = f.item_key
+        WHERE ms.count > 0
+    """, [c for c, _ in pairs], [i for _, i in pairs])
+    frame = pd.DataFrame([dict(row) for row in series], columns=['customer_id', 'stack_id', 'item_key', 'count'])
+
+    # 굴뚝별 예측 우선, 없으면 고객사 전체 예측 (둘 다 없는 굴뚝은 제외)
+    stack_index = {
+        (f['customer_id'], f['stack_id'], f['item_key']): i for i, f in enumerate(forecasts) if f['source'] == SOURCE_STACK
+    }
+    pooled_index = {
+        (f['customer_id'], f['item_key']): i for i, f in enumerate(forecasts) if f['source'] == SOURCE_POOLED
+    }
+    rows_forecast = np.array([
+        stack_index.get((c, s, i), pooled_index.get((c, i), -1))
+        for c, s, i in zip(frame['customer_id'], frame['stack_id'], frame['item_key'])
+    ], dtype=int)
+    frame = frame[rows_forecast >= 0].reset_index(drop=True)
+    rows_forecast = rows_forecast[rows_forecast >= 0]
+    if len(frame) == 0:
+        return empty
+
+    await limit_index.ensure_loaded(conn)
+    limits, sources = limit_index.resolve_many(
+        frame['item_key'].to_numpy(), frame['customer_id'].to_numpy(), frame['stack_id'].to_numpy()
+    )
+
+    # 과거 측정 초과 건수 (기준 있는 굴뚝만, 1회 집계)
+    has_limit = ~np.isnan(limits)
+    historical_counts = np.zeros(len(frame))
+    if has_limit.any():
+        exceed_rows = await conn.fetch("""
+            SELECT c.stack_id, c.item_key, COUNT(m.id) as exceeded
+            FROM unnest($1::text[], $2::text[], $3::float8[]) AS c(stack_id, item_key, limit_value)
+            JOIN "Measurement" m
+              ON m."stackId" = c.stack_id AND m."itemKey" = c.item_key AND m.value > c.limit_value
+            GROUP BY c.stack_id, c.item_key
+        """,
+            frame['stack_id'][has_limit].tolist(),
+            frame['item_key'][has_limit].tolist(),
+            limits[has_limit].tolist()
+        )
+        exceeded_by_series = {(r['stack_id'], r['item_key']): r['exceeded'] for r in exceed_rows}
+        historical_counts = np.array([
+            exceeded_by_series.get(key, 0) for key in zip(frame['stack_id'], frame['item_key'])
+        ], dtype=float)
+    historical_rates = historical_counts / frame['count'].to_numpy(dtype=float)
+
+    predicted, upper, dates, lengths = forecast_matrices(forecasts, horizon)
+    scored = score_risk(
+        predicted[rows_forecast], upper[rows_forecast], lengths[rows_forecast], limits, historical_rates
+    )
+
+    first_index = scored['first_exceed_index']
+    first_dates = [
+        dates[f, i] if i >= 0 else None for f, i in zip(rows_forecast, first_index)
+    ]
+    records = [
+        (
+            f"{stack_id}:{item_key}", customer_id, stack_id, item_key,
+            forecasts[f]['forecast_id'], forecasts[f]['created_at'], forecasts[f]['source'], int(lengths[f]),
+            None if np.isnan(limit) else float(limit), source,
+            float(score), level, int(exceed_days), int(upper_days),
+            float(probability), float(max_pred), None if np.isnan(ratio) else float(ratio),
+            float(rate), bool(rising), first_date, scanned_at
+        )
+        for customer_id, stack_id, item_key, f, limit, source, score, level, exceed_days, upper_days,
+            probability, max_pred, ratio, rate, rising, first_date in zip(
+            frame['customer_id'], frame['stack_id'], frame['item_key'], rows_forecast, limits, sources,
+            scored['score'], scored['level'], scored['exceed_days'], scored['upper_exceed_days'],
+            scored['exceed_probability'], scored['max_predicted'], scored['max_ratio'],
+            historical_rates, scored['trend_rising'], first_dates
+        )
+    ]
+
+    async with conn.transaction():
+        await conn.execute('DELETE FROM risk_scan_results')
+        await conn.copy_records_to_table('risk_scan_results', records=records, columns=RESULT_COLUMNS)
+
+    levels, counts = np.unique(scored['level'], return_counts=True)
+    sources_used, source_counts = np.unique([forecasts[f]['source'] for f in rows_forecast], return_counts=True)
+    result = {
+        'series': len(records),
+        'forecasts': len(forecasts),
+        'with_limit': int(has_limit.sum()),
+        'by_level': {str(level): int(count) for level, count in zip(levels, counts)},
+        'by_source': {str(source): int(count) for source, count in zip(sources_used, source_counts)},
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+    logger.info(
+        f"Risk scan: {result['series']} series from {result['forecasts']} forecasts "
+        f"({result['with_limit']} with limits) in {result['seconds']}s"
+    )
+    return result
+
+
+# 정렬 가능 컬럼 (요청 키 -> 컬럼)
+SORT_COLUMNS = {
+    'score': 'r.score',
+    'exceed_probability': 'r."exceedProbability"',
+    'max_ratio': 'r."maxRatio"',
+    'historical_exceed_rate': 'r."historicalExceedRate"',
+    'first_exceed_date': 'r."firstExceedDate"',
+}
+
+
+async def query_results(
+    conn,
+    page: int = 1,
+    page_size: int = 50,
+    sort_by: str = 'score',
+    order: str = 'desc',
+    customer_id: Optional[str] = None,
+    item_key: Optional[str] = None,
+    level: Optional[str] = None,
+    min_score: Optional[float] = None,
+    include_no_limit: bool = False
+) -> Dict[str, Any]:
+    """저장된 위험도 결과 페이지 조회 (정렬 + 필터, 전체 건수는 window 로 함께 조회)"""
+    if sort_by not in SORT_COLUMNS:
+        raise ValueError(f"지원하지 않는 정렬 기준입니다: {sort_by} ({', '.join(SORT_COLUMNS)})")
+    if order not in ('asc', 'desc'):
+        raise ValueError("order 는 asc 또는 desc 만 가능합니다.")
+    direction = 'ASC' if order == 'asc' else 'DESC'
+
+    rows = await conn.fetch(f"""
+        SELECT r.*, c.name as customer_name,
+               COALESCE(NULLIF(s."siteName", ''), s.name) as stack_name, i.name as item_name,
+               COUNT(*) OVER() as total
+        FROM risk_scan_results r
+        LEFT JOIN "Customer" c ON c.id = r."customerId"
+        LEFT JOIN "Stack" s ON s.id = r."stackId"
+        LEFT JOIN "Item" i ON i.key = r."itemKey"
+        WHERE ($1::text IS NULL OR r."customerId" = $1)
+          AND ($2::text IS NULL OR r."itemKey" = $2)
+          AND ($3::text IS NULL OR r.level = $3)
+          AND ($4::float8 IS NULL OR r.score >= $4)
+          AND ($5::boolean OR r."limitValue" IS NOT NULL)
+        ORDER BY {SORT_COLUMNS[sort_by]} {direction} NULLS LAST, r.id
+        LIMIT $6 OFFSET $7
+    """, customer_id, item_key, level, min_score, include_no_limit, page_size, (page - 1) * page_size)
+
+    return {
+        'total': rows[0]['total'] if rows else 0,
+        'page': page,
+        'page_size': page_size,
+        'scanned_at': rows[0]['scannedAt'].isoformat() if rows else None,
+        'results': [
+            {
+                'customer_id': row['customerId'],
+                'customer_name': row['customer_name'],
+                'stack_id': row['stackId'],
+                'stack_name': row['stack_name'],
+                'item_key': row['itemKey'],
+                'item_name': row['item_name'],
+                'score': row['score'],
+                'level': row['level'],
+                'limit': row['limitValue'],
+                'limit_source': row['limitSource'],
+                'exceed_days': row['exceedDays'],
+                'upper_exceed_days': row['upperExceedDays'],
+                'horizon_days': row['horizonDays'],
+                'exceed_probability': row['exceedProbability'],
+                'max_predicted': row['maxPredicted'],
+                'max_ratio': row['maxRatio'],
+                'historical_exceed_rate': row['historicalExceedRate'],
+                'trend_rising': row['trendRising'],
+                'first_exceed_date': row['firstExceedDate'],
+                'forecast_id': row['forecastId'],
+                'forecast_source': row['forecastSource'],
+                'forecast_created_at': row['forecastCreatedAt'].isoformat() if row['forecastCreatedAt'] else None
+            }
+            for row in rows
+        ]
+    }
@@ -0,0 +1,330 @@
+"""
+측정값 이상치 검증용 강건 기준선 (굴뚝/항목/월별 중앙값 + MAD)
+- 배출 데이터는 치우친 분포가 많아 평균 ± 2σ 는 오탐/미탐이 잦음
+- (stackId, itemKey) 별 전체 기간(month = 0) 및 월별(1~12) 중앙값/MAD 사전 계산
+- 전체 재계산(backfill)은 정렬 2회로 모든 그룹을 한 번에 계산
+- 증분 갱신: measurement_stats 갱신 시각이 기준선보다 최신인 (굴뚝, 항목)만 재계산
+- 조회는 메모리 dict 상수 시간
+"""
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from measurement_stats import MIN_SAMPLES, RunningStats, bounds as mean_std_bounds
+
+logger = logging.getLogger(__name__)
+
+# 수정 Z-점수 임계값 (Iglewicz & Hoaglin)
+MODIFIED_Z_THRESHOLD = 3.5
+MAD_SCALE = 0.6745
+
+# 월 구분 시간대 (측정시각은 UTC 저장, 월 경계는 한국 시간 기준)
+MONTH_OFFSET_HOURS = 9
+
+CACHE_TTL_SECONDS = 300
+
+
+class Baseline(NamedTuple):
+    """강건 기준선"""
+    count: int
+    median: float
+    mad: float
+
+    @property
+    def bounds(self) -> Tuple[float, float]:
+        """수정 Z-점수 임계값에 해당하는 (하한, 상한), 하한은 0 이상"""
+        half_width = MODIFIED_Z_THRESHOLD * self.mad / MAD_SCALE
+        return max(0.0, self.median - half_width), self.median + half_width
+
+
+def grouped_median_mad(codes: np.ndarray, values: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    그룹별 건수/중앙값/MAD (벡터 연산)
+
+    Args:
+        codes: 그룹 번호 (0 ~ n_groups-1)
+        values: 값
+
+    Returns:
+        (건수, 중앙값, MAD) - 데이터 없는 그룹은 건수 0, NaN
+    """
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    lo = starts + (counts - 1) // 2
+    hi = starts + counts // 2
+
+    def medians(keys: np.ndarray) -> np.ndarray:
+        # 값 기준 정렬 후 그룹 번호로 안정 정렬 (정수 키는 radix sort)
+        order = np.argsort(keys)
+        order = order[np.argsort(codes[order], kind='stable')]
+        ordered = keys[order]
+        result = np.full(n_groups, np.nan)
+        result[present] = (ordered[lo[present]] + ordered[hi[present]]) / 2
+        return result
+
+    median = medians(values)
+    mad = medians(np.abs(values - median[codes]))
+    return counts, median, mad
+
+
+def compute_baselines(
+    pair_index: np.ndarray,
+    months: np.ndarray,
+    values: np.ndarray,
+    n_pairs: int
+) -> Dict[Tuple[int, int], Baseline]:
+    """
+    (굴뚝, 항목) 쌍별 전체 기간 + 월별 기준선 일괄 계산
+
+    Args:
+        pair_index: 행별 (굴뚝, 항목) 쌍 번호
+        months: 행별 월 (1~12)
+        values: 측정값
+    """
+    pair_index = np.asarray(pair_index, dtype=np.int64)
+    months = np.asarray(months, dtype=np.int64)
+    values = np.asarray(values, dtype=float)
+
+    # 전체 기간(month 0)과 월별 그룹을 같은 배열에서 함께 계산
+    codes = np.concatenate((pair_index * 13, pair_index * 13 + months))
+    counts, median, mad = grouped_median_mad(codes, np.concatenate((values, values)), n_pairs * 13)
+
+    baselines = {}
+    for code in np.flatnonzero(counts):
+        baselines[(int(code // 13), int(code % 13))] = Baseline(
+            count=int(counts[code]),
+            median=float(median[code]),
+            mad=float(mad[code])
+        )
+    return baselines
+
+
+def select_baseline(monthly: Optional[Dict[int, Baseline]], month: int) -> Tuple[Optional[Baseline], str]:
+    """
+    월별 -> 전체 기간 순으로 사용 가능한 기준선 선택 (MAD 0 이면 다음 단계)
+
+    Returns:
+        (기준선, 방식) - 방식: 'robust_monthly', 'robust_stack', 'none'
+    """
+    if not monthly:
+        return None, 'none'
+    for key, method in ((month, 'robust_monthly'), (0, 'robust_stack')):
+        baseline = monthly.get(key)
+        if baseline and baseline.count >= MIN_SAMPLES and baseline.mad > 0:
+            return baseline, method
+    return None, 'none'
+
+
+class Bounds(NamedTuple):
+    """검증 범위"""
+    lower: float
+    upper: float
+    center: float
+    count: int
+    method: str
+
+
+def resolve_bounds(
+    monthly: Optional[Dict[int, Baseline]],
+    month: int,
+    fallback: Optional[RunningStats] = None
+) -> Optional[Bounds]:
+    """
+    검증 범위 결정
+    1. 굴뚝/항목 월별 중앙값 ± MAD 기준
+    2. 굴뚝/항목 전체 기간 중앙값 ± MAD 기준
+    3. 고객사 전체 평균 ± 2σ (기존 방식, measurement_stats)
+    """
+    baseline, method = select_baseline(monthly, month)
+    if baseline is not None:
+        lower, upper = baseline.bounds
+        return Bounds(lower, upper, baseline.median, baseline.count, method)
+    if fallback is not None and fallback.count >= MIN_SAMPLES:
+        lower, upper = mean_std_bounds(fallback)
+        return Bounds(lower, upper, fallback.mean, fallback.count, 'mean_std')
+    return None
+
+
+def judge_values(bounds: Sequence[Optional[Bounds]], values: Sequence[Optional[float]]) -> Dict[str, np.ndarray]:
+    """
+    다건 이상치 판정 (벡터 연산)
+
+    Returns:
+        anomaly_detected, skip_reason ('' 판정 / 'insufficient_data' / 'no_value')
+    """
+    n = len(values)
+    lower = np.array([b.lower if b else np.nan for b in bounds], dtype=float)
+    upper = np.array([b.upper if b else np.nan for b in bounds], dtype=float)
+    values = np.array([np.nan if v is None else v for v in values], dtype=float).reshape(n)
+
+    skip_reason = np.where(np.isnan(lower), 'insufficient_data', np.where(np.isnan(values), 'no_value', ''))
+    with np.errstate(invalid='ignore'):
+        anomaly = (skip_reason == '') & ((values < lower) | (values > upper))
+    return {'anomaly_detected': anomaly, 'skip_reason': skip_reason}
+
+
+def month_of(measured_at: Optional[datetime]) -> int:
+    """
+    측정 월 (미지정 시 현재 월), SQL 집계와 같은 기준: UTC + MONTH_OFFSET_HOURS
+
+    - 시간대 있는 값은 UTC 로 변환, 시간대 없는 값은 UTC 로 간주 (DB "measuredAt" 과 동일)
+    """
+    if measured_at is None:
+        measured_at = datetime.now(timezone.utc)
+    if measured_at.tzinfo is not None:
+        measured_at = measured_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return (measured_at + timedelta(hours=MONTH_OFFSET_HOURS)).month
+
+
+class BaselineStore:
+    """
+    굴뚝/항목별 기준선 저장소 (메모리 + DB "measurement_baselines")
+
+    구조: {(stackId, itemKey): {month: Baseline}}
+    """
+
+    def __init__(self, ttl_seconds: float = CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._baselines: Dict[Tuple[str, str], Dict[int, Baseline]] = {}
+        self._loaded: Dict[Tuple[str, str], float] = {}
+
+    def lookup(self, stack_id: str, item_key: str) -> Optional[Dict[int, Baseline]]:
+        return self._baselines.get((stack_id, item_key))
+
+    def is_loaded(self, customer_id: str, item_key: str) -> bool:
+        loaded_at = self._loaded.get((customer_id, item_key))
+        return loaded_at is not None and time.monotonic() - loaded_at < self.ttl_seconds
+
+    async def load(self, conn, customer_id: str, item_keys: Sequence[str]) -> None:
+        """고객사/항목의 모든 굴뚝 기준선 조회 (1회 쿼리)"""
+        item_keys = list(dict.fromkeys(item_keys))
+        try:
+            rows = await conn.fetch("""
+                SELECT "stackId", "itemKey", month, count, median, mad
+                FROM "measurement_baselines"
+                WHERE "customerId" = $1
+                  AND "itemKey" = ANY($2::text[])
+            """, customer_id, item_keys)
+        except Exception as e:
+            logger.warning(f"Baseline lookup failed (table may not exist): {e}")
+            rows = []
+
+        loaded: Dict[Tuple[str, str], Dict[int, Baseline]] = {}
+        for row in rows:
+            monthly = loaded.setdefault((row['stackId'], row['itemKey']), {})
+            monthly[row['month']] = Baseline(int(row['count']), float(row['median']), float(row['mad']))
+        self._baselines.update(loaded)
+
+        now = time.monotonic()
+        for item_key in item_keys:
+            self._loaded[(customer_id, item_key)] = now
+
+    async def refresh(self, conn, customer_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        변경된 (굴뚝, 항목) 기준선만 재계산
+        - measurement_stats(트리거 갱신) 의 updatedAt 이 기준선보다 최신인 쌍
+        """
+        stale = await conn.fetch("""
+            SELECT ms."customerId", ms."stackId", ms."itemKey"
+            FROM "measurement_stats" ms
+            LEFT JOIN "measurement_baselines" b
+              ON b."stackId" = ms."stackId" AND b."itemKey" = ms."itemKey" AND b.month = 0
+            WHERE ($1::text IS NULL OR ms."customerId" = $1)
+              AND (b.id IS NULL OR ms."updatedAt" > b."updatedAt")
+        """, customer_id)
+
+        # 측정 데이터가 모두 삭제된 기준선 정리
+        await conn.execute("""
+            DELETE FROM "measurement_baselines" b
+            WHERE ($1::text IS NULL OR b."customerId" = $1)
+              AND NOT EXISTS (
+                SELECT 1 FROM "measurement_stats" ms
+                WHERE ms."stackId" = b."stackId" AND ms."itemKey" = b."itemKey"
+              )
+        """, customer_id)
+
+        if not stale:
+            return {'pairs': 0, 'baselines': 0}
+
+        rows = await conn.fetch(f"""
+            SELECT m."customerId" as customer_id, m."stackId" as stack_id, m."itemKey" as item_key,
+                   EXTRACT(MONTH FROM m."measuredAt" + INTERVAL '{MONTH_OFFSET_HOURS} hours')::int as month,
+                   m.value
+            FROM "Measurement" m
+            JOIN unnest($1::text[], $2::text[]) AS p(stack_id, item_key)
+              ON m."stackId" = p.stack_id AND m."itemKey" = p.item_key
+            WHERE m.value IS NOT NULL
+        """, [r['stackId'] for r in stale], [r['itemKey'] for r in stale])
+
+        saved = await self._recompute(conn, rows)
+        logger.info(f"Baselines refreshed: {len(stale)} stack/item pairs, {saved} baselines")
+        return {'pairs': len(stale), 'baselines': saved}
+
+    async def backfill(self, conn) -> Dict[str, int]:
+        """전체 기준선 재계산 (전체 측정 데이터 1회 조회, 1회 벡터 연산)"""
+        rows = await conn.fetch(f"""
+            SELECT m."customerId" as customer_id, m."stackId" as stack_id, m."itemKey" as item_key,
+                   EXTRACT(MONTH FROM m."measuredAt" + INTERVAL '{MONTH_OFFSET_HOURS} hours')::int as month,
+                   m.value
+            FROM "Measurement" m
+            WHERE m.value IS NOT NULL
+        """)
+        self._baselines.clear()
+        saved = await self._recompute(conn, rows, replace_all=True)
+        logger.info(f"Baselines backfilled: {len(rows)} measurements, {saved} baselines")
+        return {'measurements': len(rows), 'baselines': saved}
+
+    async def _recompute(self, conn, rows: List[Any], replace_all: bool = False) -> int:
+        """측정 행으로 기준선 계산 후 저장 (replace_all: 기존 기준선 전체 교체)"""
+        if not rows and not replace_all:
+            return 0
+
+        pairs: Dict[Tuple[str, str, str], int] = {}
+        pair_index = np.fromiter(
+            (pairs.setdefault((r['customer_id'], r['stack_id'], r['item_key']), len(pairs)) for r in rows),
+            dtype=np.int64, count=len(rows)
+        )
+        months = np.fromiter((r['month'] for r in rows), dtype=np.int64, count=len(rows))
+        values = np.fromiter((r['value'] for r in rows), dtype=float, count=len(rows))
+
+        baselines = compute_baselines(pair_index, months, values, len(pairs))
+        pair_keys = list(pairs)
+
+        records = []
+        for (index, month), baseline in baselines.items():
+            customer_id, stack_id, item_key = pair_keys[index]
+            records.append((
+                f"{stack_id}:{item_key}:{month}",
+                customer_id, stack_id, item_key, month,
+                baseline.count, baseline.median, baseline.mad
+            ))
+
+        async with conn.transaction():
+            if replace_all:
+                await conn.execute('DELETE FROM "measurement_baselines"')
+            await conn.execute("""
+                DELETE FROM "measurement_baselines" b
+                USING unnest($1::text[], $2::text[]) AS p(stack_id, item_key)
+                WHERE b."stackId" = p.stack_id AND b."itemKey" = p.item_key
+            """, [k[1] for k in pair_keys], [k[2] for k in pair_keys])
+            await conn.executemany("""
+                INSERT INTO "measurement_baselines"
+                (id, "customerId", "stackId", "itemKey", month, count, median, mad, "updatedAt")
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW())
+            """, records)
+
+        # 메모리 반영 (재계산한 쌍은 월별 기준선 전체 교체)
+        recomputed: Dict[Tuple[str, str], Dict[int, Baseline]] = {}
+        for (index, month), baseline in baselines.items():
+            _, stack_id, item_key = pair_keys[index]
+            recomputed.setdefault((stack_id, item_key), {})[month] = baseline
+        self._baselines.update(recomputed)
+        return len(records)
+
+
+# 프로세스 공용 저장소
+baseline_store = BaselineStore()
@@ -0,0 +1,122 @@
+"""
+인사이트 분석 섹션 캐시
+- 섹션별 입력(시계열 식별자, 데이터 내용 해시, 예측 ID, 기준값, 템플릿 버전) 해시를 키로 결과 재사용
+- 예측만 바뀌거나 기준값만 바뀐 경우 영향받는 섹션만 재계산
+- 섹션별 적중률 통계 제공
+"""
+import copy
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Sequence
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 프로세스 전체에서 유지할 최대 캐시 항목 수
+MAX_ENTRIES = 1024
+
+
+def make_key(*parts: Any) -> str:
+    """입력 구성요소로 캐시 키(해시) 생성"""
+    raw = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def series_hash(df: pd.DataFrame, columns: Sequence[str] = ('y',)) -> str:
+    """학습 데이터 내용 해시 (측정 시각 + 지정 컬럼 값, 중간 수정도 반영)"""
+    if df is None or len(df) == 0:
+        return "empty"
+    columns = [column for column in columns if column in df.columns]
+    frame = df[columns]
+    if not isinstance(df.index, pd.DatetimeIndex) and 'ds' in df.columns:
+        frame = frame.set_axis(pd.DatetimeIndex(df['ds']))
+    digest = hashlib.sha256(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    digest.update(json.dumps(columns).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def rows_hash(rows: List[Any]) -> str:
+    """
+    원본 측정 행 내용 해시 (측정시각, 굴뚝 ID/이름, 값)
+    - 값 수정/upsert, 굴뚝 배정 변경도 반영 (전체 행 1회 순회)
+    """
+    if not rows:
+        return "empty"
+    first = rows[0]
+    columns = set(first.keys()) if hasattr(first, 'keys') else set(first)
+    fields = [
+        key for key in ('measured_at', 'stack_id', 'stackId', 'stack_name', 'stackName', 'value') if key in columns
+    ]
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update('\x1f'.join(str(row[key]) for key in fields).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def forecast_id(predictions: List[Dict]) -> str:
+    """예측 결과 식별자 (예측 내용 해시)"""
+    return make_key([
+        (p['date'], p['predicted_value'], p['lower_bound'], p['upper_bound'])
+        for p in predictions
+    ])[:16]
+
+
+class SectionCache:
+    """
+    LRU 기반 섹션 결과 캐시
+
+    Features:
+    - 섹션명 + 입력 해시 키
+    - 반환 시 복사본 제공 (호출측 수정으로 인한 캐시 오염 방지)
+    - 섹션별 hit/miss 집계
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def get_or_compute(self, section: str, key: str, compute: Callable[[], Any]) -> Any:
+        """캐시 조회, 없으면 계산 후 저장"""
+        stats = self._stats.setdefault(section, {'hits': 0, 'misses': 0})
+        entry_key = f"{section}:{key}"
+
+        if entry_key in self._entries:
+            stats['hits'] += 1
+            self._entries.move_to_end(entry_key)
+            return copy.deepcopy(self._entries[entry_key])
+
+        stats['misses'] += 1
+        value = compute()
+        self._entries[entry_key] = copy.deepcopy(value)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """섹션별 적중률"""
+        sections = {}
+        for section, counts in self._stats.items():
+            total = counts['hits'] + counts['misses']
+            sections[section] = {
+                'hits': counts['hits'],
+                'misses': counts['misses'],
+                'hit_rate': round(counts['hits'] / total * 100, 1) if total else 0.0
+            }
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'sections': sections
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._stats.clear()
+
+
+# 프로세스 공용 캐시 (요청마다 InsightGenerator가 새로 생성되므로 모듈 수준 유지)
+section_cache = SectionCache()
@@ -0,0 +1,151 @@
+"""
+시계열 기술통계 커널
+- 배출농도 시계열(y)을 1회 정렬/집계하여 불변 요약(SeriesStats) 생성
+- InsightGenerator 의 과거 분석/트렌드/위험도/상관관계 섹션이 같은 요약을 공유
+- 분위수와 기준 초과 건수는 정렬 배열에서 바로 계산 (기준값이 바뀌어도 재집계 없음)
+- 다변수 행렬의 쌍별 결측 제외(pairwise-complete) 상관계수 / 그룹 평균
+"""
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 상관관계 분석 대상 환경변수 (분석 컬럼명 -> 표시명)
+ENV_VARIABLES = {
+    'temp': '기온',
+    'humidity': '습도',
+    'wind_speed': '풍속',
+    'gas_temp': '배가스온도',
+    'o2_measured': '산소농도',
+    'pressure': '기압',
+    'gas_velocity': '가스속도',
+    'moisture': '수분함량',
+    'flow': '배출가스유량'
+}
+
+
+class SeriesStats(NamedTuple):
+    """시계열 기술통계 요약 (불변)"""
+    count: int
+    mean: float
+    std: float
+    min: float
+    max: float
+    median: float
+    q90: float
+    first: float
+    last: float
+    sorted_values: np.ndarray
+
+    def quantile(self, q: float) -> float:
+        """선형 보간 분위수 (np.percentile 과 동일)"""
+        return float(np.percentile(self.sorted_values, q * 100))
+
+    def count_above(self, threshold: float) -> int:
+        """기준값 초과 건수 (이진 탐색, O(log n))"""
+        return int(self.count - np.searchsorted(self.sorted_values, threshold, side='right'))
+
+
+def summarize_series(values) -> SeriesStats:
+    """
+    시계열 요약 통계 계산
+
+    Args:
+        values: 1차원 수치 배열 (측정 순서 유지)
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n == 0:
+        raise ValueError("빈 시계열은 요약할 수 없습니다.")
+
+    sorted_values = np.sort(values)
+    sorted_values.setflags(write=False)
+
+    mean = values.mean()
+    deviations = values - mean
+    std = np.sqrt(np.mean(deviations * deviations))
+
+    return SeriesStats(
+        count=n,
+        mean=float(mean),
+        std=float(std),
+        min=float(sorted_values[0]),
+        max=float(sorted_values[-1]),
+        median=float(np.percentile(sorted_values, 50)),
+        q90=float(np.percentile(sorted_values, 90)),
+        first=float(values[0]),
+        last=float(values[-1]),
+        sorted_values=sorted_values
+    )
+
+
+def pairwise_correlation(
+    matrix: np.ndarray,
+    min_periods: int = 1,
+    rows: Optional[Sequence[int]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    쌍별 결측 제외 피어슨 상관계수 행렬 (pandas DataFrame.corr 와 동일 정의)
+    - 결측 마스크 행렬곱으로 모든 변수 쌍의 건수/합/제곱합/교차곱을 한 번에 계산
+    - 열별 평균으로 중심화하여 수치 안정성 확보 (상관계수는 평행이동 불변)
+
+    Args:
+        matrix: (n, k) float 행렬, 결측은 NaN
+        min_periods: 쌍별 최소 유효 건수 (미만이면 NaN)
+        rows: 계산할 행 변수 인덱스 (None이면 전체 k x k 행렬)
+              예) rows=[0] 이면 0번 변수와 나머지 변수 간 상관계수만 계산 (O(n*k))
+
+    Returns:
+        (상관계수 행렬 (r, k), 쌍별 유효 건수 행렬 (r, k))
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=float)
+    valid = ~np.isnan(matrix)
+    weights = valid.astype(float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centers = np.nansum(matrix, axis=0) / weights.sum(axis=0)
+    centered = np.where(valid, matrix - np.nan_to_num(centers), 0.0)
+    squared = centered * centered
+
+    rows = list(range(matrix.shape[1])) if rows is None else list(rows)
+    row_weights = weights[:, rows]
+    row_centered = centered[:, rows]
+
+    # [i, j]: 변수 i, j 가 모두 유효한 행에 대한 집계
+    counts = row_weights.T @ weights
+    sums_i = row_centered.T @ weights
+    sums_j = row_weights.T @ centered
+    squares_i = (row_centered * row_centered).T @ weights
+    squares_j = row_weights.T @ squared
+    cross = row_centered.T @ centered
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = cross - sums_i * sums_j / counts
+        var_i = squares_i - sums_i * sums_i / counts
+        var_j = squares_j - sums_j * sums_j / counts
+        # 상수열(분산 0)은 반올림 잔차만 남으므로 NaN 처리
+        var_i[var_i <= 1e-10 * squares_i] = np.nan
+        var_j[var_j <= 1e-10 * squares_j] = np.nan
+        corr = cov / np.sqrt(var_i * var_j)
+
+    corr = np.clip(corr, -1.0, 1.0)
+    corr[counts < min_periods] = np.nan
+    return corr, counts.astype(int)
+
+
+def group_means(matrix: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """
+    그룹별 열 평균 (결측 제외)
+
+    Args:
+        matrix: (n, k) float 행렬, 결측은 NaN
+        groups: (g, n) bool 행렬, 각 행이 그룹 소속 마스크
+
+    Returns:
+        (g, k) 평균 행렬 (유효값이 없으면 NaN)
+    """
+    valid = ~np.isnan(matrix)
+    membership = np.asarray(groups, dtype=float)
+    sums = membership @ np.where(valid, matrix, 0.0)
+    counts = membership @ valid.astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
@@ -0,0 +1,227 @@
+"""
+굴뚝/항목별 증분 상태 저장소 (comoment_store, quantile_sketch 공용)
+- 굴뚝마다 측정 행을 요약한 상태(누적기/스케치)를 메모리 + DB 테이블에 보관
+- 신규 측정 행만 조회해 상태에 반영(증분), 기존 행이 바뀐 굴뚝만 전체 재계산
+- 변경 감지: "measurement_stats" 의 굴뚝별 측정 건수, 최신 측정시각, 행 체크섬 합계
+  (Measurement 트리거/일괄 적재 재집계가 유지 -> 조회 시 전체 이력 재해시 없이 굴뚝 수만큼 읽음)
+  -> 과거 시점 추가/삭제, 값/측정시각/환경변수 제자리 수정(upsert, UI 수정, bulk) 모두 감지
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 측정 행 체크섬 (측정시각, 값, 환경변수 전체 / measurement_stats."checksum" 과 같은 DB 함수)
+ROW_CHECKSUM = 'measurement_checksum(m)'
+
+
+class StackStateStore:
+    """
+    굴뚝/항목별 증분 상태 저장소 (메모리 + DB)
+
+    Args:
+        table: 상태 테이블 (id, customerId, stackId, itemKey, rowCount, lastMeasuredAt, checksum, state, updatedAt)
+        label: 로그용 이름
+        columns: 조회 컬럼 {행 키: Measurement 컬럼}
+        state_type: 상태 클래스 (인자 없는 생성자, to_dict, from_dict -> 버전이 다르면 None)
+        apply_rows: (상태, 신규 행 목록) -> 상태, 신규 행을 상태에 반영
+    """
+
+    def __init__(
+        self,
+        table: str,
+        label: str,
+        columns: Dict[str, str],
+        state_type: Any,
+        apply_rows: Callable[[Any, List[Any]], Any]
+    ):
+        self.table = table
+        self.label = label
+        self.columns = columns
+        self.state_type = state_type
+        self.apply_rows = apply_rows
+        # (stackId, itemKey) -> {'customer_id', 'state', 'row_count', 'last_measured_at', 'checksum'}
+        self._states: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    async def get_stacks(
+        self,
+        conn,
+        customer_id: str,
+        item_key: str,
+        stack_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """고객사/항목의 굴뚝별 상태 (갱신 후)"""
+        await self.refresh(conn, customer_id, item_key)
+        return {
+            stack_id: entry['state']
+            for (stack_id, key), entry in self._states.items()
+            if key == item_key and entry['customer_id'] == customer_id
+            and (not stack_ids or stack_id in stack_ids)
+        }
+
+    async def refresh(self, conn, customer_id: str, item_key: str) -> int:
+        """
+        변경된 굴뚝만 증분 반영
+
+        Returns:
+            새로 반영한 측정 행 수
+        """
+        current = await conn.fetch("""
+            SELECT "stackId" as stack_id, count as row_count, "lastMeasuredAt" as last_measured_at, checksum
+            FROM "measurement_stats"
+            WHERE "customerId" = $1
+              AND "itemKey" = $2
+        """, customer_id, item_key)
+        current = {row['stack_id']: row for row in current}
+
+        await self._load(conn, customer_id, item_key, current.keys())
+
+        # 삭제된 굴뚝 제거
+        for key in [k for k, entry in self._states.items()
+                    if k[1] == item_key and entry['customer_id'] == customer_id and k[0] not in current]:
+            del self._states[key]
+
+        stale = {}
+        for stack_id, row in current.items():
+            entry = self._states.get((stack_id, item_key))
+            if (entry and entry['row_count'] == row['row_count']
+                    and entry['last_measured_at'] == row['last_measured_at']
+                    and entry['checksum'] == row['checksum']):
+                continue
+            stale[stack_id] = entry['last_measured_at'] if entry else None
+
+        if not stale:
+            return 0
+
+        fetched = await self._fetch_rows(conn, customer_id, item_key, stale)
+
+        # 증분 건수/체크섬 불일치 굴뚝은 전체 재계산 (상태에서 행을 뺄 수 없음)
+        rebuild = {}
+        for stack_id, since in stale.items():
+            if since is None:
+                continue
+            entry = self._states[(stack_id, item_key)]
+            new_rows = fetched.get(stack_id, [])
+            if (entry['row_count'] + len(new_rows) != current[stack_id]['row_count']
+                    or entry['checksum'] is None
+                    or entry['checksum'] + sum(row['row_checksum'] for row in new_rows) != current[stack_id]['checksum']):
+                rebuild[stack_id] = None
+        if rebuild:
+            logger.info(f"Rebuilding {self.label} for {len(rebuild)} stacks (backdated, deleted or updated rows)")
+            fetched.update(await self._fetch_rows(conn, customer_id, item_key, rebuild))
+
+        changed = []
+        applied = 0
+        for stack_id, since in stale.items():
+            rows = fetched.get(stack_id, [])
+            entry = self._states.get((stack_id, item_key))
+            if since is None or stack_id in rebuild or entry is None:
+                state = self.state_type()
+            else:
+                state = entry['state']
+            state = self.apply_rows(state, rows)
+            applied += len(rows)
+
+            self._states[(stack_id, item_key)] = {
+                'customer_id': customer_id,
+                'state': state,
+                'row_count': current[stack_id]['row_count'],
+                'last_measured_at': current[stack_id]['last_measured_at'],
+                'checksum': current[stack_id]['checksum']
+            }
+            changed.append(stack_id)
+
+        await self._save(conn, customer_id, item_key, changed)
+        logger.info(f"{self.label.capitalize()} refreshed for {customer_id}/{item_key}: "
+                    f"{len(changed)} stacks, {applied} rows")
+        return applied
+
+    async def _fetch_rows(
+        self,
+        conn,
+        customer_id: str,
+        item_key: str,
+        since_by_stack: Dict[str, Optional[datetime]]
+    ) -> Dict[str, List[Any]]:
+        """굴뚝별 기준시각 이후 측정 행 조회 (기준시각 None이면 전체, 행 체크섬 포함)"""
+        select_columns = ",\n                ".join(
+            f'm."{column}" as {key}' for key, column in self.columns.items()
+        )
+        rows = await conn.fetch(f"""
+            SELECT
+                m."stackId" as stack_id,
+                {select_columns},
+                {ROW_CHECKSUM} as row_checksum
+            FROM "Measurement" m
+            JOIN unnest($3::text[], $4::timestamp[]) AS w(stack_id, since)
+              ON m."stackId" = w.stack_id
+            WHERE m."customerId" = $1
+              AND m."itemKey" = $2
+              AND m.value IS NOT NULL
+              AND (w.since IS NULL OR m."measuredAt" > w.since)
+        """, customer_id, item_key, list(since_by_stack.keys()), list(since_by_stack.values()))
+
+        grouped: Dict[str, List[Any]] = {}
+        for row in rows:
+            grouped.setdefault(row['stack_id'], []).append(row)
+        return grouped
+
+    async def _load(self, conn, customer_id: str, item_key: str, stack_ids) -> None:
+        """메모리에 없는 굴뚝 상태를 DB에서 복원"""
+        missing = [s for s in stack_ids if (s, item_key) not in self._states]
+        if not missing:
+            return
+        try:
+            rows = await conn.fetch(f"""
+                SELECT "stackId", "rowCount", "lastMeasuredAt", checksum, state
+                FROM "{self.table}"
+                WHERE "itemKey" = $1
+                  AND "stackId" = ANY($2::text[])
+            """, item_key, missing)
+        except Exception as e:
+            logger.warning(f"{self.label.capitalize()} state lookup failed (table may not exist): {e}")
+            return
+
+        for row in rows:
+            state = self.state_type.from_dict(json.loads(row['state']))
+            if state is None:
+                continue
+            self._states[(row['stackId'], item_key)] = {
+                'customer_id': customer_id,
+                'state': state,
+                'row_count': row['rowCount'],
+                'last_measured_at': row['lastMeasuredAt'],
+                'checksum': row['checksum']
+            }
+
+    async def _save(self, conn, customer_id: str, item_key: str, stack_ids: List[str]) -> None:
+        """변경된 굴뚝 상태 저장 (upsert)"""
+        records = []
+        for stack_id in stack_ids:
+            entry = self._states[(stack_id, item_key)]
+            records.append((
+                f"{stack_id}:{item_key}",
+                customer_id,
+                stack_id,
+                item_key,
+                entry['row_count'],
+                entry['last_measured_at'],
+                entry['checksum'],
+                json.dumps(entry['state'].to_dict())
+            ))
+        try:
+            await conn.executemany(f"""
+                INSERT INTO "{self.table}"
+                (id, "customerId", "stackId", "itemKey", "rowCount", "lastMeasuredAt", checksum, state, "updatedAt")
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW())
+                ON CONFLICT ("stackId", "itemKey") DO UPDATE SET
+                    "rowCount" = EXCLUDED."rowCount",
+                    "lastMeasuredAt" = EXCLUDED."lastMeasuredAt",
+                    checksum = EXCLUDED.checksum,
+                    state = EXCLUDED.state,
+                    "updatedAt" = NOW()
+            """, records)
+        except Exception as e:
+            logger.warning(f"Failed to save {self.label} state: {e}")
@@ -0,0 +1,92 @@
+"""
+공모멘트 누적기 테스트 (numpy 기준값 비교)
+- 증분 반영 + 굴뚝 간 병합(Chan) 결과 == 전체 데이터 np.cov / np.corrcoef
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from comoment_store import ComomentAccumulator, rows_to_matrix
+from series_stats import ENV_VARIABLES
+
+
+def make_matrix(rng, n, shift):
+    """[y, 환경변수...] 행렬 (y 와 상관된 변수 + 결측 10%)"""
+    y = rng.lognormal(1.0 + shift, 0.5, n)
+    values = y[:, None] * rng.uniform(0.5, 2.0, len(ENV_VARIABLES)) + rng.normal(shift, 1.0, (n, len(ENV_VARIABLES)))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    y[rng.random(n) < 0.05] = np.nan
+    return np.column_stack([y, values])
+
+
+def pairwise_reference(matrix):
+    """변수별 (y, v) 모두 유효한 쌍의 건수, 표본 공분산, 상관계수"""
+    n, cov, corr = [], [], []
+    for j in range(1, matrix.shape[1]):
+        valid = ~np.isnan(matrix[:, 0]) & ~np.isnan(matrix[:, j])
+        pair = matrix[valid][:, [0, j]]
+        n.append(len(pair))
+        cov.append(np.cov(pair.T, ddof=0)[0, 1])
+        corr.append(np.corrcoef(pair.T)[0, 1])
+    return np.array(n), np.array(cov), np.array(corr)
+
+
+def test_merge_matches_numpy():
+    """굴뚝별 증분 누적 후 병합 == 전체 데이터 공분산/상관계수"""
+    rng = np.random.default_rng(0)
+    stacks = [make_matrix(rng, n, shift) for n, shift in [(500, 0.0), (120, 1.5), (37, -0.5)]]
+
+    merged = ComomentAccumulator()
+    for matrix in stacks:
+        accumulator = ComomentAccumulator()
+        for chunk in np.array_split(matrix, 4):
+            accumulator.update(chunk)
+        merged.merge(accumulator)
+
+    n, cov, corr = pairwise_reference(np.vstack(stacks))
+    merged_corr, merged_n = merged.correlations()
+    assert np.array_equal(merged_n, n)
+    assert np.allclose(merged.comoment / merged.pair_n, cov)
+    assert np.allclose(merged_corr, corr)
+    assert merged.row_count == sum(int((~np.isnan(m[:, 0])).sum()) for m in stacks)
+
+
+def test_high_contrast_normal_means():
+    """전체 평균 == 유효 쌍의 환경변수 평균"""
+    rng = np.random.default_rng(1)
+    matrix = make_matrix(rng, 800, 0.0)
+    normal_means, high_means, high_count = ComomentAccumulator().update(matrix).high_contrast()
+
+    y_valid = ~np.isnan(matrix[:, 0])
+    expected = np.nanmean(matrix[y_valid, 1:], axis=0)
+    assert np.allclose(normal_means, expected)
+    assert high_count == round(y_valid.sum() * 0.1)
+    # 상관이 양수인 데이터: 고농도 구간 평균이 전체 평균보다 큼
+    assert np.all(high_means > normal_means)
+
+
+def test_state_round_trip():
+    """to_dict/from_dict 복원 후 같은 상관계수, 다른 버전은 None"""
+    rng = np.random.default_rng(2)
+    accumulator = ComomentAccumulator().update(make_matrix(rng, 200, 0.0))
+    restored = ComomentAccumulator.from_dict(accumulator.to_dict())
+    assert np.allclose(restored.correlations()[0], accumulator.correlations()[0], equal_nan=True)
+    assert ComomentAccumulator.from_dict({**accumulator.to_dict(), 'version': 0}) is None
+
+
+def test_rows_to_matrix_none():
+    """None 값은 NaN"""
+    row = {'value': 1.0, **{name: None for name in ENV_VARIABLES}}
+    matrix = rows_to_matrix([row])
+    assert matrix.shape == (1, 1 + len(ENV_VARIABLES))
+    assert np.isnan(matrix[0, 1:]).all()
+
+
+if __name__ == "__main__":
+    tests = [test_merge_matches_numpy, test_high_contrast_normal_means, test_state_round_trip, test_rows_to_matrix_none]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,110 @@
+"""
+Monte Carlo 경로 시뮬레이션 테스트 (statsmodels / numpy 기준값 비교)
+- 경로 모델 해석 분산 == SARIMAX 예측 분산
+- simulate_paths 표본 분산/공분산 ≈ forecast_variance / 충격 응답 해석해
+"""
+import sys
+import warnings
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from exceedance_simulation import (
+    PathModel,
+    exceedance_probabilities,
+    fit_path_model,
+    forecast_variance,
+    simulate_paths
+)
+
+HORIZON = 30
+N_PATHS = 40_000
+
+
+@lru_cache(maxsize=1)
+def fit_sarimax():
+    """주간 계절성 + 확률 보행 일별 농도에 ARIMA(1,1,1)x(1,0,0,7) 학습 (테스트 간 공유)"""
+    rng = np.random.default_rng(0)
+    t = np.arange(400)
+    y = 50 + 4 * np.sin(2 * np.pi * t / 7) + np.cumsum(rng.normal(0, 0.3, len(t))) + rng.normal(0, 1.5, len(t))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return SARIMAX(y, order=(1, 1, 1), seasonal_order=(1, 0, 0, 7)).fit(disp=False)
+
+
+def analytic_covariance(model: PathModel) -> np.ndarray:
+    """cov(y_s, y_t) = initial_s·initial_t + Σ_j impulse_{s-1-j}·impulse_{t-1-j} + obs²·[s=t]"""
+    h = model.horizon
+    cov = model.initial @ model.initial.T + model.obs_std ** 2 * np.eye(h)
+    for s in range(h):
+        for t in range(h):
+            for j in range(min(s, t)):
+                cov[s, t] += model.impulse[s - 1 - j] @ model.impulse[t - 1 - j]
+    return cov
+
+
+def test_path_model_matches_statsmodels():
+    """경로 모델 시점별 표준편차 == statsmodels 예측 표준오차"""
+    results = fit_sarimax()
+    model = fit_path_model(results, HORIZON)
+    expected = np.sqrt(np.asarray(results.get_forecast(HORIZON).var_pred_mean))
+    assert np.allclose(model.std(), expected, rtol=1e-6)
+    assert np.allclose(model.mean, results.get_forecast(HORIZON).predicted_mean)
+
+
+def test_simulated_paths_match_forecast_variance():
+    """0 절단이 없는 평균에서 경로 표본 분산/공분산 ≈ 해석해 (표본 오차 범위)"""
+    model = fit_path_model(fit_sarimax(), HORIZON)
+    forecast = {'path_model': model.to_dict(), 'metrics': {'rmse': 99.0}}
+    paths = simulate_paths(model, N_PATHS)
+
+    assert paths.shape == (N_PATHS, HORIZON)
+    assert np.all(paths >= 0)
+    # 분산 추정 상대 표준오차 ≈ √(2/N) ≈ 0.7% -> 5σ
+    variance = forecast_variance(forecast, HORIZON)
+    assert np.allclose(paths.var(axis=0), variance, rtol=5 * np.sqrt(2 / N_PATHS))
+    assert np.allclose(paths.mean(axis=0), model.mean, atol=5 * np.sqrt(variance.max() / N_PATHS))
+
+    cov = analytic_covariance(model)
+    sample = np.cov(paths.T)
+    scale = np.sqrt(np.outer(np.diag(cov), np.diag(cov)))
+    assert np.abs(sample - cov).max() / scale.max() < 5 * np.sqrt(2 / N_PATHS)
+
+
+def test_forecast_variance_fallback():
+    """경로 모델이 없거나 기간이 짧으면 RMSE² 상수"""
+    model = fit_path_model(fit_sarimax(), 5)
+    assert np.allclose(forecast_variance({'metrics': {'rmse': 2.0}}, HORIZON), 4.0)
+    assert np.allclose(forecast_variance({'path_model': model.to_dict(), 'metrics': {'rmse': 3.0}}, HORIZON), 9.0)
+    assert np.allclose(forecast_variance({}, 3), 1.0)
+
+
+def test_exceedance_probabilities():
+    """시점별/누적 초과 확률, 기대 초과 일수 (직접 계산과 비교)"""
+    paths = np.array([
+        [1.0, 5.0, 1.0],
+        [1.0, 1.0, 1.0],
+        [6.0, 6.0, 1.0],
+        [1.0, 1.0, 7.0]
+    ])
+    result = exceedance_probabilities(paths, 4.0)
+    assert np.allclose(result['daily'], [0.25, 0.5, 0.25])
+    assert np.allclose(result['cumulative'], [0.25, 0.5, 0.75])
+    assert result['any_probability'] == 0.75
+    assert result['expected_exceed_days'] == 1.0
+
+
+if __name__ == "__main__":
+    tests = [
+        test_path_model_matches_statsmodels,
+        test_simulated_paths_match_forecast_variance,
+        test_forecast_variance_fallback,
+        test_exceedance_probabilities
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,98 @@
+"""
+계층 조정 테스트 (hierarchical_forecast.reconcile, numpy 기준값 비교)
+- 닫힌 해 == 정규방정식 해 (np.linalg.solve)
+- 고객사 예측 분산 0 이면 weights @ 결과 == 고객사 예측 (완전 일치)
+- 시작일이 다른 예측은 날짜로 정렬
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hierarchical_forecast import aligned_steps, reconcile, reconciled_predictions, shared_dates
+
+
+def make_inputs(seed: int = 0, stacks: int = 4, horizon: int = 6):
+    rng = np.random.default_rng(seed)
+    bottom = rng.uniform(5, 30, (stacks, horizon))
+    bottom_variance = rng.uniform(0.5, 4.0, (stacks, horizon))
+    weights = rng.uniform(0.1, 1.0, stacks)
+    weights /= weights.sum()
+    top = weights @ bottom + rng.normal(0, 3, horizon)
+    top_variance = rng.uniform(0.5, 4.0, horizon)
+    return bottom, bottom_variance, weights, top, top_variance
+
+
+def test_matches_normal_equations():
+    """시점별 min Σ (b - b̂)² / v + (w·b - ŷ)² / v_top 의 해와 동일"""
+    bottom, bottom_variance, weights, top, top_variance = make_inputs()
+    result = reconcile(bottom, bottom_variance, weights, top, top_variance)
+
+    for t in range(bottom.shape[1]):
+        v = bottom_variance[:, t]
+        lhs = np.diag(1 / v) + np.outer(weights, weights) / top_variance[t]
+        rhs = bottom[:, t] / v + weights * top[t] / top_variance[t]
+        assert np.allclose(result[:, t], np.linalg.solve(lhs, rhs))
+
+
+def test_coherent_with_exact_top():
+    """고객사 분산 0: 굴뚝 가중합이 고객사 예측과 일치, 조정량은 굴뚝 분산 비례"""
+    bottom, bottom_variance, weights, top, _ = make_inputs(seed=1)
+    result = reconcile(bottom, bottom_variance, weights, top, np.zeros_like(top))
+    assert np.allclose(weights @ result, top)
+
+    adjustment = (result - bottom) / (bottom_variance * weights[:, None])
+    assert np.allclose(adjustment, adjustment[0])
+
+
+def test_combined_top_between_inputs():
+    """고객사 분산 > 0: 조정 후 가중합은 고객사 예측과 굴뚝 합 사이 (분산 역가중)"""
+    bottom, bottom_variance, weights, top, top_variance = make_inputs(seed=2)
+    combined = weights @ reconcile(bottom, bottom_variance, weights, top, top_variance)
+    bottom_up = weights @ bottom
+    bottom_up_variance = (weights[:, None] ** 2 * bottom_variance).sum(axis=0)
+    expected = (top / top_variance + bottom_up / bottom_up_variance) / (1 / top_variance + 1 / bottom_up_variance)
+    assert np.allclose(combined, expected)
+
+
+def test_bottom_up_without_top():
+    """고객사 예측이 없으면 굴뚝 예측 그대로 (복사본)"""
+    bottom, bottom_variance, weights, _, _ = make_inputs(seed=3)
+    result = reconcile(bottom, bottom_variance, weights)
+    assert np.array_equal(result, bottom) and result is not bottom
+
+
+def test_date_alignment():
+    """재사용 예측(시작일이 이른)과 새 예측은 공통 날짜로 정렬"""
+    def forecast(start_day, values):
+        return {'predictions': [
+            {'date': f'2025-03-{start_day + i:02d}', 'predicted_value': v, 'lower_bound': v - 1, 'upper_bound': v + 1}
+            for i, v in enumerate(values)
+        ]}
+
+    reused = forecast(1, [10.0, 11.0, 12.0, 13.0, 14.0])
+    fresh = forecast(3, [20.0, 21.0, 22.0, 23.0, 24.0])
+    dates = shared_dates([reused, fresh])
+    assert dates == ['2025-03-03', '2025-03-04', '2025-03-05']
+    assert aligned_steps(reused, dates).tolist() == [2, 3, 4]
+    assert aligned_steps(fresh, dates).tolist() == [0, 1, 2]
+
+    points = reconciled_predictions(reused, np.array([12.5, 13.0, 15.0]), dates)
+    assert [p['date'] for p in points] == dates
+    assert [p['predicted_value'] for p in points] == [12.5, 13.0, 15.0]
+    assert [p['lower_bound'] for p in points] == [11.5, 12.0, 14.0]
+
+
+if __name__ == "__main__":
+    tests = [
+        test_matches_normal_equations,
+        test_coherent_with_exact_top,
+        test_combined_top_between_inputs,
+        test_bottom_up_without_top,
+        test_date_alignment
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -64,6 +64,18 @@ async def test_playwright():
             
             logger.info("✅ PDF 검증 성공")
             
+            # PDF 용량 최적화 검증
+            from pdf_optimizer import optimize_pdf
+            optimized_bytes, stats = optimize_pdf(pdf_bytes)
+            logger.info(
+                f"✅ PDF 최적화 성공 ({stats['original_size']} -> {stats['optimized_size']} bytes, "
+                f"-{stats['reduction_pct']}%, 폰트 서브셋 {stats['fonts_subset']}개, "
+                f"이미지 재압축 {stats['images_recompressed']}개, 중복 제거 {stats['duplicates_removed']}개)"
+            )
+            
+            if not optimized_bytes.startswith(b'%PDF'):
+                raise ValueError("PDF 최적화 실패: 유효하지 않은 PDF")
+            
             await browser.close()
             logger.info("✅ 브라우저 종료 성공")
             
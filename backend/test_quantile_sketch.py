@@ -0,0 +1,80 @@
+"""
+분위수 스케치 테스트 (np.percentile 기준값 비교)
+- 소량 데이터는 np.percentile 과 동일, 대량 데이터는 순위 오차가 중심점 1개 폭 이내
+- 병합은 입력 스케치를 변경하지 않음
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from quantile_sketch import COMPRESSION, QuantileSketch, merge_sketches
+
+QUANTILES = np.array([0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999])
+
+
+def rank_error_bound(q):
+    """k1 척도 중심점 1개가 차지하는 분위 폭: π·√(q(1-q)) / COMPRESSION"""
+    return np.pi * np.sqrt(q * (1 - q)) / COMPRESSION
+
+
+def test_small_matches_percentile():
+    """중심점이 모두 1건이면 np.percentile 과 동일"""
+    values = np.random.default_rng(0).normal(10, 3, 60)
+    sketch = QuantileSketch().add(values)
+    sketch._compress()
+    assert np.all(sketch.weights == 1)
+    assert np.allclose(sketch.quantile(QUANTILES), np.percentile(values, QUANTILES * 100))
+    assert sketch.quantile(0.0) == values.min() and sketch.quantile(1.0) == values.max()
+
+
+def test_merged_quantile_error():
+    """굴뚝별 스케치 병합 후 분위수의 실제 순위 오차 ≤ 중심점 1개 폭"""
+    rng = np.random.default_rng(1)
+    parts = [rng.lognormal(mean, 0.6, n) for mean, n in [(1.0, 20000), (2.0, 7000), (0.5, 3333)]]
+    merged = merge_sketches([QuantileSketch().add(p) for p in parts])
+    values = np.sort(np.concatenate(parts))
+
+    assert merged.count == len(values)
+    assert merged.min == values[0] and merged.max == values[-1]
+    assert len(merged.means) <= COMPRESSION
+
+    ranks = np.searchsorted(values, merged.quantile(QUANTILES)) / len(values)
+    assert np.all(np.abs(ranks - QUANTILES) <= rank_error_bound(QUANTILES))
+
+    for q in (0.5, 0.9, 0.99):
+        threshold = np.quantile(values, q)
+        exact = int((values > threshold).sum())
+        assert abs(merged.count_above(threshold) - exact) <= rank_error_bound(q) * len(values)
+
+
+def test_merge_keeps_inputs():
+    """merge / merge_sketches 후 입력 스케치의 중심점/버퍼 그대로"""
+    rng = np.random.default_rng(2)
+    base = QuantileSketch().add(rng.normal(0, 1, 3000))
+    other = QuantileSketch().add(rng.normal(5, 1, 4000)).add(rng.normal(5, 1, 300))
+    before = (other.means.copy(), other.weights.copy(), len(other._buffer), other.count)
+
+    merge_sketches([base, other])
+    base.merge(other)
+
+    assert np.array_equal(other.means, before[0]) and np.array_equal(other.weights, before[1])
+    assert len(other._buffer) == before[2] and other.count == before[3]
+    assert base.count == 7300
+
+
+def test_state_round_trip():
+    """to_dict/from_dict 복원 후 같은 분위수, 다른 압축 계수는 None"""
+    sketch = QuantileSketch().add(np.random.default_rng(3).exponential(2.0, 5000))
+    restored = QuantileSketch.from_dict(sketch.to_dict())
+    assert np.allclose(restored.quantile(QUANTILES), sketch.quantile(QUANTILES))
+    assert QuantileSketch.from_dict({**sketch.to_dict(), 'compression': COMPRESSION + 1}) is None
+
+
+if __name__ == "__main__":
+    tests = [test_small_matches_percentile, test_merged_quantile_error, test_merge_keeps_inputs, test_state_round_trip]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
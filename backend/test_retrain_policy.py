@@ -0,0 +1,110 @@
+"""
+재학습 판단 테스트 (retrain_policy.evaluate 사유별)
+- 예측 분산은 in-sample RMSE 기준 (경로 모델 없음) -> 표준화 잔차 = (실측 - 예측) / RMSE
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from retrain_policy import (
+    DRIFT_THRESHOLD,
+    MAX_MODEL_AGE_DAYS,
+    MIN_RESIDUALS,
+    REASON_DRIFT,
+    REASON_HORIZON_EXHAUSTED,
+    REASON_MAX_AGE,
+    REASON_NO_MODEL,
+    REASON_NO_NEW_DATA,
+    REASON_REQUESTED,
+    REASON_TOO_FEW_RESIDUALS,
+    REASON_WITHIN_TOLERANCE,
+    ROLLING_WINDOW,
+    evaluate,
+    standardized_residuals
+)
+
+CREATED_AT = datetime(2025, 3, 1, 9, 0)
+NOW = CREATED_AT + timedelta(days=3)
+RMSE = 2.0
+
+
+def make_forecast(days: int = 10, value: float = 20.0):
+    """생성 다음 날부터 days 일 예측 (예측값 일정)"""
+    return {
+        'predictions': [
+            {'date': (CREATED_AT + timedelta(days=i + 1)).strftime('%Y-%m-%d'), 'predicted_value': value}
+            for i in range(days)
+        ],
+        'metrics': {'rmse': RMSE}
+    }
+
+
+def make_rows(errors, start: int = 1):
+    """예측 시작일부터 하루 1건, 예측값 + 오차(RMSE 배수)"""
+    return [
+        {'measured_at': CREATED_AT + timedelta(days=start + i, hours=3), 'value': 20.0 + e * RMSE}
+        for i, e in enumerate(errors)
+    ]
+
+
+def test_standardized_residuals():
+    """같은 날 측정은 평균, 예측 기간 밖 날짜는 잔차 제외 + exhausted"""
+    rows = make_rows([1.0, 3.0]) + make_rows([-1.0], start=2) + make_rows([0.5], start=20)
+    residuals, exhausted = standardized_residuals(make_forecast(), rows)
+    assert np.allclose(residuals, [1.0, 1.0])
+    assert exhausted
+
+
+def test_reasons():
+    """사유 우선순위: 요청 > 최대 수명 > 예측 기간 소진 > drift > 유지"""
+    forecast = make_forecast()
+    drifted = make_rows([DRIFT_THRESHOLD * 2] * MIN_RESIDUALS)
+    calm = make_rows([0.2, -0.2] * MIN_RESIDUALS)
+    old = NOW + timedelta(days=MAX_MODEL_AGE_DAYS + 1)
+
+    cases = [
+        (dict(forecast=None, created_at=None, new_rows=drifted), True, REASON_NO_MODEL),
+        (dict(forecast={'predictions': []}, created_at=CREATED_AT, new_rows=calm), True, REASON_NO_MODEL),
+        (dict(forecast=forecast, created_at=CREATED_AT, new_rows=[], requested=True), True, REASON_REQUESTED),
+        (dict(forecast=forecast, created_at=CREATED_AT, new_rows=calm, now=old), True, REASON_MAX_AGE),
+        (dict(forecast=forecast, created_at=CREATED_AT, new_rows=make_rows([0.0], start=11)), True,
+         REASON_HORIZON_EXHAUSTED),
+        (dict(forecast=forecast, created_at=CREATED_AT, new_rows=drifted), True, REASON_DRIFT),
+        (dict(forecast=forecast, created_at=CREATED_AT, new_rows=calm), False, REASON_WITHIN_TOLERANCE),
+        (dict(forecast=forecast, created_at=CREATED_AT, new_rows=drifted[:MIN_RESIDUALS - 1]), False,
+         REASON_TOO_FEW_RESIDUALS),
+        (dict(forecast=forecast, created_at=CREATED_AT, new_rows=[]), False, REASON_NO_NEW_DATA)
+    ]
+    for kwargs, retrain, reason in cases:
+        kwargs.setdefault('now', NOW)
+        decision = evaluate(**kwargs)
+        assert (decision['retrain'], decision['reason']) == (retrain, reason), (reason, decision)
+
+
+def test_rolling_error_window():
+    """rolling error 는 최근 ROLLING_WINDOW 개 잔차의 RMS (오래된 큰 잔차는 제외)"""
+    errors = [DRIFT_THRESHOLD * 3] * 2 + [0.5] * ROLLING_WINDOW
+    decision = evaluate(make_forecast(days=len(errors)), CREATED_AT, make_rows(errors), now=NOW)
+    assert decision['residual_count'] == len(errors)
+    assert decision['rolling_error'] == 0.5
+    assert decision['reason'] == REASON_WITHIN_TOLERANCE
+
+
+def test_decision_fields():
+    """모델 수명(일), 최신 측정 시각 기록"""
+    rows = make_rows([0.0, 0.0])
+    decision = evaluate(make_forecast(), CREATED_AT, rows, now=CREATED_AT + timedelta(hours=36))
+    assert decision['model_age_days'] == 1.5
+    assert decision['forecast_created_at'] == CREATED_AT
+    assert decision['last_measured_at'] == rows[-1]['measured_at']
+
+
+if __name__ == "__main__":
+    tests = [test_standardized_residuals, test_reasons, test_rolling_error_window, test_decision_fields]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
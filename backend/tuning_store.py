@@ -0,0 +1,146 @@
+"""
+시계열별 하이퍼파라미터 탐색 이력 (Optuna warm start)
+- (고객사, 굴뚝, 항목) 시계열마다 이전 최적 파라미터와 시도 이력을 "tuning_studies" 에 보관
+- 재학습 시 PmmsAutoMLPredictor 에 전달 -> 이전 최적을 첫 시도로 재평가, 이전 시도는 TPE 사전 분포
+- 이력이 없는 신규 시계열은 메타 특성이 가까운 탐색 완료 시계열의 최적 파라미터를 첫 시도로 사용 (meta_tuning)
+- 굴뚝 '' = 고객사 전체 시계열 (hierarchical_forecast.TOP_NODE 와 동일)
+"""
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from meta_tuning import nearest_seeds, series_features
+
+logger = logging.getLogger(__name__)
+
+SeriesKey = Tuple[str, str, str]  # (customerId, stackId, itemKey)
+
+
+def series_id(key: SeriesKey) -> str:
+    return ':'.join(key)
+
+
+class TuningStore:
+    """탐색 이력 조회/저장 (DB 단일 소스, 메모리 캐시 없음)"""
+
+    async def load(self, conn, keys: List[SeriesKey]) -> Dict[SeriesKey, Dict[str, Any]]:
+        """시계열별 이전 탐색 결과 {key: {best_params, best_value, trials}} (없는 시계열은 생략)"""
+        if not keys:
+            return {}
+        rows = await conn.fetch("""
+            SELECT id, "bestParams" as best_params, "bestValue" as best_value, trials
+            FROM "tuning_studies"
+            WHERE id = ANY($1::text[])
+        """, [series_id(key) for key in keys])
+        by_id = {row['id']: row for row in rows}
+        history = {}
+        for key in keys:
+            row = by_id.get(series_id(key))
+            if row is None:
+                continue
+            history[key] = {
+                'best_params': json.loads(row['best_params']),
+                'best_value': row['best_value'],
+                'trials': json.loads(row['trials'])
+            }
+        return history
+
+    async def get(self, conn, key: SeriesKey) -> Optional[Dict[str, Any]]:
+        return (await self.load(conn, [key])).get(key)
+
+    async def load_with_seeds(
+        self,
+        conn,
+        rows_by_key: Dict[SeriesKey, List[Any]]
+    ) -> Dict[SeriesKey, Dict[str, Any]]:
+        """
+        시계열별 이전 탐색 결과, 없으면 유사 시계열 최적 파라미터 {key: {seed_params, seeded_from}}
+
+        Args:
+            rows_by_key: 시계열별 학습 데이터 (신규 시계열 메타 특성 계산용)
+        """
+        history = await self.load(conn, list(rows_by_key))
+        missing = [key for key in rows_by_key if key not in history]
+        if not missing:
+            return history
+
+        candidate_rows = await conn.fetch("""
+            SELECT t.id, t."itemKey" as item_key, t."bestParams" as best_params, t.features,
+                   i.classification
+            FROM "tuning_studies" t
+            LEFT JOIN "Item" i ON i.key = t."itemKey"
+            WHERE t.features IS NOT NULL AND t."bestValue" IS NOT NULL
+        """)
+        if not candidate_rows:
+            return history
+        candidates = [
+            {
+                'id': row['id'],
+                'item_key': row['item_key'],
+                'classification': row['classification'],
+                'features': json.loads(row['features']),
+                'best_params': json.loads(row['best_params'])
+            }
+            for row in candidate_rows
+        ]
+        item_rows = await conn.fetch("""
+            SELECT key, classification FROM "Item" WHERE key = ANY($1::text[])
+        """, list({key[2] for key in missing}))
+        classifications = {row['key']: row['classification'] for row in item_rows}
+
+        from automl_engine import PmmsAutoMLPredictor
+
+        for key in missing:
+            y = PmmsAutoMLPredictor().prepare_training_data(rows_by_key[key])['y'].to_numpy()
+            seeds = nearest_seeds(series_features(y), key[2], classifications.get(key[2]), candidates)
+            if seeds:
+                history[key] = {
+                    'seed_params': [seed['best_params'] for seed in seeds],
+                    'seeded_from': [{'id': seed['id'], 'distance': seed['distance']} for seed in seeds]
+                }
+        logger.info(f"Meta-seeded {sum(key in history for key in missing)} of {len(missing)} new series")
+        return history
+
+    async def get_or_seed(self, conn, key: SeriesKey, rows: List[Any]) -> Optional[Dict[str, Any]]:
+        return (await self.load_with_seeds(conn, {key: rows})).get(key)
+
+    async def save(self, conn, tunings: Dict[SeriesKey, Optional[Dict[str, Any]]]) -> None:
+        """예측 결과의 tuning 저장 (시계열별 upsert, 탐색하지 않은 시계열은 생략)"""
+        entries = [(key, tuning) for key, tuning in tunings.items() if tuning]
+        if not entries:
+            return
+        await conn.execute("""
+            INSERT INTO "tuning_studies" (
+                id, "customerId", "stackId", "itemKey", "bestParams", "bestValue", trials, features,
+                "warmStart", "trialsRun", "updatedAt"
+            )
+            SELECT c || ':' || s || ':' || i, c, s, i, bp, bv, tr, f, ws, n, NOW()
+            FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::float8[], $6::text[], $7::text[],
+                        $8::bool[], $9::int[]) AS t(c, s, i, bp, bv, tr, f, ws, n)
+            ON CONFLICT (id) DO UPDATE SET
+                "bestParams" = EXCLUDED."bestParams",
+                "bestValue" = EXCLUDED."bestValue",
+                trials = EXCLUDED.trials,
+                features = EXCLUDED.features,
+                "warmStart" = EXCLUDED."warmStart",
+                "trialsRun" = EXCLUDED."trialsRun",
+                "updatedAt" = EXCLUDED."updatedAt"
+        """,
+            [key[0] for key, _ in entries],
+            [key[1] for key, _ in entries],
+            [key[2] for key, _ in entries],
+            [json.dumps(tuning['best_params']) for _, tuning in entries],
+            [tuning['best_value'] for _, tuning in entries],
+            [json.dumps(tuning['trials']) for _, tuning in entries],
+            [json.dumps(tuning['features']) if tuning.get('features') else None for _, tuning in entries],
+            [tuning['warm_start'] for _, tuning in entries],
+            [tuning['trials_run'] for _, tuning in entries]
+        )
+        logger.info(
+            f"Saved tuning history for {len(entries)} series "
+            f"({sum(tuning['warm_start'] for _, tuning in entries)} warm-started)"
+        )
+
+
+# 탐색 이력 저장소 싱글톤
+tuning_store = TuningStore()
@@ -0,0 +1,15 @@
+-- AlterTable
+ALTER TABLE "insight_reports" ADD COLUMN "summary" TEXT;
+
+-- Backfill: 기존 보고서의 reportData에서 목록용 요약 추출
+UPDATE "insight_reports"
+SET "summary" = json_build_object(
+    'risk_level', ("reportData"::jsonb) #>> '{insight_report,summary,risk,level}',
+    'risk_score', (("reportData"::jsonb) #>> '{insight_report,summary,risk,score}')::float,
+    'trend', ("reportData"::jsonb) #>> '{insight_report,summary,trend,trend}',
+    'change_rate', (("reportData"::jsonb) #>> '{insight_report,summary,trend,change_rate}')::float,
+    'historical_period', ("reportData"::jsonb) #>> '{insight_report,summary,historical,period}',
+    'prediction_period', ("reportData"::jsonb) #>> '{insight_report,summary,prediction,period}',
+    'exceed_probability', (("reportData"::jsonb) #>> '{insight_report,summary,prediction,exceed_probability}')::float
+)::text
+WHERE "summary" IS NULL;
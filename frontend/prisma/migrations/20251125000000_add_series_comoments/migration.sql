@@ -0,0 +1,19 @@
+-- CreateTable
+CREATE TABLE "series_comoments" (
+    "id" TEXT NOT NULL,
+    "customerId" TEXT NOT NULL,
+    "stackId" TEXT NOT NULL,
+    "itemKey" TEXT NOT NULL,
+    "rowCount" INTEGER NOT NULL,
+    "lastMeasuredAt" TIMESTAMP(3),
+    "state" TEXT NOT NULL,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "series_comoments_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "series_comoments_stackId_itemKey_key" ON "series_comoments"("stackId", "itemKey");
+
+-- CreateIndex
+CREATE INDEX "series_comoments_customerId_itemKey_idx" ON "series_comoments"("customerId", "itemKey");
@@ -0,0 +1,117 @@
+-- CreateTable
+CREATE TABLE "measurement_stats" (
+    "id" TEXT NOT NULL,
+    "customerId" TEXT NOT NULL,
+    "stackId" TEXT NOT NULL,
+    "itemKey" TEXT NOT NULL,
+    "count" INTEGER NOT NULL,
+    "mean" DOUBLE PRECISION NOT NULL,
+    "m2" DOUBLE PRECISION NOT NULL,
+    "minValue" DOUBLE PRECISION NOT NULL,
+    "maxValue" DOUBLE PRECISION NOT NULL,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "measurement_stats_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "measurement_stats_customerId_itemKey_stackId_key" ON "measurement_stats"("customerId", "itemKey", "stackId");
+
+-- 측정값 1건 반영 (Welford 증분 갱신)
+CREATE OR REPLACE FUNCTION measurement_stats_add(p_customer TEXT, p_stack TEXT, p_item TEXT, p_value DOUBLE PRECISION)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO "measurement_stats" AS s
+        ("id", "customerId", "stackId", "itemKey", "count", "mean", "m2", "minValue", "maxValue", "updatedAt")
+    VALUES
+        (p_customer || ':' || p_stack || ':' || p_item, p_customer, p_stack, p_item, 1, p_value, 0, p_value, p_value, CURRENT_TIMESTAMP)
+    ON CONFLICT ("customerId", "itemKey", "stackId") DO UPDATE SET
+        "count" = s."count" + 1,
+        "mean" = s."mean" + (p_value - s."mean") / (s."count" + 1),
+        "m2" = s."m2" + (p_value - s."mean") * (p_value - (s."mean" + (p_value - s."mean") / (s."count" + 1))),
+        "minValue" = LEAST(s."minValue", p_value),
+        "maxValue" = GREATEST(s."maxValue", p_value),
+        "updatedAt" = CURRENT_TIMESTAMP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 측정값 1건 제거 (Welford 역연산, 최소/최대값이 빠지면 해당 범위만 재조회)
+CREATE OR REPLACE FUNCTION measurement_stats_remove(p_customer TEXT, p_stack TEXT, p_item TEXT, p_value DOUBLE PRECISION)
+RETURNS VOID AS $$
+DECLARE
+    s RECORD;
+    new_mean DOUBLE PRECISION;
+BEGIN
+    SELECT * INTO s FROM "measurement_stats"
+    WHERE "customerId" = p_customer AND "itemKey" = p_item AND "stackId" = p_stack
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    IF s."count" <= 1 THEN
+        DELETE FROM "measurement_stats" WHERE "id" = s."id";
+        RETURN;
+    END IF;
+
+    new_mean := (s."mean" * s."count" - p_value) / (s."count" - 1);
+
+    UPDATE "measurement_stats" SET
+        "count" = s."count" - 1,
+        "mean" = new_mean,
+        "m2" = GREATEST(s."m2" - (p_value - new_mean) * (p_value - s."mean"), 0),
+        "updatedAt" = CURRENT_TIMESTAMP
+    WHERE "id" = s."id";
+
+    IF p_value <= s."minValue" OR p_value >= s."maxValue" THEN
+        UPDATE "measurement_stats" SET
+            ("minValue", "maxValue") = (
+                SELECT MIN(m.value), MAX(m.value)
+                FROM "Measurement" m
+                WHERE m."customerId" = p_customer
+                  AND m."itemKey" = p_item
+                  AND (p_stack = '' OR m."stackId" = p_stack)
+                  AND m.value IS NOT NULL
+            )
+        WHERE "id" = s."id";
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION measurement_stats_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.value IS NOT NULL THEN
+        PERFORM measurement_stats_remove(OLD."customerId", OLD."stackId", OLD."itemKey", OLD.value);
+        PERFORM measurement_stats_remove(OLD."customerId", '', OLD."itemKey", OLD.value);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.value IS NOT NULL THEN
+        PERFORM measurement_stats_add(NEW."customerId", NEW."stackId", NEW."itemKey", NEW.value);
+        PERFORM measurement_stats_add(NEW."customerId", '', NEW."itemKey", NEW.value);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "Measurement_stats_trigger"
+AFTER INSERT OR DELETE OR UPDATE OF "value", "customerId", "stackId", "itemKey" ON "Measurement"
+FOR EACH ROW EXECUTE FUNCTION measurement_stats_trigger();
+
+-- Backfill: 굴뚝별 / 고객사 전체 통계
+INSERT INTO "measurement_stats"
+    ("id", "customerId", "stackId", "itemKey", "count", "mean", "m2", "minValue", "maxValue", "updatedAt")
+SELECT
+    "customerId" || ':' || COALESCE("stackId", '') || ':' || "itemKey",
+    "customerId",
+    COALESCE("stackId", ''),
+    "itemKey",
+    COUNT(*),
+    AVG(value),
+    COALESCE(VAR_POP(value) * COUNT(*), 0),
+    MIN(value),
+    MAX(value),
+    CURRENT_TIMESTAMP
+FROM "Measurement"
+WHERE value IS NOT NULL
+GROUP BY GROUPING SETS (("customerId", "stackId", "itemKey"), ("customerId", "itemKey"));
@@ -0,0 +1,20 @@
+-- CreateTable
+CREATE TABLE "measurement_baselines" (
+    "id" TEXT NOT NULL,
+    "customerId" TEXT NOT NULL,
+    "stackId" TEXT NOT NULL,
+    "itemKey" TEXT NOT NULL,
+    "month" INTEGER NOT NULL,
+    "count" INTEGER NOT NULL,
+    "median" DOUBLE PRECISION NOT NULL,
+    "mad" DOUBLE PRECISION NOT NULL,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "measurement_baselines_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "measurement_baselines_stackId_itemKey_month_key" ON "measurement_baselines"("stackId", "itemKey", "month");
+
+-- CreateIndex
+CREATE INDEX "measurement_baselines_customerId_itemKey_idx" ON "measurement_baselines"("customerId", "itemKey");
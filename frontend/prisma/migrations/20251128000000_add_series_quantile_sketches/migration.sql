@@ -0,0 +1,19 @@
+-- CreateTable
+CREATE TABLE "series_quantile_sketches" (
+    "id" TEXT NOT NULL,
+    "customerId" TEXT NOT NULL,
+    "stackId" TEXT NOT NULL,
+    "itemKey" TEXT NOT NULL,
+    "rowCount" INTEGER NOT NULL,
+    "lastMeasuredAt" TIMESTAMP(3),
+    "state" TEXT NOT NULL,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "series_quantile_sketches_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "series_quantile_sketches_stackId_itemKey_key" ON "series_quantile_sketches"("stackId", "itemKey");
+
+-- CreateIndex
+CREATE INDEX "series_quantile_sketches_customerId_itemKey_idx" ON "series_quantile_sketches"("customerId", "itemKey");
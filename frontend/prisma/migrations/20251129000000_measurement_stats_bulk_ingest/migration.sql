@@ -0,0 +1,19 @@
+-- 일괄 적재(Python /api/measurements/ingest) 중에는 행 단위 통계 갱신 생략
+-- 적재 트랜잭션이 SET LOCAL pmms.bulk_ingest = 'on' 설정 후 영향받은 고객사/항목 통계를 1회 재집계
+CREATE OR REPLACE FUNCTION measurement_stats_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('pmms.bulk_ingest', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.value IS NOT NULL THEN
+        PERFORM measurement_stats_remove(OLD."customerId", OLD."stackId", OLD."itemKey", OLD.value);
+        PERFORM measurement_stats_remove(OLD."customerId", '', OLD."itemKey", OLD.value);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.value IS NOT NULL THEN
+        PERFORM measurement_stats_add(NEW."customerId", NEW."stackId", NEW."itemKey", NEW.value);
+        PERFORM measurement_stats_add(NEW."customerId", '', NEW."itemKey", NEW.value);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
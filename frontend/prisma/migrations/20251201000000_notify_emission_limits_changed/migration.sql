@@ -0,0 +1,17 @@
+-- 배출허용기준 변경 알림 (Python 배출허용기준 인덱스 재적재용)
+-- 문장(statement) 단위 트리거: 일괄 변경도 알림 1회, 같은 트랜잭션 내 중복 알림은 Postgres 가 병합
+CREATE OR REPLACE FUNCTION notify_emission_limits_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('emission_limits_changed', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER emission_limit_changed
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "EmissionLimit"
+FOR EACH STATEMENT EXECUTE FUNCTION notify_emission_limits_changed();
+
+CREATE TRIGGER item_limit_changed
+AFTER INSERT OR UPDATE OF "limit" OR DELETE ON "Item"
+FOR EACH STATEMENT EXECUTE FUNCTION notify_emission_limits_changed();
@@ -0,0 +1,34 @@
+-- CreateTable
+CREATE TABLE "risk_scan_results" (
+    "id" TEXT NOT NULL,
+    "customerId" TEXT NOT NULL,
+    "stackId" TEXT NOT NULL,
+    "itemKey" TEXT NOT NULL,
+    "forecastId" TEXT NOT NULL,
+    "forecastCreatedAt" TIMESTAMP(3) NOT NULL,
+    "horizonDays" INTEGER NOT NULL,
+    "limitValue" DOUBLE PRECISION,
+    "limitSource" TEXT,
+    "score" DOUBLE PRECISION NOT NULL,
+    "level" TEXT NOT NULL,
+    "exceedDays" INTEGER NOT NULL,
+    "upperExceedDays" INTEGER NOT NULL,
+    "exceedProbability" DOUBLE PRECISION NOT NULL,
+    "maxPredicted" DOUBLE PRECISION NOT NULL,
+    "maxRatio" DOUBLE PRECISION,
+    "historicalExceedRate" DOUBLE PRECISION NOT NULL,
+    "trendRising" BOOLEAN NOT NULL,
+    "firstExceedDate" TEXT,
+    "scannedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "risk_scan_results_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "risk_scan_results_score_idx" ON "risk_scan_results"("score");
+
+-- CreateIndex
+CREATE INDEX "risk_scan_results_customerId_score_idx" ON "risk_scan_results"("customerId", "score");
+
+-- CreateIndex
+CREATE INDEX "risk_scan_results_itemKey_score_idx" ON "risk_scan_results"("itemKey", "score");
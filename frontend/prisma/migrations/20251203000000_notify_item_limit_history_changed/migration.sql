@@ -0,0 +1,5 @@
+-- 항목 기준 이력(ItemLimitHistory) 변경도 배출허용기준 인덱스 재적재 대상
+-- (시작일이 미래인 이력은 인덱스 TTL 재적재 시점에 반영)
+CREATE TRIGGER item_limit_history_changed
+AFTER INSERT OR UPDATE OR DELETE ON "ItemLimitHistory"
+FOR EACH STATEMENT EXECUTE FUNCTION notify_emission_limits_changed();
@@ -0,0 +1,17 @@
+-- CreateTable
+CREATE TABLE "stack_forecasts" (
+    "id" TEXT NOT NULL,
+    "customerId" TEXT NOT NULL,
+    "stackId" TEXT NOT NULL,
+    "itemKey" TEXT NOT NULL,
+    "periods" INTEGER NOT NULL,
+    "rowCount" INTEGER NOT NULL,
+    "lastMeasuredAt" TIMESTAMP(3),
+    "forecast" TEXT NOT NULL,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "stack_forecasts_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "stack_forecasts_customerId_stackId_itemKey_periods_key" ON "stack_forecasts"("customerId", "stackId", "itemKey", "periods");
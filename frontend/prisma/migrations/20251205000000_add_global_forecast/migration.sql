@@ -0,0 +1,33 @@
+-- CreateTable
+CREATE TABLE "global_forecast_models" (
+    "id" TEXT NOT NULL,
+    "version" INTEGER NOT NULL,
+    "model" BYTEA NOT NULL,
+    "info" TEXT NOT NULL,
+    "trainedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "global_forecast_models_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateTable
+CREATE TABLE "global_forecast_evaluations" (
+    "id" TEXT NOT NULL,
+    "customerId" TEXT NOT NULL,
+    "stackId" TEXT NOT NULL,
+    "itemKey" TEXT NOT NULL,
+    "holdoutStart" TIMESTAMP(3) NOT NULL,
+    "holdoutCount" INTEGER NOT NULL,
+    "globalRmse" DOUBLE PRECISION NOT NULL,
+    "globalMae" DOUBLE PRECISION NOT NULL,
+    "globalMape" DOUBLE PRECISION NOT NULL,
+    "arimaRmse" DOUBLE PRECISION,
+    "arimaMae" DOUBLE PRECISION,
+    "arimaMape" DOUBLE PRECISION,
+    "arimaComparedAt" TIMESTAMP(3),
+    "evaluatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "global_forecast_evaluations_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "global_forecast_evaluations_customerId_itemKey_idx" ON "global_forecast_evaluations"("customerId", "itemKey");
@@ -0,0 +1,15 @@
+-- CreateTable
+CREATE TABLE "tuning_studies" (
+    "id" TEXT NOT NULL,
+    "customerId" TEXT NOT NULL,
+    "stackId" TEXT NOT NULL,
+    "itemKey" TEXT NOT NULL,
+    "bestParams" TEXT NOT NULL,
+    "bestValue" DOUBLE PRECISION,
+    "trials" TEXT NOT NULL,
+    "warmStart" BOOLEAN NOT NULL DEFAULT false,
+    "trialsRun" INTEGER NOT NULL,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "tuning_studies_pkey" PRIMARY KEY ("id")
+);
@@ -0,0 +1,2 @@
+-- AlterTable
+ALTER TABLE "tuning_studies" ADD COLUMN "features" TEXT;
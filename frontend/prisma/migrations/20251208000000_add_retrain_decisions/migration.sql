@@ -0,0 +1,21 @@
+-- CreateTable
+CREATE TABLE "retrain_decisions" (
+    "id" TEXT NOT NULL,
+    "customerId" TEXT NOT NULL,
+    "stackId" TEXT NOT NULL,
+    "itemKey" TEXT NOT NULL,
+    "periods" INTEGER NOT NULL,
+    "retrain" BOOLEAN NOT NULL,
+    "reason" TEXT NOT NULL,
+    "rollingError" DOUBLE PRECISION,
+    "residualCount" INTEGER NOT NULL,
+    "modelAgeDays" DOUBLE PRECISION,
+    "forecastCreatedAt" TIMESTAMP(3),
+    "lastMeasuredAt" TIMESTAMP(3),
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "retrain_decisions_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "retrain_decisions_customerId_itemKey_idx" ON "retrain_decisions"("customerId", "itemKey");
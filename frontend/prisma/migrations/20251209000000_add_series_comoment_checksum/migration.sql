@@ -0,0 +1,3 @@
+-- 굴뚝별 행 체크섬 (SUM(hashtext(측정 행))): 값/환경변수 제자리 수정 시 누적 통계 재계산
+-- 기존 상태는 checksum 이 없으므로 다음 조회 시 굴뚝별 1회 재계산
+ALTER TABLE "series_comoments" ADD COLUMN "checksum" BIGINT;
@@ -0,0 +1,3 @@
+-- 굴뚝별 행 체크섬 (SUM(hashtext(측정시각, 값))): 값 제자리 수정 시 분위수 스케치 재계산
+-- 기존 상태는 checksum 이 없으므로 다음 조회 시 굴뚝별 1회 재계산
+ALTER TABLE "series_quantile_sketches" ADD COLUMN "checksum" BIGINT;
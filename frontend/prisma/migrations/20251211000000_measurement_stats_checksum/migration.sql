@@ -0,0 +1,153 @@
+-- 굴뚝/항목별 행 체크섬 + 최신 측정시각을 measurement_stats 트리거가 함께 유지
+-- 증분 상태 저장소(series_comoments, series_quantile_sketches)는 조회 시 전체 이력을 다시 해시하지 않고
+-- 이 값(건수, 최신 측정시각, 체크섬)만 비교해 신규 행 반영/재계산 여부를 판단
+
+-- 측정 행 체크섬 (측정시각, 값, 환경변수): 저장소의 신규 행 조회와 같은 정의
+CREATE OR REPLACE FUNCTION measurement_checksum(m "Measurement")
+RETURNS BIGINT AS $$
+    SELECT hashtext(ROW(
+        m."measuredAt", m.value, m."temperatureC", m."humidityPct", m."windSpeedMs", m."gasTempC",
+        m."oxygenMeasuredPct", m."pressureMmHg", m."gasVelocityMs", m."moisturePct", m."flowSm3Min"
+    )::text)::BIGINT
+$$ LANGUAGE sql STABLE;
+
+ALTER TABLE "measurement_stats" ADD COLUMN "checksum" BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE "measurement_stats" ADD COLUMN "lastMeasuredAt" TIMESTAMP(3);
+
+DROP FUNCTION measurement_stats_add(TEXT, TEXT, TEXT, DOUBLE PRECISION);
+DROP FUNCTION measurement_stats_remove(TEXT, TEXT, TEXT, DOUBLE PRECISION);
+
+-- 측정값 1건 반영 (Welford 증분 갱신, 체크섬 가산)
+CREATE OR REPLACE FUNCTION measurement_stats_add(
+    p_customer TEXT, p_stack TEXT, p_item TEXT, p_value DOUBLE PRECISION,
+    p_checksum BIGINT, p_measured_at TIMESTAMP(3)
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO "measurement_stats" AS s
+        ("id", "customerId", "stackId", "itemKey", "count", "mean", "m2", "minValue", "maxValue",
+         "checksum", "lastMeasuredAt", "updatedAt")
+    VALUES
+        (p_customer || ':' || p_stack || ':' || p_item, p_customer, p_stack, p_item, 1, p_value, 0, p_value, p_value,
+         p_checksum, p_measured_at, CURRENT_TIMESTAMP)
+    ON CONFLICT ("customerId", "itemKey", "stackId") DO UPDATE SET
+        "count" = s."count" + 1,
+        "mean" = s."mean" + (p_value - s."mean") / (s."count" + 1),
+        "m2" = s."m2" + (p_value - s."mean") * (p_value - (s."mean" + (p_value - s."mean") / (s."count" + 1))),
+        "minValue" = LEAST(s."minValue", p_value),
+        "maxValue" = GREATEST(s."maxValue", p_value),
+        "checksum" = s."checksum" + p_checksum,
+        "lastMeasuredAt" = GREATEST(s."lastMeasuredAt", p_measured_at),
+        "updatedAt" = CURRENT_TIMESTAMP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 측정값 1건 제거 (Welford 역연산, 체크섬 감산, 최소/최대값이 빠지면 해당 범위만 재조회)
+-- lastMeasuredAt 은 줄이지 않음 (건수/체크섬 불일치로 저장소가 재계산하므로 보수적으로 유지)
+CREATE OR REPLACE FUNCTION measurement_stats_remove(
+    p_customer TEXT, p_stack TEXT, p_item TEXT, p_value DOUBLE PRECISION, p_checksum BIGINT
+)
+RETURNS VOID AS $$
+DECLARE
+    s RECORD;
+    new_mean DOUBLE PRECISION;
+BEGIN
+    SELECT * INTO s FROM "measurement_stats"
+    WHERE "customerId" = p_customer AND "itemKey" = p_item AND "stackId" = p_stack
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    IF s."count" <= 1 THEN
+        DELETE FROM "measurement_stats" WHERE "id" = s."id";
+        RETURN;
+    END IF;
+
+    new_mean := (s."mean" * s."count" - p_value) / (s."count" - 1);
+
+    UPDATE "measurement_stats" SET
+        "count" = s."count" - 1,
+        "mean" = new_mean,
+        "m2" = GREATEST(s."m2" - (p_value - new_mean) * (p_value - s."mean"), 0),
+        "checksum" = s."checksum" - p_checksum,
+        "updatedAt" = CURRENT_TIMESTAMP
+    WHERE "id" = s."id";
+
+    IF p_value <= s."minValue" OR p_value >= s."maxValue" THEN
+        UPDATE "measurement_stats" SET
+            ("minValue", "maxValue") = (
+                SELECT MIN(m.value), MAX(m.value)
+                FROM "Measurement" m
+                WHERE m."customerId" = p_customer
+                  AND m."itemKey" = p_item
+                  AND (p_stack = '' OR m."stackId" = p_stack)
+                  AND m.value IS NOT NULL
+            )
+        WHERE "id" = s."id";
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION measurement_stats_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('pmms.bulk_ingest', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    -- 값/키 변화 없는 수정 (측정시각/환경변수만): 체크섬, 최신 측정시각만 갱신
+    IF TG_OP = 'UPDATE'
+       AND OLD.value IS NOT DISTINCT FROM NEW.value
+       AND OLD."customerId" = NEW."customerId"
+       AND OLD."stackId" IS NOT DISTINCT FROM NEW."stackId"
+       AND OLD."itemKey" = NEW."itemKey" THEN
+        IF NEW.value IS NOT NULL THEN
+            UPDATE "measurement_stats" SET
+                "checksum" = "checksum" - measurement_checksum(OLD) + measurement_checksum(NEW),
+                "lastMeasuredAt" = GREATEST("lastMeasuredAt", NEW."measuredAt"),
+                "updatedAt" = CURRENT_TIMESTAMP
+            WHERE "customerId" = NEW."customerId"
+              AND "itemKey" = NEW."itemKey"
+              AND "stackId" IN (NEW."stackId", '');
+        END IF;
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.value IS NOT NULL THEN
+        PERFORM measurement_stats_remove(OLD."customerId", OLD."stackId", OLD."itemKey", OLD.value, measurement_checksum(OLD));
+        PERFORM measurement_stats_remove(OLD."customerId", '', OLD."itemKey", OLD.value, measurement_checksum(OLD));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.value IS NOT NULL THEN
+        PERFORM measurement_stats_add(NEW."customerId", NEW."stackId", NEW."itemKey", NEW.value,
+                                      measurement_checksum(NEW), NEW."measuredAt");
+        PERFORM measurement_stats_add(NEW."customerId", '', NEW."itemKey", NEW.value,
+                                      measurement_checksum(NEW), NEW."measuredAt");
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 측정시각/환경변수 수정도 체크섬에 반영 (limitCheck 등 판정 컬럼 갱신은 제외)
+DROP TRIGGER "Measurement_stats_trigger" ON "Measurement";
+CREATE TRIGGER "Measurement_stats_trigger"
+AFTER INSERT OR DELETE OR UPDATE OF
+    "value", "customerId", "stackId", "itemKey", "measuredAt",
+    "temperatureC", "humidityPct", "windSpeedMs", "gasTempC", "oxygenMeasuredPct",
+    "pressureMmHg", "gasVelocityMs", "moisturePct", "flowSm3Min"
+ON "Measurement"
+FOR EACH ROW EXECUTE FUNCTION measurement_stats_trigger();
+
+-- Backfill: 기존 통계 행의 체크섬/최신 측정시각
+UPDATE "measurement_stats" s SET
+    "checksum" = agg.checksum,
+    "lastMeasuredAt" = agg.last_measured_at
+FROM (
+    SELECT
+        m."customerId" || ':' || COALESCE(m."stackId", '') || ':' || m."itemKey" as id,
+        SUM(measurement_checksum(m)) as checksum,
+        MAX(m."measuredAt") as last_measured_at
+    FROM "Measurement" m
+    WHERE m.value IS NOT NULL
+    GROUP BY GROUPING SETS ((m."customerId", m."stackId", m."itemKey"), (m."customerId", m."itemKey"))
+) agg
+WHERE s."id" = agg.id;
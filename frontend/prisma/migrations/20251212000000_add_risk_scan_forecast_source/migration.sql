@@ -0,0 +1,2 @@
+-- 위험도 채점에 사용한 예측 출처: stack (굴뚝별 기준 예측) / pooled (고객사 전체 예측)
+ALTER TABLE "risk_scan_results" ADD COLUMN "forecastSource" TEXT NOT NULL DEFAULT 'pooled';
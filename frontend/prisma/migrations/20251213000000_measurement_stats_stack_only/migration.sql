@@ -0,0 +1,88 @@
+-- measurement_stats 를 굴뚝 행만 유지
+-- 고객사 전체 행(stackId = '')은 모든 측정 행의 트리거가 같은 행을 갱신해 잠금 경합이 생기고,
+-- 삭제 시 최소/최대값을 고객사 전체 범위로 재조회하므로 제거
+-- 고객사 전체 통계는 조회 시 굴뚝 행을 병합해 산출 (backend/measurement_stats.py)
+
+-- 측정값 1건 제거 (Welford 역연산, 체크섬 감산, 최소/최대값이 빠지면 해당 굴뚝만 재조회)
+-- lastMeasuredAt 은 줄이지 않음 (건수/체크섬 불일치로 저장소가 재계산하므로 보수적으로 유지)
+CREATE OR REPLACE FUNCTION measurement_stats_remove(
+    p_customer TEXT, p_stack TEXT, p_item TEXT, p_value DOUBLE PRECISION, p_checksum BIGINT
+)
+RETURNS VOID AS $$
+DECLARE
+    s RECORD;
+    new_mean DOUBLE PRECISION;
+BEGIN
+    SELECT * INTO s FROM "measurement_stats"
+    WHERE "customerId" = p_customer AND "itemKey" = p_item AND "stackId" = p_stack
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    IF s."count" <= 1 THEN
+        DELETE FROM "measurement_stats" WHERE "id" = s."id";
+        RETURN;
+    END IF;
+
+    new_mean := (s."mean" * s."count" - p_value) / (s."count" - 1);
+
+    UPDATE "measurement_stats" SET
+        "count" = s."count" - 1,
+        "mean" = new_mean,
+        "m2" = GREATEST(s."m2" - (p_value - new_mean) * (p_value - s."mean"), 0),
+        "checksum" = s."checksum" - p_checksum,
+        "updatedAt" = CURRENT_TIMESTAMP
+    WHERE "id" = s."id";
+
+    IF p_value <= s."minValue" OR p_value >= s."maxValue" THEN
+        UPDATE "measurement_stats" SET
+            ("minValue", "maxValue") = (
+                SELECT MIN(m.value), MAX(m.value)
+                FROM "Measurement" m
+                WHERE m."customerId" = p_customer
+                  AND m."itemKey" = p_item
+                  AND m."stackId" = p_stack
+                  AND m.value IS NOT NULL
+            )
+        WHERE "id" = s."id";
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION measurement_stats_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('pmms.bulk_ingest', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    -- 값/키 변화 없는 수정 (측정시각/환경변수만): 체크섬, 최신 측정시각만 갱신
+    IF TG_OP = 'UPDATE'
+       AND OLD.value IS NOT DISTINCT FROM NEW.value
+       AND OLD."customerId" = NEW."customerId"
+       AND OLD."stackId" = NEW."stackId"
+       AND OLD."itemKey" = NEW."itemKey" THEN
+        IF NEW.value IS NOT NULL THEN
+            UPDATE "measurement_stats" SET
+                "checksum" = "checksum" - measurement_checksum(OLD) + measurement_checksum(NEW),
+                "lastMeasuredAt" = GREATEST("lastMeasuredAt", NEW."measuredAt"),
+                "updatedAt" = CURRENT_TIMESTAMP
+            WHERE "customerId" = NEW."customerId"
+              AND "itemKey" = NEW."itemKey"
+              AND "stackId" = NEW."stackId";
+        END IF;
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.value IS NOT NULL THEN
+        PERFORM measurement_stats_remove(OLD."customerId", OLD."stackId", OLD."itemKey", OLD.value, measurement_checksum(OLD));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.value IS NOT NULL THEN
+        PERFORM measurement_stats_add(NEW."customerId", NEW."stackId", NEW."itemKey", NEW.value,
+                                      measurement_checksum(NEW), NEW."measuredAt");
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DELETE FROM "measurement_stats" WHERE "stackId" = '';